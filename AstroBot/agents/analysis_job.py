@@ -0,0 +1,166 @@
+import hashlib
+import time
+import uuid
+from datetime import datetime
+
+from .persistence import atomic_write_json, load_json
+
+
+class AnalysisJob:
+    """
+    Travail d'analyse reprenable, décrit par un point de reprise JSON :
+    phase courante, curseur dans la liste des éléments de chaque phase,
+    éléments en échec (avec leur erreur) et débit mesuré. Un arrêt (Ctrl-C, plantage d'Ollama)
+    laisse le point de reprise à jour ; le lancement suivant reprend la phase
+    interrompue au curseur enregistré au lieu de tout reparcourir.
+    """
+
+    def __init__(self, checkpoint_file, phases, logger=None, checkpoint_interval=30):
+        self.checkpoint_file = checkpoint_file
+        self.phases = list(phases)
+        self.logger = logger
+        self.checkpoint_interval = checkpoint_interval
+        self.state = None
+        self._last_checkpoint = 0.0
+        self._phase_started = {}
+
+    def start(self, resume=True):
+        """Reprend le travail inachevé s'il existe, sinon en démarre un nouveau. Retourne True en cas de reprise."""
+        previous = load_json(self.checkpoint_file, None, self.logger) if resume else None
+        if previous and previous.get('status') != 'completed' and previous.get('phase_order') == self.phases:
+            self.state = previous
+            self.state['status'] = 'running'
+            self.state['resumed'] = self.state.get('resumed', 0) + 1
+            self._log('info', f"♻️ Reprise du travail {self.state['job_id']} à la phase '{self.state['phase']}'.")
+            self.save()
+            return True
+
+        now = self._now()
+        self.state = {
+            'job_id': uuid.uuid4().hex[:8],
+            'status': 'running',
+            'phase_order': self.phases,
+            'phase': self.phases[0],
+            'started_at': now,
+            'updated_at': now,
+            'resumed': 0,
+            'phases': {name: {'status': 'pending', 'total': 0, 'cursor': 0, 'done': 0,
+                              'failed': {}, 'elapsed': 0.0, 'rate': 0.0, 'stats': {}}
+                       for name in self.phases}
+        }
+        self.save()
+        return False
+
+    def is_done(self, phase):
+        return self.state['phases'][phase]['status'] == 'done'
+
+    def begin_phase(self, phase, items):
+        """
+        Démarre (ou reprend) une phase sur la liste 'items' (pubkeys) et retourne
+        les éléments restant à traiter, situés après le curseur enregistré.
+        La liste doit être fournie dans un ordre stable d'un lancement à
+        l'autre : toute différence (contenu ou ordre) fait repartir la phase
+        du début plutôt que de sauter des éléments jamais traités.
+        """
+        info = self.state['phases'][phase]
+        self.state['phase'] = phase
+        fingerprint = [len(items), hashlib.sha1('\n'.join(map(str, items)).encode('utf-8')).hexdigest()]
+        if info['status'] == 'pending' or info.get('fingerprint') != fingerprint:
+            # Nouvelle phase, ou liste modifiée depuis l'arrêt : on repart du début (échecs compris)
+            info.update({'cursor': 0, 'done': 0, 'failed': {}, 'fingerprint': fingerprint})
+        info['status'] = 'running'
+        info['total'] = len(items)
+        info['elapsed_before'] = info['elapsed']
+        self._phase_started[phase] = (time.time(), info['cursor'])
+        self.save()
+
+        if info['cursor']:
+            self._log('info', f"⏩ Phase '{phase}' : reprise à l'élément {info['cursor']}/{len(items)}.")
+        return items[info['cursor']:]
+
+    def advance(self, phase, count=1, failed=None):
+        """Enregistre 'count' éléments traités (et les éventuels échecs : {pubkey: erreur})."""
+        info = self.state['phases'][phase]
+        info['cursor'] = min(info['cursor'] + count, info['total'])
+        info['done'] += count
+        for pubkey, error in (failed or {}).items():
+            failure = info['failed'].setdefault(pubkey, {'attempts': 0})
+            failure['attempts'] += 1
+            failure['error'] = str(error)[:200]
+        self._measure(phase)
+
+    def failed_items(self, phase):
+        """Éléments en échec de la phase (déjà passés par le curseur), à retenter lors d'une reprise."""
+        return set(self.state['phases'][phase]['failed'])
+
+    def resolve(self, phase, item):
+        """Retire de la liste des échecs un élément retenté avec succès."""
+        self.state['phases'][phase]['failed'].pop(item, None)
+
+    def checkpoint_due(self):
+        return time.time() - self._last_checkpoint >= self.checkpoint_interval
+
+    def end_phase(self, phase, stats=None):
+        info = self.state['phases'][phase]
+        info['status'] = 'done'
+        info['cursor'] = info['total']
+        info['stats'] = stats or {}
+        self._measure(phase)
+        self.save()
+
+    def finish(self, status='completed', error=None):
+        """Termine le travail : 'completed', 'interrupted' ou 'failed'."""
+        self.state['status'] = status
+        if error:
+            self.state['error'] = str(error)[:500]
+        self.save()
+
+    def eta_seconds(self, phase):
+        """Temps restant estimé pour la phase, d'après le débit mesuré."""
+        info = self.state['phases'][phase]
+        if info['rate'] <= 0:
+            return None
+        return (info['total'] - info['cursor']) / info['rate']
+
+    def progress_line(self, phase):
+        info = self.state['phases'][phase]
+        eta = self.eta_seconds(phase)
+        eta_text = f", reste ~{eta / 60:.1f} min" if eta is not None else ""
+        return f"{info['cursor']}/{info['total']} ({info['rate']:.2f}/s{eta_text})"
+
+    def summary(self):
+        """Résumé du travail (pour l'affichage ou une sortie JSON)."""
+        return {
+            'job_id': self.state['job_id'],
+            'status': self.state['status'],
+            'phase': self.state['phase'],
+            'resumed': self.state['resumed'],
+            'phases': {name: dict({key: info[key] for key in ('status', 'total', 'cursor', 'rate', 'stats')},
+                                  failed=len(info['failed']), eta_seconds=self.eta_seconds(name))
+                       for name, info in self.state['phases'].items()}
+        }
+
+    def save(self):
+        self.state['updated_at'] = self._now()
+        atomic_write_json(self.checkpoint_file, self.state, indent=2)
+        self._last_checkpoint = time.time()
+
+    def _measure(self, phase):
+        started = self._phase_started.get(phase)
+        if not started:
+            return
+        start_time, start_cursor = started
+        info = self.state['phases'][phase]
+        elapsed = time.time() - start_time
+        processed = info['cursor'] - start_cursor
+        if elapsed > 0 and processed > 0:
+            info['rate'] = round(processed / elapsed, 3)
+        info['elapsed'] = round(info.get('elapsed_before', 0.0) + elapsed, 1)
+
+    @staticmethod
+    def _now():
+        return datetime.utcnow().isoformat() + 'Z'
+
+    def _log(self, level, message):
+        if self.logger:
+            getattr(self.logger, level)(message)
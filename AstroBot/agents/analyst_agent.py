@@ -1,11 +1,18 @@
 from .base_agent import Agent
+from .llm_client import LLMClientError
+from .geocoder import OfflineGeocoder, SpatialGeoCache
+from .countries import primary_language
+from .persistence import atomic_write_json
+from .journal_cache import JournalCache
+from .llm_cache import prompt_version
+from .analysis_job import AnalysisJob
 import json
 import os
 import subprocess
 import random
 import requests
 import time
-from collections import defaultdict, Counter
+from collections import Counter
 import unicodedata
 from itertools import combinations
 import hashlib
@@ -17,6 +24,9 @@ class AnalystAgent(Agent):
     de choisir une cible stratégique. Il propose deux modes : Rapide et Profond.
     """
 
+    # Entrée du cache thématique qui mémorise la version du prompt utilisé
+    THEMATIC_CACHE_VERSION_KEY = '__prompt_version__'
+
     def _clean_ia_json_output(self, ia_output_str: str) -> str:
         """
         Nettoie la sortie brute de l'IA pour en extraire une chaîne JSON valide.
@@ -52,25 +62,26 @@ class AnalystAgent(Agent):
         Charge la base de connaissance existante, la synchronise avec le
         fichier de prospects source pour ajouter/mettre à jour les entrées,
         et la retourne. La base est un dictionnaire indexé par pubkey.
+        La synchronisation n'est rejouée que si le fichier source a changé.
         """
-        kb_file = self.shared_state['config']['enriched_prospects_file']
         prospect_file = os.path.expanduser(self.shared_state['config']['prospect_file'])
+        store = self._knowledge_store()
         
         # 1. Charger la base de connaissance existante
-        knowledge_base = {}
-        if os.path.exists(kb_file):
-            try:
-                with open(kb_file, 'r') as f:
-                    knowledge_base = json.load(f)
-                self.logger.info(f"{len(knowledge_base)} profils chargés depuis la base de connaissance.")
-            except (json.JSONDecodeError, IOError) as e:
-                self.logger.error(f"Impossible de charger la base de connaissance '{kb_file}'. Erreur : {e}")
+        knowledge_base = store.load_all()
+        if knowledge_base:
+            self.logger.info(f"{len(knowledge_base)} profils chargés depuis la base de connaissance.")
 
         # 2. Lire le fichier source et synchroniser
         if not os.path.exists(prospect_file):
             self.logger.error(f"Fichier de prospects source '{prospect_file}' non trouvé.")
             return knowledge_base # On retourne ce qu'on a
 
+        source_signature = self._get_source_signature(prospect_file)
+        if store.get_meta('source_signature') == source_signature:
+            self.logger.debug("Fichier de prospects source inchangé depuis la dernière synchronisation.")
+            return knowledge_base
+
         try:
             with open(prospect_file, 'r') as f:
                 source_data = json.load(f)
@@ -136,20 +147,53 @@ class AnalystAgent(Agent):
 
             self.logger.info(f"Synchronisation terminée : {source_prospects_count} profils dans la source, {new_prospects_count} nouveaux ajoutés, {updated_prospects_count} mis à jour.")
             self.logger.info(f"📊 Composition : {g1_prospects} G1, {gchange_prospects} Gchange, {linked_accounts_count} avec comptes liés")
+
+            # Seuls les profils réellement modifiés par la synchronisation sont réécrits
+            written = store.save(knowledge_base)
+            store.set_meta('source_signature', source_signature)
+            self.logger.debug(f"{written} profils écrits après synchronisation.")
             
         except Exception as e:
             self.logger.error(f"Erreur lors de la synchronisation avec '{prospect_file}': {e}", exc_info=True)
             
         return knowledge_base
 
+    def _get_source_signature(self, prospect_file):
+        """Empreinte (chemin, date de modification, taille) du fichier de prospects source."""
+        stat = os.stat(prospect_file)
+        return f"{os.path.abspath(prospect_file)}:{stat.st_mtime_ns}:{stat.st_size}"
+
+    def _ensure_knowledge_base_synced(self):
+        """Synchronise la base avec le fichier source uniquement si celui-ci a changé."""
+        prospect_file = os.path.expanduser(self.shared_state['config']['prospect_file'])
+        if not os.path.exists(prospect_file):
+            return
+        if self._knowledge_store().get_meta('source_signature') != self._get_source_signature(prospect_file):
+            self._load_and_sync_knowledge_base()
+
+    def _targeting_cache(self):
+        """
+        Retourne le cache partagé de la base de connaissance après synchronisation,
+        avec ses index inversés (thèmes, langues, pays, régions) pour le ciblage.
+        """
+        self._ensure_knowledge_base_synced()
+        return self._knowledge_cache()
+
+    @staticmethod
+    def _target_entry(pubkey, data):
+        """Format d'une cible sauvegardée dans todays_targets.json"""
+        return {
+            'pubkey': pubkey,
+            'uid': data.get('uid', ''),
+            'metadata': data.get('metadata', {})
+        }
+
     def _save_knowledge_base(self, knowledge_base):
-        """Sauvegarde la base de connaissance enrichie dans son fichier."""
-        kb_file = self.shared_state['config']['enriched_prospects_file']
+        """Sauvegarde la base de connaissance enrichie (seuls les profils modifiés sont écrits)."""
         try:
-            with open(kb_file, 'w') as f:
-                json.dump(knowledge_base, f, indent=2, ensure_ascii=False)
-            self.logger.info(f"Base de connaissance sauvegardée avec {len(knowledge_base)} profils.")
-        except IOError as e:
+            written = self._knowledge_store().save(knowledge_base)
+            self.logger.info(f"Base de connaissance sauvegardée avec {len(knowledge_base)} profils ({written} mis à jour).")
+        except Exception as e:
             self.logger.error(f"Impossible de sauvegarder la base de connaissance : {e}")
 
     def display_enhanced_statistics(self):
@@ -295,66 +339,11 @@ class AnalystAgent(Agent):
     def get_analysis_progress(self):
         """
         Calcule et retourne l'état d'avancement de l'enrichissement
-        de la base de connaissance.
+        de la base de connaissance. Les compteurs sont calculés par le
+        stockage sans recharger l'ensemble des profils.
         """
-        knowledge_base = self._load_and_sync_knowledge_base()
-        total_prospects = len(knowledge_base)
-        
-        language_analyzed = 0
-        tags_analyzed = 0
-        web2_analyzed = 0
-        gps_prospects = 0
-        
-        # Nouvelles statistiques
-        linked_accounts_count = 0
-        import_sources = {}
-        discovery_methods = {}
-        
-        for pk, data in knowledge_base.items():
-            metadata = data.get('metadata', {})
-            if 'language' in metadata:
-                language_analyzed += 1
-            if 'tags' in metadata:
-                tags_analyzed += 1
-            if 'web2' in metadata:
-                web2_analyzed += 1
-            
-            # Compter les profils avec GPS
-            profile = data.get('profile', {})
-            if profile and '_source' in profile:
-                source = profile['_source']
-                geo_point = source.get('geoPoint', {})
-                if geo_point and 'lat' in geo_point and 'lon' in geo_point:
-                    lat = geo_point.get('lat')
-                    lon = geo_point.get('lon')
-                    if lat is not None and lon is not None and lat != 0 and lon != 0:
-                        gps_prospects += 1
-            
-            # Analyser les nouvelles données
-            linked_accounts = data.get('linked_accounts', {})
-            if linked_accounts:
-                linked_accounts_count += 1
-            
-            import_metadata = data.get('import_metadata', {})
-            if import_metadata:
-                source_script = import_metadata.get('source_script')
-                if source_script:
-                    import_sources[source_script] = import_sources.get(source_script, 0) + 1
-                
-                discovery_method = import_metadata.get('discovery_method')
-                if discovery_method:
-                    discovery_methods[discovery_method] = discovery_methods.get(discovery_method, 0) + 1
-                
-        return {
-            "total": total_prospects,
-            "language": language_analyzed,
-            "tags": tags_analyzed,
-            "web2": web2_analyzed,
-            "gps_prospects": gps_prospects,
-            "linked_accounts": linked_accounts_count,
-            "import_sources": import_sources,
-            "discovery_methods": discovery_methods
-        }
+        self._ensure_knowledge_base_synced()
+        return self._knowledge_store().progress_stats()
 
     def run_geo_linguistic_analysis(self):
         """
@@ -417,6 +406,8 @@ class AnalystAgent(Agent):
         batch_size = 15
         max_gps_requests = min(5000, len(prospects_with_gps))
         gps_requests_made = 0
+        spatial_cache = self._spatial_geo_cache(geo_cache)
+        resolved = []  # (pubkey, geo_data) à appliquer à la fin du batch
         
         for i in range(0, len(prospects_with_gps), batch_size):
             batch = prospects_with_gps[i:i+batch_size]
@@ -426,50 +417,37 @@ class AnalystAgent(Agent):
                     self.logger.info(f"⚠️ Limite GPS atteinte ({max_gps_requests} requêtes)")
                     break
                     
-                # Vérifier le cache
-                if item['cache_key'] in geo_cache:
-                    geo_data = geo_cache[item['cache_key']]
+                # Vérifier le cache (même point ou point voisin déjà résolu)
+                geo_data = spatial_cache.get(item['lat'], item['lon'])
+                if geo_data:
                     gps_cached += 1
                     self.logger.debug(f"📍 Cache GPS hit : {item['uid']}")
                 else:
-                    # Géolocaliser
+                    # Géolocaliser (hors ligne si possible, sinon Nominatim)
                     try:
-                        time.sleep(random.uniform(1.0, 1.2))  # Respecter les limites Nominatim
                         geo_data = self._geolocate_from_coordinates(item['lat'], item['lon'])
                         
                         if geo_data:
-                            geo_cache[item['cache_key']] = geo_data
+                            spatial_cache.put(item['lat'], item['lon'], geo_data)
                             gps_geolocated += 1
-                            gps_requests_made += 1
-                            self.logger.info(f"📍 GPS {gps_requests_made}/{max_gps_requests} : {item['uid']} -> {geo_data.get('country', 'N/A')}")
+                            if geo_data.get('geolocation_source') == 'offline_geonames':
+                                self.logger.debug(f"📍 GPS hors ligne : {item['uid']} -> {geo_data.get('country', 'N/A')}")
+                            else:
+                                # Seules les requêtes réseau sont limitées
+                                gps_requests_made += 1
+                                self.logger.info(f"📍 GPS {gps_requests_made}/{max_gps_requests} : {item['uid']} -> {geo_data.get('country', 'N/A')}")
                         else:
                             self.logger.debug(f"⚠️ Échec géolocalisation GPS pour {item['uid']}")
                     except Exception as e:
+                        geo_data = None
                         self.logger.warning(f"⚠️ Erreur GPS pour {item['uid']} : {e}")
                 
-                # Appliquer les données géolocalisées
-                if item['cache_key'] in geo_cache:
-                    geo_data = geo_cache[item['cache_key']]
-                    prospect_data = knowledge_base[item['pubkey']]
-                    meta = prospect_data.setdefault('metadata', {})
-                    
-                    language = geo_data.get('language', 'xx')
-                    if language != 'xx':
-                        meta['language'] = language
-                    
-                    country = geo_data.get('country')
-                    if country:
-                        meta['country'] = country
-                    
-                    region = geo_data.get('region')
-                    if region:
-                        meta['region'] = region
-                    
-                    city = geo_data.get('city')
-                    if city:
-                        meta['city'] = city
-                    
-                    meta['geolocation_source'] = 'gps_service'
+                if geo_data:
+                    resolved.append((item['pubkey'], geo_data))
+            
+            # Appliquer les données géolocalisées du batch en une passe
+            self._apply_geo_results(knowledge_base, resolved, 'gps_service')
+            resolved = []
             
             # Sauvegarder le cache après chaque batch
             self._save_geo_cache(geo_cache, geo_cache_file)
@@ -477,6 +455,9 @@ class AnalystAgent(Agent):
             if gps_requests_made >= max_gps_requests:
                 break
         
+        if prospects_with_gps:
+            self.logger.info(f"📍 Cache GPS spatial : {spatial_cache.summary()}")
+        
         # --- PHASE 2 : Analyse IA pour les cas restants ---
         self.logger.info("🧠 PHASE 2 : Analyse IA pour cas restants...")
         
@@ -500,36 +481,16 @@ class AnalystAgent(Agent):
         
         self.logger.info(f"🧠 {len(prospects_needing_ia)} prospects nécessitent une analyse IA")
         
-        # Traiter l'IA séquentiellement (pas de parallélisation pour Ollama)
-        for i, item in enumerate(prospects_needing_ia):
+        # Traiter l'IA via le pool de workers (résultats restitués dans l'ordre)
+        pool = self._ia_pool("Analyse géo-linguistique")
+        query = lambda item: self._query_geo_data(item['description'], geo_prompt_template)
+        for i, (item, geo_data, error) in enumerate(pool.imap(query, prospects_needing_ia)):
             try:
-                self.logger.info(f"🧠 Analyse IA {i+1}/{len(prospects_needing_ia)} : {item['uid']}")
-                prompt = f"{geo_prompt_template}\n\nTexte fourni: \"{item['description']}\""
-                
-                ia_response = self._query_ia(prompt, expect_json=True)
-                cleaned_answer = self._clean_ia_json_output(ia_response['answer'])
-                geo_data = json.loads(cleaned_answer)
-                
-                prospect_data = knowledge_base[item['pubkey']]
-                meta = prospect_data.setdefault('metadata', {})
+                if error:
+                    raise error
+                self.logger.debug(f"🧠 Analyse IA {i+1}/{len(prospects_needing_ia)} : {item['uid']}")
                 
-                language = geo_data.get('language', 'xx')
-                if language != 'xx':
-                    meta['language'] = language
-                
-                country = geo_data.get('country')
-                if country:
-                    meta['country'] = country
-                
-                region = geo_data.get('region')
-                if region:
-                    meta['region'] = region
-                
-                city = geo_data.get('city')
-                if city:
-                    meta['city'] = city
-                
-                meta['geolocation_source'] = 'ia_analysis'
+                self._apply_geo_results(knowledge_base, [(item['pubkey'], geo_data)], 'ia_analysis')
                 
                 ia_analyzed += 1
                 
@@ -557,38 +518,73 @@ class AnalystAgent(Agent):
 
     def _load_geo_cache(self, cache_file):
         """Charge le cache de géolocalisation"""
-        try:
-            if os.path.exists(cache_file):
-                with open(cache_file, 'r') as f:
-                    return json.load(f)
-        except Exception as e:
-            self.logger.warning(f"⚠️ Impossible de charger le cache GPS : {e}")
-        return {}
+        return self._journal_cache(cache_file)
+
+    def _journal_cache(self, cache_file):
+        """
+        Retourne le cache à écriture différée associé à 'cache_file', chargé
+        une seule fois puis partagé via l'état partagé.
+        """
+        caches = self.shared_state.setdefault('journal_caches', {})
+        cache = caches.get(cache_file)
+        if cache is None:
+            config = self.shared_state['config']
+            try:
+                cache = JournalCache(
+                    cache_file, self.logger,
+                    flush_interval=config.get('cache_flush_interval', 30),
+                    flush_size=config.get('cache_flush_size', 200)
+                )
+            except Exception as e:
+                self.logger.warning(f"⚠️ Impossible de charger le cache '{cache_file}' : {e}")
+                return {}
+            caches[cache_file] = cache
+        return cache
+
+    def _spatial_geo_cache(self, geo_cache):
+        """
+        Place un cache spatial devant le cache GPS : un point proche (moins de
+        'geo_cache_radius_km') d'un point déjà résolu réutilise son résultat.
+        """
+        radius_km = self.shared_state['config'].get('geo_cache_radius_km', 2.0)
+        return SpatialGeoCache(geo_cache, radius_km)
 
     def _save_geo_cache(self, cache, cache_file):
-        """Sauvegarde le cache de géolocalisation"""
+        """Sauvegarde le cache de géolocalisation (nouvelles entrées uniquement, selon le délai de vidage)"""
+        self._flush_cache(cache, cache_file, "GPS")
+
+    def _flush_cache(self, cache, cache_file, label):
         try:
-            with open(cache_file, 'w') as f:
-                json.dump(cache, f, indent=2)
+            if isinstance(cache, JournalCache):
+                cache.flush_if_due()
+            else:
+                atomic_write_json(cache_file, cache)
         except Exception as e:
-            self.logger.warning(f"⚠️ Impossible de sauvegarder le cache GPS : {e}")
+            self.logger.warning(f"⚠️ Impossible de sauvegarder le cache {label} : {e}")
 
-    def _process_gps_batch(self, gps_batch, geo_cache):
-        """Traite un lot de coordonnées GPS en parallèle"""
+    def _process_gps_batch(self, gps_batch, spatial_cache):
+        """
+        Traite un lot de coordonnées GPS. Chaque élément résolu reçoit ses
+        géodonnées dans item['geo_data'] ; un point voisin d'un point déjà
+        résolu dans le lot est servi par le cache spatial (item['cached']).
+        """
         processed = []
         
         for item in gps_batch:
             try:
-                # Respecter les limites de Nominatim avec délai adaptatif
-                time.sleep(random.uniform(1.0, 1.2))
-                
-                geo_data = self._geolocate_from_coordinates(item['lat'], item['lon'])
+                geo_data = spatial_cache.get(item['lat'], item['lon'])
+                if geo_data:
+                    item['cached'] = True
+                else:
+                    # Les limites de Nominatim sont gérées par _geolocate_with_nominatim
+                    geo_data = self._geolocate_from_coordinates(item['lat'], item['lon'])
+                    if geo_data:
+                        spatial_cache.put(item['lat'], item['lon'], geo_data)
+                        self.logger.info(f"📍 GPS batch : {item['uid']} -> {geo_data.get('country', 'N/A')}")
                 
                 if geo_data:
-                    # Stocker dans le cache
-                    geo_cache[item['cache_key']] = geo_data
+                    item['geo_data'] = geo_data
                     processed.append(item)
-                    self.logger.info(f"📍 GPS batch : {item['uid']} -> {geo_data.get('country', 'N/A')}")
                 else:
                     self.logger.debug(f"⚠️ Échec géolocalisation GPS pour {item['uid']}")
                     
@@ -597,19 +593,59 @@ class AnalystAgent(Agent):
         
         return processed
 
+    def _offline_geocoder(self):
+        """
+        Retourne le géocodeur hors ligne (données GeoNames) partagé, ou None
+        si les données ne sont pas disponibles.
+        """
+        geocoder = self.shared_state.get('offline_geocoder')
+        if geocoder is None:
+            config = self.shared_state['config']
+            geocoder = OfflineGeocoder(
+                config.get('geonames_dir', os.path.join(config['workspace'], 'geonames')),
+                dataset=config.get('geonames_dataset', 'cities1000'),
+                boundaries_file=config.get('geo_boundaries_file'),
+                max_distance_km=config.get('geo_max_distance_km', 50),
+                logger=self.logger
+            )
+            if not geocoder.ensure_loaded(auto_download=config.get('geonames_auto_download', True)):
+                self.logger.warning("⚠️ Géocodeur hors ligne indisponible, utilisation de Nominatim.")
+            self.shared_state['offline_geocoder'] = geocoder
+        return geocoder if geocoder.loaded else None
+
     def _geolocate_from_coordinates(self, lat, lon):
         """
-        Utilise un service de géolocalisation pour obtenir les informations
+        Obtient les informations de pays, région et ville à partir de coordonnées GPS.
+        Le géocodeur hors ligne (GeoNames) est utilisé en priorité ; Nominatim
+        sert de repli, ou d'affinage si 'geo_nominatim_refine' est activé.
+        """
+        geo_data = None
+        geocoder = self._offline_geocoder()
+        if geocoder:
+            geo_data = geocoder.reverse(lat, lon)
+            if geo_data:
+                geo_data['language'] = self._get_language_from_country(geo_data['country_code'], geo_data.get('region'))
+                if not self.shared_state['config'].get('geo_nominatim_refine', False):
+                    return geo_data
+        
+        return self._geolocate_with_nominatim(lat, lon) or geo_data
+
+    def _wait_for_nominatim(self):
+        """Respecte la limite de Nominatim : au plus une requête toutes les 1.1 secondes."""
+        elapsed = time.time() - getattr(self, '_nominatim_last_call', 0)
+        if elapsed < 1.1:
+            time.sleep(1.1 - elapsed)
+        self._nominatim_last_call = time.time()
+
+    def _geolocate_with_nominatim(self, lat, lon):
+        """
+        Utilise le service Nominatim (OpenStreetMap) pour obtenir les informations
         de pays, région et ville à partir de coordonnées GPS.
         """
         try:
-            # Respecter les limites de Nominatim : max 1 requête par seconde
-            # Utiliser un délai aléatoire entre 1.1 et 1.3 secondes (> 1)
-            time.sleep(random.uniform(1.1, 1.3))
+            self._wait_for_nominatim()
             
             # Utiliser l'API Nominatim (OpenStreetMap) - gratuite et fiable
-            import requests
-            
             url = f"https://nominatim.openstreetmap.org/reverse"
             params = {
                 'lat': lat,
@@ -656,7 +692,7 @@ class AnalystAgent(Agent):
             )
             
             # Déterminer la langue basée sur le pays
-            language = self._get_language_from_country(country)
+            language = self._get_language_from_country(country, region)
             
             geo_data = {
                 'language': language,
@@ -675,53 +711,13 @@ class AnalystAgent(Agent):
             self.logger.warning(f"⚠️ Erreur de géolocalisation : {e}")
             return None
 
-    def _get_language_from_country(self, country):
-        """
-        Détermine la langue principale basée sur le pays.
-        """
-        if not country:
-            return 'xx'
-        
-        # Mapping pays -> langue principale
-        country_language_map = {
-            'FRANCE': 'fr',
-            'FR': 'fr',
-            'BELGIUM': 'fr',
-            'BE': 'fr',
-            'SWITZERLAND': 'fr',
-            'CH': 'fr',
-            'CANADA': 'fr',
-            'CA': 'fr',
-            'UNITED STATES': 'en',
-            'US': 'en',
-            'USA': 'en',
-            'UNITED KINGDOM': 'en',
-            'GB': 'en',
-            'UK': 'en',
-            'SPAIN': 'es',
-            'ES': 'es',
-            'MEXICO': 'es',
-            'MX': 'es',
-            'ARGENTINA': 'es',
-            'AR': 'es',
-            'GERMANY': 'de',
-            'DE': 'de',
-            'AUSTRIA': 'de',
-            'AT': 'de',
-            'SWITZERLAND': 'de',  # Suisse germanophone
-            'ITALY': 'it',
-            'IT': 'it',
-            'PORTUGAL': 'pt',
-            'PT': 'pt',
-            'BRAZIL': 'pt',
-            'BR': 'pt',
-            'NETHERLANDS': 'nl',
-            'NL': 'nl',
-            'CATALONIA': 'ca',
-            'CATALUNYA': 'ca'
-        }
-        
-        return country_language_map.get(country.upper(), 'xx')
+    def _get_language_from_country(self, country, region=None):
+        """
+        Détermine la langue principale basée sur le pays (code ISO ou nom,
+        en français, anglais ou langue locale), précisée par la région pour
+        les pays multilingues.
+        """
+        return primary_language(country, region)
 
     def select_cluster_from_tags(self):
         """
@@ -731,24 +727,14 @@ class AnalystAgent(Agent):
         Inclut également les réseaux sociaux (web2).
         """
         self.logger.info("🤖 Agent Analyste : Préparation du ciblage par thème et réseaux sociaux...")
-        knowledge_base = self._load_and_sync_knowledge_base()
+        cache = self._targeting_cache()
         
-        # Agréger les résultats (thèmes + réseaux sociaux)
+        # Agréger les résultats (thèmes + réseaux sociaux) depuis les index inversés
         self.logger.info("--- Agrégation des thèmes et réseaux sociaux existants ---")
-        members_by_tag = defaultdict(list)
-        
-        for pubkey, data in knowledge_base.items():
-            metadata = data.get('metadata', {})
-            
-            # Ajouter les tags thématiques
-            if 'tags' in metadata:
-                for tag in metadata['tags']:
-                    members_by_tag[tag].append(data)
-            
-            # Ajouter les réseaux sociaux (web2)
-            if 'web2' in metadata:
-                for social in metadata['web2']:
-                    members_by_tag[social].append(data)
+        members_by_tag = {}
+        for kind in ('tag', 'web2'):
+            for tag, pubkeys in cache.index(kind).items():
+                members_by_tag.setdefault(tag, set()).update(pubkeys)
         
         if not members_by_tag:
             self.logger.warning("Aucun thème ou réseau social n'a encore été analysé. Veuillez lancer l'analyse par thèmes d'abord (option 2).")
@@ -760,9 +746,10 @@ class AnalystAgent(Agent):
         sorted_tags = sorted(members_by_tag.items(), key=lambda item: len(item[1]), reverse=True)
 
         # Limiter à l'affichage des 50 thèmes/réseaux les plus populaires pour ne pas surcharger le menu
-        for tag, members in sorted_tags[:50]:
+        for tag, pubkeys in sorted_tags[:50]:
             # Déterminer le type (thème ou réseau social)
             tag_type = "Réseau" if tag in ['website', 'facebook', 'email', 'instagram', 'youtube', 'twitter', 'diaspora', 'linkedin', 'github', 'phone', 'vimeo'] else "Thème"
+            members = [data for pubkey, data in cache.records(pubkeys)]
             
             clusters.append({
                 "cluster_name": f"{tag_type} : {tag.capitalize()}",
@@ -809,6 +796,7 @@ class AnalystAgent(Agent):
         # --- OPTIMISATION 3 : Charger le prompt template une seule fois ---
         thematic_prompt_template = self._load_prompt('analyst_thematic_prompt_file')
         if not thematic_prompt_template: return
+        self._check_thematic_cache_version(ia_cache, thematic_prompt_template)
 
         needs_analysis_count = 0
         save_interval = 50
@@ -816,11 +804,11 @@ class AnalystAgent(Agent):
         # Statistiques des réseaux sociaux
         social_stats = Counter()
         
-        # --- OPTIMISATION 4 : Batch processing pour IA ---
-        ia_batch = []
-        batch_size = 5  # Traiter par lots de 5 (IA plus lente)
+        # --- OPTIMISATION 4 : Requêtes IA concurrentes pour les descriptions absentes du cache ---
+        pending_profiles = []  # (pubkey, social_tags, cache_key)
+        ia_items = {}  # Une seule requête IA par description distincte
         
-        for i, pubkey in enumerate(prospects_to_analyze):
+        for pubkey in prospects_to_analyze:
             prospect_data = knowledge_base[pubkey]
             
             metadata = prospect_data.setdefault('metadata', {})
@@ -858,43 +846,34 @@ class AnalystAgent(Agent):
                         social_tags.append(normalized_type)
                         social_stats[normalized_type] += 1
 
-            # --- ÉTAPE 2 : Analyse thématique avec cache ---
-            thematic_tags = []
+            # --- ÉTAPE 2 : Repérer les descriptions à analyser (clé de cache = hash de la description) ---
+            cache_key = None
             if description:
-                # Créer une clé de cache basée sur le hash de la description
-                import hashlib
                 description_hash = hashlib.md5(description.encode()).hexdigest()
                 cache_key = f"thematic_{description_hash}"
                 
-                # Vérifier le cache
                 if cache_key in ia_cache:
-                    thematic_tags = ia_cache[cache_key]
                     self.logger.debug(f"🧠 Cache IA hit : {prospect_data.get('uid', 'N/A')}")
-                else:
-                    # Ajouter au batch IA
-                    ia_batch.append({
+                elif cache_key not in ia_items:
+                    ia_items[cache_key] = {
                         'pubkey': pubkey,
                         'description': description,
                         'uid': prospect_data.get('uid', 'N/A'),
                         'cache_key': cache_key
-                    })
-                    
-                    # Traiter le batch quand il est plein ou à la fin
-                    if len(ia_batch) >= batch_size or i == len(prospects_to_analyze) - 1:
-                        processed_batch = self._process_ia_batch(ia_batch, ia_cache, thematic_prompt_template, guide_tags)
-                        
-                        # Sauvegarder le cache
-                        self._save_thematic_cache(ia_cache, ia_cache_file)
-                        
-                        ia_batch = []
-                
-                # Récupérer les tags depuis le cache
-                if cache_key in ia_cache:
-                    thematic_tags = ia_cache[cache_key]
+                    }
             else:
                 self.logger.debug(f"Pas de description pour {prospect_data.get('uid', 'N/A')}")
+            
+            pending_profiles.append((pubkey, social_tags, cache_key))
 
-            # --- ÉTAPE 3 : Combiner et sauvegarder ---
+        # --- ÉTAPE 3 : Analyse IA concurrente (le cache est sauvegardé par tranches) ---
+        self._run_thematic_ia_queue(list(ia_items.values()), ia_cache, ia_cache_file,
+                                    thematic_prompt_template, guide_tags, chunk_size=save_interval)
+
+        # --- ÉTAPE 4 : Combiner et sauvegarder ---
+        for pubkey, social_tags, cache_key in pending_profiles:
+            metadata = knowledge_base[pubkey]['metadata']
+            thematic_tags = ia_cache.get(cache_key, []) if cache_key else []
             all_tags = social_tags + thematic_tags
             
             # Validation et nettoyage des tags
@@ -909,11 +888,6 @@ class AnalystAgent(Agent):
                 metadata['tags'] = normalized_tags
             else:
                 metadata['tags'] = []
-
-            # Sauvegarde intermédiaire
-            if needs_analysis_count > 0 and needs_analysis_count % save_interval == 0:
-                self.logger.info(f"--- Sauvegarde intermédiaire ({needs_analysis_count} profils analysés)... ---")
-                self._save_knowledge_base(knowledge_base)
         
         # Sauvegarde finale
         self._save_knowledge_base(knowledge_base)
@@ -928,41 +902,117 @@ class AnalystAgent(Agent):
 
     def _load_thematic_cache(self, cache_file):
         """Charge le cache des analyses thématiques"""
-        try:
-            if os.path.exists(cache_file):
-                with open(cache_file, 'r') as f:
-                    return json.load(f)
-        except Exception as e:
-            self.logger.warning(f"⚠️ Impossible de charger le cache thématique : {e}")
-        return {}
+        return self._journal_cache(cache_file)
+
+    def _check_thematic_cache_version(self, cache, prompt_template):
+        """
+        Le cache thématique est indexé par description : il est vidé lorsque le
+        template du prompt thématique change, pour ne pas resservir d'anciens thèmes.
+        Un cache sans version (antérieur) est rattaché au template actuel.
+        """
+        version = prompt_version(prompt_template)
+        previous = cache.get(self.THEMATIC_CACHE_VERSION_KEY)
+        if previous is not None and previous != version:
+            self.logger.info(f"♻️ Prompt thématique modifié : {len(cache) - 1} analyses en cache invalidées.")
+            cache.clear()
+        if previous != version:
+            cache[self.THEMATIC_CACHE_VERSION_KEY] = version
 
     def _save_thematic_cache(self, cache, cache_file):
-        """Sauvegarde le cache des analyses thématiques"""
-        try:
-            with open(cache_file, 'w') as f:
-                json.dump(cache, f, indent=2)
-        except Exception as e:
-            self.logger.warning(f"⚠️ Impossible de sauvegarder le cache thématique : {e}")
+        """Sauvegarde le cache des analyses thématiques (nouvelles entrées uniquement, selon le délai de vidage)"""
+        self._flush_cache(cache, cache_file, "thématique")
+
+    def _query_geo_data(self, description, prompt_template):
+        """Interroge l'IA sur la langue/pays/région d'une description (exécuté dans le pool IA)"""
+        prompt = f"{prompt_template}\n\nTexte fourni: \"{description}\""
+        ia_response = self._query_ia(prompt, expect_json=True, json_format=True,
+                                     cache_namespace=self._cache_namespace('geo', prompt_template))
+        cleaned_answer = self._clean_ia_json_output(ia_response['answer'])
+        return json.loads(cleaned_answer)
+
+    def _query_thematic_tags(self, description, prompt_template, guide_tags):
+        """Interroge l'IA sur les thèmes d'une description (exécuté dans le pool IA)"""
+        # Construire le prompt guidé
+        prompt = f"{prompt_template}\n\nTexte fourni: \"{description}\""
+        if guide_tags:
+            prompt += f"\nThèmes existants : {json.dumps(guide_tags)}"
+        
+        ia_response = self._query_ia(prompt, expect_json=True,
+                                     cache_namespace=self._cache_namespace('thematic', prompt_template))
+        cleaned_answer = self._clean_ia_json_output(ia_response['answer'])
+        return json.loads(cleaned_answer)
+
+    def _run_thematic_ia_queue(self, ia_items, ia_cache, ia_cache_file, prompt_template, guide_tags, chunk_size=50):
+        """
+        Analyse toutes les descriptions absentes du cache via le pool IA,
+        en sauvegardant le cache thématique après chaque tranche.
+        """
+        if not ia_items:
+            return 0
+        self.logger.info(f"🧠 {len(ia_items)} descriptions à analyser par l'IA...")
+        processed_count = 0
+        for start in range(0, len(ia_items), chunk_size):
+            processed = self._process_ia_batch(ia_items[start:start + chunk_size], ia_cache, prompt_template, guide_tags)
+            processed_count += len(processed)
+            self._save_thematic_cache(ia_cache, ia_cache_file)
+            self.logger.info(f"🧠 Analyse thématique : {min(start + chunk_size, len(ia_items))}/{len(ia_items)} descriptions traitées")
+        llm_cache = self._llm_cache()
+        if llm_cache:
+            self.logger.info(f"💾 Cache des réponses IA : {llm_cache.summary()}")
+        return processed_count
 
     def _process_ia_batch(self, ia_batch, ia_cache, prompt_template, guide_tags):
-        """Traite un lot d'analyses IA en parallèle"""
+        """
+        Traite un lot d'analyses IA en parallèle (pool de workers IA).
+        Les descriptions sont regroupées par paquets dans un même prompt
+        (réponse JSON indexée par identifiant) ; les descriptions dont la
+        réponse est absente ou invalide sont réanalysées une par une.
+        """
+        config = self.shared_state['config']
+        batch_size = config.get('thematic_batch_size', 8)
+        if batch_size <= 1:
+            return self._process_ia_single(ia_batch, ia_cache, prompt_template, guide_tags)
+        
+        packs = self._pack_descriptions(ia_batch, batch_size, config.get('thematic_batch_max_chars', 6000))
+        processed = []
+        retry_items = []
+        
+        pool = self._ia_pool("Analyse thématique (lots)")
+        query = lambda pack: self._query_thematic_pack(pack, prompt_template, guide_tags)
+        for pack, answers, error in pool.imap(query, packs):
+            if error or not isinstance(answers, dict):
+                self.logger.warning(f"⚠️ Réponse IA invalide pour un lot de {len(pack)} descriptions : {error or 'objet JSON attendu'}")
+                retry_items.extend(pack)
+                continue
+            
+            for item in pack:
+                thematic_tags = answers.get(self._thematic_item_id(item))
+                if self._is_valid_thematic_answer(thematic_tags):
+                    ia_cache[item['cache_key']] = thematic_tags
+                    processed.append(item)
+                    self.logger.debug(f"✅ IA lot : {item['uid']} -> {len(thematic_tags)} tags")
+                else:
+                    retry_items.append(item)
+        
+        if retry_items:
+            self.logger.info(f"🔁 {len(retry_items)} descriptions réanalysées individuellement")
+            processed.extend(self._process_ia_single(retry_items, ia_cache, prompt_template, guide_tags))
+        
+        return processed
+
+    def _process_ia_single(self, ia_batch, ia_cache, prompt_template, guide_tags):
+        """Analyse les descriptions une par une (un prompt par description)"""
         processed = []
         
-        for item in ia_batch:
+        pool = self._ia_pool("Analyse thématique")
+        query = lambda item: self._query_thematic_tags(item['description'], prompt_template, guide_tags)
+        for item, thematic_tags, error in pool.imap(query, ia_batch):
             try:
-                self.logger.info(f"🧠 Analyse IA batch : {item['uid']}")
-                
-                # Construire le prompt guidé
-                prompt = f"{prompt_template}\n\nTexte fourni: \"{item['description']}\""
-                if guide_tags:
-                    prompt += f"\nThèmes existants : {json.dumps(guide_tags)}"
-                
-                ia_response = self._query_ia(prompt, expect_json=True)
-                cleaned_answer = self._clean_ia_json_output(ia_response['answer'])
-                thematic_tags = json.loads(cleaned_answer)
+                if error:
+                    raise error
 
                 # Validation et stockage dans le cache
-                if isinstance(thematic_tags, list) and len(thematic_tags) <= 7:
+                if self._is_valid_thematic_answer(thematic_tags):
                     ia_cache[item['cache_key']] = thematic_tags
                     processed.append(item)
                     self.logger.debug(f"✅ IA batch : {item['uid']} -> {len(thematic_tags)} tags")
@@ -976,6 +1026,61 @@ class AnalystAgent(Agent):
         
         return processed
 
+    @staticmethod
+    def _is_valid_thematic_answer(thematic_tags):
+        return isinstance(thematic_tags, list) and len(thematic_tags) <= 7 and all(isinstance(tag, str) for tag in thematic_tags)
+
+    @staticmethod
+    def _thematic_item_id(item):
+        """Identifiant court d'une description dans un prompt groupé (début du hash de la clé de cache)"""
+        return item['cache_key'].rsplit('_', 1)[-1][:8]
+
+    @staticmethod
+    def _pack_descriptions(items, batch_size, max_chars):
+        """
+        Regroupe les descriptions en paquets d'au plus 'batch_size' éléments et
+        'max_chars' caractères de descriptions (une description plus longue forme un paquet seule).
+        """
+        packs = []
+        current = []
+        current_chars = 0
+        for item in items:
+            length = len(item['description'])
+            if current and (len(current) >= batch_size or current_chars + length > max_chars):
+                packs.append(current)
+                current = []
+                current_chars = 0
+            current.append(item)
+            current_chars += length
+        if current:
+            packs.append(current)
+        return packs
+
+    def _query_thematic_pack(self, pack, prompt_template, guide_tags):
+        """Interroge l'IA sur un paquet de descriptions (exécuté dans le pool IA)"""
+        example_ids = [self._thematic_item_id(item) for item in pack[:2]]
+        example = {example_ids[0]: ["permaculture", "local"]}
+        if len(example_ids) > 1:
+            example[example_ids[1]] = ["developpeur", "crypto"]
+        
+        prompt = (
+            f"{prompt_template}\n\n"
+            "MODE LOT : plusieurs textes sont fournis ci-dessous, chacun précédé de son identifiant entre crochets.\n"
+            "Applique les mêmes règles à chaque texte, indépendamment des autres.\n"
+            "Réponds UNIQUEMENT avec un objet JSON dont les clés sont les identifiants et les valeurs "
+            f"les listes de thèmes, par exemple : {json.dumps(example, ensure_ascii=False)}\n"
+        )
+        if guide_tags:
+            prompt += f"\nThèmes existants : {json.dumps(guide_tags)}\n"
+        prompt += "\nTextes fournis :\n"
+        for item in pack:
+            prompt += f"[{self._thematic_item_id(item)}] {json.dumps(item['description'], ensure_ascii=False)}\n"
+        
+        ia_response = self._query_ia(prompt, expect_json=True, json_format=True,
+                                     cache_namespace=self._cache_namespace('thematic_pack', prompt_template))
+        cleaned_answer = self._clean_ia_json_output(ia_response['answer'])
+        return json.loads(cleaned_answer)
+
     def run_test_mode(self):
         """
         Génère un fichier de cible avec un unique profil de test
@@ -1136,8 +1241,7 @@ class AnalystAgent(Agent):
             # On utilise la même méthode de sauvegarde que pour les vrais clusters
             target_file = os.path.join(self.shared_state['config']['workspace'], "todays_targets.json")
             try:
-                with open(target_file, 'w') as f:
-                    json.dump(final_targets, f, indent=4, ensure_ascii=False)
+                atomic_write_json(target_file, final_targets, indent=4)
 
                 report = f"Mode Test : Cible unique '{test_uid}' enregistrée."
                 self.logger.info(f"✅ {report}")
@@ -1321,7 +1425,8 @@ Le persona doit être une synthèse créative des thèmes {', '.join(theme_group
 
         for attempt in range(2): # 1ère tentative + 1 nouvelle tentative
             try:
-                response = self._query_ia(prompt, expect_json=True)
+                # La nouvelle tentative ne doit pas resservir la réponse invalide du cache
+                response = self._query_ia(prompt, expect_json=True, cache_namespace='persona', refresh=attempt > 0)
                 if not response:
                     if attempt == 0:
                         self.logger.warning("La requête IA n'a retourné aucune réponse. Nouvelle tentative...")
@@ -1428,23 +1533,13 @@ Le persona doit être une synthèse créative des thèmes {', '.join(theme_group
     def _save_banks_config(self, banks_config, config_file):
         """Sauvegarde la configuration des banques de mémoire."""
         try:
-            os.makedirs(os.path.dirname(config_file), exist_ok=True)
-            with open(config_file, 'w', encoding='utf-8') as f:
-                json.dump(banks_config, f, indent=2, ensure_ascii=False)
+            atomic_write_json(config_file, banks_config, indent=2)
         except Exception as e:
             self.logger.error(f"Erreur lors de la sauvegarde de la config des banques : {e}")
 
     def _prepare_data(self):
         prospect_file = os.path.expanduser(self.shared_state['config']['prospect_file'])
-        blocklist_file = self.shared_state['config']['blocklist_file']
-        
-        blocklist = set()
-        if os.path.exists(blocklist_file):
-            try:
-                with open(blocklist_file, 'r') as f:
-                    blocklist = set(u.get('pubkey') for u in json.load(f))
-            except (json.JSONDecodeError, IOError):
-                self.logger.warning(f"Impossible de lire la blocklist '{blocklist_file}'.")
+        blocklist = self._load_blocklist()
 
         if not os.path.exists(prospect_file):
             self.logger.error(f"Fichier de prospects '{prospect_file}' non trouvé.")
@@ -1473,27 +1568,33 @@ Le persona doit être une synthèse créative des thèmes {', '.join(theme_group
             self.logger.error(f"Erreur lors de la préparation des données : {e}", exc_info=True)
             return []
 
-    def _query_ia(self, prompt, expect_json=False):
-        command = ['python3', self.shared_state['config']['question_script'], prompt]
-        if expect_json:
-            command.append('--json')
-        
-        self.logger.debug(f"Exécution de la commande IA : {' '.join(command[:2])}...")
+    def _query_ia(self, prompt, expect_json=False, json_format=False, cache_namespace='analyst', refresh=False):
+        """
+        Interroge l'IA via le client partagé. Avec expect_json, la réponse est
+        retournée sous la forme {'answer': ...} (format historique de question.py --json).
+        json_format force une réponse JSON (objet) côté Ollama.
+        cache_namespace : espace du cache des réponses (voir _cache_namespace) ;
+        refresh force une nouvelle génération (réponse précédente invalide).
+        """
         self.logger.info("📞 Interrogation de l'IA en cours... Le traitement du prompt peut être long.")
         self.logger.debug(f"Taille du prompt: {len(prompt)} caractères.")
         start_time = time.time()
 
         try:
-            result = subprocess.run(command, capture_output=True, text=True, check=True)
+            answer = self._llm_client().generate(prompt, json_format=json_format,
+                                                 cache_namespace=cache_namespace, refresh=refresh)
             
             end_time = time.time()
             self.logger.info(f"✅ Réponse de l'IA reçue en {end_time - start_time:.2f} secondes.")
-            self.logger.debug(f"Réponse brute de l'IA reçue : {result.stdout.strip()}")
+            self.logger.debug(f"Réponse brute de l'IA reçue : {answer.strip()}")
 
             if expect_json:
-                return json.loads(result.stdout)
-            return result.stdout
+                return {'answer': answer}
+            return answer
 
+        except LLMClientError as e:
+            self.logger.error(f"❌ Échec de l'interrogation de l'IA : {e}")
+            return None
         except subprocess.CalledProcessError as e:
             self.logger.error(f"❌ Le script d'IA a retourné une erreur.")
             self.logger.error(f"   Code de retour : {e.returncode}")
@@ -1549,8 +1650,7 @@ Le persona doit être une synthèse créative des thèmes {', '.join(theme_group
             final_targets = selected_cluster['members']
             
             target_file = os.path.join(self.shared_state['config']['workspace'], "todays_targets.json")
-            with open(target_file, 'w') as f:
-                json.dump(final_targets, f, indent=4, ensure_ascii=False)
+            atomic_write_json(target_file, final_targets, indent=4)
 
             report = f"Cluster '{selected_cluster['cluster_name']}' sélectionné automatiquement. {len(final_targets)} cibles enregistrées."
             self.logger.info(f"✅ {report}")
@@ -1596,8 +1696,7 @@ Le persona doit être une synthèse créative des thèmes {', '.join(theme_group
             final_targets = selected_cluster['members']
 
             target_file = os.path.join(self.shared_state['config']['workspace'], "todays_targets.json")
-            with open(target_file, 'w') as f:
-                json.dump(final_targets, f, indent=4, ensure_ascii=False)
+            atomic_write_json(target_file, final_targets, indent=4)
 
             report = f"Cluster '{selected_cluster['cluster_name']}' sélectionné. {len(final_targets)} cibles enregistrées."
             self.logger.info(f"✅ {report}")
@@ -1634,6 +1733,10 @@ Le persona doit être une synthèse créative des thèmes {', '.join(theme_group
         if not getattr(self, '_ollama_checked', False):
             ollama_script = self.shared_state['config']['ollama_script']
             self.logger.info("Vérification de la disponibilité de l'API Ollama...")
+            if self._llm_client().is_available():
+                self.logger.info("✅ API Ollama accessible.")
+                self._ollama_checked = True
+                return True
             self.logger.debug(f"Exécution du script de vérification : {ollama_script}")
             try:
                 subprocess.run([ollama_script], check=True, capture_output=True, text=True)
@@ -1764,7 +1867,8 @@ Le persona doit être une synthèse créative des thèmes {', '.join(theme_group
         prompt = prompt_template.replace('{tag_list_json}', json.dumps(tags, indent=2))
         
         try:
-            ia_response = self._query_ia(prompt, expect_json=True)
+            ia_response = self._query_ia(prompt, expect_json=True,
+                                         cache_namespace=self._cache_namespace('consolidation', prompt_template))
             cleaned_answer = self._clean_ia_json_output(ia_response['answer'])
             suggested_groups = json.loads(cleaned_answer)
             
@@ -1841,8 +1945,8 @@ Le persona doit être une synthèse créative des thèmes {', '.join(theme_group
         self.logger.info("🎯 Agent Analyste : Ciblage avancé multi-sélection...")
         
         # Charger la base de connaissance
-        knowledge_base = self._load_and_sync_knowledge_base()
-        if not knowledge_base:
+        cache = self._targeting_cache()
+        if not cache.all():
             self.logger.error("❌ Base de connaissance vide.")
             return
         
@@ -1856,15 +1960,7 @@ Le persona doit être une synthèse créative des thèmes {', '.join(theme_group
         print()
         
         # Analyser les thèmes disponibles
-        all_tags = []
-        for pubkey, data in knowledge_base.items():
-            metadata = data.get('metadata', {})
-            tags = metadata.get('tags', [])
-            if tags and tags != ['error']:
-                all_tags.extend(tags)
-        
-        tag_counts = Counter(all_tags)
-        top_themes = tag_counts.most_common(20)
+        top_themes = cache.counts('tag')[:20]
         
         for i, (theme, count) in enumerate(top_themes, 1):
             print(f" {i:>2}. {theme:<20} ({count:>4} membres)")
@@ -1891,19 +1987,9 @@ Le persona doit être une synthèse créative des thèmes {', '.join(theme_group
             self.logger.error(f"❌ Erreur dans la sélection : {e}")
             return
         
-        # Étape 2 : Filtrer les prospects par thèmes
-        filtered_prospects = []
-        for pubkey, data in knowledge_base.items():
-            metadata = data.get('metadata', {})
-            tags = metadata.get('tags', [])
-            if tags and tags != ['error']:
-                # Vérifier si le prospect a au moins un des thèmes sélectionnés
-                if any(theme in tags for theme in selected_themes):
-                    filtered_prospects.append({
-                        'pubkey': pubkey,
-                        'uid': data.get('uid', ''),
-                        'metadata': metadata
-                    })
+        # Étape 2 : Filtrer les prospects ayant au moins un des thèmes sélectionnés
+        selected_pubkeys = cache.lookup('tag', selected_themes)
+        filtered_prospects = [self._target_entry(pubkey, data) for pubkey, data in cache.records(selected_pubkeys)]
         
         self.logger.info(f"📊 Prospects des thèmes sélectionnés : {len(filtered_prospects)}")
         
@@ -1971,16 +2057,12 @@ Le persona doit être une synthèse créative des thèmes {', '.join(theme_group
         """Filtre les prospects par langue"""
         print(f"\n🌍 LANGUES DISPONIBLES :")
         
-        # Analyser les langues disponibles
-        languages = {}
-        for prospect in prospects:
-            metadata = prospect.get('metadata', {})
-            lang = metadata.get('language', 'xx')
-            if lang != 'xx':
-                languages[lang] = languages.get(lang, 0) + 1
+        # Analyser les langues disponibles parmi les prospects
+        cache = self._knowledge_cache()
+        prospect_pubkeys = {prospect.get('pubkey') for prospect in prospects}
+        lang_list = [(lang, count) for lang, count in cache.counts('language', prospect_pubkeys) if lang != 'xx']
         
         # Afficher les langues
-        lang_list = sorted(languages.items(), key=lambda x: x[1], reverse=True)
         for i, (lang, count) in enumerate(lang_list, 1):
             lang_name = {
                 'fr': 'Français', 'en': 'Anglais', 'es': 'Espagnol',
@@ -2006,12 +2088,8 @@ Le persona doit être une synthèse créative des thèmes {', '.join(theme_group
                 return prospects
             
             # Filtrer
-            filtered = []
-            for prospect in prospects:
-                metadata = prospect.get('metadata', {})
-                lang = metadata.get('language', 'xx')
-                if lang in selected_langs:
-                    filtered.append(prospect)
+            selected_pubkeys = cache.lookup('language', selected_langs)
+            filtered = [prospect for prospect in prospects if prospect.get('pubkey') in selected_pubkeys]
             
             self.logger.info(f"✅ Filtrage par langue : {len(filtered)} prospects sélectionnés")
             return filtered
@@ -2024,16 +2102,12 @@ Le persona doit être une synthèse créative des thèmes {', '.join(theme_group
         """Filtre les prospects par pays"""
         print(f"\n🌍 PAYS DISPONIBLES :")
         
-        # Analyser les pays disponibles
-        countries = {}
-        for prospect in prospects:
-            metadata = prospect.get('metadata', {})
-            country = metadata.get('country')
-            if country:
-                countries[country] = countries.get(country, 0) + 1
+        # Analyser les pays disponibles parmi les prospects
+        cache = self._knowledge_cache()
+        prospect_pubkeys = {prospect.get('pubkey') for prospect in prospects}
+        country_list = cache.counts('country', prospect_pubkeys)
         
         # Afficher les pays
-        country_list = sorted(countries.items(), key=lambda x: x[1], reverse=True)
         for i, (country, count) in enumerate(country_list, 1):
             print(f"{i}. {country} ({count} prospects)")
         
@@ -2055,12 +2129,8 @@ Le persona doit être une synthèse créative des thèmes {', '.join(theme_group
                 return prospects
             
             # Filtrer
-            filtered = []
-            for prospect in prospects:
-                metadata = prospect.get('metadata', {})
-                country = metadata.get('country')
-                if country in selected_countries:
-                    filtered.append(prospect)
+            selected_pubkeys = cache.lookup('country', selected_countries)
+            filtered = [prospect for prospect in prospects if prospect.get('pubkey') in selected_pubkeys]
             
             self.logger.info(f"✅ Filtrage par pays : {len(filtered)} prospects sélectionnés")
             return filtered
@@ -2071,84 +2141,44 @@ Le persona doit être une synthèse créative des thèmes {', '.join(theme_group
 
     def _filter_by_region(self, prospects):
         """Filtre les prospects par région"""
-        self.logger.info("🌍 Agent Analyste : Ciblage par région...")
-        
-        # Charger la base de connaissance
-        knowledge_base = self._load_and_sync_knowledge_base()
-        if not knowledge_base:
-            self.logger.error("❌ Base de connaissance vide.")
-            return
+        print(f"\n🌍 RÉGIONS DISPONIBLES :")
         
-        # Analyser les régions disponibles
-        regions = {}
-        for pubkey, data in knowledge_base.items():
-            metadata = data.get('metadata', {})
-            region = metadata.get('region')
-            country = metadata.get('country', '')
-            if region:
-                region_key = f"{region}, {country}" if country else region
-                regions[region_key] = regions.get(region_key, 0) + 1
+        # Analyser les régions disponibles parmi les prospects
+        cache = self._knowledge_cache()
+        prospect_pubkeys = {prospect.get('pubkey') for prospect in prospects}
+        region_list = cache.counts('region', prospect_pubkeys)
         
-        if not regions:
-            self.logger.error("❌ Aucune région détectée dans la base de connaissance.")
-            return
-        
-        # Afficher les options
-        print("\n🌍 RÉGIONS DISPONIBLES :")
-        print("=" * 50)
-        
-        region_list = sorted(regions.items(), key=lambda x: x[1], reverse=True)
+        # Afficher les régions
         for i, (region, count) in enumerate(region_list, 1):
-            print(f"{i}. Région : {region} ({count} membres)")
-            print(f"    Description : Groupe de {count} membres localisés en '{region}'.")
-            print()
+            print(f"{i}. {region} ({count} prospects)")
+        
+        print("r. Retour")
         
         try:
-            choice = input("Sélectionnez une région (numéro) : ").strip()
-            if not choice:
-                self.logger.info("Opération annulée.")
-                return
-            
-            selected_index = int(choice) - 1
-            if not (0 <= selected_index < len(region_list)):
-                self.logger.error("❌ Sélection invalide.")
-                return
-            
-            selected_region, count = region_list[selected_index]
+            choice = input("\nSélectionnez les régions (ex: 1,2), 'all' pour toutes, ou 'r' pour retour : ").strip()
+            if choice.lower() == 'r':
+                self.logger.info("Retour aux options de filtrage...")
+                return prospects
             
-            # Filtrer les prospects
-            filtered_prospects = []
-            for pubkey, data in knowledge_base.items():
-                metadata = data.get('metadata', {})
-                region = metadata.get('region')
-                country = metadata.get('country', '')
-                region_key = f"{region}, {country}" if country else region
-                if region_key == selected_region:
-                    filtered_prospects.append({
-                        'pubkey': pubkey,
-                        'uid': data.get('uid', ''),
-                        'metadata': metadata
-                    })
+            if choice.lower() == 'all':
+                selected_regions = [region for region, _ in region_list]
+            else:
+                selected_indices = [int(x.strip()) - 1 for x in choice.split(',')]
+                selected_regions = [region_list[i][0] for i in selected_indices if 0 <= i < len(region_list)]
             
-            # Créer un cluster simple pour la région sélectionnée
-            cluster = {
-                'cluster_name': f'Région {selected_region}',
-                'description': f'Prospects localisés en {selected_region}',
-                'members': filtered_prospects
-            }
+            if not selected_regions:
+                return prospects
             
-            # Sauvegarder et gérer le retour
-            result = self._select_and_save_cluster([cluster])
+            # Filtrer
+            selected_pubkeys = cache.lookup('region', selected_regions)
+            filtered = [prospect for prospect in prospects if prospect.get('pubkey') in selected_pubkeys]
             
-            if result == "quit":
-                return
-            elif result == "continue":
-                # L'utilisateur veut continuer vers l'Agent Stratège
-                print("\n🎯 Prêt pour l'Agent Stratège ! Retournez au menu principal et choisissez l'option 2.")
-                return
+            self.logger.info(f"✅ Filtrage par région : {len(filtered)} prospects sélectionnés")
+            return filtered
             
-        except (ValueError, KeyboardInterrupt):
-            self.logger.error("❌ Erreur dans la sélection.")
+        except (ValueError, IndexError):
+            self.logger.warning("⚠️ Erreur dans la sélection, aucun filtre appliqué.")
+            return prospects
 
     def select_cluster_by_linked_accounts(self):
         """
@@ -2563,31 +2593,61 @@ Le persona doit être une synthèse créative des thèmes {', '.join(theme_group
         
         # Sauvegarder
         targets_file = os.path.join(self.shared_state['config']['workspace'], 'todays_targets.json')
-        with open(targets_file, 'w', encoding='utf-8') as f:
-            json.dump(prospects, f, indent=2, ensure_ascii=False)
+        atomic_write_json(targets_file, prospects, indent=2)
         
         self.logger.info(f"💾 Cible sauvegardée : {target_name} ({count} prospects)")
         self.shared_state['targets'] = prospects
 
+    TARGET_FILTER_INDEXES = ('tag', 'web2', 'language', 'country', 'region', 'source')
+
+    def select_targets(self, filters, limit=None, save=True):
+        """
+        Ciblage non interactif (ligne de commande, cron).
+        'filters' est une liste de triplets (index, valeurs, exclure) : un profil
+        doit avoir au moins une des valeurs de chaque filtre (ou aucune si
+        'exclure' est vrai). Les index sont ceux du cache de ciblage
+        (voir TARGET_FILTER_INDEXES) ; les valeurs de 'region' sont de la
+        forme « Région, Pays ». Les cibles sont triées par pubkey avant
+        d'appliquer 'limit'. Retourne la liste des cibles retenues.
+        """
+        cache = self._targeting_cache()
+        selected = set(cache.all())
+        for name, values, exclude in filters:
+            if name not in self.TARGET_FILTER_INDEXES:
+                raise ValueError(f"Filtre inconnu : '{name}' (disponibles : {', '.join(self.TARGET_FILTER_INDEXES)})")
+            matching = cache.lookup(name, values)
+            selected = selected - matching if exclude else selected & matching
+        # Profils ayant demandé à ne plus être contactés (réponse STOP)
+        selected -= self._load_blocklist()
+
+        # Ordre stable (pubkey) avant la limite : deux lancements identiques retiennent les mêmes cibles
+        records = sorted(cache.records(selected), key=lambda record: record[0])
+        targets = [self._target_entry(pubkey, data) for pubkey, data in records]
+        if limit:
+            targets = targets[:limit]
+        self.logger.info(f"🎯 Ciblage non interactif : {len(targets)} cible(s) retenue(s).")
+
+        if save and targets:
+            targets_file = os.path.join(self.shared_state['config']['workspace'], 'todays_targets.json')
+            atomic_write_json(targets_file, targets, indent=2)
+            self.shared_state['targets'] = targets
+            self.shared_state['status']['AnalystAgent'] = f"{len(targets)} cible(s) sélectionnée(s)"
+        return targets
+
     def select_cluster_by_language(self):
         """Sélectionne les prospects selon leur langue détectée"""
         self.logger.info("🌍 Agent Analyste : Ciblage par langue...")
         
         # Charger la base de connaissance
-        knowledge_base = self._load_and_sync_knowledge_base()
-        if not knowledge_base:
+        cache = self._targeting_cache()
+        if not cache.all():
             self.logger.error("❌ Base de connaissance vide.")
             return
         
         # Analyser les langues disponibles
-        languages = {}
-        for pubkey, data in knowledge_base.items():
-            metadata = data.get('metadata', {})
-            lang = metadata.get('language', 'xx')
-            if lang != 'xx':
-                languages[lang] = languages.get(lang, 0) + 1
+        lang_list = [(lang, count) for lang, count in cache.counts('language') if lang != 'xx']
         
-        if not languages:
+        if not lang_list:
             self.logger.error("❌ Aucune langue détectée dans la base de connaissance.")
             return
         
@@ -2595,7 +2655,6 @@ Le persona doit être une synthèse créative des thèmes {', '.join(theme_group
         print("\n🌍 LANGUES DISPONIBLES :")
         print("=" * 50)
         
-        lang_list = sorted(languages.items(), key=lambda x: x[1], reverse=True)
         for i, (lang, count) in enumerate(lang_list, 1):
             lang_name = {
                 'fr': 'Français', 'en': 'Anglais', 'es': 'Espagnol',
@@ -2619,16 +2678,8 @@ Le persona doit être une synthèse créative des thèmes {', '.join(theme_group
             selected_lang, count = lang_list[selected_index]
             
             # Filtrer les prospects
-            filtered_prospects = []
-            for pubkey, data in knowledge_base.items():
-                metadata = data.get('metadata', {})
-                lang = metadata.get('language', 'xx')
-                if lang == selected_lang:
-                    filtered_prospects.append({
-                        'pubkey': pubkey,
-                        'uid': data.get('uid', ''),
-                        'metadata': metadata
-                    })
+            selected_pubkeys = cache.lookup('language', [selected_lang])
+            filtered_prospects = [self._target_entry(pubkey, data) for pubkey, data in cache.records(selected_pubkeys)]
             
             # Créer un cluster simple pour la langue sélectionnée
             cluster = {
@@ -2655,20 +2706,15 @@ Le persona doit être une synthèse créative des thèmes {', '.join(theme_group
         self.logger.info("🌍 Agent Analyste : Ciblage par pays...")
         
         # Charger la base de connaissance
-        knowledge_base = self._load_and_sync_knowledge_base()
-        if not knowledge_base:
+        cache = self._targeting_cache()
+        if not cache.all():
             self.logger.error("❌ Base de connaissance vide.")
             return
         
         # Analyser les pays disponibles
-        countries = {}
-        for pubkey, data in knowledge_base.items():
-            metadata = data.get('metadata', {})
-            country = metadata.get('country')
-            if country:
-                countries[country] = countries.get(country, 0) + 1
+        country_list = cache.counts('country')
         
-        if not countries:
+        if not country_list:
             self.logger.error("❌ Aucun pays détecté dans la base de connaissance.")
             return
         
@@ -2676,7 +2722,6 @@ Le persona doit être une synthèse créative des thèmes {', '.join(theme_group
         print("\n🌍 PAYS DISPONIBLES :")
         print("=" * 50)
         
-        country_list = sorted(countries.items(), key=lambda x: x[1], reverse=True)
         for i, (country, count) in enumerate(country_list, 1):
             print(f"{i}. Pays : {country} ({count} membres)")
             print(f"    Description : Groupe de {count} membres localisés en '{country}'.")
@@ -2696,16 +2741,8 @@ Le persona doit être une synthèse créative des thèmes {', '.join(theme_group
             selected_country, count = country_list[selected_index]
             
             # Filtrer les prospects
-            filtered_prospects = []
-            for pubkey, data in knowledge_base.items():
-                metadata = data.get('metadata', {})
-                country = metadata.get('country')
-                if country == selected_country:
-                    filtered_prospects.append({
-                        'pubkey': pubkey,
-                        'uid': data.get('uid', ''),
-                        'metadata': metadata
-                    })
+            selected_pubkeys = cache.lookup('country', [selected_country])
+            filtered_prospects = [self._target_entry(pubkey, data) for pubkey, data in cache.records(selected_pubkeys)]
             
             # Créer un cluster simple pour le pays sélectionné
             cluster = {
@@ -2732,22 +2769,15 @@ Le persona doit être une synthèse créative des thèmes {', '.join(theme_group
         self.logger.info("🌍 Agent Analyste : Ciblage par région...")
         
         # Charger la base de connaissance
-        knowledge_base = self._load_and_sync_knowledge_base()
-        if not knowledge_base:
+        cache = self._targeting_cache()
+        if not cache.all():
             self.logger.error("❌ Base de connaissance vide.")
             return
         
         # Analyser les régions disponibles
-        regions = {}
-        for pubkey, data in knowledge_base.items():
-            metadata = data.get('metadata', {})
-            region = metadata.get('region')
-            country = metadata.get('country', '')
-            if region:
-                region_key = f"{region}, {country}" if country else region
-                regions[region_key] = regions.get(region_key, 0) + 1
+        region_list = cache.counts('region')
         
-        if not regions:
+        if not region_list:
             self.logger.error("❌ Aucune région détectée dans la base de connaissance.")
             return
         
@@ -2755,7 +2785,6 @@ Le persona doit être une synthèse créative des thèmes {', '.join(theme_group
         print("\n🌍 RÉGIONS DISPONIBLES :")
         print("=" * 50)
         
-        region_list = sorted(regions.items(), key=lambda x: x[1], reverse=True)
         for i, (region, count) in enumerate(region_list, 1):
             print(f"{i}. Région : {region} ({count} membres)")
             print(f"    Description : Groupe de {count} membres localisés en '{region}'.")
@@ -2775,18 +2804,8 @@ Le persona doit être une synthèse créative des thèmes {', '.join(theme_group
             selected_region, count = region_list[selected_index]
             
             # Filtrer les prospects
-            filtered_prospects = []
-            for pubkey, data in knowledge_base.items():
-                metadata = data.get('metadata', {})
-                region = metadata.get('region')
-                country = metadata.get('country', '')
-                region_key = f"{region}, {country}" if country else region
-                if region_key == selected_region:
-                    filtered_prospects.append({
-                        'pubkey': pubkey,
-                        'uid': data.get('uid', ''),
-                        'metadata': metadata
-                    })
+            selected_pubkeys = cache.lookup('region', [selected_region])
+            filtered_prospects = [self._target_entry(pubkey, data) for pubkey, data in cache.records(selected_pubkeys)]
             
             # Créer un cluster simple pour la région sélectionnée
             cluster = {
@@ -2965,7 +2984,7 @@ Réponds UNIQUEMENT avec un objet JSON valide au format suivant :
 
             try:
                 # Appeler l'IA pour la traduction
-                response = self._query_ia(prompt, expect_json=True)
+                response = self._query_ia(prompt, expect_json=True, cache_namespace='persona_translation')
                 if not response:
                     continue
                 
@@ -3001,10 +3020,10 @@ Réponds UNIQUEMENT avec un objet JSON valide au format suivant :
         print(f"\n🖥️ PLATEFORMES DISPONIBLES :")
         
         # Analyser les plateformes disponibles
+        knowledge_base = self._knowledge_cache().all()
         platforms = {}
         for prospect in prospects:
             # Récupérer les données complètes depuis la base de connaissance
-            knowledge_base = self._load_and_sync_knowledge_base()
             pubkey = prospect.get('pubkey')
             if pubkey in knowledge_base:
                 data = knowledge_base[pubkey]
@@ -3085,7 +3104,7 @@ Réponds UNIQUEMENT avec un objet JSON valide au format suivant :
                 return prospects
             
             # Charger la base de connaissance pour accéder aux données complètes
-            knowledge_base = self._load_and_sync_knowledge_base()
+            knowledge_base = self._knowledge_cache().all()
             
             filtered = []
             for prospect in prospects:
@@ -3141,7 +3160,7 @@ Réponds UNIQUEMENT avec un objet JSON valide au format suivant :
                 return prospects
             
             # Charger la base de connaissance
-            knowledge_base = self._load_and_sync_knowledge_base()
+            knowledge_base = self._knowledge_cache().all()
             
             filtered = []
             for prospect in prospects:
@@ -3235,10 +3254,14 @@ Réponds UNIQUEMENT avec un objet JSON valide au format suivant :
             self.logger.error(f"❌ Erreur dans le filtrage combiné : {e}")
             return prospects
 
-    def run_optimized_analysis_suite(self):
+    def run_optimized_analysis_suite(self, resume=True):
         """
         Suite d'analyse optimisée combinant géo-linguistique et thématique
         avec des optimisations avancées : cache, batch processing, parallélisation.
+        La suite est un travail reprenable (AnalysisJob) : un point de reprise
+        est enregistré au fil des phases avec la base de connaissance, et un
+        lancement après interruption reprend là où l'analyse s'était arrêtée.
+        Retourne le résumé du travail (None si l'analyse n'a pas pu démarrer).
         """
         self.logger.info("🚀 Agent Analyste : Démarrage de la suite d'analyse OPTIMISÉE...")
         self.shared_state['status']['AnalystAgent'] = "Suite d'analyse optimisée en cours..."
@@ -3246,15 +3269,15 @@ Réponds UNIQUEMENT avec un objet JSON valide au format suivant :
         # Vérifier Ollama une seule fois
         if not self._check_ollama_once():
             self.shared_state['status']['AnalystAgent'] = "Échec : API Ollama indisponible."
-            return
+            return None
 
         knowledge_base = self._load_and_sync_knowledge_base()
         
         # --- OPTIMISATION 1 : Pré-calcul des données communes ---
         self.logger.info("📊 Pré-calcul des données communes...")
         
-        # Identifier tous les prospects à analyser
-        all_prospects = [pk for pk, data in knowledge_base.items() if 'g1_wot' in data.get('source', '')]
+        # Identifier tous les prospects à analyser (ordre stable : le curseur de reprise en dépend)
+        all_prospects = sorted(pk for pk, data in knowledge_base.items() if 'g1_wot' in data.get('source', ''))
         prospects_with_gps = []
         prospects_with_description = []
         
@@ -3287,7 +3310,7 @@ Réponds UNIQUEMENT avec un objet JSON valide au format suivant :
         
         if not geo_prompt_template or not thematic_prompt_template:
             self.logger.error("❌ Impossible de charger les prompts templates.")
-            return
+            return None
         
         # --- OPTIMISATION 3 : Charger tous les caches ---
         geo_cache_file = os.path.join(self.shared_state['config']['workspace'], 'geo_cache.json')
@@ -3295,6 +3318,7 @@ Réponds UNIQUEMENT avec un objet JSON valide au format suivant :
         
         geo_cache = self._load_geo_cache(geo_cache_file)
         thematic_cache = self._load_thematic_cache(thematic_cache_file)
+        self._check_thematic_cache_version(thematic_cache, thematic_prompt_template)
         
         # --- OPTIMISATION 4 : Calcul des thèmes guides ---
         tag_counter = Counter()
@@ -3304,26 +3328,49 @@ Réponds UNIQUEMENT avec un objet JSON valide au format suivant :
         
         guide_tags = [tag for tag, count in tag_counter.most_common(50)]
         
-        # --- OPTIMISATION 5 : Traitement optimisé par phases ---
-        
-        # PHASE 1 : Géolocalisation GPS (batch processing)
-        self.logger.info("📍 PHASE 1 : Géolocalisation GPS optimisée...")
-        gps_stats = self._run_optimized_gps_analysis(
-            knowledge_base, prospects_with_gps, geo_cache, geo_cache_file
-        )
-        
-        # PHASE 2 : Analyse thématique (batch processing)
-        self.logger.info("🏷️ PHASE 2 : Analyse thématique optimisée...")
-        thematic_stats = self._run_optimized_thematic_analysis(
-            knowledge_base, prospects_with_description, thematic_cache, 
-            thematic_cache_file, thematic_prompt_template, guide_tags
-        )
+        # --- OPTIMISATION 5 : Traitement optimisé par phases, avec point de reprise ---
+        job = self._analysis_job()
+        if job.start(resume):
+            self.logger.info(f"♻️ Reprise de l'analyse interrompue ({job.state['updated_at']}).")
+        
+        phases = [
+            # PHASE 1 : Géolocalisation GPS (batch processing)
+            ('gps', "📍 PHASE 1 : Géolocalisation GPS optimisée...",
+             lambda: self._run_optimized_gps_analysis(knowledge_base, prospects_with_gps, geo_cache, geo_cache_file, job)),
+            # PHASE 2 : Analyse thématique (batch processing)
+            ('thematic', "🏷️ PHASE 2 : Analyse thématique optimisée...",
+             lambda: self._run_optimized_thematic_analysis(knowledge_base, prospects_with_description, thematic_cache,
+                                                           thematic_cache_file, thematic_prompt_template, guide_tags, job)),
+            # PHASE 3 : Analyse IA pour les cas restants
+            ('ia', "🧠 PHASE 3 : Analyse IA pour cas restants...",
+             lambda: self._run_optimized_ia_analysis(knowledge_base, all_prospects, geo_prompt_template, job)),
+        ]
+        stats = {}
+        try:
+            for phase, title, run_phase in phases:
+                if job.is_done(phase):
+                    self.logger.info(f"⏭️ Phase '{phase}' déjà terminée lors d'un lancement précédent.")
+                    stats[phase] = job.state['phases'][phase]['stats']
+                    continue
+                self.logger.info(title)
+                stats[phase] = run_phase()
+                self._save_knowledge_base(knowledge_base)
+                job.end_phase(phase, stats[phase])
+        except KeyboardInterrupt:
+            self._save_knowledge_base(knowledge_base)
+            job.finish('interrupted')
+            self.logger.warning(f"⏸️ Analyse interrompue, reprise possible à la phase '{job.state['phase']}' ({job.progress_line(job.state['phase'])}).")
+            self.shared_state['status']['AnalystAgent'] = "Suite optimisée interrompue (reprise possible)."
+            return job.summary()
+        except Exception as e:
+            self._save_knowledge_base(knowledge_base)
+            job.finish('failed', e)
+            self.logger.error(f"❌ Analyse arrêtée à la phase '{job.state['phase']}' : {e}. Reprise possible au prochain lancement.")
+            self.shared_state['status']['AnalystAgent'] = "Suite optimisée en échec (reprise possible)."
+            return job.summary()
+        job.finish('completed')
         
-        # PHASE 3 : Analyse IA pour les cas restants
-        self.logger.info("🧠 PHASE 3 : Analyse IA pour cas restants...")
-        ia_stats = self._run_optimized_ia_analysis(
-            knowledge_base, all_prospects, geo_prompt_template
-        )
+        gps_stats, thematic_stats, ia_stats = stats['gps'], stats['thematic'], stats['ia']
         
         # --- RÉSULTATS FINAUX ---
         self.logger.info("✅ Suite d'analyse optimisée terminée !")
@@ -3335,107 +3382,174 @@ Réponds UNIQUEMENT avec un objet JSON valide au format suivant :
         self.logger.info(f"   • Total traités : {gps_stats['geolocated'] + gps_stats['cached'] + ia_stats['ia_analyzed']}")
         
         self.shared_state['status']['AnalystAgent'] = f"Suite optimisée terminée : {gps_stats['geolocated'] + gps_stats['cached'] + ia_stats['ia_analyzed']} profils analysés"
+        return job.summary()
+
+    def _analysis_job(self):
+        """Travail reprenable de la suite d'analyse optimisée (point de reprise dans le workspace)."""
+        config = self.shared_state['config']
+        checkpoint_file = os.path.join(config['workspace'], 'analysis_job_checkpoint.json')
+        return AnalysisJob(checkpoint_file, ('gps', 'thematic', 'ia'), self.logger,
+                           checkpoint_interval=config.get('analysis_checkpoint_interval', 30))
+
+    def _job_checkpoint(self, job, phase, knowledge_base, force=False):
+        """Enregistre la base de connaissance puis le point de reprise (au plus toutes les N secondes)."""
+        if job is None or not (force or job.checkpoint_due()):
+            return
+        self._save_knowledge_base(knowledge_base)
+        job.save()
+        self.logger.info(f"💾 Point de reprise '{phase}' : {job.progress_line(phase)}")
 
-    def _run_optimized_gps_analysis(self, knowledge_base, prospects_with_gps, geo_cache, geo_cache_file):
-        """Analyse GPS optimisée avec batch processing"""
+    def _run_optimized_gps_analysis(self, knowledge_base, prospects_with_gps, geo_cache, geo_cache_file, job=None):
+        """Analyse GPS optimisée avec batch processing et cache spatial"""
         gps_geolocated = 0
         gps_cached = 0
         batch_size = 15  # Batch plus grand pour GPS
         gps_batch = []
-        
-        for i, pubkey in enumerate(prospects_with_gps):
+        spatial_cache = self._spatial_geo_cache(geo_cache)
+        resolved = []  # (pubkey, geo_data) appliqués en une passe
+        handled = 0  # Profils parcourus depuis le dernier point de synchronisation
+        
+        def flush_batch():
+            nonlocal gps_geolocated, gps_cached
+            processed = self._process_gps_batch(gps_batch, spatial_cache)
+            for item in processed:
+                resolved.append((item['pubkey'], item['geo_data']))
+                if item.get('cached'):
+                    gps_cached += 1
+                else:
+                    gps_geolocated += 1
+            processed_keys = {item['pubkey'] for item in processed}
+            failed = {item['pubkey']: "géolocalisation impossible" for item in gps_batch if item['pubkey'] not in processed_keys}
+            self._save_geo_cache(geo_cache, geo_cache_file)
+            gps_batch.clear()
+            return failed
+        
+        def sync(failed=None):
+            nonlocal handled
+            self._apply_geo_results(knowledge_base, resolved)
+            resolved.clear()
+            if job:
+                job.advance('gps', handled, failed)
+                self._job_checkpoint(job, 'gps', knowledge_base)
+            handled = 0
+        
+        items = job.begin_phase('gps', prospects_with_gps) if job else prospects_with_gps
+        for pubkey in items:
             prospect_data = knowledge_base[pubkey]
+            handled += 1
             
-            if 'language' in prospect_data.get('metadata', {}):
-                continue
-            
-            profile = prospect_data.get('profile', {})
-            source = profile.get('_source', {})
-            geo_point = source.get('geoPoint', {})
-            
-            lat = geo_point.get('lat')
-            lon = geo_point.get('lon')
-            cache_key = f"{lat:.4f},{lon:.4f}"
-            
-            if cache_key in geo_cache:
-                gps_cached += 1
-                self._apply_geo_data(prospect_data, geo_cache[cache_key])
-            else:
-                gps_batch.append({
-                    'pubkey': pubkey,
-                    'lat': lat,
-                    'lon': lon,
-                    'uid': prospect_data.get('uid', 'N/A'),
-                    'cache_key': cache_key
-                })
+            if 'language' not in prospect_data.get('metadata', {}):
+                profile = prospect_data.get('profile', {})
+                source = profile.get('_source', {})
+                geo_point = source.get('geoPoint', {})
+                
+                lat = geo_point.get('lat')
+                lon = geo_point.get('lon')
                 
-                if len(gps_batch) >= batch_size or i == len(prospects_with_gps) - 1:
-                    processed = self._process_gps_batch(gps_batch, geo_cache)
-                    gps_geolocated += len(processed)
-                    self._save_geo_cache(geo_cache, geo_cache_file)
-                    gps_batch = []
+                geo_data = spatial_cache.get(lat, lon)
+                if geo_data:
+                    gps_cached += 1
+                    resolved.append((pubkey, geo_data))
+                else:
+                    gps_batch.append({
+                        'pubkey': pubkey,
+                        'lat': lat,
+                        'lon': lon,
+                        'uid': prospect_data.get('uid', 'N/A'),
+                        'cache_key': spatial_cache.key(lat, lon)
+                    })
+                    
+                    if len(gps_batch) >= batch_size:
+                        sync(flush_batch())
+                        continue
+            
+            # Point de synchronisation lorsque aucun lot n'est en attente
+            if not gps_batch and handled >= batch_size:
+                sync()
+        
+        sync(flush_batch() if gps_batch else None)
+        
+        if prospects_with_gps:
+            self.logger.info(f"📍 Cache GPS spatial : {spatial_cache.summary()}")
         
         return {'geolocated': gps_geolocated, 'cached': gps_cached}
 
     def _run_optimized_thematic_analysis(self, knowledge_base, prospects_with_description, 
-                                       thematic_cache, thematic_cache_file, prompt_template, guide_tags):
-        """Analyse thématique optimisée avec batch processing"""
+                                       thematic_cache, thematic_cache_file, prompt_template, guide_tags,
+                                       job=None, chunk_size=200):
+        """
+        Analyse thématique optimisée : requêtes IA concurrentes puis application
+        des tags, par tranches de profils (un point de reprise par tranche).
+        """
         tags_generated = 0
-        batch_size = 8  # Batch optimal pour IA
-        ia_batch = []
+        items = job.begin_phase('thematic', prospects_with_description) if job else prospects_with_description
         
-        for i, pubkey in enumerate(prospects_with_description):
-            prospect_data = knowledge_base[pubkey]
-            metadata = prospect_data.setdefault('metadata', {})
-            
-            if 'tags' in metadata:
-                continue
-            
-            profile = prospect_data.get('profile', {})
-            source = profile.get('_source', {})
-            description = (source.get('description') or '').strip()
+        for start in range(0, len(items), chunk_size):
+            chunk = items[start:start + chunk_size]
+            pending_profiles = []  # (pubkey, social_tags, cache_key)
+            ia_items = {}  # Une seule requête IA par description distincte
             
-            # Traiter les réseaux sociaux
-            socials = source.get('socials', [])
-            social_tags = self._extract_social_tags(socials)
-            
-            if description:
-                import hashlib
-                description_hash = hashlib.md5(description.encode()).hexdigest()
-                cache_key = f"thematic_{description_hash}"
+            for pubkey in chunk:
+                prospect_data = knowledge_base[pubkey]
+                metadata = prospect_data.setdefault('metadata', {})
                 
-                if cache_key in thematic_cache:
-                    thematic_tags = thematic_cache[cache_key]
-                else:
-                    ia_batch.append({
-                        'pubkey': pubkey,
-                        'description': description,
-                        'uid': prospect_data.get('uid', 'N/A'),
-                        'cache_key': cache_key
-                    })
+                if 'tags' in metadata:
+                    continue
+                
+                profile = prospect_data.get('profile', {})
+                source = profile.get('_source', {})
+                description = (source.get('description') or '').strip()
+                
+                # Traiter les réseaux sociaux
+                socials = source.get('socials', [])
+                social_tags = self._extract_social_tags(socials)
+                
+                cache_key = None
+                if description:
+                    description_hash = hashlib.md5(description.encode()).hexdigest()
+                    cache_key = f"thematic_{description_hash}"
                     
-                    if len(ia_batch) >= batch_size or i == len(prospects_with_description) - 1:
-                        processed = self._process_ia_batch(ia_batch, thematic_cache, prompt_template, guide_tags)
-                        self._save_thematic_cache(thematic_cache, thematic_cache_file)
-                        ia_batch = []
+                    if cache_key not in thematic_cache and cache_key not in ia_items:
+                        ia_items[cache_key] = {
+                            'pubkey': pubkey,
+                            'description': description,
+                            'uid': prospect_data.get('uid', 'N/A'),
+                            'cache_key': cache_key
+                        }
                 
-                if cache_key in thematic_cache:
+                pending_profiles.append((pubkey, social_tags, cache_key))
+            
+            self._run_thematic_ia_queue(list(ia_items.values()), thematic_cache, thematic_cache_file,
+                                        prompt_template, guide_tags)
+            
+            failed = {}
+            for pubkey, social_tags, cache_key in pending_profiles:
+                metadata = knowledge_base[pubkey]['metadata']
+                if cache_key is None:
+                    metadata['tags'] = social_tags
+                    tags_generated += len(social_tags)
+                elif cache_key in thematic_cache:
                     thematic_tags = thematic_cache[cache_key]
                     all_tags = social_tags + thematic_tags
                     normalized_tags = self._normalize_tags(all_tags)
                     metadata['tags'] = normalized_tags
                     tags_generated += len(normalized_tags)
-            else:
-                metadata['tags'] = social_tags
-                tags_generated += len(social_tags)
+                else:
+                    failed[pubkey] = "analyse thématique sans réponse"
+            
+            if job:
+                job.advance('thematic', len(chunk), failed)
+                self._job_checkpoint(job, 'thematic', knowledge_base)
         
         return {'tags_generated': tags_generated}
 
-    def _run_optimized_ia_analysis(self, knowledge_base, all_prospects, geo_prompt_template):
-        """Analyse IA pour les cas restants"""
+    def _run_optimized_ia_analysis(self, knowledge_base, all_prospects, geo_prompt_template, job=None):
+        """Analyse IA pour les cas restants (pool de workers IA)"""
         ia_analyzed = 0
+        items = job.begin_phase('ia', all_prospects) if job else all_prospects
         
-        for pubkey in all_prospects:
+        prospects_needing_ia = []  # (position dans items, pubkey, description)
+        for position, pubkey in enumerate(items):
             prospect_data = knowledge_base[pubkey]
             
             # Vérifier si déjà analysé
@@ -3447,41 +3561,65 @@ Réponds UNIQUEMENT avec un objet JSON valide au format suivant :
             description = (source.get('description') or '').strip()
             
             if description:
+                prospects_needing_ia.append((position, pubkey, description))
+        
+        advanced = 0  # Nombre d'éléments de 'items' déjà comptés dans le point de reprise
+        pool = self._ia_pool("Analyse IA (cas restants)")
+        query = lambda item: self._query_geo_data(item[2], geo_prompt_template)
+        for (position, pubkey, description), geo_data, error in pool.imap(query, prospects_needing_ia):
+            prospect_data = knowledge_base[pubkey]
+            failed = None
+            if error:
+                self.logger.error(f"❌ Erreur analyse IA pour {prospect_data.get('uid')} : {error}")
+                failed = {pubkey: error}
+            else:
                 try:
-                    prompt = f"{geo_prompt_template}\n\nTexte fourni: \"{description}\""
-                    ia_response = self._query_ia(prompt, expect_json=True)
-                    cleaned_answer = self._clean_ia_json_output(ia_response['answer'])
-                    geo_data = json.loads(cleaned_answer)
-                    
                     self._apply_geo_data(prospect_data, geo_data)
                     ia_analyzed += 1
-                    
                 except Exception as e:
                     self.logger.error(f"❌ Erreur analyse IA pour {prospect_data.get('uid')} : {e}")
-        
+                    failed = {pubkey: e}
+            if job:
+                # Les profils ignorés situés avant celui-ci sont comptés avec lui
+                job.advance('ia', position + 1 - advanced, failed)
+                advanced = position + 1
+                self._job_checkpoint(job, 'ia', knowledge_base)
+        
+        if job:
+            job.advance('ia', len(items) - advanced)
         return {'ia_analyzed': ia_analyzed}
 
     def _apply_geo_data(self, prospect_data, geo_data):
         """Applique les données géolocalisées à un prospect"""
-        meta = prospect_data.setdefault('metadata', {})
-        
+        prospect_data.setdefault('metadata', {}).update(self._geo_metadata_updates(geo_data))
+
+    def _geo_metadata_updates(self, geo_data, geolocation_source=None):
+        """Champs de métadonnées à écrire pour un résultat de géolocalisation"""
+        updates = {field: geo_data[field] for field in ('country', 'region', 'city') if geo_data.get(field)}
         language = geo_data.get('language', 'xx')
         if language != 'xx':
-            meta['language'] = language
-        
-        country = geo_data.get('country')
-        if country:
-            meta['country'] = country
-        
-        region = geo_data.get('region')
-        if region:
-            meta['region'] = region
-        
-        city = geo_data.get('city')
-        if city:
-            meta['city'] = city
-        
-        meta['geolocation_source'] = geo_data.get('geolocation_source', 'unknown')
+            updates['language'] = language
+        updates['geolocation_source'] = geolocation_source or geo_data.get('geolocation_source', 'unknown')
+        return updates
+
+    def _apply_geo_results(self, knowledge_base, results, geolocation_source=None):
+        """
+        Applique en une passe des résultats de géolocalisation (pubkey, geo_data).
+        Les champs à écrire sont calculés une seule fois par résultat distinct :
+        les profils servis par la même entrée du cache GPS les partagent.
+        """
+        updates_by_result = {}
+        applied = 0
+        for pubkey, geo_data in results:
+            cached = updates_by_result.get(id(geo_data))
+            if cached is None:
+                # La référence à geo_data garantit l'unicité de son id pendant la passe
+                cached = (geo_data, self._geo_metadata_updates(geo_data, geolocation_source))
+                updates_by_result[id(geo_data)] = cached
+            updates = cached[1]
+            knowledge_base[pubkey].setdefault('metadata', {}).update(updates)
+            applied += 1
+        return applied
 
     def _extract_social_tags(self, socials):
         """Extrait les tags des réseaux sociaux"""
@@ -1,5 +1,10 @@
 import json
 import os
+from .knowledge_store import KnowledgeStore
+from .knowledge_cache import KnowledgeBaseCache
+from .ia_pool import IAWorkerPool
+from .llm_client import OllamaClient
+from .llm_cache import LLMResponseCache, prompt_version
 
 class Agent:
     """
@@ -21,4 +26,104 @@ class Agent:
         """
         Retourne le statut actuel de l'agent.
         """
-        return self.shared_state['status'].get(self.__class__.__name__, "Inactif") 
\ No newline at end of file
+        return self.shared_state['status'].get(self.__class__.__name__, "Inactif")
+
+    def _knowledge_store(self):
+        """
+        Retourne le stockage SQLite de la base de connaissance, partagé entre
+        tous les agents via l'état partagé. Au premier accès, l'ancienne base
+        'enriched_prospects.json' est importée si le stockage est vide.
+        """
+        store = self.shared_state.get('knowledge_store')
+        if store is None:
+            config = self.shared_state['config']
+            kb_json_file = config['enriched_prospects_file']
+            db_file = config.get('knowledge_base_db') or os.path.splitext(kb_json_file)[0] + '.db'
+            store = KnowledgeStore(db_file, self.logger)
+            if store.count() == 0 and os.path.exists(kb_json_file):
+                try:
+                    imported = store.import_json(kb_json_file)
+                    self.logger.info(f"📦 {imported} profils importés de '{kb_json_file}' vers '{db_file}'.")
+                except (json.JSONDecodeError, IOError) as e:
+                    self.logger.error(f"Impossible d'importer la base de connaissance '{kb_json_file}'. Erreur : {e}")
+            self.shared_state['knowledge_store'] = store
+        return store
+
+    def _knowledge_cache(self):
+        """
+        Retourne le cache en lecture de la base de connaissance, partagé entre
+        tous les agents. À utiliser pour les recherches par cible : la base
+        n'est relue que lorsqu'elle a changé.
+        """
+        cache = self.shared_state.get('knowledge_cache')
+        if cache is None:
+            cache = KnowledgeBaseCache(self._knowledge_store(), self.logger)
+            self.shared_state['knowledge_cache'] = cache
+        return cache
+
+    def _load_blocklist(self):
+        """Pubkeys des profils ayant demandé à ne plus être contactés (blocklist.json)."""
+        config = self.shared_state['config']
+        blocklist_file = config.get('blocklist_file') or os.path.join(config['workspace'], 'blocklist.json')
+        if not os.path.exists(blocklist_file):
+            return set()
+        try:
+            with open(blocklist_file, 'r') as f:
+                return set(u.get('pubkey') for u in json.load(f))
+        except (json.JSONDecodeError, IOError):
+            self.logger.warning(f"Impossible de lire la blocklist '{blocklist_file}'.")
+            return set()
+
+    def _load_knowledge_base(self):
+        """
+        Charge une copie modifiable de la base de connaissance enrichie
+        (dictionnaire indexé par pubkey). Pour une simple lecture, préférer
+        _knowledge_cache().
+        """
+        return self._knowledge_store().load_all()
+
+    def _llm_client(self):
+        """
+        Retourne le client IA partagé entre tous les agents (API Ollama en
+        connexion persistante, avec repli sur le script question.py).
+        """
+        client = self.shared_state.get('llm_client')
+        if client is None:
+            config = self.shared_state['config']
+            client = OllamaClient(
+                config.get('ollama_url'),
+                config.get('ollama_model'),
+                question_script=config.get('question_script'),
+                timeout=config.get('ia_timeout_seconds', 300),
+                pool_size=config.get('ia_max_workers', 2),
+                logger=self.logger,
+                cache=self._llm_cache()
+            )
+            self.shared_state['llm_client'] = client
+        return client
+
+    def _llm_cache(self):
+        """
+        Retourne le cache des réponses de l'IA partagé entre les agents, ou None
+        s'il est désactivé ('llm_cache_enabled').
+        """
+        if 'llm_cache' not in self.shared_state:
+            config = self.shared_state['config']
+            cache = None
+            if config.get('llm_cache_enabled', True):
+                db_file = config.get('llm_cache_db') or os.path.join(config.get('workspace', '.'), 'llm_cache.db')
+                cache = LLMResponseCache(db_file, config.get('llm_cache_max_entries', 50000), self.logger)
+            self.shared_state['llm_cache'] = cache
+        return self.shared_state['llm_cache']
+
+    def _cache_namespace(self, kind, template=None):
+        """Espace de cache 'type:version' d'un prompt ; la version suit le contenu du template."""
+        return f"{kind}:{prompt_version(template)}" if template is not None else kind
+
+    def _ia_pool(self, label="IA"):
+        """
+        Crée un pool de workers pour les requêtes IA. Le nombre de requêtes
+        simultanées se règle avec 'ia_max_workers' (1 = traitement séquentiel).
+        """
+        max_workers = self.shared_state['config'].get('ia_max_workers', 2)
+        return IAWorkerPool(max_workers, self.logger, label)
@@ -0,0 +1,199 @@
+import unicodedata
+from collections import namedtuple
+
+# Table ISO-3166 des pays et de leurs langues, chargée une seule fois à l'import.
+# Format : alpha-2 | alpha-3 | nom anglais | nom français | langues pondérées | autres noms
+# Les poids approximent la part de locuteurs ; la première langue est la principale.
+_COUNTRY_TABLE = """
+FR|FRA|France|France|fr|République française
+BE|BEL|Belgium|Belgique|nl:0.59,fr:0.40,de:0.01|België;Belgien
+CH|CHE|Switzerland|Suisse|de:0.62,fr:0.23,it:0.08,rm:0.01|Schweiz;Svizzera;Svizra
+LU|LUX|Luxembourg|Luxembourg|lb:0.50,fr:0.30,de:0.20|Lëtzebuerg;Luxemburg
+MC|MCO|Monaco|Monaco|fr|
+AD|AND|Andorra|Andorre|ca:0.60,es:0.30,fr:0.10|
+CA|CAN|Canada|Canada|en:0.75,fr:0.25|
+US|USA|United States|États-Unis|en:0.90,es:0.10|United States of America;USA;États-Unis d'Amérique
+GB|GBR|United Kingdom|Royaume-Uni|en|UK;Great Britain;Grande-Bretagne;England;Angleterre;Scotland;Écosse;Wales;Pays de Galles
+IE|IRL|Ireland|Irlande|en:0.95,ga:0.05|Éire
+ES|ESP|Spain|Espagne|es:0.80,ca:0.15,eu:0.03,gl:0.02|España;Espanya
+PT|PRT|Portugal|Portugal|pt|
+IT|ITA|Italy|Italie|it|Italia
+DE|DEU|Germany|Allemagne|de|Deutschland
+AT|AUT|Austria|Autriche|de|Österreich
+NL|NLD|Netherlands|Pays-Bas|nl|Nederland;The Netherlands;Holland;Hollande
+DK|DNK|Denmark|Danemark|da|Danmark
+SE|SWE|Sweden|Suède|sv|Sverige
+NO|NOR|Norway|Norvège|no|Norge
+FI|FIN|Finland|Finlande|fi:0.87,sv:0.13|Suomi
+IS|ISL|Iceland|Islande|is|Ísland
+PL|POL|Poland|Pologne|pl|Polska
+CZ|CZE|Czechia|Tchéquie|cs|Czech Republic;République tchèque;Česko
+SK|SVK|Slovakia|Slovaquie|sk|Slovensko
+HU|HUN|Hungary|Hongrie|hu|Magyarország
+RO|ROU|Romania|Roumanie|ro|România
+BG|BGR|Bulgaria|Bulgarie|bg|България
+GR|GRC|Greece|Grèce|el|Ελλάδα
+HR|HRV|Croatia|Croatie|hr|Hrvatska
+SI|SVN|Slovenia|Slovénie|sl|Slovenija
+RS|SRB|Serbia|Serbie|sr|Србија
+BA|BIH|Bosnia and Herzegovina|Bosnie-Herzégovine|bs:0.50,hr:0.25,sr:0.25|
+AL|ALB|Albania|Albanie|sq|Shqipëria
+MT|MLT|Malta|Malte|mt:0.90,en:0.10|
+CY|CYP|Cyprus|Chypre|el:0.80,tr:0.20|
+EE|EST|Estonia|Estonie|et|Eesti
+LV|LVA|Latvia|Lettonie|lv|Latvija
+LT|LTU|Lithuania|Lituanie|lt|Lietuva
+UA|UKR|Ukraine|Ukraine|uk:0.70,ru:0.30|Україна
+BY|BLR|Belarus|Biélorussie|be:0.30,ru:0.70|
+RU|RUS|Russia|Russie|ru|Russian Federation;Россия
+TR|TUR|Turkey|Turquie|tr|Türkiye
+MA|MAR|Morocco|Maroc|ar:0.60,fr:0.30,ber:0.10|المغرب
+DZ|DZA|Algeria|Algérie|ar:0.70,fr:0.20,ber:0.10|
+TN|TUN|Tunisia|Tunisie|ar:0.70,fr:0.30|
+SN|SEN|Senegal|Sénégal|fr|
+CI|CIV|Côte d'Ivoire|Côte d'Ivoire|fr|Ivory Coast
+ML|MLI|Mali|Mali|fr|
+BF|BFA|Burkina Faso|Burkina Faso|fr|
+NE|NER|Niger|Niger|fr|
+TG|TGO|Togo|Togo|fr|
+BJ|BEN|Benin|Bénin|fr|
+GN|GIN|Guinea|Guinée|fr|
+CM|CMR|Cameroon|Cameroun|fr:0.80,en:0.20|
+GA|GAB|Gabon|Gabon|fr|
+CG|COG|Congo|Congo|fr|République du Congo;Congo-Brazzaville
+CD|COD|DR Congo|République démocratique du Congo|fr|Democratic Republic of the Congo;RDC;Congo-Kinshasa
+MG|MDG|Madagascar|Madagascar|mg:0.60,fr:0.40|
+MU|MUS|Mauritius|Maurice|en:0.50,fr:0.50|Île Maurice
+HT|HTI|Haiti|Haïti|fr:0.50,ht:0.50|
+RW|RWA|Rwanda|Rwanda|rw:0.70,fr:0.15,en:0.15|
+EG|EGY|Egypt|Égypte|ar|
+ZA|ZAF|South Africa|Afrique du Sud|en:0.50,af:0.50|
+KE|KEN|Kenya|Kenya|sw:0.50,en:0.50|
+NG|NGA|Nigeria|Nigeria|en|
+MX|MEX|Mexico|Mexique|es|México
+AR|ARG|Argentina|Argentine|es|
+CL|CHL|Chile|Chili|es|
+CO|COL|Colombia|Colombie|es|
+PE|PER|Peru|Pérou|es|Perú
+VE|VEN|Venezuela|Venezuela|es|
+EC|ECU|Ecuador|Équateur|es|
+BO|BOL|Bolivia|Bolivie|es|
+UY|URY|Uruguay|Uruguay|es|
+PY|PRY|Paraguay|Paraguay|es:0.50,gn:0.50|
+CR|CRI|Costa Rica|Costa Rica|es|
+GT|GTM|Guatemala|Guatemala|es|
+CU|CUB|Cuba|Cuba|es|
+DO|DOM|Dominican Republic|République dominicaine|es|República Dominicana
+BR|BRA|Brazil|Brésil|pt|Brasil
+JP|JPN|Japan|Japon|ja|日本
+CN|CHN|China|Chine|zh|中国
+KR|KOR|South Korea|Corée du Sud|ko|Korea
+IN|IND|India|Inde|hi:0.60,en:0.40|
+VN|VNM|Vietnam|Viêt Nam|vi|Viet Nam
+TH|THA|Thailand|Thaïlande|th|
+ID|IDN|Indonesia|Indonésie|id|
+IL|ISR|Israel|Israël|he:0.80,ar:0.20|
+LB|LBN|Lebanon|Liban|ar:0.70,fr:0.30|
+AU|AUS|Australia|Australie|en|
+NZ|NZL|New Zealand|Nouvelle-Zélande|en|
+NC|NCL|New Caledonia|Nouvelle-Calédonie|fr|
+PF|PYF|French Polynesia|Polynésie française|fr|
+RE|REU|Réunion|La Réunion|fr|
+GP|GLP|Guadeloupe|Guadeloupe|fr|
+MQ|MTQ|Martinique|Martinique|fr|
+GF|GUF|French Guiana|Guyane|fr|Guyane française
+YT|MYT|Mayotte|Mayotte|fr|
+PM|SPM|Saint Pierre and Miquelon|Saint-Pierre-et-Miquelon|fr|
+"""
+
+# Régions dont la langue diffère de la langue principale du pays
+# (noms GeoNames anglais et noms français de Nominatim)
+_REGION_LANGUAGES = {
+    'BE': {'fr': ['Wallonia', 'Wallonie', 'Brussels Capital', 'Brussels', 'Bruxelles', 'Bruxelles-Capitale'],
+           'de': ['Ostbelgien', 'Communauté germanophone']},
+    'CA': {'fr': ['Quebec', 'Québec']},
+    'CH': {'fr': ['Geneva', 'Genève', 'Vaud', 'Neuchâtel', 'Jura', 'Fribourg', 'Valais'],
+           'it': ['Ticino', 'Tessin']},
+    'ES': {'ca': ['Catalonia', 'Catalogne', 'Catalunya', 'Cataluña', 'Balearic Islands', 'Îles Baléares'],
+           'eu': ['Basque Country', 'Pays basque', 'Euskadi'],
+           'gl': ['Galicia', 'Galice']},
+    'IT': {'de': ['Trentino-Alto Adige', 'Trentin-Haut-Adige']},
+}
+
+Country = namedtuple('Country', ['code', 'alpha3', 'name', 'name_fr', 'languages'])
+
+
+def normalize_name(value):
+    """Clé de recherche insensible à la casse, aux accents et à la ponctuation."""
+    value = unicodedata.normalize('NFKD', str(value))
+    value = ''.join(c for c in value if not unicodedata.combining(c))
+    return ' '.join(value.upper().replace('-', ' ').replace("'", ' ').split())
+
+
+def _parse_languages(field):
+    languages = []
+    for part in field.split(','):
+        lang, _, weight = part.partition(':')
+        languages.append((lang, float(weight) if weight else 1.0))
+    return tuple(sorted(languages, key=lambda item: -item[1]))
+
+
+def _load_tables():
+    countries = {}
+    names = {}
+    for line in _COUNTRY_TABLE.strip().splitlines():
+        code, alpha3, name, name_fr, languages, aliases = line.split('|')
+        countries[code] = Country(code, alpha3, name, name_fr, _parse_languages(languages))
+        for alias in [code, alpha3, name, name_fr] + [a for a in aliases.split(';') if a]:
+            names.setdefault(normalize_name(alias), code)
+
+    regions = {}
+    for code, by_language in _REGION_LANGUAGES.items():
+        for lang, region_names in by_language.items():
+            for region in region_names:
+                regions[(code, normalize_name(region))] = lang
+    return countries, names, regions
+
+
+COUNTRIES, _NAME_INDEX, _REGION_INDEX = _load_tables()
+
+# Régions linguistiques parfois renseignées à la place du pays
+_NAME_INDEX.setdefault('CATALONIA', 'ES')
+_NAME_INDEX.setdefault('CATALUNYA', 'ES')
+
+
+def country_code(value):
+    """Code ISO alpha-2 d'un pays donné par son code (alpha-2/3) ou son nom, sinon None."""
+    if not value:
+        return None
+    return _NAME_INDEX.get(normalize_name(value))
+
+
+def country_languages(value):
+    """Langues pondérées [(langue, poids), ...] d'un pays, de la plus parlée à la moins parlée."""
+    country = COUNTRIES.get(country_code(value))
+    return list(country.languages) if country else []
+
+
+def primary_language(country, region=None, default='xx'):
+    """
+    Langue principale d'un pays, précisée par la région lorsqu'elle est connue
+    (ex: Québec -> fr, Catalogne -> ca, Tessin -> it).
+    """
+    code = country_code(country)
+    if code is None:
+        return default
+    # Une région linguistique peut aussi être renseignée à la place du pays
+    for name in (region, country):
+        region_lang = _REGION_INDEX.get((code, normalize_name(name))) if name else None
+        if region_lang:
+            return region_lang
+    return COUNTRIES[code].languages[0][0]
+
+
+def country_name(value, lang='fr'):
+    """Nom d'affichage d'un pays (français par défaut, 'en' pour l'anglais)."""
+    country = COUNTRIES.get(country_code(value))
+    if country is None:
+        return value
+    return country.name_fr if lang == 'fr' else country.name
@@ -0,0 +1,179 @@
+import os
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class TokenBucket:
+    """
+    Limiteur de débit à jetons (thread-safe) : 'rate' jetons par seconde,
+    au plus 'burst' envois consécutifs sans attente. Un débit nul ou absent
+    désactive la limitation.
+    """
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.capacity = max(1, int(burst or 1))
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Attend qu'un jeton soit disponible et le consomme. Retourne le temps d'attente."""
+        if not self.rate:
+            return 0.0
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class ChannelDispatcher:
+    """
+    Envoi des messages d'une campagne sur un ou plusieurs canaux (jaklis,
+    mailjet, nostr) en parallèle. Chaque canal a ses propres réglages :
+    débit maximal (seau à jetons), nombre d'envois simultanés, nombre de
+    nouvelles tentatives en cas d'échec transitoire (erreur système au
+    lancement) avec un délai doublé à chaque tentative. Un code de retour non
+    nul ou un délai dépassé n'est retenté que si 'retry_on_exit_code' est
+    activé pour le canal : les envois Jaklis et Mailjet ne sont pas
+    idempotents, un script qui échoue ou expire après avoir envoyé le message
+    provoquerait un doublon.
+
+    Un envoi est un dictionnaire : 'command' (liste d'arguments, où
+    MESSAGE_FILE est remplacé par un fichier temporaire contenant 'message'),
+    'label' (pour les journaux, la commande pouvant contenir une clé secrète),
+    et les données libres transmises à 'on_success'. En mode simulation
+    ('dry_run'), aucune commande n'est exécutée.
+    """
+
+    MESSAGE_FILE = '{message_file}'
+    DEFAULTS = {
+        'rate_per_minute': 12,
+        'burst': 1,
+        'max_concurrency': 1,
+        'max_retries': 2,
+        'backoff_seconds': 2,
+        'timeout_seconds': 120,
+        'retry_on_exit_code': False,
+    }
+
+    def __init__(self, channels_config=None, logger=None, dry_run=False, defaults=None):
+        self.channels_config = channels_config or {}
+        self.defaults = {**self.DEFAULTS, **(defaults or {})}
+        self.logger = logger
+        self.dry_run = dry_run
+        self._callback_lock = threading.Lock()
+
+    def settings(self, channel):
+        return {**self.defaults, **self.channels_config.get(channel, {})}
+
+    def dispatch(self, deliveries_by_channel, on_success=None):
+        """
+        Envoie les messages de chaque canal, les canaux étant traités en
+        parallèle. 'on_success(canal, envoi)' est appelé (un appel à la fois)
+        après chaque envoi réussi. Retourne un rapport par canal.
+        """
+        channels = [channel for channel, deliveries in deliveries_by_channel.items() if deliveries]
+        if not channels:
+            return {channel: self._report(channel, 0, 0, 0, 0.0) for channel in deliveries_by_channel}
+        with ThreadPoolExecutor(max_workers=len(channels), thread_name_prefix="astrobot-send") as executor:
+            futures = {channel: executor.submit(self._run_channel, channel, deliveries_by_channel[channel], on_success)
+                       for channel in channels}
+            reports = {channel: future.result() for channel, future in futures.items()}
+        for channel in deliveries_by_channel:
+            reports.setdefault(channel, self._report(channel, 0, 0, 0, 0.0))
+        return reports
+
+    def _run_channel(self, channel, deliveries, on_success):
+        settings = self.settings(channel)
+        rate = settings['rate_per_minute'] / 60.0 if settings['rate_per_minute'] else None
+        bucket = TokenBucket(rate, settings['burst'])
+        workers = max(1, int(settings['max_concurrency'] or 1))
+        start = time.time()
+        self._log('info', f"🚀 {channel} : {len(deliveries)} envoi(s), {settings['rate_per_minute'] or '∞'}/min, "
+                          f"{workers} simultané(s){' (SIMULATION)' if self.dry_run else ''}")
+
+        success = failure = retries = 0
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"astrobot-{channel}") as executor:
+            for position, (delivery, (ok, attempts)) in enumerate(zip(deliveries, executor.map(
+                    lambda delivery: self._deliver(channel, delivery, settings, bucket), deliveries)), 1):
+                retries += attempts - 1
+                if ok:
+                    success += 1
+                    if on_success and not self.dry_run:
+                        with self._callback_lock:
+                            on_success(channel, delivery)
+                else:
+                    failure += 1
+                self._log('info', f"--- Envoi {channel} {position}/{len(deliveries)} à {delivery.get('label', 'N/A')} : "
+                                  f"{'✅' if ok else '❌'} ---")
+        return self._report(channel, success, failure, retries, time.time() - start)
+
+    def _deliver(self, channel, delivery, settings, bucket):
+        """Envoie un message en respectant le débit du canal. Retourne (succès, nombre de tentatives)."""
+        attempts = 0
+        while True:
+            bucket.acquire()
+            attempts += 1
+            ok, transient, error = self._send(channel, delivery, settings)
+            if ok:
+                return True, attempts
+            if not transient or attempts > settings['max_retries']:
+                self._log('error', f"❌ Échec de l'envoi {channel} à {delivery.get('label', 'N/A')} : {error}")
+                return False, attempts
+            delay = settings['backoff_seconds'] * 2 ** (attempts - 1)
+            self._log('warning', f"⚠️ Échec transitoire de l'envoi {channel} à {delivery.get('label', 'N/A')} "
+                                 f"({error}), nouvelle tentative dans {delay:.1f}s.")
+            time.sleep(delay)
+
+    def _send(self, channel, delivery, settings):
+        """Exécute la commande d'envoi. Retourne (succès, échec transitoire, erreur)."""
+        if self.dry_run:
+            self._log('info', f"🧪 (SIMULATION) Envoi {channel} à {delivery.get('label', 'N/A')}")
+            return True, False, None
+
+        message_path = None
+        command = delivery['command']
+        try:
+            if self.MESSAGE_FILE in command:
+                with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix=".txt", encoding='utf-8') as tmp:
+                    tmp.write(delivery.get('message', ''))
+                    message_path = tmp.name
+                command = [message_path if arg == self.MESSAGE_FILE else arg for arg in command]
+            result = subprocess.run(command, capture_output=True, text=True,
+                                    timeout=settings['timeout_seconds'], input=delivery.get('stdin'))
+            if result.returncode != 0:
+                return False, bool(settings['retry_on_exit_code']), \
+                    (result.stderr or result.stdout or f"code de retour {result.returncode}").strip()
+            self._log('debug', f"Sortie de la commande : {result.stdout}")
+            return True, False, None
+        except FileNotFoundError as e:
+            return False, False, f"commande non trouvée : {e}"
+        except subprocess.TimeoutExpired:
+            # Le message a pu partir avant l'expiration : même règle qu'un code de retour non nul
+            return False, bool(settings['retry_on_exit_code']), f"délai de {settings['timeout_seconds']}s dépassé"
+        except OSError as e:
+            return False, True, str(e)
+        finally:
+            if message_path:
+                os.remove(message_path)
+
+    @staticmethod
+    def _report(channel, success, failure, retries, elapsed):
+        return {'channel': channel, 'success': success, 'failure': failure, 'retries': retries,
+                'elapsed_seconds': round(elapsed, 2)}
+
+    def _log(self, level, message):
+        if self.logger:
+            getattr(self.logger, level)(message)
@@ -0,0 +1,334 @@
+import io
+import json
+import math
+import os
+import zipfile
+
+import requests
+
+from .countries import COUNTRIES, country_name
+
+GEONAMES_BASE_URL = "https://download.geonames.org/export/dump"
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = 111.32
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Distance orthodromique entre deux points GPS, en kilomètres."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+class BoundaryIndex:
+    """
+    Index de polygones administratifs (GeoJSON) pour déterminer le pays et la
+    région d'un point par test d'inclusion (point-in-polygon).
+    Compatible avec les fichiers Natural Earth admin-0 / admin-1
+    (propriétés 'admin', 'iso_a2', 'name', en minuscules ou majuscules).
+    """
+
+    def __init__(self, geojson_file, cell_deg=1.0):
+        self.cell_deg = cell_deg
+        self.polygons = []  # (bbox, anneaux, propriétés)
+        self.cells = {}
+        with open(geojson_file, 'r', encoding='utf-8') as f:
+            features = json.load(f).get('features', [])
+        for feature in features:
+            geometry = feature.get('geometry') or {}
+            properties = {k.lower(): v for k, v in (feature.get('properties') or {}).items()}
+            if geometry.get('type') == 'Polygon':
+                polygons = [geometry['coordinates']]
+            elif geometry.get('type') == 'MultiPolygon':
+                polygons = geometry['coordinates']
+            else:
+                continue
+            for rings in polygons:
+                self._add_polygon(rings, properties)
+
+    def _add_polygon(self, rings, properties):
+        outer = rings[0]
+        lons = [point[0] for point in outer]
+        lats = [point[1] for point in outer]
+        bbox = (min(lons), min(lats), max(lons), max(lats))
+        index = len(self.polygons)
+        self.polygons.append((bbox, rings, properties))
+        for i in range(math.floor(bbox[1] / self.cell_deg), math.floor(bbox[3] / self.cell_deg) + 1):
+            for j in range(math.floor(bbox[0] / self.cell_deg), math.floor(bbox[2] / self.cell_deg) + 1):
+                self.cells.setdefault((i, j), []).append(index)
+
+    @staticmethod
+    def _in_ring(lon, lat, ring):
+        inside = False
+        j = len(ring) - 1
+        for i in range(len(ring)):
+            xi, yi = ring[i][0], ring[i][1]
+            xj, yj = ring[j][0], ring[j][1]
+            if (yi > lat) != (yj > lat) and lon < (xj - xi) * (lat - yi) / (yj - yi) + xi:
+                inside = not inside
+            j = i
+        return inside
+
+    def locate(self, lat, lon):
+        """Retourne les propriétés du polygone contenant le point, ou None."""
+        cell = (math.floor(lat / self.cell_deg), math.floor(lon / self.cell_deg))
+        for index in self.cells.get(cell, []):
+            bbox, rings, properties = self.polygons[index]
+            if not (bbox[0] <= lon <= bbox[2] and bbox[1] <= lat <= bbox[3]):
+                continue
+            if self._in_ring(lon, lat, rings[0]) and not any(self._in_ring(lon, lat, hole) for hole in rings[1:]):
+                return properties
+        return None
+
+
+class OfflineGeocoder:
+    """
+    Géocodage inverse hors ligne à partir des données GeoNames
+    (citiesXXX.txt, admin1CodesASCII.txt, countryInfo.txt).
+    Les villes sont indexées dans une grille de cellules de 'cell_deg' degrés :
+    la recherche du plus proche voisin parcourt les cellules en anneaux
+    concentriques et s'arrête dès qu'aucun point plus proche n'est possible.
+    Un fichier GeoJSON de frontières administratives peut compléter l'index
+    pour déterminer pays et région par inclusion plutôt que par proximité.
+    """
+
+    def __init__(self, data_dir, dataset="cities1000", boundaries_file=None,
+                 max_distance_km=50, cell_deg=0.25, logger=None):
+        self.data_dir = data_dir
+        self.dataset = dataset
+        self.max_distance_km = max_distance_km
+        self.cell_deg = cell_deg
+        self.logger = logger
+        self.cities = []  # (lat, lon, nom, code pays, code admin1)
+        self.cells = {}
+        self.countries = {}  # code ISO -> (nom, langues)
+        self.admin1 = {}  # "FR.84" -> nom de région
+        self.boundaries = None
+        self.loaded = False
+        self.boundaries_file = boundaries_file
+
+    # --- Données ---
+
+    def _path(self, name):
+        return os.path.join(self.data_dir, name)
+
+    def has_dataset(self):
+        return all(os.path.exists(self._path(name))
+                   for name in (f"{self.dataset}.txt", "admin1CodesASCII.txt", "countryInfo.txt"))
+
+    def download(self, base_url=GEONAMES_BASE_URL):
+        """Télécharge les fichiers GeoNames nécessaires dans data_dir."""
+        os.makedirs(self.data_dir, exist_ok=True)
+        self._log('info', f"🌍 Téléchargement des données GeoNames ({self.dataset}) depuis {base_url}...")
+        response = requests.get(f"{base_url}/{self.dataset}.zip", timeout=120)
+        response.raise_for_status()
+        with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+            archive.extract(f"{self.dataset}.txt", self.data_dir)
+        for name in ("admin1CodesASCII.txt", "countryInfo.txt"):
+            response = requests.get(f"{base_url}/{name}", timeout=60)
+            response.raise_for_status()
+            with open(self._path(name), 'wb') as f:
+                f.write(response.content)
+        self._log('info', "✅ Données GeoNames téléchargées.")
+
+    def load(self):
+        """Charge les données et construit l'index spatial (une seule fois)."""
+        if self.loaded:
+            return True
+        if not self.has_dataset():
+            return False
+
+        with open(self._path("countryInfo.txt"), 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.startswith('#'):
+                    continue
+                fields = line.rstrip('\n').split('\t')
+                if len(fields) > 15:
+                    self.countries[fields[0]] = (fields[4], fields[15])
+
+        with open(self._path("admin1CodesASCII.txt"), 'r', encoding='utf-8') as f:
+            for line in f:
+                fields = line.rstrip('\n').split('\t')
+                if len(fields) > 1:
+                    self.admin1[fields[0]] = fields[1]
+
+        with open(self._path(f"{self.dataset}.txt"), 'r', encoding='utf-8') as f:
+            for line in f:
+                fields = line.split('\t')
+                if len(fields) < 11:
+                    continue
+                lat, lon = float(fields[4]), float(fields[5])
+                index = len(self.cities)
+                self.cities.append((lat, lon, fields[1], fields[8], fields[10]))
+                self.cells.setdefault(self._cell(lat, lon), []).append(index)
+
+        if self.boundaries_file and os.path.exists(self.boundaries_file):
+            self.boundaries = BoundaryIndex(self.boundaries_file)
+
+        self.loaded = True
+        self._log('info', f"🌍 Géocodeur hors ligne prêt : {len(self.cities)} localités, {len(self.countries)} pays.")
+        return True
+
+    def ensure_loaded(self, auto_download=False):
+        """Charge les données, en les téléchargeant au besoin si auto_download est activé."""
+        if self.loaded:
+            return True
+        if not self.has_dataset() and auto_download:
+            try:
+                self.download()
+            except (requests.RequestException, zipfile.BadZipFile, OSError) as e:
+                self._log('warning', f"⚠️ Impossible de télécharger les données GeoNames : {e}")
+                return False
+        return self.load()
+
+    # --- Recherche ---
+
+    def _cell(self, lat, lon):
+        return (math.floor(lat / self.cell_deg), math.floor(lon / self.cell_deg))
+
+    def nearest_city(self, lat, lon):
+        """Retourne (indice de la localité, distance en km) la plus proche, ou (None, None)."""
+        ci, cj = self._cell(lat, lon)
+        # Largeur minimale d'une cellule autour du point (le côté est-ouest rétrécit avec la latitude)
+        cos_lat = max(math.cos(math.radians(min(abs(lat) + self.cell_deg, 89.9))), 0.01)
+        cell_km = self.cell_deg * KM_PER_DEGREE * cos_lat
+        lon_cells = int(360 / self.cell_deg)
+        best_index, best_distance = None, float('inf')
+        ring = 0
+        while True:
+            for i in range(ci - ring, ci + ring + 1):
+                for j in range(cj - ring, cj + ring + 1):
+                    if ring and ci - ring < i < ci + ring and cj - ring < j < cj + ring:
+                        continue  # Cellule déjà visitée dans un anneau intérieur
+                    # Les longitudes bouclent autour de l'antiméridien
+                    wrapped_j = (j + lon_cells // 2) % lon_cells - lon_cells // 2
+                    for index in self.cells.get((i, wrapped_j), ()):
+                        city = self.cities[index]
+                        distance = haversine_km(lat, lon, city[0], city[1])
+                        if distance < best_distance:
+                            best_index, best_distance = index, distance
+            # Tout point hors des anneaux parcourus est à plus de ring * cell_km
+            if best_distance <= ring * cell_km or ring * cell_km > self.max_distance_km:
+                break
+            ring += 1
+        if best_index is None or best_distance > self.max_distance_km:
+            return None, None
+        return best_index, best_distance
+
+    def reverse(self, lat, lon):
+        """
+        Géocodage inverse d'un point GPS. Retourne un dictionnaire
+        {country, country_code, region, city, distance_km, geolocation_source}
+        ou None si aucune localité connue n'est assez proche.
+        """
+        if not self.loaded:
+            return None
+        index, distance = self.nearest_city(lat, lon)
+        if index is None:
+            return None
+        city_lat, city_lon, city, country_code, admin1_code = self.cities[index]
+        country = self.countries.get(country_code, (country_code, ''))[0]
+        region = self.admin1.get(f"{country_code}.{admin1_code}")
+
+        if self.boundaries:
+            properties = self.boundaries.locate(lat, lon)
+            if properties:
+                country_code = properties.get('iso_a2') or country_code
+                country = properties.get('admin') or self.countries.get(country_code, (country, ''))[0]
+                # Fichier admin-1 (régions) : le nom du polygone est celui de la région
+                if 'adm1_code' in properties:
+                    region = properties.get('name') or region
+
+        # Noms GeoNames / Natural Earth en anglais : nom français, comme pour le géocodage en ligne
+        if country_code in COUNTRIES:
+            country = country_name(country_code, 'fr')
+        return {
+            'country': country,
+            'country_code': country_code,
+            'region': region,
+            'city': city,
+            'distance_km': round(distance, 2),
+            'geolocation_source': 'offline_geonames'
+        }
+
+    def country_languages(self, country_code):
+        """Langues officielles (codes GeoNames, ex: 'fr-BE,nl-BE,de-BE') d'un pays."""
+        return self.countries.get(country_code, ('', ''))[1]
+
+    def _log(self, level, message):
+        if self.logger:
+            getattr(self.logger, level)(message)
+
+
+class SpatialGeoCache:
+    """
+    Cache de géolocalisation avec regroupement spatial.
+    Les résultats sont conservés par coordonnées ("lat,lon" à 4 décimales,
+    format historique de geo_cache.json) et indexés dans une grille : un point
+    non encore résolu reçoit le résultat du point résolu le plus proche situé
+    à moins de 'radius_km' (membres d'un même village, par exemple).
+    """
+
+    def __init__(self, entries=None, radius_km=2.0):
+        self.entries = entries if entries is not None else {}
+        self.radius_km = radius_km
+        self.cell_deg = max(radius_km, 0.01) / KM_PER_DEGREE
+        self.cells = {}
+        self.exact_hits = 0
+        self.near_hits = 0
+        self.misses = 0
+        for key in self.entries:
+            try:
+                lat, lon = (float(value) for value in key.split(','))
+            except ValueError:
+                continue
+            self._index(lat, lon, key)
+
+    @staticmethod
+    def key(lat, lon):
+        return f"{lat:.4f},{lon:.4f}"
+
+    def _cell(self, lat, lon):
+        return (math.floor(lat / self.cell_deg), math.floor(lon / self.cell_deg))
+
+    def _index(self, lat, lon, key):
+        self.cells.setdefault(self._cell(lat, lon), []).append((lat, lon, key))
+
+    def get(self, lat, lon):
+        """Retourne les géodonnées du point résolu le plus proche dans le rayon, ou None."""
+        key = self.key(lat, lon)
+        if key in self.entries:
+            self.exact_hits += 1
+            return self.entries[key]
+
+        ci, cj = self._cell(lat, lon)
+        # Les cellules rétrécissent en longitude avec la latitude
+        lon_rings = math.ceil(1 / max(math.cos(math.radians(abs(lat))), 0.01))
+        best_key, best_distance = None, self.radius_km
+        for i in range(ci - 1, ci + 2):
+            for j in range(cj - lon_rings, cj + lon_rings + 1):
+                for point_lat, point_lon, point_key in self.cells.get((i, j), ()):
+                    distance = haversine_km(lat, lon, point_lat, point_lon)
+                    if distance <= best_distance:
+                        best_key, best_distance = point_key, distance
+        if best_key is None:
+            self.misses += 1
+            return None
+        self.near_hits += 1
+        return self.entries[best_key]
+
+    def put(self, lat, lon, geo_data):
+        key = self.key(lat, lon)
+        if key not in self.entries:
+            self._index(lat, lon, key)
+        self.entries[key] = geo_data
+
+    def hit_rate(self):
+        lookups = self.exact_hits + self.near_hits + self.misses
+        return (self.exact_hits + self.near_hits) / lookups if lookups else 0.0
+
+    def summary(self):
+        return (f"{self.hit_rate():.0%} de réussite ({self.exact_hits} exacts, "
+                f"{self.near_hits} à moins de {self.radius_km} km, {self.misses} à résoudre)")
@@ -0,0 +1,74 @@
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+class IAWorkerPool:
+    """
+    Pool de workers pour les interrogations IA (un thread par requête en vol).
+    Le nombre de requêtes simultanées est borné par 'max_workers', à régler
+    selon la capacité du backend Ollama (OLLAMA_NUM_PARALLEL). Les éléments
+    sont soumis au fil de l'eau (file bornée) et les résultats sont restitués
+    dans l'ordre de soumission, avec un suivi de progression et de débit.
+    """
+
+    def __init__(self, max_workers=2, logger=None, label="IA", progress_interval=10):
+        self.max_workers = max(1, int(max_workers or 1))
+        # Quelques éléments d'avance pour que les workers ne restent jamais inactifs
+        self.max_in_flight = self.max_workers * 2
+        self.logger = logger
+        self.label = label
+        self.progress_interval = progress_interval
+        self.completed = 0
+        self.failed = 0
+        self.elapsed = 0.0
+
+    def imap(self, func, items, total=None):
+        """
+        Applique 'func' à chaque élément dans le pool et génère des tuples
+        (élément, résultat, erreur) dans l'ordre des éléments. Une exception
+        levée par 'func' est retournée dans 'erreur' (le résultat vaut alors None).
+        """
+        if total is None and hasattr(items, '__len__'):
+            total = len(items)
+        items = iter(items)
+        pending = deque()
+        start_time = time.time()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="astrobot-ia") as executor:
+            def submit_next():
+                for item in items:
+                    pending.append((item, executor.submit(func, item)))
+                    return
+
+            for _ in range(self.max_in_flight):
+                submit_next()
+
+            while pending:
+                item, future = pending.popleft()
+                try:
+                    result, error = future.result(), None
+                except Exception as e:
+                    result, error = None, e
+                    self.failed += 1
+                submit_next()
+
+                self.completed += 1
+                self.elapsed = time.time() - start_time
+                if self.completed % self.progress_interval == 0 or not pending:
+                    self._log_progress(total)
+                yield item, result, error
+
+    def throughput(self):
+        """Nombre d'éléments traités par seconde depuis le début."""
+        return self.completed / self.elapsed if self.elapsed > 0 else 0.0
+
+    def _log_progress(self, total):
+        if not self.logger:
+            return
+        rate = self.throughput()
+        progress = f"{self.completed}/{total}" if total else f"{self.completed}"
+        eta = ""
+        if total and rate > 0:
+            eta = f", reste ~{(total - self.completed) / rate:.0f}s"
+        self.logger.info(f"⚡ {self.label} : {progress} traités ({rate:.2f}/s, {self.max_workers} workers{eta})")
@@ -0,0 +1,221 @@
+import contextlib
+import hashlib
+import json
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from .persistence import atomic_write_json, dumps_json, load_json
+
+
+def message_id(channel, message):
+    """Identifiant d'un message : celui du canal, sinon une empreinte (expéditeur, date, contenu)."""
+    if message.get('id'):
+        return str(message['id'])
+    digest = hashlib.sha1(
+        f"{channel}|{message.get('pubkey', '')}|{message.get('date', 0)}|{message.get('content', '')}".encode('utf-8')
+    ).hexdigest()
+    return f"{channel}:{digest}"
+
+
+def parse_jaklis_messages(output):
+    """Messages de 'jaklis read -j' : liste JSON de {id, date, pubkey, title, content}."""
+    messages = json.loads(output or '[]')
+    return [{'id': message.get('id'), 'pubkey': message.get('pubkey', ''), 'date': message.get('date') or 0,
+             'title': message.get('title', ''), 'content': message.get('content', '')}
+            for message in messages if isinstance(message, dict)]
+
+
+def parse_nostr_events(output):
+    """Événements Nostr (un JSON par ligne, ex: 'strfry scan') : réponses publiques (kind 1) et DM (kind 4)."""
+    messages = []
+    for line in (output or '').splitlines():
+        try:
+            event = json.loads(line)
+        except ValueError:
+            continue
+        if not isinstance(event, dict) or 'pubkey' not in event:
+            continue
+        messages.append({'id': event.get('id'), 'pubkey': event['pubkey'], 'date': event.get('created_at') or 0,
+                         'title': '', 'content': event.get('content', ''),
+                         # Contenu d'un DM chiffré (NIP-04) : à déchiffrer avant toute classification
+                         'encrypted': event.get('kind') == 4})
+    return messages
+
+
+class InboxSync:
+    """
+    Relève incrémentale des messageries (Cesium+ via Jaklis, Nostr).
+    Pour chaque canal, la date du dernier message traité et les identifiants
+    reçus à cette date (marque haute) sont conservés dans 'state_file' : seuls
+    les messages plus récents sont retenus, sans doublon, même si la source
+    renvoie toujours ses derniers messages. Ils sont ajoutés à la file
+    'queue_file' (JSONL) en attente de classification, d'où les consommateurs
+    les retirent avec acknowledge().
+
+    'sources' associe à chaque canal une fonction 'since -> messages'
+    (dictionnaires id, pubkey, date, title, content), 'since' étant la marque
+    haute du canal (timestamp Unix), ou la date de début de la première
+    relève ('initial_lookback_days').
+
+    Plusieurs processus peuvent partager ces fichiers (démon 'sync-inbox
+    --loop', 'receive', tâche cron) : la marque haute est relue à chaque
+    relève, et toute lecture-modification-écriture de l'état ou de la file
+    se fait sous un verrou de fichier ('<state_file>.lock', fcntl.flock).
+    """
+
+    def __init__(self, state_file, queue_file, sources, logger=None, initial_lookback_days=30):
+        self.state_file = state_file
+        self.queue_file = queue_file
+        self.sources = sources
+        self.logger = logger
+        self.initial_lookback_days = initial_lookback_days
+        self.lock_file = f"{state_file}.lock"
+        self._lock = threading.RLock()
+        self._lock_depth = 0
+        self._lock_handle = None
+        self.state = load_json(state_file, {}, logger) or {}
+
+    @contextlib.contextmanager
+    def _locked(self):
+        """Verrou exclusif entre threads et entre processus (réentrant dans un même objet)."""
+        with self._lock:
+            if self._lock_depth == 0:
+                os.makedirs(os.path.dirname(os.path.abspath(self.lock_file)), exist_ok=True)
+                self._lock_handle = open(self.lock_file, 'a')
+                if fcntl is not None:
+                    fcntl.flock(self._lock_handle, fcntl.LOCK_EX)
+            self._lock_depth += 1
+            try:
+                yield
+            finally:
+                self._lock_depth -= 1
+                if self._lock_depth == 0:
+                    if fcntl is not None:
+                        fcntl.flock(self._lock_handle, fcntl.LOCK_UN)
+                    self._lock_handle.close()
+                    self._lock_handle = None
+
+    def high_water_mark(self, channel):
+        mark = self.state.get(channel) or {}
+        return mark.get('last_date'), set(mark.get('last_ids', []))
+
+    def sync(self, channels=None):
+        """
+        Relève les canaux (tous par défaut) et met en file les nouveaux
+        messages. Retourne {canal: nombre de nouveaux messages} ; un canal en
+        échec est signalé par None et sa marque haute reste inchangée.
+        """
+        counts = {}
+        for channel in channels or list(self.sources):
+            with self._locked():
+                # Marque haute relue à chaque relève : un autre processus a pu l'avancer
+                self.state = load_json(self.state_file, {}, self.logger) or {}
+                last_date, last_ids = self.high_water_mark(channel)
+                since = last_date if last_date is not None else time.time() - self.initial_lookback_days * 86400
+                try:
+                    fetched = self.sources[channel](since)
+                except Exception as e:
+                    self._log('error', f"❌ Relève de la messagerie {channel} impossible : {e}")
+                    counts[channel] = None
+                    continue
+
+                queued_ids = {entry['message_id'] for entry in self.pending()}
+                new_messages = []
+                for message in sorted(fetched, key=lambda item: item.get('date') or 0):
+                    identifier = message_id(channel, message)
+                    date = message.get('date') or 0
+                    if last_date is not None and (date < last_date or (date == last_date and identifier in last_ids)):
+                        continue
+                    if last_date is None and date < since:
+                        continue
+                    if identifier in queued_ids:
+                        continue
+                    queued_ids.add(identifier)
+                    new_messages.append(dict(message, channel=channel, message_id=identifier,
+                                             received_at=time.time()))
+                    if last_date is None or date > last_date:
+                        last_date, last_ids = date, set()
+                    last_ids.add(identifier)
+
+                if new_messages:
+                    self._append(new_messages)
+                    self.state[channel] = {'last_date': last_date, 'last_ids': sorted(last_ids),
+                                           'last_sync': time.time()}
+                else:
+                    self.state.setdefault(channel, {'last_date': last_date, 'last_ids': sorted(last_ids)})
+                    self.state[channel]['last_sync'] = time.time()
+                atomic_write_json(self.state_file, self.state, indent=2)
+                counts[channel] = len(new_messages)
+                self._log('info', f"📥 Messagerie {channel} : {len(new_messages)} nouveau(x) message(s) "
+                                  f"sur {len(fetched)} relevé(s).")
+        return counts
+
+    def _append(self, messages):
+        with self._locked():
+            os.makedirs(os.path.dirname(self.queue_file) or '.', exist_ok=True)
+            with open(self.queue_file, 'ab') as f:
+                for message in messages:
+                    f.write(dumps_json(message) + b'\n')
+                f.flush()
+
+    def pending(self):
+        """Messages en attente de classification, du plus ancien au plus récent."""
+        with self._locked():
+            if not os.path.exists(self.queue_file):
+                return []
+            entries = []
+            with open(self.queue_file, 'rb') as f:
+                for line in f:
+                    try:
+                        entries.append(json.loads(line))
+                    except ValueError:
+                        # Ligne tronquée par un arrêt brutal pendant l'écriture
+                        self._log('warning', f"⚠️ Ligne illisible ignorée dans '{self.queue_file}'.")
+            return entries
+
+    def acknowledge(self, message_ids):
+        """Retire de la file les messages traités. Retourne le nombre de messages restants."""
+        message_ids = set(message_ids)
+        with self._locked():
+            remaining = [entry for entry in self.pending() if entry.get('message_id') not in message_ids]
+            tmp_file = f"{self.queue_file}.tmp"
+            with open(tmp_file, 'wb') as f:
+                for entry in remaining:
+                    f.write(dumps_json(entry) + b'\n')
+            os.replace(tmp_file, self.queue_file)
+            return len(remaining)
+
+    def run_forever(self, interval=300, iterations=None, stop_event=None):
+        """
+        Boucle de relève (mode démon) : une relève toutes les 'interval'
+        secondes, 'iterations' fois (indéfiniment par défaut) ou jusqu'à ce
+        que 'stop_event' soit positionné (ou Ctrl-C). Retourne le total de
+        nouveaux messages par canal.
+        """
+        totals = {}
+        done = 0
+        try:
+            while True:
+                for channel, count in self.sync().items():
+                    totals[channel] = totals.get(channel, 0) + (count or 0)
+                done += 1
+                if iterations is not None and done >= iterations:
+                    return totals
+                if stop_event is not None:
+                    if stop_event.wait(interval):
+                        return totals
+                else:
+                    time.sleep(interval)
+        except KeyboardInterrupt:
+            self._log('info', "⏹️ Relève des messageries interrompue.")
+            return totals
+
+    def _log(self, level, message):
+        if self.logger:
+            getattr(self.logger, level)(message)
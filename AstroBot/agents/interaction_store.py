@@ -0,0 +1,423 @@
+import os
+import re
+import shutil
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+from .persistence import load_json
+
+
+class InteractionStore:
+    """
+    Mémoire des interactions de l'Opérateur dans une base SQLite unique.
+    Chaque message envoyé (et la réponse éventuelle) est une ligne indexée
+    par (pubkey, slot) : un envoi est une simple insertion, l'historique d'un
+    profil une lecture indexée, et les statistiques d'un slot une requête
+    d'agrégation, sans ouvrir un fichier par profil. Seules les
+    'max_history' dernières interactions d'un profil dans un slot sont
+    conservées, comme avec les anciens fichiers operator_memory/slot_N/<pubkey>.json,
+    que migrate_slot_directories() importe.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS interactions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            slot INTEGER NOT NULL,
+            pubkey TEXT NOT NULL,
+            uid TEXT,
+            message_sent TEXT,
+            response_received TEXT,
+            channel TEXT,
+            timestamp TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_interactions_pubkey ON interactions (pubkey, slot, id);
+        CREATE INDEX IF NOT EXISTS idx_interactions_slot ON interactions (slot, pubkey);
+        CREATE INDEX IF NOT EXISTS idx_interactions_responses ON interactions (slot, pubkey)
+            WHERE response_received IS NOT NULL AND response_received != '';
+        CREATE TABLE IF NOT EXISTS slot_stats (
+            slot INTEGER PRIMARY KEY,
+            sent INTEGER NOT NULL DEFAULT 0,
+            responses INTEGER NOT NULL DEFAULT 0,
+            profiles INTEGER NOT NULL DEFAULT 0,
+            conversations INTEGER NOT NULL DEFAULT 0,
+            last_interaction TEXT
+        );
+        CREATE TABLE IF NOT EXISTS slot_channel_stats (
+            slot INTEGER NOT NULL,
+            channel TEXT NOT NULL,
+            sent INTEGER NOT NULL DEFAULT 0,
+            responses INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (slot, channel)
+        );
+        CREATE TABLE IF NOT EXISTS recipients (
+            pubkey TEXT NOT NULL,
+            slot INTEGER NOT NULL,
+            uid TEXT,
+            channel TEXT,
+            sent INTEGER NOT NULL DEFAULT 0,
+            last_sent TEXT,
+            PRIMARY KEY (pubkey, slot)
+        );
+        CREATE TABLE IF NOT EXISTS reply_labels (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            pubkey TEXT,
+            slot INTEGER,
+            message TEXT NOT NULL,
+            label TEXT NOT NULL,
+            source TEXT NOT NULL,
+            timestamp TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        );
+    """
+    SLOT_DIR_RE = re.compile(r'^slot_(\d+)$')
+    # Version des agrégats (statistiques par slot, index des destinataires) :
+    # une base plus ancienne les recalcule à l'ouverture
+    STATS_VERSION = '2'
+    COLUMNS = "pubkey, uid, message_sent, response_received, timestamp, slot, channel"
+
+    def __init__(self, db_file, max_history=50, logger=None):
+        self.db_file = db_file
+        self.max_history = max_history
+        self.logger = logger
+        self._lock = threading.RLock()
+        # Index des destinataires en mémoire, rechargé si une autre connexion a écrit dans la base
+        self._recipients = None
+        self._recipients_version = None
+        os.makedirs(os.path.dirname(os.path.abspath(db_file)), exist_ok=True)
+        self._conn = sqlite3.connect(db_file, check_same_thread=False)
+        # Journal WAL : chaque envoi enregistré est un simple ajout, sans réécriture de la base
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._lock, self._conn:
+            self._conn.executescript(self.SCHEMA)
+        if self._get_meta('stats_version') != self.STATS_VERSION:
+            self.rebuild_stats()
+
+    def _get_meta(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    @staticmethod
+    def _now():
+        return datetime.utcnow().isoformat() + 'Z'
+
+    @staticmethod
+    def _as_interaction(row):
+        pubkey, uid, message_sent, response_received, timestamp, slot, channel = row
+        return {
+            'target_pubkey': pubkey,
+            'target_uid': uid,
+            'message_sent': message_sent,
+            'response_received': response_received,
+            'timestamp': timestamp,
+            'slot': slot,
+            'channel': channel
+        }
+
+    def record(self, pubkey, uid, message_sent, response_received=None, slot=0, channel=None, timestamp=None):
+        """Ajoute une interaction (et met à jour les statistiques du slot) et retourne l'enregistrement créé."""
+        slot = int(slot)
+        row = (pubkey, uid, message_sent, response_received, timestamp or self._now(), slot, channel)
+        with self._lock, self._conn:
+            new_profile = self._conn.execute(
+                "SELECT 1 FROM interactions WHERE pubkey = ? AND slot = ? LIMIT 1", (pubkey, slot)
+            ).fetchone() is None
+            new_conversation = bool(response_received) and not self._has_response(pubkey, slot)
+            self._conn.execute(f"INSERT INTO interactions ({self.COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)", row)
+            self._update_stats(slot, channel, row[4], sent=1, responses=int(bool(response_received)),
+                               profiles=int(new_profile), conversations=int(new_conversation))
+            self._conn.execute(
+                "INSERT INTO recipients (pubkey, slot, uid, channel, sent, last_sent) VALUES (?, ?, ?, ?, 1, ?)"
+                " ON CONFLICT(pubkey, slot) DO UPDATE SET uid = COALESCE(excluded.uid, uid),"
+                " channel = COALESCE(excluded.channel, channel), sent = sent + 1,"
+                " last_sent = MAX(COALESCE(last_sent, ''), excluded.last_sent)",
+                (pubkey, slot, uid, channel, row[4])
+            )
+            self._trim(pubkey, slot)
+        with self._lock:
+            if self._recipients is not None:
+                self._index_recipient(self._recipients, pubkey, slot, uid, channel, row[4])
+        return self._as_interaction(row)
+
+    def _has_response(self, pubkey, slot):
+        return self._conn.execute(
+            "SELECT 1 FROM interactions WHERE slot = ? AND pubkey = ?"
+            " AND response_received IS NOT NULL AND response_received != '' LIMIT 1", (slot, pubkey)
+        ).fetchone() is not None
+
+    def _update_stats(self, slot, channel, timestamp, sent=0, responses=0, profiles=0, conversations=0):
+        # Agrégats du slot tenus à jour à l'écriture : les vues de statistiques n'ont rien à recalculer
+        self._conn.execute(
+            "INSERT INTO slot_stats (slot, sent, responses, profiles, conversations, last_interaction)"
+            " VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT(slot) DO UPDATE SET"
+            " sent = sent + excluded.sent, responses = responses + excluded.responses,"
+            " profiles = profiles + excluded.profiles, conversations = conversations + excluded.conversations,"
+            " last_interaction = MAX(COALESCE(last_interaction, ''), COALESCE(excluded.last_interaction, ''))",
+            (slot, sent, responses, profiles, conversations, timestamp)
+        )
+        self._conn.execute(
+            "INSERT INTO slot_channel_stats (slot, channel, sent, responses) VALUES (?, ?, ?, ?)"
+            " ON CONFLICT(slot, channel) DO UPDATE SET"
+            " sent = sent + excluded.sent, responses = responses + excluded.responses",
+            (slot, channel or '', sent, responses)
+        )
+
+    def _trim(self, pubkey, slot):
+        # Garder seulement les 'max_history' dernières interactions du profil dans ce slot
+        self._conn.execute(
+            "DELETE FROM interactions WHERE pubkey = ? AND slot = ? AND id <= ("
+            " SELECT id FROM interactions WHERE pubkey = ? AND slot = ? ORDER BY id DESC LIMIT 1 OFFSET ?)",
+            (pubkey, slot, pubkey, slot, self.max_history)
+        )
+
+    def set_last_response(self, pubkey, slot, response):
+        """Associe une réponse reçue à la dernière interaction du profil dans le slot."""
+        slot = int(slot)
+        with self._lock, self._conn:
+            last = self._conn.execute(
+                "SELECT id, response_received, channel FROM interactions WHERE pubkey = ? AND slot = ?"
+                " ORDER BY id DESC LIMIT 1", (pubkey, slot)
+            ).fetchone()
+            if last is None:
+                return False
+            interaction_id, previous_response, channel = last
+            new_conversation = bool(response) and not self._has_response(pubkey, slot)
+            self._conn.execute("UPDATE interactions SET response_received = ? WHERE id = ?", (response, interaction_id))
+            responses = int(bool(response)) - int(bool(previous_response))
+            self._update_stats(slot, channel, self._now(), responses=responses, conversations=int(new_conversation))
+        return True
+
+    def history(self, pubkey, slot=0):
+        """Interactions d'un profil dans un slot, de la plus ancienne à la plus récente."""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {self.COLUMNS} FROM interactions WHERE pubkey = ? AND slot = ? ORDER BY id",
+                (pubkey, int(slot))
+            ).fetchall()
+        return [self._as_interaction(row) for row in rows]
+
+    def slots_for_pubkey(self, pubkey):
+        """Slots (campagnes) dans lesquels le profil a été contacté."""
+        recipient = self.recipient_index().get(pubkey)
+        return sorted(recipient['slots']) if recipient else []
+
+    def pubkeys(self, slot=None):
+        """Profils contactés (dans un slot, ou dans tous)."""
+        index = self.recipient_index()
+        if slot is None:
+            return list(index)
+        return [pubkey for pubkey, recipient in index.items() if int(slot) in recipient['slots']]
+
+    def recipient_index(self):
+        """
+        Index des destinataires : pubkey -> {'uid', 'slots', 'last_sent',
+        'last_slot', 'channels'}, chargé une fois en mémoire et tenu à jour
+        à chaque envoi. Associer un lot de messages reçus à nos envois se fait
+        alors par simple recherche dans ce dictionnaire.
+        """
+        with self._lock:
+            version = self._data_version()
+            if self._recipients is None or version != self._recipients_version:
+                index = {}
+                rows = self._conn.execute(
+                    "SELECT pubkey, slot, uid, channel, last_sent FROM recipients ORDER BY last_sent"
+                ).fetchall()
+                for pubkey, slot, uid, channel, last_sent in rows:
+                    self._index_recipient(index, pubkey, slot, uid, channel, last_sent)
+                self._recipients, self._recipients_version = index, version
+            return self._recipients
+
+    @staticmethod
+    def _index_recipient(index, pubkey, slot, uid, channel, last_sent):
+        recipient = index.setdefault(pubkey, {'uid': None, 'slots': [], 'last_sent': None,
+                                              'last_slot': None, 'channels': []})
+        if slot not in recipient['slots']:
+            recipient['slots'].append(slot)
+        if channel and channel not in recipient['channels']:
+            recipient['channels'].append(channel)
+        if uid:
+            recipient['uid'] = uid
+        if last_sent and (recipient['last_sent'] is None or last_sent >= recipient['last_sent']):
+            recipient['last_sent'], recipient['last_slot'] = last_sent, slot
+
+    def _data_version(self):
+        # Change quand une autre connexion (ex: tâche cron) a modifié la base
+        return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def record_label(self, message, label, source, pubkey=None, slot=None):
+        """Enregistre la classification d'une réponse reçue et l'étape qui l'a décidée (règles, modèle, ia...)."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO reply_labels (pubkey, slot, message, label, source, timestamp) VALUES (?, ?, ?, ?, ?, ?)",
+                (pubkey, slot, message, label, source, self._now()))
+
+    def labeled_replies(self, sources=None, limit=None):
+        """Réponses classées (message, label, source), les plus récentes en dernier, filtrées par étape."""
+        where, params = "", []
+        if sources:
+            where = f"WHERE source IN ({', '.join('?' * len(sources))})"
+            params = list(sources)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT message, label, source FROM (SELECT id, message, label, source FROM reply_labels {where}"
+                " ORDER BY id DESC LIMIT ?) ORDER BY id", params + [-1 if limit is None else int(limit)]
+            ).fetchall()
+        return rows
+
+    def active_slots(self):
+        """Slots contenant au moins une interaction."""
+        with self._lock:
+            rows = self._conn.execute("SELECT slot FROM slot_stats WHERE sent > 0 ORDER BY slot").fetchall()
+        return [row[0] for row in rows]
+
+    def slot_stats(self, slot=None):
+        """
+        Statistiques tenues à jour à l'écriture, par slot : messages envoyés,
+        réponses, taux de réponse, profils contactés, conversations (profils
+        ayant répondu), dernière activité et détail par canal. Les envois
+        restent comptés même quand l'historique d'un profil est tronqué.
+        """
+        where, params = ("WHERE slot = ?", (int(slot),)) if slot is not None else ("", ())
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT slot, sent, responses, profiles, conversations, last_interaction FROM slot_stats {where}"
+                " ORDER BY slot", params
+            ).fetchall()
+            channel_rows = self._conn.execute(
+                f"SELECT slot, channel, sent, responses FROM slot_channel_stats {where} ORDER BY slot, channel", params
+            ).fetchall()
+        stats = {}
+        for slot_id, sent, responses, profiles, conversations, last_interaction in rows:
+            stats[slot_id] = {
+                'slot': slot_id, 'sent': sent, 'responses': responses,
+                'response_rate': (responses / sent * 100) if sent else 0.0,
+                'profiles': profiles, 'conversations': conversations,
+                'last_interaction': last_interaction or None, 'channels': {}
+            }
+        for slot_id, channel, sent, responses in channel_rows:
+            if slot_id in stats:
+                stats[slot_id]['channels'][channel] = {'sent': sent, 'responses': responses}
+        if slot is not None:
+            return stats.get(int(slot))
+        return stats
+
+    def responders(self, slot, limit=None):
+        """Profils ayant répondu dans un slot (index partiel sur les seules réponses), les plus actifs d'abord."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT pubkey, COUNT(*), MAX(timestamp) FROM interactions"
+                " WHERE slot = ? AND response_received IS NOT NULL AND response_received != ''"
+                " GROUP BY pubkey ORDER BY COUNT(*) DESC, MAX(id) LIMIT ?",
+                (int(slot), -1 if limit is None else int(limit))
+            ).fetchall()
+        return [{'pubkey': pubkey, 'responses': responses, 'last_response': last_response}
+                for pubkey, responses, last_response in rows]
+
+    def rebuild_stats(self):
+        """Recalcule les statistiques des slots et l'index des destinataires à partir des interactions conservées."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM slot_stats")
+            self._conn.execute("DELETE FROM slot_channel_stats")
+            self._conn.execute(
+                "INSERT INTO slot_stats (slot, sent, responses, profiles, conversations, last_interaction)"
+                " SELECT slot, COUNT(*), COUNT(NULLIF(response_received, '')), COUNT(DISTINCT pubkey),"
+                " COUNT(DISTINCT CASE WHEN NULLIF(response_received, '') IS NOT NULL THEN pubkey END), MAX(timestamp)"
+                " FROM interactions GROUP BY slot"
+            )
+            self._conn.execute(
+                "INSERT INTO slot_channel_stats (slot, channel, sent, responses)"
+                " SELECT slot, COALESCE(channel, ''), COUNT(*), COUNT(NULLIF(response_received, ''))"
+                " FROM interactions GROUP BY slot, COALESCE(channel, '')"
+            )
+            self._conn.execute("DELETE FROM recipients")
+            self._conn.execute(
+                "INSERT INTO recipients (pubkey, slot, uid, channel, sent, last_sent)"
+                " SELECT pubkey, slot, MAX(uid), MAX(channel), COUNT(*), MAX(timestamp)"
+                " FROM interactions GROUP BY pubkey, slot"
+            )
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('stats_version', ?)",
+                               (self.STATS_VERSION,))
+            self._recipients = None
+
+    def slot_summary(self, slot):
+        """
+        Statistiques d'un slot calculées par agrégation : nombre d'interactions,
+        de réponses, dernière activité et détail par profil.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT pubkey, MAX(uid), COUNT(*), COUNT(NULLIF(response_received, '')), MAX(timestamp),"
+                " MAX(CASE WHEN NULLIF(response_received, '') IS NOT NULL THEN timestamp END)"
+                " FROM interactions WHERE slot = ? GROUP BY pubkey ORDER BY MAX(id)",
+                (int(slot),)
+            ).fetchall()
+        profiles = [{'pubkey': pubkey, 'uid': uid, 'interactions': interactions, 'responses': responses,
+                     'last_interaction': last_interaction, 'last_response': last_response}
+                    for pubkey, uid, interactions, responses, last_interaction, last_response in rows]
+        return {
+            'slot': int(slot),
+            'interactions': sum(profile['interactions'] for profile in profiles),
+            'responses': sum(profile['responses'] for profile in profiles),
+            'last_interaction': max((profile['last_interaction'] for profile in profiles), default=None),
+            'profiles': profiles
+        }
+
+    def migrate_slot_directories(self, memory_dir):
+        """
+        Importe les anciens fichiers operator_memory/slot_N/<pubkey>.json puis
+        déplace les répertoires importés dans operator_memory/legacy_slots.
+        Retourne le nombre d'interactions importées.
+        """
+        if not os.path.isdir(memory_dir):
+            return 0
+        imported = 0
+        legacy_dir = os.path.join(memory_dir, 'legacy_slots')
+        for name in sorted(os.listdir(memory_dir)):
+            match = self.SLOT_DIR_RE.match(name)
+            slot_dir = os.path.join(memory_dir, name)
+            if not match or not os.path.isdir(slot_dir):
+                continue
+            slot = int(match.group(1))
+            files = sorted(f for f in os.listdir(slot_dir) if f.endswith('.json'))
+            if not files:
+                if not os.listdir(slot_dir):
+                    os.rmdir(slot_dir)  # slot vide créé par l'ancienne initialisation de la mémoire
+                continue
+
+            rows = []
+            for file in files:
+                pubkey = file[:-len('.json')]
+                history = load_json(os.path.join(slot_dir, file), [], self.logger)
+                for interaction in history[-self.max_history:] if isinstance(history, list) else []:
+                    rows.append((interaction.get('target_pubkey') or pubkey, interaction.get('target_uid'),
+                                 interaction.get('message_sent'), interaction.get('response_received'),
+                                 interaction.get('timestamp') or self._now(), slot, interaction.get('channel')))
+            with self._lock, self._conn:
+                self._conn.executemany(
+                    f"INSERT INTO interactions ({self.COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            imported += len(rows)
+
+            os.makedirs(legacy_dir, exist_ok=True)
+            destination = os.path.join(legacy_dir, name)
+            if os.path.exists(destination):
+                destination = f"{destination}.{int(time.time())}"
+            shutil.move(slot_dir, destination)
+            self._log('info', f"📦 Slot {slot} : {len(rows)} interaction(s) de {len(files)} profil(s) importée(s) "
+                              f"(anciens fichiers déplacés dans {destination}).")
+        if imported:
+            self.rebuild_stats()
+        return imported
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _log(self, level, message):
+        if self.logger:
+            getattr(self.logger, level)(message)
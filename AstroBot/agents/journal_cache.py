@@ -0,0 +1,115 @@
+import atexit
+import json
+import os
+import threading
+import time
+
+from .persistence import atomic_write_json, dumps_json, load_json
+
+
+class JournalCache(dict):
+    """
+    Cache clé -> valeur conservé en mémoire, avec écriture différée.
+    Le fichier JSON historique (ex: geo_cache.json) sert d'instantané ; les
+    nouvelles entrées sont ajoutées en O(1) à un journal JSONL voisin
+    ('<fichier>.journal'), vidé lorsque 'flush_size' entrées sont en attente
+    ou après 'flush_interval' secondes, ainsi qu'à la fermeture du programme.
+    Le journal est fusionné dans l'instantané (compaction) au chargement et
+    à la fermeture, quand il dépasse 'compact_ratio' fois la taille du cache.
+    """
+
+    def __init__(self, path, logger=None, flush_interval=30, flush_size=200, compact_ratio=0.5):
+        super().__init__()
+        self.path = path
+        self.journal_path = f"{path}.journal"
+        self.logger = logger
+        self.flush_interval = flush_interval
+        self.flush_size = flush_size
+        self.compact_ratio = compact_ratio
+        self._pending = []
+        self._lock = threading.RLock()
+        self._last_flush = time.time()
+        self.journal_entries = 0
+        self.flushes = 0
+
+        super().update(load_json(path, {}, logger) or {})
+        self._replay_journal()
+        if self.journal_entries:
+            self.compact()
+        atexit.register(self.close)
+
+    def _replay_journal(self):
+        if not os.path.exists(self.journal_path):
+            return
+        with open(self.journal_path, 'rb') as f:
+            for line in f:
+                try:
+                    key, value = json.loads(line)
+                except ValueError:
+                    # Ligne tronquée par un arrêt brutal pendant l'écriture
+                    self._log('warning', f"⚠️ Ligne de journal illisible ignorée dans '{self.journal_path}'.")
+                    continue
+                super().__setitem__(key, value)
+                self.journal_entries += 1
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            super().__setitem__(key, value)
+            self._pending.append((key, value))
+            if len(self._pending) >= self.flush_size:
+                self.flush()
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def clear(self):
+        """Vide le cache et réécrit immédiatement un instantané vide."""
+        with self._lock:
+            super().clear()
+            self.compact()
+
+    def flush_if_due(self):
+        """Vide le journal si le délai 'flush_interval' est écoulé."""
+        if self._pending and time.time() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """Ajoute les entrées en attente à la fin du journal."""
+        with self._lock:
+            if self._pending:
+                lines = b''.join(dumps_json([key, value]) + b'\n' for key, value in self._pending)
+                with open(self.journal_path, 'ab') as f:
+                    f.write(lines)
+                self.journal_entries += len(self._pending)
+                self.flushes += 1
+                self._pending = []
+            self._last_flush = time.time()
+
+    def compact(self):
+        """Réécrit l'instantané complet (écriture atomique) puis vide le journal."""
+        with self._lock:
+            self._pending = []
+            atomic_write_json(self.path, dict(self), fsync=True)
+            if os.path.exists(self.journal_path):
+                os.remove(self.journal_path)
+            self.journal_entries = 0
+            self._last_flush = time.time()
+
+    def close(self):
+        """Vide le journal et le compacte s'il est devenu trop long."""
+        try:
+            self.flush()
+            if self.journal_entries > max(len(self) * self.compact_ratio, self.flush_size):
+                self.compact()
+        except OSError as e:
+            self._log('warning', f"⚠️ Impossible de sauvegarder le cache '{self.path}' : {e}")
+
+    def _log(self, level, message):
+        if self.logger:
+            getattr(self.logger, level)(message)
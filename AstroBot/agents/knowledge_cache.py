@@ -0,0 +1,143 @@
+import os
+import threading
+
+
+class KnowledgeBaseCache:
+    """
+    Accès en lecture partagé à la base de connaissance enrichie.
+    La base est chargée une seule fois puis conservée en mémoire (dans l'état
+    partagé) avec des index par pubkey et par uid. Elle n'est rechargée que si
+    le fichier de la base change (date de modification / taille) ou si le
+    stockage a été modifié depuis ce processus.
+    Les profils retournés sont partagés : ils ne doivent pas être modifiés.
+    """
+
+    def __init__(self, store, logger=None):
+        self.store = store
+        self.logger = logger
+        self._lock = threading.RLock()
+        self._signature = None
+        self._knowledge_base = {}
+        self._uid_index = {}
+        self._order = {}
+        self._indexes = {}
+        self._derived = {}
+        self.reloads = 0
+
+    def _current_signature(self):
+        try:
+            stat = os.stat(self.store.db_file)
+            file_signature = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            file_signature = None
+        return (self.store.generation, file_signature)
+
+    def _refresh(self):
+        signature = self._current_signature()
+        if signature == self._signature:
+            return
+        knowledge_base = self.store.load_all()
+        uid_index = {}
+        for pubkey, info in knowledge_base.items():
+            uid = info.get('uid')
+            # Comme l'ancienne recherche linéaire : le premier profil trouvé l'emporte
+            if uid and uid not in uid_index:
+                uid_index[uid] = pubkey
+        self._knowledge_base = knowledge_base
+        self._uid_index = uid_index
+        self._order = {pubkey: position for position, pubkey in enumerate(knowledge_base)}
+        self._indexes = {}
+        self._derived = {}
+        self._signature = signature
+        self.reloads += 1
+        if self.logger:
+            self.logger.debug(f"📚 Cache de la base de connaissance rechargé ({len(knowledge_base)} profils).")
+
+    def all(self):
+        """Retourne la base complète (dictionnaire indexé par pubkey)."""
+        with self._lock:
+            self._refresh()
+            return self._knowledge_base
+
+    def get(self, pubkey):
+        """Retourne le profil associé à une pubkey, ou None."""
+        if not pubkey:
+            return None
+        with self._lock:
+            self._refresh()
+            return self._knowledge_base.get(pubkey)
+
+    def find(self, pubkey=None, uid=None):
+        """
+        Cherche un profil par pubkey puis, à défaut, par uid.
+        Retourne un tuple (pubkey, profil) ou (None, None).
+        """
+        with self._lock:
+            self._refresh()
+            if pubkey and pubkey in self._knowledge_base:
+                return pubkey, self._knowledge_base[pubkey]
+            key = self._uid_index.get(uid) if uid else None
+            if key:
+                return key, self._knowledge_base[key]
+            return None, None
+
+    def index(self, name):
+        """
+        Index inversé valeur -> ensemble de pubkeys, lu depuis les index
+        persistants du stockage et conservé jusqu'au prochain rechargement.
+        Index disponibles : 'tag', 'web2', 'language', 'country', 'region'
+        (clé "région, pays"), 'source'.
+        """
+        with self._lock:
+            self._refresh()
+            if name not in self._indexes:
+                if name in ('tag', 'web2'):
+                    pairs = self.store.tag_index(name)
+                elif name == 'region':
+                    pairs = [(f"{region}, {country}" if country else region, pubkey)
+                             for region, country, pubkey in self.store.region_index()]
+                else:
+                    pairs = self.store.column_index(name)
+                inverted = {}
+                for value, pubkey in pairs:
+                    inverted.setdefault(value, set()).add(pubkey)
+                self._indexes[name] = inverted
+            return self._indexes[name]
+
+    def lookup(self, name, values):
+        """Union des pubkeys ayant au moins une des valeurs données pour un index."""
+        inverted = self.index(name)
+        pubkeys = set()
+        for value in values:
+            pubkeys |= inverted.get(value, set())
+        return pubkeys
+
+    def counts(self, name, within=None):
+        """
+        Nombre de profils par valeur d'un index, trié par effectif décroissant.
+        Si 'within' est fourni, seuls les profils de cet ensemble sont comptés.
+        """
+        counts = []
+        for value, pubkeys in self.index(name).items():
+            count = len(pubkeys) if within is None else len(pubkeys & within)
+            if count:
+                counts.append((value, count))
+        return sorted(counts, key=lambda x: x[1], reverse=True)
+
+    def records(self, pubkeys):
+        """Retourne les couples (pubkey, profil) demandés, dans l'ordre de la base."""
+        with self._lock:
+            self._refresh()
+            ordered = sorted((pk for pk in pubkeys if pk in self._order), key=self._order.get)
+            return [(pubkey, self._knowledge_base[pubkey]) for pubkey in ordered]
+
+    def derived(self, name, builder):
+        """
+        Mémoïse une valeur calculée sur toute la base (ex: fréquence des thèmes).
+        La valeur est recalculée après chaque rechargement de la base.
+        """
+        with self._lock:
+            self._refresh()
+            if name not in self._derived:
+                self._derived[name] = builder(self._knowledge_base)
+            return self._derived[name]
@@ -0,0 +1,252 @@
+import json
+import os
+import sqlite3
+import threading
+
+
+class KnowledgeStore:
+    """
+    Stockage de la base de connaissance enrichie dans SQLite.
+    Chaque prospect est un enregistrement indexé par pubkey : une sauvegarde
+    ne réécrit que les profils modifiés au lieu de tout le fichier JSON.
+    Quelques colonnes dérivées (langue, pays, drapeaux d'analyse...) permettent
+    de calculer les statistiques sans désérialiser les profils.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS prospects (
+            pubkey TEXT PRIMARY KEY,
+            uid TEXT,
+            source TEXT,
+            language TEXT,
+            country TEXT,
+            region TEXT,
+            has_tags INTEGER NOT NULL DEFAULT 0,
+            has_web2 INTEGER NOT NULL DEFAULT 0,
+            has_gps INTEGER NOT NULL DEFAULT 0,
+            has_linked INTEGER NOT NULL DEFAULT 0,
+            source_script TEXT,
+            discovery_method TEXT,
+            data TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        );
+        CREATE TABLE IF NOT EXISTS prospect_tags (
+            pubkey TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            tag TEXT NOT NULL,
+            PRIMARY KEY (pubkey, kind, tag)
+        );
+        CREATE INDEX IF NOT EXISTS idx_prospect_tags_tag ON prospect_tags (kind, tag);
+        CREATE INDEX IF NOT EXISTS idx_prospects_uid ON prospects (uid);
+        CREATE INDEX IF NOT EXISTS idx_prospects_language ON prospects (language);
+        CREATE INDEX IF NOT EXISTS idx_prospects_country ON prospects (country);
+        CREATE INDEX IF NOT EXISTS idx_prospects_region ON prospects (region, country);
+    """
+
+    # Version des index secondaires : une base plus ancienne est réindexée à l'ouverture
+    INDEX_VERSION = '1'
+
+    def __init__(self, db_file, logger=None):
+        self.db_file = db_file
+        self.logger = logger
+        self._lock = threading.RLock()
+        # Empreinte de la dernière version écrite/lue de chaque profil
+        self._digests = {}
+        # Incrémenté à chaque écriture, pour invalider les caches en mémoire
+        self.generation = 0
+        os.makedirs(os.path.dirname(os.path.abspath(db_file)), exist_ok=True)
+        self._conn = sqlite3.connect(db_file, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.executescript(self.SCHEMA)
+        if self.get_meta('index_version') != self.INDEX_VERSION:
+            self._rebuild_tag_index()
+
+    @staticmethod
+    def _serialize(record):
+        return json.dumps(record, ensure_ascii=False, separators=(',', ':'))
+
+    @staticmethod
+    def _has_gps(record):
+        profile = record.get('profile') or {}
+        geo_point = (profile.get('_source') or {}).get('geoPoint') or {}
+        lat = geo_point.get('lat')
+        lon = geo_point.get('lon')
+        return lat is not None and lon is not None and lat != 0 and lon != 0
+
+    def _row_for(self, pubkey, record, data):
+        metadata = record.get('metadata') or {}
+        import_metadata = record.get('import_metadata') or {}
+        return (
+            pubkey,
+            record.get('uid'),
+            record.get('source'),
+            metadata.get('language'),
+            metadata.get('country'),
+            metadata.get('region'),
+            int('tags' in metadata),
+            int('web2' in metadata),
+            int(self._has_gps(record)),
+            int(bool(record.get('linked_accounts'))),
+            import_metadata.get('source_script'),
+            import_metadata.get('discovery_method'),
+            data,
+        )
+
+    @staticmethod
+    def _tag_rows_for(pubkey, record):
+        """Entrées de l'index inversé des thèmes (kind='tag') et réseaux sociaux (kind='web2')."""
+        metadata = record.get('metadata') or {}
+        rows = set()
+        tags = metadata.get('tags')
+        if isinstance(tags, list) and tags != ['error']:
+            rows.update((pubkey, 'tag', tag) for tag in tags if isinstance(tag, str) and tag)
+        web2 = metadata.get('web2')
+        if isinstance(web2, list):
+            rows.update((pubkey, 'web2', social) for social in web2 if isinstance(social, str) and social)
+        return rows
+
+    def _rebuild_tag_index(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT pubkey, data FROM prospects").fetchall()
+            tag_rows = set()
+            for pubkey, data in rows:
+                tag_rows.update(self._tag_rows_for(pubkey, json.loads(data)))
+            with self._conn:
+                self._conn.execute("DELETE FROM prospect_tags")
+                self._conn.executemany("INSERT INTO prospect_tags (pubkey, kind, tag) VALUES (?, ?, ?)", tag_rows)
+                self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('index_version', ?)", (self.INDEX_VERSION,))
+            self.generation += 1
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM prospects").fetchone()[0]
+
+    def load_all(self):
+        """Charge tous les profils dans un dictionnaire indexé par pubkey (ordre des pubkeys, stable d'un appel à l'autre)."""
+        knowledge_base = {}
+        with self._lock:
+            rows = self._conn.execute("SELECT pubkey, data FROM prospects ORDER BY pubkey").fetchall()
+        for pubkey, data in rows:
+            knowledge_base[pubkey] = json.loads(data)
+            self._digests[pubkey] = hash(data)
+        return knowledge_base
+
+    def get(self, pubkey):
+        """Retourne un profil unique, ou None s'il est inconnu."""
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM prospects WHERE pubkey = ?", (pubkey,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def upsert_many(self, records):
+        """Écrit (insère ou remplace) les profils fournis, sans comparaison."""
+        rows = []
+        tag_rows = set()
+        for pubkey, record in records.items():
+            data = self._serialize(record)
+            rows.append(self._row_for(pubkey, record, data))
+            tag_rows.update(self._tag_rows_for(pubkey, record))
+            self._digests[pubkey] = hash(data)
+        self._write_rows(rows, tag_rows)
+        return len(rows)
+
+    def save(self, knowledge_base):
+        """
+        Sauvegarde la base en n'écrivant que les profils modifiés depuis
+        leur dernier chargement ou écriture. Retourne le nombre de profils écrits.
+        """
+        rows = []
+        tag_rows = set()
+        for pubkey, record in knowledge_base.items():
+            data = self._serialize(record)
+            digest = hash(data)
+            if self._digests.get(pubkey) == digest:
+                continue
+            rows.append(self._row_for(pubkey, record, data))
+            tag_rows.update(self._tag_rows_for(pubkey, record))
+            self._digests[pubkey] = digest
+        self._write_rows(rows, tag_rows)
+        return len(rows)
+
+    def _write_rows(self, rows, tag_rows):
+        if not rows:
+            return
+        with self._lock, self._conn:
+            # Les entrées d'index des profils réécrits sont remplacées dans la même transaction
+            self._conn.executemany("DELETE FROM prospect_tags WHERE pubkey = ?", [(row[0],) for row in rows])
+            self._conn.executemany("INSERT INTO prospect_tags (pubkey, kind, tag) VALUES (?, ?, ?)", tag_rows)
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO prospects (pubkey, uid, source, language, country, region, "
+                "has_tags, has_web2, has_gps, has_linked, source_script, discovery_method, data) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            self.generation += 1
+
+    def import_json(self, json_file):
+        """Importe une base enrichie au format JSON historique (enriched_prospects.json)."""
+        with open(json_file, 'r') as f:
+            knowledge_base = json.load(f)
+        return self.upsert_many(knowledge_base)
+
+    def tag_index(self, kind='tag'):
+        """Retourne les couples (tag, pubkey) de l'index inversé pour un type donné ('tag' ou 'web2')."""
+        with self._lock:
+            return self._conn.execute("SELECT tag, pubkey FROM prospect_tags WHERE kind = ?", (kind,)).fetchall()
+
+    def column_index(self, column):
+        """Retourne les couples (valeur, pubkey) d'une colonne indexée (uid, language, country, region, source)."""
+        if column not in ('uid', 'language', 'country', 'region', 'source'):
+            raise ValueError(f"Colonne non indexée : {column}")
+        with self._lock:
+            return self._conn.execute(
+                f"SELECT {column}, pubkey FROM prospects WHERE {column} IS NOT NULL AND {column} != ''"
+            ).fetchall()
+
+    def region_index(self):
+        """Retourne les triplets (région, pays, pubkey) des profils localisés."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT region, country, pubkey FROM prospects WHERE region IS NOT NULL AND region != ''"
+            ).fetchall()
+
+    def get_meta(self, key, default=None):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, key, value):
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def progress_stats(self):
+        """Calcule l'avancement de l'enrichissement directement en SQL."""
+        with self._lock:
+            total, language, tags, web2, gps, linked = self._conn.execute(
+                "SELECT COUNT(*), COUNT(language), COALESCE(SUM(has_tags), 0), COALESCE(SUM(has_web2), 0), "
+                "COALESCE(SUM(has_gps), 0), COALESCE(SUM(has_linked), 0) FROM prospects"
+            ).fetchone()
+            import_sources = dict(self._conn.execute(
+                "SELECT source_script, COUNT(*) FROM prospects WHERE source_script IS NOT NULL AND source_script != '' "
+                "GROUP BY source_script"
+            ).fetchall())
+            discovery_methods = dict(self._conn.execute(
+                "SELECT discovery_method, COUNT(*) FROM prospects WHERE discovery_method IS NOT NULL AND discovery_method != '' "
+                "GROUP BY discovery_method"
+            ).fetchall())
+        return {
+            "total": total,
+            "language": language,
+            "tags": tags,
+            "web2": web2,
+            "gps_prospects": gps,
+            "linked_accounts": linked,
+            "import_sources": import_sources,
+            "discovery_methods": discovery_methods
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,52 @@
+import re
+
+# Liens configurables : clé de links_config.json et nom utilisé dans le placeholder [Lien vers <nom>]
+LINK_PLACEHOLDERS = (
+    ('opencollective', 'OpenCollective'),
+    ('documentation', 'Documentation'),
+    ('github', 'GitHub'),
+    ('discord', 'Discord'),
+    ('telegram', 'Telegram'),
+    ('website', 'Site Web'),
+    ('blog', 'Blog'),
+    ('forum', 'Forum'),
+    ('wiki', 'Wiki'),
+    ('mastodon', 'Mastodon'),
+    ('nostr', 'Nostr'),
+    ('ipfs', 'IPFS'),
+    ('g1', 'G1'),
+    ('uplanet', 'UPlanet'),
+    ('astroport', 'Astroport'),
+    ('zen', 'Zen'),
+    ('multipass', 'Multipass'),
+)
+
+
+class LinkRenderer:
+    """
+    Remplace les placeholders [Lien vers <nom>] d'un message par les liens
+    configurés, en une seule passe. L'expression régulière (une alternative
+    par nom de lien) et la table de correspondance sont construites une fois
+    à partir de la configuration des liens, puis réutilisées pour tous les
+    messages d'une campagne. Comme auparavant, la ponctuation collée après le
+    placeholder est absorbée (sauf le '[' d'un placeholder accolé, qui est
+    lui aussi remplacé), un placeholder sans lien configuré est supprimé, et
+    les espaces multiples sont réduits à un seul.
+    """
+
+    def __init__(self, links_config):
+        self.links = {name.lower(): links_config.get(key) or '' for key, name in LINK_PLACEHOLDERS}
+        names = sorted((name for _, name in LINK_PLACEHOLDERS), key=len, reverse=True)
+        self.pattern = re.compile(
+            r'\[Lien vers (' + '|'.join(re.escape(name) for name in names) + r')\][^\w\s\[]*',
+            re.IGNORECASE
+        )
+
+    def _replace(self, match):
+        return self.links[match.group(1).lower()]
+
+    def render(self, message):
+        if '[' in message:
+            message = self.pattern.sub(self._replace, message)
+        # Nettoyer les espaces multiples créés par les suppressions
+        return ' '.join(message.split())
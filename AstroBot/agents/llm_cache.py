@@ -0,0 +1,155 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+def prompt_version(template):
+    """Empreinte courte d'un template de prompt, utilisée comme version dans les espaces de cache."""
+    return hashlib.sha256((template or '').encode('utf-8')).hexdigest()[:12]
+
+
+class LLMResponseCache:
+    """
+    Cache persistant (SQLite) des réponses de l'IA.
+    Une réponse est indexée par (modèle, espace, prompt normalisé, options).
+    L'espace a la forme 'type:version' (ex: 'thematic:3f2a9c01be44') : lors
+    du premier accès à un type, les réponses des autres versions de ce type
+    sont supprimées, si bien qu'une modification de template n'est jamais
+    servie par d'anciennes réponses. Le nombre d'entrées est borné par
+    'max_entries' (éviction des moins récemment utilisées).
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS responses (
+            key TEXT PRIMARY KEY,
+            model TEXT,
+            namespace TEXT,
+            response TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            last_used REAL NOT NULL,
+            hits INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE INDEX IF NOT EXISTS idx_responses_last_used ON responses (last_used);
+        CREATE INDEX IF NOT EXISTS idx_responses_namespace ON responses (namespace);
+    """
+
+    def __init__(self, db_file, max_entries=50000, logger=None):
+        self.db_file = db_file
+        self.max_entries = max_entries
+        self.logger = logger
+        self._lock = threading.RLock()
+        self._current_versions = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(os.path.dirname(os.path.abspath(db_file)), exist_ok=True)
+        self._conn = sqlite3.connect(db_file, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.executescript(self.SCHEMA)
+        self._count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    @staticmethod
+    def make_key(model, namespace, prompt, json_format=False, options=None):
+        # Les différences d'espacement du prompt ne changent pas la réponse attendue
+        normalized = ' '.join(prompt.split())
+        material = json.dumps([model, namespace, normalized, bool(json_format), options or {}],
+                              ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+    def _ensure_current(self, namespace):
+        """Supprime les réponses des anciennes versions du type de prompt de 'namespace'."""
+        kind, sep, version = namespace.partition(':')
+        if not sep or self._current_versions.get(kind) == version:
+            return
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "DELETE FROM responses WHERE namespace LIKE ? AND namespace != ?", (f"{kind}:%", namespace)
+            )
+        self._current_versions[kind] = version
+        if cursor.rowcount > 0:
+            self._count -= cursor.rowcount
+            self._log('info', f"♻️ Cache IA : {cursor.rowcount} réponses de l'ancienne version du prompt '{kind}' supprimées.")
+
+    def get(self, key, namespace):
+        self._ensure_current(namespace)
+        with self._lock:
+            row = self._conn.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            with self._conn:
+                self._conn.execute(
+                    "UPDATE responses SET last_used = ?, hits = hits + 1 WHERE key = ?", (time.time(), key)
+                )
+            self.hits += 1
+            return row[0]
+
+    def put(self, key, namespace, model, response):
+        self._ensure_current(namespace)
+        now = time.time()
+        with self._lock, self._conn:
+            exists = self._conn.execute("SELECT 1 FROM responses WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, namespace, response, created_at, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?)", (key, model, namespace, response, now, now)
+            )
+            if not exists:
+                self._count += 1
+            if self._count > self.max_entries:
+                self._evict()
+
+    def _evict(self):
+        # Libérer 10 % de marge pour ne pas évincer à chaque insertion
+        excess = self._count - int(self.max_entries * 0.9)
+        cursor = self._conn.execute(
+            "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY last_used LIMIT ?)", (excess,)
+        )
+        self._count -= cursor.rowcount
+        self.evictions += cursor.rowcount
+
+    def invalidate(self, namespace=None, model=None):
+        """Supprime les réponses d'un espace ('type' ou 'type:version') et/ou d'un modèle."""
+        clauses, params = [], []
+        if namespace:
+            if ':' in namespace:
+                clauses.append("namespace = ?")
+                params.append(namespace)
+            else:
+                clauses.append("(namespace = ? OR namespace LIKE ?)")
+                params.extend([namespace, f"{namespace}:%"])
+        if model:
+            clauses.append("model = ?")
+            params.append(model)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock, self._conn:
+            removed = self._conn.execute(f"DELETE FROM responses{where}", params).rowcount
+        self._count -= removed
+        return removed
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self):
+        return {
+            'entries': self._count,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': round(self.hit_rate(), 3)
+        }
+
+    def summary(self):
+        return (f"{self.hits} réponses réutilisées, {self.misses} générées "
+                f"({self.hit_rate():.0%} de réussite, {self._count} en cache)")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _log(self, level, message):
+        if self.logger:
+            getattr(self.logger, level)(message)
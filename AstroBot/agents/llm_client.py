@@ -0,0 +1,155 @@
+import json
+import subprocess
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class LLMClientError(Exception):
+    """Erreur de génération IA (API Ollama indisponible et aucun repli possible)."""
+
+
+class OllamaClient:
+    """
+    Client IA partagé par les agents.
+    Interroge directement l'API HTTP d'Ollama (/api/generate) via une session
+    persistante (connexions keep-alive), en streaming, avec délais d'attente
+    et nouvelles tentatives. Si l'API n'est pas joignable, le script historique
+    question.py est utilisé en repli.
+    """
+
+    def __init__(self, base_url, model, question_script=None, timeout=300, max_retries=2,
+                 pool_size=4, keep_alive="10m", logger=None, cache=None):
+        self.base_url = base_url.rstrip('/') if base_url else None
+        self.model = model
+        self.question_script = question_script
+        # (connexion, lecture) : en streaming le délai de lecture s'applique entre deux fragments
+        self.timeout = (5, timeout)
+        self.max_retries = max_retries
+        self.keep_alive = keep_alive
+        self.logger = logger
+        # Cache des réponses (LLMResponseCache), utilisé pour les appels qui indiquent un espace de cache
+        self.cache = cache
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, pool_size))
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self._lock = threading.Lock()
+        # Après un échec de connexion, l'API n'est pas retentée avant ce délai
+        self._http_retry_after = 0
+        self.http_calls = 0
+        self.fallback_calls = 0
+
+    def is_available(self, timeout=3):
+        """Vérifie que l'API Ollama répond."""
+        if not self.base_url:
+            return False
+        try:
+            response = self.session.get(f"{self.base_url}/api/tags", timeout=timeout)
+            return response.status_code == 200
+        except requests.RequestException:
+            return False
+
+    def generate(self, prompt, json_format=False, options=None, on_token=None, cache_namespace=None, refresh=False):
+        """
+        Génère une réponse pour le prompt donné et retourne le texte complet.
+        json_format : force une réponse JSON (mode 'format: json' d'Ollama).
+        on_token : fonction appelée avec chaque fragment reçu en streaming.
+        cache_namespace : espace 'type:version' du cache de réponses (None = pas de cache).
+        refresh : ignore la réponse en cache et la remplace par une nouvelle génération.
+        """
+        cache_key = None
+        if self.cache is not None and cache_namespace:
+            cache_key = self.cache.make_key(self.model, cache_namespace, prompt, json_format, options)
+            if not refresh:
+                answer = self.cache.get(cache_key, cache_namespace)
+                if answer is not None:
+                    if on_token:
+                        on_token(answer)
+                    return answer
+
+        answer = self._generate(prompt, json_format, options, on_token)
+        if cache_key and answer.strip():
+            self.cache.put(cache_key, cache_namespace, self.model, answer)
+        return answer
+
+    def _generate(self, prompt, json_format, options, on_token):
+        if self.base_url and time.time() >= self._http_retry_after:
+            try:
+                answer = self._generate_http(prompt, json_format, options, on_token)
+                self.http_calls += 1
+                return answer
+            except (requests.ConnectionError, requests.Timeout) as e:
+                with self._lock:
+                    self._http_retry_after = time.time() + 60
+                self._log('warning', f"⚠️ API Ollama injoignable ({e}), repli sur question.py.")
+            except (requests.HTTPError, LLMClientError) as e:
+                self._log('warning', f"⚠️ Erreur de l'API Ollama ({e}), repli sur question.py.")
+
+        if not self.question_script:
+            raise LLMClientError("API Ollama indisponible et aucun script question.py configuré.")
+        self.fallback_calls += 1
+        return self._generate_subprocess(prompt, json_format)
+
+    def _generate_http(self, prompt, json_format, options, on_token):
+        payload = {
+            "model": self.model,
+            "prompt": prompt,
+            "stream": True,
+            "keep_alive": self.keep_alive
+        }
+        if json_format:
+            payload["format"] = "json"
+        if options:
+            payload["options"] = options
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                with self.session.post(f"{self.base_url}/api/generate", json=payload,
+                                       stream=True, timeout=self.timeout) as response:
+                    # Les erreurs serveur (5xx) sont retentées, les erreurs client (modèle inconnu...) non
+                    if response.status_code >= 500 and attempt < self.max_retries:
+                        raise requests.ConnectionError(f"HTTP {response.status_code}")
+                    response.raise_for_status()
+                    return self._read_stream(response, on_token)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = 2 ** attempt
+                self._log('debug', f"Nouvelle tentative Ollama dans {delay}s ({e})")
+                time.sleep(delay)
+
+    def _read_stream(self, response, on_token):
+        chunks = []
+        for line in response.iter_lines():
+            if not line:
+                continue
+            data = json.loads(line)
+            if 'error' in data:
+                raise LLMClientError(data['error'])
+            fragment = data.get('response', '')
+            if fragment:
+                chunks.append(fragment)
+                if on_token:
+                    on_token(fragment)
+            if data.get('done'):
+                break
+        return ''.join(chunks)
+
+    def _generate_subprocess(self, prompt, json_format):
+        """Repli historique : un processus question.py par prompt."""
+        command = ['python3', self.question_script, prompt]
+        if json_format:
+            command.append('--json')
+        result = subprocess.run(command, capture_output=True, text=True, check=True)
+        if result.stderr.strip():
+            self._log('debug', f"Erreurs de l'IA (stderr) : {result.stderr.strip()}")
+        if json_format:
+            return json.loads(result.stdout).get('answer', '')
+        return result.stdout
+
+    def _log(self, level, message):
+        if self.logger:
+            getattr(self.logger, level)(message)
@@ -1,8 +1,12 @@
 from .base_agent import Agent
+from .persistence import atomic_write_json
+from .dispatcher import ChannelDispatcher
+from .interaction_store import InteractionStore
+from .inbox_sync import InboxSync, parse_jaklis_messages, parse_nostr_events
+from .reply_classifier import ReplyClassifier, POSITIVE, NEGATIVE, STOP, NEUTRAL
 import json
 import os
 import subprocess
-import time
 import tempfile
 from datetime import datetime
 
@@ -57,8 +61,17 @@ class OperatorAgent(Agent):
             else:
                 print("❌ Choix invalide")
 
-    def _run_send_campaign(self):
-        """Lance l'envoi de la campagne"""
+    SEND_CHANNELS = {'1': 'jaklis', '2': 'mailjet', '3': 'nostr'}
+
+    def _run_send_campaign(self, channel=None, assume_yes=False, dry_run=False):
+        """
+        Lance l'envoi de la campagne.
+        'channel' ('jaklis', 'mailjet', 'nostr' ou le numéro du menu, plusieurs
+        canaux séparés par des virgules étant envoyés en parallèle) évite le
+        choix interactif du canal, 'assume_yes' la validation finale. En mode
+        simulation ('dry_run'), rien n'est envoyé ni enregistré.
+        Retourne le slot de la campagne envoyée, ou None.
+        """
         self.logger.info("🤖 Agent Opérateur : Lancement de la campagne.")
         self.shared_state['status']['OperatorAgent'] = "Envoi en cours."
 
@@ -92,21 +105,28 @@ class OperatorAgent(Agent):
         targets = [item['target'] for item in campaign_data]
         
         # --- 3. Sélection du canal ---
-        print("\n📡 Choisissez le canal d'envoi :")
-        print("1. Jaklis (Message privé Cesium+)")
-        print("2. Mailjet (Email)")
-        print("3. Nostr (DM pour les détenteurs de MULTIPASS)")
-        try:
-            channel_choice = input("> ")
-        except KeyboardInterrupt:
-            self.logger.info("🚫 Envoi annulé.")
-            self.shared_state['status']['OperatorAgent'] = "Annulé par l'utilisateur."
-            return
+        if channel is None:
+            print("\n📡 Choisissez le canal d'envoi :")
+            print("1. Jaklis (Message privé Cesium+)")
+            print("2. Mailjet (Email)")
+            print("3. Nostr (DM pour les détenteurs de MULTIPASS)")
+            print("(plusieurs canaux en parallèle : 1,3)")
+            try:
+                channel = input("> ")
+            except KeyboardInterrupt:
+                self.logger.info("🚫 Envoi annulé.")
+                self.shared_state['status']['OperatorAgent'] = "Annulé par l'utilisateur."
+                return
+        if isinstance(channel, str):
+            channel = channel.split(',')
+        channels = list(dict.fromkeys(self.SEND_CHANNELS.get(str(name).strip(), str(name).strip().lower())
+                                      for name in channel if str(name).strip()))
 
         # --- 4. Validation finale ---
-        channel_name = {
-            '1': 'Jaklis', '2': 'Mailjet', '3': 'Nostr (DM)'
-        }.get(channel_choice, 'Inconnu')
+        if channels and all(name in self.SEND_CHANNEL_NAMES for name in channels):
+            channel_name = " + ".join(self.SEND_CHANNEL_NAMES[name] for name in channels)
+        else:
+            channel_name = 'Inconnu'
         
         # Préparer un exemple de message pour l'aperçu
         example_item = campaign_data[0] if campaign_data else {'target': {"uid": "Exemple"}, 'message': "Message d'exemple.", 'title': 'Titre d\'exemple'}
@@ -117,24 +137,35 @@ class OperatorAgent(Agent):
         print("="*60)
         print(f"📡 Canal : {channel_name}")
         print(f"🎯 Cibles : {len(targets)}")
-        print(f"⏱️  Délai : {self.shared_state['config']['send_delay_seconds']} secondes")
+        if channel_name != 'Inconnu':
+            dispatcher = self._dispatcher(dry_run)
+            for name in channels:
+                settings = dispatcher.settings(name)
+                print(f"⏱️  {self.SEND_CHANNEL_NAMES[name]} : {settings['rate_per_minute'] or '∞'} envois/min, "
+                      f"{settings['max_concurrency']} simultané(s), {settings['max_retries']} nouvelle(s) tentative(s)")
         print("\n--- EXEMPLE DE MESSAGE QUI SERA ENVOYÉ ---")
         print(f"Titre : {example_item['title']}")
         print(f"---")
         print(final_message_preview)
         print("--- FIN DU MESSAGE ---")
 
-        print("\n🚀 Lancer la campagne ? (oui/non) : ", end='', flush=True)
-        try:
-            confirm = input().lower().strip()
-            if confirm not in ['o', 'oui', 'y', 'yes']:
+        if channel_name == 'Inconnu':
+            self.logger.error("Choix de canal invalide.")
+            self.shared_state['status']['OperatorAgent'] = "Échec : Canal invalide."
+            return
+
+        if not assume_yes:
+            print("\n🚀 Lancer la campagne ? (oui/non) : ", end='', flush=True)
+            try:
+                confirm = input().lower().strip()
+                if confirm not in ['o', 'oui', 'y', 'yes']:
+                    self.logger.info("🚫 Envoi annulé.")
+                    self.shared_state['status']['OperatorAgent'] = "Annulé par l'utilisateur."
+                    return
+            except KeyboardInterrupt:
                 self.logger.info("🚫 Envoi annulé.")
                 self.shared_state['status']['OperatorAgent'] = "Annulé par l'utilisateur."
                 return
-        except KeyboardInterrupt:
-            self.logger.info("🚫 Envoi annulé.")
-            self.shared_state['status']['OperatorAgent'] = "Annulé par l'utilisateur."
-            return
 
         # Trouver un slot disponible
         available_slot = self._find_available_slot()
@@ -146,18 +177,13 @@ class OperatorAgent(Agent):
         
         # Sauvegarder les informations de la campagne
         # Utilise le premier message comme aperçu pour la campagne
-        self._save_campaign_info(available_slot, targets, campaign_data[0]['message'] if campaign_data else "")
+        if not dry_run:
+            self._save_campaign_info(available_slot, targets, campaign_data[0]['message'] if campaign_data else "")
         
-        # Démarrer la campagne pour de bon
-        if channel_choice == '1':
-            self.send_with_jaklis(campaign_data, available_slot)
-        elif channel_choice == '2':
-            self.send_with_mailjet(campaign_data, available_slot)
-        elif channel_choice == '3':
-            self.send_with_nostr(campaign_data, available_slot)
-        else:
-            self.logger.error("Choix de canal invalide.")
-            self.shared_state['status']['OperatorAgent'] = "Échec : Canal invalide."
+        # Démarrer la campagne pour de bon (les canaux choisis sont envoyés en parallèle)
+        if self.send_campaign(campaign_data, channels, available_slot, dry_run=dry_run) is None:
+            return None
+        return available_slot
 
     def _run_receive_messages(self):
         """Consulte la messagerie et gère les réponses automatiquement"""
@@ -165,31 +191,7 @@ class OperatorAgent(Agent):
         print("="*50)
         
         try:
-            # Utiliser Jaklis pour récupérer les nouveaux messages
-            captain_email_file = os.path.expanduser("~/.zen/game/players/.current/.player")
-            with open(captain_email_file, 'r') as f:
-                captain_email = f.read().strip()
-            
-            secret_key_path = os.path.expanduser(f"~/.zen/game/nostr/{captain_email}/.secret.dunikey")
-            cesium_node = self.shared_state['config']['cesium_node']
-            jaklis_script = self.shared_state['config']['jaklis_script']
-            
-            print(f"🔍 Consultation de la messagerie Cesium+ pour {captain_email}...")
-            
-            # Récupérer les messages récents
-            command = [
-                'python3', jaklis_script,
-                '-k', secret_key_path,
-                '-n', cesium_node,
-                'read',
-                '-j'
-            ]
-            
-            result = subprocess.run(command, capture_output=True, text=True, check=True)
-            messages_output = result.stdout
-            
-            # Analyser les messages pour identifier les réponses
-            new_responses = self._parse_messages_for_responses(messages_output)
+            new_responses = self.fetch_new_responses()
             
             if not new_responses:
                 print("✅ Aucune nouvelle réponse détectée.")
@@ -200,7 +202,10 @@ class OperatorAgent(Agent):
             for i, response in enumerate(new_responses, 1):
                 print(f"\n--- Réponse {i}/{len(new_responses)} ---")
                 print(f"De : {response['sender_uid']} ({response['sender_pubkey'][:10]}...)")
-                print(f"Message : {response['content'][:100]}...")
+                if response.get('encrypted'):
+                    print("Message : (DM Nostr chiffré, à lire dans un client Nostr)")
+                else:
+                    print(f"Message : {response['content'][:100]}...")
                 
                 # Proposer de traiter automatiquement
                 print("\nOptions :")
@@ -219,66 +224,145 @@ class OperatorAgent(Agent):
                         
                 except KeyboardInterrupt:
                     print("\n⏭️ Réponse ignorée.")
-                    continue
+                
+                # Réponse traitée (ou ignorée) : retirée de la file d'attente
+                self.acknowledge_responses([response])
             
         except Exception as e:
             self.logger.error(f"❌ Erreur lors de la consultation de la messagerie : {e}")
             print(f"❌ Erreur : {e}")
 
+    def fetch_new_responses(self, sync=True):
+        """
+        Relève les messageries (seulement les messages postérieurs à la
+        dernière relève, voir InboxSync) puis retourne les réponses en attente
+        des profils contactés, sans interaction. Les messages qui ne répondent
+        à aucun envoi sont retirés de la file ; les réponses y restent jusqu'à
+        acknowledge_responses().
+        """
+        inbox = self._inbox_sync()
+        if sync:
+            inbox.sync()
+        pending = inbox.pending()
+        responses = self._match_responses(pending)
+        matched = {response['message_id'] for response in responses}
+        unrelated = [entry['message_id'] for entry in pending if entry['message_id'] not in matched]
+        if unrelated:
+            inbox.acknowledge(unrelated)
+        return responses
+
+    def acknowledge_responses(self, responses):
+        """Retire des réponses traitées de la file d'attente de la messagerie."""
+        message_ids = [response['message_id'] for response in responses if response.get('message_id')]
+        if message_ids:
+            self._inbox_sync().acknowledge(message_ids)
+
+    def _inbox_sync(self):
+        """Relève incrémentale des messageries (Cesium+ via Jaklis, Nostr), partagée via l'état partagé."""
+        inbox = self.shared_state.get('inbox_sync')
+        if inbox is None:
+            config = self.shared_state['config']
+            memory_dir = self.setup_memory_system()
+            fetchers = {'jaklis': self._fetch_jaklis_inbox, 'nostr': self._fetch_nostr_inbox}
+            sources = {channel: fetchers[channel] for channel in config.get('inbox_channels', ['jaklis'])
+                       if channel in fetchers}
+            inbox = InboxSync(config.get('inbox_state_file') or os.path.join(memory_dir, 'inbox_state.json'),
+                              config.get('inbox_queue_file') or os.path.join(memory_dir, 'inbox_queue.jsonl'),
+                              sources, self.logger, config.get('inbox_initial_lookback_days', 30))
+            self.shared_state['inbox_sync'] = inbox
+        return inbox
+
+    def _fetch_jaklis_inbox(self, since):
+        """
+        Derniers messages de la messagerie Cesium+ du capitaine ('jaklis read -j').
+        Jaklis ne filtre pas par date : les 'inbox_fetch_limit' derniers
+        messages sont relevés et InboxSync ne garde que ceux postérieurs à 'since'.
+        """
+        secret_key_path = self._captain_secret_file('.secret.dunikey')
+        if not secret_key_path:
+            raise RuntimeError("clé secrète du capitaine introuvable")
+        config = self.shared_state['config']
+        self.logger.info("🔍 Consultation de la messagerie Cesium+...")
+        command = [
+            'python3', config['jaklis_script'],
+            '-k', secret_key_path,
+            '-n', config['cesium_node'],
+            'read',
+            '-n', str(config.get('inbox_fetch_limit', 100)),
+            '-j'
+        ]
+        result = subprocess.run(command, capture_output=True, text=True, check=True,
+                                timeout=config.get('inbox_fetch_timeout_seconds', 120))
+        return parse_jaklis_messages(result.stdout)
+
+    def _fetch_nostr_inbox(self, since):
+        """
+        Messages Nostr adressés au capitaine (mentions et DM) depuis 'since',
+        lus dans le relai strfry local : le filtre 'since' est appliqué par le relai.
+        """
+        config = self.shared_state['config']
+        strfry_dir = config.get('strfry_dir') or os.path.expanduser("~/.zen/strfry")
+        if not os.access(os.path.join(strfry_dir, 'strfry'), os.X_OK):
+            self.logger.debug(f"Relai strfry absent ({strfry_dir}) : messagerie Nostr non relevée.")
+            return []
+        secret_file_path = self._captain_secret_file('.secret.nostr')
+        captain_hex = self._parse_nostr_secret(secret_file_path).get('HEX') if secret_file_path else None
+        if not captain_hex:
+            raise RuntimeError("clé Nostr (HEX) du capitaine introuvable")
+        nostr_filter = {'kinds': [1, 4], '#p': [captain_hex], 'since': int(since),
+                        'limit': config.get('inbox_fetch_limit', 100)}
+        result = subprocess.run(['./strfry', 'scan', json.dumps(nostr_filter)], cwd=strfry_dir,
+                                capture_output=True, text=True, check=True,
+                                timeout=config.get('inbox_fetch_timeout_seconds', 120))
+        return parse_nostr_events(result.stdout)
+
     def _parse_messages_for_responses(self, messages_output):
         """Parse la sortie JSON de Jaklis pour identifier les réponses"""
+        try:
+            return self._match_responses(parse_jaklis_messages(messages_output))
+        except json.JSONDecodeError as e:
+            self.logger.error(f"Erreur de parsing JSON : {e}")
+            return []
+
+    def _match_responses(self, messages):
+        """Identifie, parmi des messages reçus, les réponses des profils contactés (plus récentes en premier)."""
         responses = []
         
         try:
-            # Parser le JSON de Jaklis
-            messages = json.loads(messages_output)
-            
-            # Charger l'historique des interactions pour identifier les réponses
-            memory_dir = self.setup_memory_system()
-            sent_messages = set()
-            
-            # Récupérer tous les pubkeys à qui on a envoyé des messages
-            for slot in range(12):
-                slot_dir = os.path.join(memory_dir, f'slot_{slot}')
-                if os.path.exists(slot_dir):
-                    files = [f.replace('.json', '') for f in os.listdir(slot_dir) if f.endswith('.json')]
-                    sent_messages.update(files)
+            # Index des destinataires (pubkey -> slots, uid, dernier envoi) : une recherche par message
+            recipients = self._interaction_store().recipient_index()
+            campaigns_info = self._load_campaigns_info()
             
             # Analyser chaque message
             for message in messages:
                 if isinstance(message, dict):
                     sender_pubkey = message.get('pubkey', '')
-                    content = message.get('content', '')
-                    title = message.get('title', '')
                     date = message.get('date', 0)
                     
                     # Vérifier si c'est une réponse à nos messages
-                    if sender_pubkey in sent_messages:
-                        # C'est une réponse potentielle
+                    recipient = recipients.get(sender_pubkey)
+                    if recipient:
+                        # C'est une réponse potentielle, rattachée à la dernière campagne envoyée à ce profil
+                        slot = recipient['last_slot']
                         responses.append({
                             'sender_pubkey': sender_pubkey,
-                            'sender_uid': self._get_uid_from_pubkey(sender_pubkey),
-                            'content': content,
-                            'title': title,
+                            'sender_uid': recipient['uid'] or self._get_uid_from_pubkey(sender_pubkey),
+                            'content': message.get('content', ''),
+                            'title': message.get('title', ''),
                             'timestamp': self._format_timestamp(date),
-                            'date_unix': date
+                            'date_unix': date,
+                            'slot': slot,
+                            'campaign': campaigns_info.get(str(slot), {}).get('name', f'Campagne {slot}'),
+                            'last_sent': recipient['last_sent'],
+                            'channel': message.get('channel', 'jaklis'),
+                            'message_id': message.get('message_id'),
+                            'encrypted': message.get('encrypted', False)
                         })
             
             # Trier par date (plus récent en premier)
             responses.sort(key=lambda x: x['date_unix'], reverse=True)
+            return responses
             
-            # Filtrer pour ne garder que les réponses récentes (dernières 24h)
-            current_time = time.time()
-            recent_responses = [
-                r for r in responses 
-                if (current_time - r['date_unix']) < 86400  # 24h en secondes
-            ]
-            
-            return recent_responses
-            
-        except json.JSONDecodeError as e:
-            self.logger.error(f"Erreur de parsing JSON : {e}")
-            return []
         except Exception as e:
             self.logger.error(f"Erreur lors du parsing des messages : {e}")
             return []
@@ -286,15 +370,11 @@ class OperatorAgent(Agent):
     def _get_uid_from_pubkey(self, pubkey):
         """Récupère l'UID depuis la base de connaissance"""
         try:
-            kb_file = self.shared_state['config']['enriched_prospects_file']
-            if os.path.exists(kb_file):
-                with open(kb_file, 'r') as f:
-                    knowledge_base = json.load(f)
-                
-                if pubkey in knowledge_base:
-                    profile = knowledge_base[pubkey].get('profile', {})
-                    if profile and '_source' in profile:
-                        return profile['_source'].get('uid', 'Unknown')
+            profile_data = self._knowledge_cache().get(pubkey)
+            if profile_data:
+                profile = profile_data.get('profile', {})
+                if profile and '_source' in profile:
+                    return profile['_source'].get('uid', 'Unknown')
         except Exception as e:
             self.logger.debug(f"Erreur lors de la récupération de l'UID : {e}")
         
@@ -313,8 +393,14 @@ class OperatorAgent(Agent):
         try:
             print(f"🤖 Traitement automatique de la réponse de {response['sender_uid']}...")
             
+            if response.get('encrypted'):
+                print("⚠️ DM Nostr chiffré : traitement manuel recommandé.")
+                return
+            
             # Trouver le slot correspondant à cette interaction
-            target_slot = self._find_slot_for_pubkey(response['sender_pubkey'])
+            target_slot = response.get('slot')
+            if target_slot is None:
+                target_slot = self._find_slot_for_pubkey(response['sender_pubkey'])
             
             if target_slot is None:
                 print("⚠️ Aucun historique d'interaction trouvé. Traitement manuel recommandé.")
@@ -329,17 +415,7 @@ class OperatorAgent(Agent):
                 print("⚠️ Aucun historique d'interaction trouvé dans ce slot.")
                 return
             
-            # Enregistrer la réponse reçue
-            last_interaction = history[-1]
-            self.record_interaction(
-                response['sender_pubkey'],
-                response['sender_uid'],
-                last_interaction['message_sent'],
-                response['content'],
-                target_slot
-            )
-            
-            # Traiter la réponse
+            # Traiter la réponse (elle est associée au dernier envoi, sans compter comme un nouvel envoi)
             auto_response = self.process_incoming_response(
                 response['sender_pubkey'],
                 response['sender_uid'],
@@ -352,23 +428,28 @@ class OperatorAgent(Agent):
                 print(f"📝 Réponse : {auto_response[:100]}...")
             else:
                 print("⚠️ Réponse nécessite une intervention manuelle.")
+            return auto_response
                 
         except Exception as e:
             self.logger.error(f"❌ Erreur lors du traitement automatique : {e}")
             print(f"❌ Erreur : {e}")
 
     def _find_slot_for_pubkey(self, pubkey):
-        """Trouve le slot correspondant à un pubkey"""
-        memory_dir = self.setup_memory_system()
-        
-        for slot in range(12):
-            slot_dir = os.path.join(memory_dir, f'slot_{slot}')
-            if os.path.exists(slot_dir):
-                slot_file = os.path.join(slot_dir, f'{pubkey}.json')
-                if os.path.exists(slot_file):
-                    return slot
-        
-        return None
+        """Trouve le slot correspondant à un pubkey (celui du dernier message qui lui a été envoyé)"""
+        recipient = self._interaction_store().recipient_index().get(pubkey)
+        return recipient['last_slot'] if recipient else None
+
+    def _load_campaigns_info(self):
+        """Informations des campagnes par slot (operator_memory/campaigns.json)"""
+        campaigns_file = os.path.join(self.setup_memory_system(), 'campaigns.json')
+        try:
+            with open(campaigns_file, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            self.logger.error(f"Erreur lors du chargement des campagnes : {e}")
+            return {}
 
     def _process_response_manually(self, response):
         """Traite manuellement une réponse reçue"""
@@ -424,72 +505,42 @@ class OperatorAgent(Agent):
             total_interactions = 0
             total_responses = 0
             
-            for slot in range(12):  # Slots 0-11
-                slot_dir = os.path.join(memory_dir, f'slot_{slot}')
-                if os.path.exists(slot_dir):
-                    slot_files = [f for f in os.listdir(slot_dir) if f.endswith('.json')]
-                    
-                    if slot_files:  # Slot actif
-                        active_campaigns += 1
-                        slot_interactions = 0
-                        slot_responses = 0
-                        slot_conversations = 0
-                        
-                        # Récupérer le nom de la campagne
-                        campaign_name = campaigns_info.get(str(slot), {}).get('name', f'Campagne {slot}')
-                        campaign_date = campaigns_info.get(str(slot), {}).get('date', 'Date inconnue')
-                        campaign_targets = campaigns_info.get(str(slot), {}).get('targets', 0)
-                        
-                        print(f"\n🎯 SLOT {slot}: {campaign_name}")
-                        print(f"   📅 Date: {campaign_date}")
-                        print(f"   🎯 Cibles initiales: {campaign_targets}")
-                        
-                        # Analyser chaque profil
-                        profiles_with_responses = []
-                        
-                        for file in slot_files:
-                            try:
-                                profile_pubkey = file.replace('.json', '')
-                                with open(os.path.join(slot_dir, file), 'r') as f:
-                                    history = json.load(f)
-                                
-                                profile_interactions = len(history)
-                                profile_responses = sum(1 for interaction in history if interaction.get('response_received'))
-                                
-                                slot_interactions += profile_interactions
-                                slot_responses += profile_responses
-                                
-                                if profile_responses > 0:
-                                    slot_conversations += 1
-                                    profiles_with_responses.append({
-                                        'pubkey': profile_pubkey,
-                                        'interactions': profile_interactions,
-                                        'responses': profile_responses
-                                    })
-                                    
-                            except Exception as e:
-                                self.logger.error(f"Erreur lecture {file} : {e}")
-                        
-                        # Afficher les statistiques du slot
-                        if slot_interactions > 0:
-                            slot_response_rate = (slot_responses / slot_interactions) * 100
-                            print(f"   📊 Interactions: {slot_interactions}")
-                            print(f"   💬 Réponses: {slot_responses}")
-                            print(f"   📈 Taux de réponse: {slot_response_rate:.1f}%")
-                            print(f"   👥 Conversations actives: {slot_conversations}")
-                            
-                            total_interactions += slot_interactions
-                            total_responses += slot_responses
-                            
-                            # Afficher les profils avec réponses
-                            if profiles_with_responses:
-                                print(f"   📋 Profils ayant répondu:")
-                                for profile in profiles_with_responses[:5]:  # Limiter à 5
-                                    print(f"      • {profile['pubkey'][:10]}... ({profile['responses']} réponses)")
-                                if len(profiles_with_responses) > 5:
-                                    print(f"      • ... et {len(profiles_with_responses) - 5} autres")
-                        else:
-                            print(f"   ⚠️ Aucune interaction enregistrée")
+            # Statistiques tenues à jour à chaque envoi et réponse : rien à relire
+            store = self._interaction_store()
+            for slot, stats in store.slot_stats().items():
+                if not stats['sent']:
+                    continue
+                active_campaigns += 1
+                slot_interactions = stats['sent']
+                slot_responses = stats['responses']
+                
+                # Récupérer le nom de la campagne
+                campaign_name = campaigns_info.get(str(slot), {}).get('name', f'Campagne {slot}')
+                campaign_date = campaigns_info.get(str(slot), {}).get('date', 'Date inconnue')
+                campaign_targets = campaigns_info.get(str(slot), {}).get('targets', 0)
+                
+                print(f"\n🎯 SLOT {slot}: {campaign_name}")
+                print(f"   📅 Date: {campaign_date}")
+                print(f"   🎯 Cibles initiales: {campaign_targets}")
+                
+                # Afficher les statistiques du slot
+                slot_conversations = stats['conversations']
+                print(f"   📊 Interactions: {slot_interactions}")
+                print(f"   💬 Réponses: {slot_responses}")
+                print(f"   📈 Taux de réponse: {stats['response_rate']:.1f}%")
+                print(f"   👥 Conversations actives: {slot_conversations}")
+                print(f"   📡 Canaux: {self._format_channel_stats(stats['channels'])}")
+                
+                total_interactions += slot_interactions
+                total_responses += slot_responses
+                
+                # Afficher les profils avec réponses
+                if slot_conversations:
+                    print(f"   📋 Profils ayant répondu:")
+                    for profile in store.responders(slot, limit=5):  # Limiter à 5
+                        print(f"      • {profile['pubkey'][:10]}... ({profile['responses']} réponses)")
+                    if slot_conversations > 5:
+                        print(f"      • ... et {slot_conversations - 5} autres")
             
             # Résumé global
             print(f"\n" + "="*60)
@@ -584,24 +635,27 @@ class OperatorAgent(Agent):
             }
             
             # Sauvegarder
-            with open(campaigns_file, 'w') as f:
-                json.dump(campaigns_info, f, indent=2, ensure_ascii=False)
+            atomic_write_json(campaigns_file, campaigns_info, indent=2)
             
             self.logger.info(f"✅ Informations de campagne sauvegardées pour le slot {slot}")
             
         except Exception as e:
             self.logger.error(f"❌ Erreur lors de la sauvegarde des infos campagne : {e}")
 
+    @staticmethod
+    def _format_channel_stats(channels):
+        """Résumé des envois et réponses par canal : 'jaklis 120 (8 réponses), nostr 40 (2 réponses)'."""
+        return ", ".join(f"{channel or 'non précisé'} {counts['sent']} ({counts['responses']} réponses)"
+                         for channel, counts in sorted(channels.items())) or "aucun"
+
     def _find_available_slot(self):
         """Trouve un slot disponible pour une nouvelle campagne"""
         try:
-            memory_dir = self.setup_memory_system()
+            active_slots = set(self._interaction_store().active_slots())
             
             for slot in range(12):  # Slots 0-11
-                slot_dir = os.path.join(memory_dir, f'slot_{slot}')
-                
-                # Si le répertoire n'existe pas ou est vide, le slot est disponible
-                if not os.path.exists(slot_dir) or not os.listdir(slot_dir):
+                # Un slot sans interaction enregistrée est disponible
+                if slot not in active_slots:
                     return slot
             
             # Si tous les slots sont utilisés, retourner None
@@ -646,7 +700,6 @@ class OperatorAgent(Agent):
                 return
             
             campaign = campaigns_info[slot]
-            slot_dir = os.path.join(memory_dir, f'slot_{slot}')
             
             print(f"\n🎯 CAMPAGNE : {campaign['name']}")
             print("="*60)
@@ -658,49 +711,26 @@ class OperatorAgent(Agent):
             print(f"\n💬 Message : {campaign['message_preview']}")
             
             # Statistiques détaillées
-            if os.path.exists(slot_dir):
-                slot_files = [f for f in os.listdir(slot_dir) if f.endswith('.json')]
+            store = self._interaction_store()
+            stats = store.slot_stats(int(slot))
+            if stats and stats['sent']:
+                print(f"\n📊 STATISTIQUES DÉTAILLÉES")
+                print("-" * 40)
+                
+                print(f"📊 Total interactions : {stats['sent']}")
+                print(f"💬 Total réponses : {stats['responses']}")
+                print(f"📈 Taux de réponse : {stats['response_rate']:.1f}%")
+                print(f"📡 Canaux : {self._format_channel_stats(stats['channels'])}")
+                if stats['last_interaction']:
+                    print(f"⏰ Dernière activité : {stats['last_interaction']}")
                 
-                if slot_files:
-                    print(f"\n📊 STATISTIQUES DÉTAILLÉES")
+                if stats['conversations']:
+                    print(f"\n👥 CONVERSATIONS ACTIVES ({stats['conversations']})")
                     print("-" * 40)
-                    
-                    total_interactions = 0
-                    total_responses = 0
-                    conversations = []
-                    
-                    for file in slot_files:
-                        profile_pubkey = file.replace('.json', '')
-                        with open(os.path.join(slot_dir, file), 'r') as f:
-                            history = json.load(f)
-                        
-                        interactions = len(history)
-                        responses = sum(1 for interaction in history if interaction.get('response_received'))
-                        
-                        total_interactions += interactions
-                        total_responses += responses
-                        
-                        if responses > 0:
-                            conversations.append({
-                                'pubkey': profile_pubkey,
-                                'interactions': interactions,
-                                'responses': responses,
-                                'last_response': next((interaction.get('timestamp') for interaction in reversed(history) if interaction.get('response_received')), 'N/A')
-                            })
-                    
-                    print(f"📊 Total interactions : {total_interactions}")
-                    print(f"💬 Total réponses : {total_responses}")
-                    if total_interactions > 0:
-                        response_rate = (total_responses / total_interactions) * 100
-                        print(f"📈 Taux de réponse : {response_rate:.1f}%")
-                    
-                    if conversations:
-                        print(f"\n👥 CONVERSATIONS ACTIVES ({len(conversations)})")
-                        print("-" * 40)
-                        for conv in sorted(conversations, key=lambda x: x['responses'], reverse=True):
-                            print(f"   • {conv['pubkey'][:10]}... ({conv['responses']} réponses, dernière: {conv['last_response'][:10]})")
-                else:
-                    print(f"\n⚠️ Aucune interaction enregistrée pour cette campagne.")
+                    for conv in store.responders(int(slot)):
+                        print(f"   • {conv['pubkey'][:10]}... ({conv['responses']} réponses, dernière: {(conv['last_response'] or 'N/A')[:10]})")
+            else:
+                print(f"\n⚠️ Aucune interaction enregistrée pour cette campagne.")
             
         except Exception as e:
             self.logger.error(f"❌ Erreur lors de l'affichage des détails : {e}")
@@ -717,18 +747,10 @@ class OperatorAgent(Agent):
                 return
             
             pubkey = pubkey.strip()
-            memory_dir = self.setup_memory_system()
+            store = self._interaction_store()
             
             # Chercher dans tous les slots
-            found_slots = []
-            for slot in range(12):
-                slot_dir = os.path.join(memory_dir, f'slot_{slot}')
-                profile_file = os.path.join(slot_dir, f'{pubkey}.json')
-                
-                if os.path.exists(profile_file):
-                    with open(profile_file, 'r') as f:
-                        history = json.load(f)
-                    found_slots.append((slot, history))
+            found_slots = [(slot, store.history(pubkey, slot)) for slot in store.slots_for_pubkey(pubkey)]
             
             if not found_slots:
                 print(f"❌ Aucun historique trouvé pour {pubkey[:10]}...")
@@ -780,181 +802,171 @@ class OperatorAgent(Agent):
             self.logger.error(f"Erreur lors de l'exécution de la commande. Sortie d'erreur :\n{e.stderr}", exc_info=True)
             return False
 
+    SEND_CHANNEL_NAMES = {'jaklis': 'Jaklis', 'mailjet': 'Mailjet', 'nostr': 'Nostr (DM)'}
+
+    def _dispatcher(self, dry_run=False):
+        """Dispatcher multicanal configuré par 'send_channels' (débit, simultanéité, nouvelles tentatives)."""
+        config = self.shared_state['config']
+        delay = config.get('send_delay_seconds')
+        defaults = {'backoff_seconds': config.get('send_retry_backoff_seconds', 2)}
+        if delay:
+            # Sans réglage propre au canal, on conserve l'ancien rythme d'un envoi toutes les 'send_delay_seconds'
+            defaults['rate_per_minute'] = 60.0 / delay
+        return ChannelDispatcher(config.get('send_channels'), self.logger,
+                                 dry_run=dry_run or config.get('send_dry_run', False), defaults=defaults)
+
+    def send_campaign(self, campaign_data, channels, slot=0, dry_run=False):
+        """
+        Envoie la campagne sur un ou plusieurs canaux en parallèle, chacun à
+        son propre débit. Retourne les rapports par canal, ou None si aucun
+        canal n'est utilisable.
+        """
+        builders = {'jaklis': self._jaklis_deliveries, 'mailjet': self._mailjet_deliveries,
+                    'nostr': self._nostr_deliveries}
+        # Dernier filet de sécurité, quel que soit le ciblage : aucun envoi aux profils de la blocklist
+        blocklist = self._load_blocklist()
+        blocked = [item for item in campaign_data if item.get('target', {}).get('pubkey') in blocklist]
+        if blocked:
+            self.logger.info(f"🚫 {len(blocked)} cible(s) de la blocklist retirée(s) de la campagne.")
+            campaign_data = [item for item in campaign_data if item not in blocked]
+        deliveries, skipped = {}, {}
+        for channel in channels:
+            prepared = builders[channel](campaign_data)
+            if prepared is not None:
+                deliveries[channel], skipped[channel] = prepared
+        if not deliveries:
+            return None
+
+        def on_success(channel, delivery):
+            if delivery.get('pubkey'):
+                self.record_interaction(delivery['pubkey'], delivery.get('uid', 'N/A'), delivery['message'],
+                                        slot=slot, channel=channel)
+
+        reports = self._dispatcher(dry_run).dispatch(deliveries, on_success=on_success)
+        summaries = []
+        for channel, report in reports.items():
+            report['failure'] += skipped[channel]
+            self.finalize_campaign(channel.capitalize(), report['success'], report['failure'])
+            summaries.append(self.shared_state['status']['OperatorAgent'])
+        self.shared_state['status']['OperatorAgent'] = " | ".join(summaries)
+        return reports
+
     def send_with_jaklis(self, campaign_data, slot=0):
-        jaklis_script = self.shared_state['config']['jaklis_script']
-        cesium_node = self.shared_state['config']['cesium_node']
+        return self.send_campaign(campaign_data, ['jaklis'], slot)
+
+    def send_with_mailjet(self, campaign_data, slot=0):
+        return self.send_campaign(campaign_data, ['mailjet'], slot)
 
-        # Déterminer dynamiquement l'email du capitaine
+    def send_with_nostr(self, campaign_data, slot=0):
+        return self.send_campaign(campaign_data, ['nostr'], slot)
+
+    def _captain_email(self):
+        """E-mail du capitaine (joueur courant d'Astroport), ou None."""
+        captain_email_file = os.path.expanduser("~/.zen/game/players/.current/.player")
         try:
-            captain_email_file = os.path.expanduser("~/.zen/game/players/.current/.player")
             with open(captain_email_file, 'r') as f:
                 captain_email = f.read().strip()
-            if not captain_email: raise FileNotFoundError
-        except (IOError, FileNotFoundError):
-            self.logger.error(f"Impossible de lire l'email du capitaine depuis '{captain_email_file}'.")
-            self.shared_state['status']['OperatorAgent'] = "Échec : Email du capitaine introuvable."
-            return
+            if not captain_email: raise FileNotFoundError("L'e-mail du capitaine est vide.")
+            return captain_email
+        except (IOError, FileNotFoundError) as e:
+            self.logger.error(f"Impossible de lire l'e-mail du capitaine depuis '{captain_email_file}' : {e}")
+            self.shared_state['status']['OperatorAgent'] = "Échec : E-mail du capitaine introuvable."
+            return None
 
-        secret_key_path = os.path.expanduser(f"~/.zen/game/nostr/{captain_email}/.secret.dunikey")
-        if not os.path.exists(secret_key_path):
-            self.logger.error(f"La clé secrète Dunikey n'a pas été trouvée pour {captain_email} à l'emplacement : {secret_key_path}")
+    def _captain_secret_file(self, filename):
+        """Chemin d'un fichier de clé secrète du capitaine, ou None s'il est introuvable."""
+        captain_email = self._captain_email()
+        if not captain_email:
+            return None
+        secret_path = os.path.expanduser(f"~/.zen/game/nostr/{captain_email}/{filename}")
+        if not os.path.exists(secret_path):
+            self.logger.error(f"Le fichier de clé secrète {filename} n'a pas été trouvé pour {captain_email} : {secret_path}")
             self.shared_state['status']['OperatorAgent'] = "Échec : Clé secrète introuvable."
-            return
+            return None
+        return secret_path
 
-        success = 0
-        failures = 0
+    def _has_multipass(self, email):
+        """Vrai si le prospect dispose d'un MULTIPASS (clé Nostr) sur cette station."""
+        multipass_dir = os.path.expanduser(f"~/.zen/game/nostr/{email}")
+        return os.path.isdir(multipass_dir) and os.path.isfile(os.path.join(multipass_dir, 'NPUB'))
+
+    def _jaklis_deliveries(self, campaign_data):
+        """Envois Jaklis (message privé Cesium+) de la campagne : (envois, cibles ignorées), ou None."""
+        jaklis_script = self.shared_state['config']['jaklis_script']
+        cesium_node = self.shared_state['config']['cesium_node']
+        secret_key_path = self._captain_secret_file('.secret.dunikey')
+        if not secret_key_path:
+            return None
 
-        self.logger.info(f"🚀 Démarrage de la campagne via Jaklis (authentifié)...")
-        for i, item in enumerate(campaign_data):
+        deliveries, skipped = [], 0
+        for item in campaign_data:
             target = item['target']
-            message_template = item['message']
-            
             uid = target.get('uid', 'N/A')
             pubkey = target.get('pubkey')
-            title = item.get('title', 'Invitation UPlanet') # Utiliser le titre du message
-
             if not pubkey:
                 self.logger.warning(f"Cible {uid} ignorée (pas de clé publique).")
-                failures += 1
+                skipped += 1
                 continue
-
-            # Utiliser la méthode centralisée pour préparer le message
-            personalized_message = self._prepare_message(message_template, target)
-            
-            self.logger.info(f"--- Envoi Jaklis {i+1}/{len(campaign_data)} à {uid} ---")
-            
-            # On passe le message par un fichier temporaire pour éviter les problèmes avec les caractères spéciaux
-            with tempfile.NamedTemporaryFile(mode='w+', delete=True, suffix=".txt") as tmp_file:
-                tmp_file.write(personalized_message)
-                tmp_file.flush() # S'assurer que tout est écrit sur le disque
-                
-                command = [
-                    'python3', jaklis_script,
-                    '-k', secret_key_path,
-                    '-n', cesium_node,
-                    'send',
-                    '-d', pubkey,
-                    '-t', title,
-                    '-f', tmp_file.name
-                ]
-                
-                if self.execute_command(command):
-                    # Enregistrer l'interaction dans la mémoire
-                    self.record_interaction(pubkey, uid, personalized_message, slot=slot)
-                    success += 1
-                else:
-                    failures += 1
-
-            time.sleep(self.shared_state['config']['send_delay_seconds'])
-        
-        report = f"Campagne via Jaklis terminée. Succès : {success}, Échecs : {failures}."
-        self.logger.info(f"==================================================\n✅ {report}\n==================================================")
-        self.shared_state['status']['OperatorAgent'] = report
-    
-    def send_with_mailjet(self, campaign_data, slot=0):
-        self.logger.info("🚀 Démarrage de la campagne via Mailjet...")
-        self.shared_state['status']['OperatorAgent'] = "Envoi via Mailjet..."
+            # Le message passe par un fichier temporaire pour éviter les problèmes avec les caractères spéciaux
+            deliveries.append({
+                'command': ['python3', jaklis_script, '-k', secret_key_path, '-n', cesium_node, 'send',
+                            '-d', pubkey, '-t', item.get('title', 'Invitation UPlanet'), '-f', ChannelDispatcher.MESSAGE_FILE],
+                'message': self._prepare_message(item['message'], target),
+                'label': uid, 'pubkey': pubkey, 'uid': uid,
+            })
+        return deliveries, skipped
+
+    def _mailjet_deliveries(self, campaign_data):
+        """Envois Mailjet (e-mail) de la campagne : (envois, cibles ignorées)."""
         mailjet_script = self.shared_state['config']['mailjet_script']
-        success, failure = 0, 0
-
-        for i, item in enumerate(campaign_data):
+        deliveries, skipped = [], 0
+        for item in campaign_data:
             target = item['target']
-            message_template = item['message']
-            title = item.get('title', 'Votre invitation pour UPlanet') # Utiliser le titre du message
-
             email = target.get('email')
             if not email:
-                self.logger.warning(f"Cible {target.get('uid', 'N/A')} ignorée (email manquant)."); failure+=1; continue
-
-            personalized_message = self._prepare_message(message_template, target)
-
-            self.logger.info(f"--- Envoi Mailjet {i+1}/{len(campaign_data)} à {email} ---")
-            try:
-                with tempfile.NamedTemporaryFile(mode='w+', delete=False, suffix=".txt", encoding='utf-8') as tmp:
-                    tmp.write(personalized_message)
-                    tmp_path = tmp.name
-
-                command = ['bash', mailjet_script, email, tmp_path, title]
-                self.logger.debug(f"Exécution Mailjet : {' '.join(command)}")
-                self.execute_command(command)
-                success += 1
-
-                os.remove(tmp_path)
-            except Exception as e:
-                self.logger.error(f"Échec de l'envoi à {email}: {e}", exc_info=True); failure+=1
-
-            if i < len(campaign_data) - 1: time.sleep(self.shared_state['config'].get('send_delay_seconds', 2))
-
-        self.finalize_campaign("Mailjet", success, failure)
-
-    def send_with_nostr(self, campaign_data, slot=0):
-        self.logger.info("🚀 Démarrage de la campagne via Nostr (DM)...")
-        self.shared_state['status']['OperatorAgent'] = "Envoi via Nostr (DM)..."
+                self.logger.warning(f"Cible {target.get('uid', 'N/A')} ignorée (email manquant)."); skipped += 1; continue
+            deliveries.append({
+                'command': ['bash', mailjet_script, email, ChannelDispatcher.MESSAGE_FILE,
+                            item.get('title', 'Votre invitation pour UPlanet')],
+                'message': self._prepare_message(item['message'], target),
+                'label': email, 'pubkey': target.get('pubkey'), 'uid': target.get('uid', 'N/A'),
+            })
+        return deliveries, skipped
+
+    def _nostr_deliveries(self, campaign_data):
+        """Envois Nostr (DM aux détenteurs d'un MULTIPASS) de la campagne : (envois, cibles ignorées), ou None."""
         nostr_script = os.path.abspath(self.shared_state['config']['nostr_dm_script'])
-
-        # Obtenir la clé NSEC de l'expéditeur de manière dynamique
-        try:
-            captain_email_file = os.path.expanduser("~/.zen/game/players/.current/.player")
-            with open(captain_email_file, 'r') as f:
-                captain_email = f.read().strip()
-            if not captain_email: raise FileNotFoundError("L'e-mail du capitaine est vide.")
-        except (IOError, FileNotFoundError) as e:
-            self.logger.error(f"Impossible de lire l'e-mail du capitaine : {e}")
-            self.shared_state['status']['OperatorAgent'] = "Échec : E-mail du capitaine introuvable."
-            return
-
-        secret_file_path = os.path.expanduser(f"~/.zen/game/nostr/{captain_email}/.secret.nostr")
-        if not os.path.exists(secret_file_path):
-            self.logger.error(f"Le fichier de clé secrète Nostr n'existe pas : {secret_file_path}")
-            self.shared_state['status']['OperatorAgent'] = "Échec : Fichier de clé secrète Nostr introuvable."
-            return
-
-        nostr_keys = self._parse_nostr_secret(secret_file_path)
-        sender_nsec = nostr_keys.get('NSEC')
-
+        secret_file_path = self._captain_secret_file('.secret.nostr')
+        if not secret_file_path:
+            return None
+        sender_nsec = self._parse_nostr_secret(secret_file_path).get('NSEC')
         if not sender_nsec:
             self.logger.error(f"Impossible d'extraire la clé NSEC depuis {secret_file_path}")
             self.shared_state['status']['OperatorAgent'] = "Échec : Clé NSEC de l'expéditeur introuvable."
-            return
-
-        success, failure = 0, 0
+            return None
 
-        for i, item in enumerate(campaign_data):
+        deliveries, skipped = [], 0
+        for item in campaign_data:
             target = item['target']
-            message_template = item['message']
-            title = item.get('title', 'Invitation UPlanet')
-
+            uid = target.get('uid', 'N/A')
             email = target.get('email')
             if not email:
-                self.logger.warning(f"Cible {target.get('uid', 'N/A')} ignorée (e-mail manquant pour la détection)."); failure+=1; continue
-
-            # Détecter si le prospect a un MULTIPASS
-            multipass_dir = os.path.expanduser(f"~/.zen/game/nostr/{email}")
-            npub_file = os.path.join(multipass_dir, 'NPUB')
-
-            if os.path.isdir(multipass_dir) and os.path.isfile(npub_file):
-                recipient_hex = target.get('pubkey')
-                if not recipient_hex:
-                    self.logger.warning(f"Cible {target.get('uid', 'N/A')} ignorée (pubkey hex manquante pour Nostr)."); failure+=1; continue
-                
-                self.logger.info(f"--- Envoi Nostr DM {i+1}/{len(campaign_data)} à {target.get('uid')} ({recipient_hex[:15]}...) ---")
-
-                full_message = f"{title}\n\n{message_template}"
-                personalized_message = self._prepare_message(full_message, target)
-
-                try:
-                    command = ['python3', nostr_script, sender_nsec, recipient_hex, personalized_message]
-                    self.logger.debug(f"Exécution Nostr : python3 {os.path.basename(nostr_script)} <nsec> {recipient_hex} <message>")
-                    self.execute_command(command)
-                    success += 1
-                except Exception as e:
-                    self.logger.error(f"Échec de l'envoi Nostr à {recipient_hex}: {e}", exc_info=True); failure+=1
-            else:
-                self.logger.warning(f"Cible {target.get('uid', 'N/A')} ignorée (pas de MULTIPASS détecté)."); failure+=1; continue
+                self.logger.warning(f"Cible {uid} ignorée (e-mail manquant pour la détection)."); skipped += 1; continue
+            if not self._has_multipass(email):
+                self.logger.warning(f"Cible {uid} ignorée (pas de MULTIPASS détecté)."); skipped += 1; continue
+            recipient_hex = target.get('pubkey')
+            if not recipient_hex:
+                self.logger.warning(f"Cible {uid} ignorée (pubkey hex manquante pour Nostr)."); skipped += 1; continue
 
-            if i < len(campaign_data) - 1: time.sleep(self.shared_state['config'].get('send_delay_seconds', 2))
-
-        self.finalize_campaign("Nostr", success, failure)
+            title = item.get('title', 'Invitation UPlanet')
+            personalized_message = self._prepare_message(f"{title}\n\n{item['message']}", target)
+            deliveries.append({
+                # La clé NSEC n'apparaît jamais dans les journaux : seul 'label' est affiché
+                'command': ['python3', nostr_script, sender_nsec, recipient_hex, personalized_message],
+                'message': personalized_message,
+                'label': f"{uid} ({recipient_hex[:15]}...)", 'pubkey': recipient_hex, 'uid': uid,
+            })
+        return deliveries, skipped
 
     def finalize_campaign(self, channel, success, failure):
         final_report = f"Campagne via {channel} terminée. Succès : {success}, Échecs : {failure}."
@@ -984,57 +996,33 @@ class OperatorAgent(Agent):
         """Configure le système de mémoire pour l'opérateur"""
         memory_dir = os.path.join(self.shared_state['config']['workspace'], 'operator_memory')
         os.makedirs(memory_dir, exist_ok=True)
-        
-        # Créer les 12 slots de mémoire (0-11)
-        for slot in range(12):
-            slot_dir = os.path.join(memory_dir, f'slot_{slot}')
-            os.makedirs(slot_dir, exist_ok=True)
-        
         return memory_dir
 
-    def record_interaction(self, target_pubkey, target_uid, message_sent, response_received=None, slot=0):
+    def _interaction_store(self):
+        """
+        Retourne la mémoire des interactions (SQLite), partagée via l'état
+        partagé. Au premier accès, les anciens fichiers operator_memory/slot_N/*.json
+        sont importés.
+        """
+        store = self.shared_state.get('interaction_store')
+        if store is None:
+            memory_dir = self.setup_memory_system()
+            db_file = self.shared_state['config'].get('interaction_store_db') or os.path.join(memory_dir, 'interactions.db')
+            store = InteractionStore(db_file, self.shared_state['config'].get('interaction_history_size', 50), self.logger)
+            imported = store.migrate_slot_directories(memory_dir)
+            if imported:
+                self.logger.info(f"📦 {imported} interactions importées dans '{db_file}'.")
+            self.shared_state['interaction_store'] = store
+        return store
+
+    def record_interaction(self, target_pubkey, target_uid, message_sent, response_received=None, slot=0, channel=None):
         """Enregistre une interaction dans la mémoire de l'opérateur"""
-        memory_dir = self.setup_memory_system()
-        slot_dir = os.path.join(memory_dir, f'slot_{slot}')
-        
-        interaction_file = os.path.join(slot_dir, f'{target_pubkey}.json')
-        
-        interaction_data = {
-            'target_pubkey': target_pubkey,
-            'target_uid': target_uid,
-            'message_sent': message_sent,
-            'response_received': response_received,
-            'timestamp': datetime.utcnow().isoformat() + 'Z',
-            'slot': slot
-        }
-        
-        # Charger les interactions existantes ou créer un nouveau fichier
-        if os.path.exists(interaction_file):
-            with open(interaction_file, 'r', encoding='utf-8') as f:
-                interactions = json.load(f)
-        else:
-            interactions = []
-        
-        interactions.append(interaction_data)
-        
-        # Garder seulement les 50 dernières interactions
-        interactions = interactions[-50:]
-        
-        with open(interaction_file, 'w', encoding='utf-8') as f:
-            json.dump(interactions, f, indent=2, ensure_ascii=False)
-        
+        self._interaction_store().record(target_pubkey, target_uid, message_sent, response_received, slot, channel)
         self.logger.info(f"📝 Interaction enregistrée pour {target_uid} (slot {slot})")
 
     def get_interaction_history(self, target_pubkey, slot=0):
         """Récupère l'historique des interactions avec une cible"""
-        memory_dir = self.setup_memory_system()
-        slot_dir = os.path.join(memory_dir, f'slot_{slot}')
-        interaction_file = os.path.join(slot_dir, f'{target_pubkey}.json')
-        
-        if os.path.exists(interaction_file):
-            with open(interaction_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        return []
+        return self._interaction_store().history(target_pubkey, slot)
 
     def generate_follow_up_response(self, target_pubkey, target_uid, incoming_message, slot=0):
         """Génère une réponse de suivi basée sur l'historique des interactions et enrichie par Perplexica"""
@@ -1180,12 +1168,8 @@ HISTORIQUE DES INTERACTIONS :
 Génère une réponse appropriée :"""
         
         try:
-            result = subprocess.run(
-                ['python3', self.shared_state['config']['question_script'], context, '--json'],
-                capture_output=True, text=True, check=True
-            )
-            response = json.loads(result.stdout)
-            return response.get('answer', 'Erreur lors de la génération de la réponse')
+            answer = self._llm_client().generate(context).strip()
+            return answer or 'Erreur lors de la génération de la réponse'
         except Exception as e:
             self.logger.error(f"Erreur lors de la génération de réponse de suivi : {e}")
             return f"Erreur lors de la génération de la réponse : {e}"
@@ -1194,23 +1178,15 @@ Génère une réponse appropriée :"""
         """Traite une réponse reçue et génère une réponse automatique si nécessaire"""
         self.logger.info(f"📨 Réponse reçue de {target_uid} : {incoming_message[:100]}...")
         
-        # Enregistrer la réponse reçue
-        history = self.get_interaction_history(target_pubkey, slot)
-        if history:
-            # Mettre à jour la dernière interaction
-            last_interaction = history[-1]
-            last_interaction['response_received'] = incoming_message
-            
-            # Sauvegarder la mise à jour
-            memory_dir = self.setup_memory_system()
-            slot_dir = os.path.join(memory_dir, f'slot_{slot}')
-            interaction_file = os.path.join(slot_dir, f'{target_pubkey}.json')
-            
-            with open(interaction_file, 'w', encoding='utf-8') as f:
-                json.dump(history, f, indent=2, ensure_ascii=False)
+        # Enregistrer la réponse reçue sur la dernière interaction
+        self._interaction_store().set_last_response(target_pubkey, slot, incoming_message)
         
         # Analyser le contenu de la réponse
-        if self._should_auto_respond(incoming_message):
+        classification = self.classify_reply(incoming_message, target_pubkey, slot)
+        if classification['label'] == STOP:
+            self._add_to_blocklist(target_pubkey, target_uid, incoming_message)
+            return None
+        if classification['label'] == POSITIVE:
             self.logger.info(f"🤖 Génération d'une réponse automatique pour {target_uid}")
             auto_response = self.generate_follow_up_response(target_pubkey, target_uid, incoming_message, slot)
             
@@ -1223,19 +1199,55 @@ Génère une réponse appropriée :"""
             return None
 
     def _should_auto_respond(self, message):
-        """Détermine si une réponse automatique est appropriée en utilisant l'IA"""
+        """Détermine si une réponse automatique est appropriée (réponse classée POSITIF)"""
+        return self.classify_reply(message)['label'] == POSITIVE
+
+    def _reply_classifier(self):
+        """
+        Classifieur local des réponses (règles multilingues + modèle bayésien),
+        entraîné une fois sur les réponses déjà classées par l'IA, puis au fil des nouvelles.
+        """
+        classifier = getattr(self, '_reply_classifier_cache', None)
+        if classifier is None:
+            config = self.shared_state['config']
+            samples = [(message, label) for message, label, _ in
+                       self._interaction_store().labeled_replies(('ia',), config.get('reply_model_max_samples', 5000))]
+            classifier = ReplyClassifier(samples, config.get('reply_model_min_samples', 20),
+                                         config.get('reply_model_min_confidence', 0.8))
+            self._reply_classifier_cache = classifier
+        return classifier
+
+    def classify_reply(self, message, pubkey=None, slot=None):
+        """
+        Classe une réponse reçue : POSITIF, NÉGATIF, STOP ou NEUTRE.
+        Les cas nets sont tranchés localement (règles, puis modèle entraîné
+        sur les réponses passées) ; seules les réponses ambiguës sont
+        confiées à l'IA. L'étape qui a décidé est journalisée et enregistrée
+        avec la réponse (table reply_labels) pour ajuster les règles.
+        """
+        classifier = self._reply_classifier()
+        decision = classifier.classify(message)
+        if decision['ambiguous'] and self.shared_state['config'].get('reply_llm_escalation', True):
+            try:
+                decision = dict(decision, label=self._classify_reply_with_llm(message), path='ia', ambiguous=False)
+                classifier.learn(message, decision['label'])
+            except Exception as e:
+                self.logger.error(f"❌ Erreur lors de l'analyse IA : {e}")
+                decision = dict(decision, label=decision['hint'], path='repli')
+        elif decision['ambiguous']:
+            decision = dict(decision, label=decision['hint'], path='repli')
+
+        self.logger.info(f"🏷️ Réponse classée {decision['label']} (étape : {decision['path']}, "
+                         f"confiance {decision['confidence']:.2f}) : {message[:50]}...")
         try:
-            message_lower = message.lower()
-            
-            # 🎯 PRIORITÉ 1 : Tags de recherche explicites - TOUJOURS répondre automatiquement
-            search_tags = ['#search', '#recherche', '#info', '#help', '#aide', '#documentation', '#doc', '#tutorial']
-            for tag in search_tags:
-                if tag in message_lower:
-                    self.logger.info(f"🔍 Tag {tag} détecté - Réponse automatique obligatoire")
-                    return True
-            
-            # Construire le prompt d'analyse pour les autres cas
-            analysis_prompt = f"""Analyse cette réponse reçue dans le contexte d'une campagne UPlanet et détermine si elle nécessite une réponse automatique.
+            self._interaction_store().record_label(message, decision['label'], decision['path'], pubkey, slot)
+        except Exception as e:
+            self.logger.debug(f"Classification non enregistrée : {e}")
+        return decision
+
+    def _classify_reply_with_llm(self, message):
+        """Classe une réponse ambiguë avec l'IA ; retourne POSITIF, NÉGATIF, STOP ou NEUTRE."""
+        analysis_prompt = f"""Analyse cette réponse reçue dans le contexte d'une campagne UPlanet et détermine si elle nécessite une réponse automatique.
 
 MESSAGE REÇU : "{message}"
 
@@ -1250,12 +1262,14 @@ CRITÈRES D'ANALYSE :
    - Volonté de participer ou rejoindre
 
 2. NÉGATIF (intervention manuelle) :
-   - Refus explicite (non, pas intéressé, stop, etc.)
+   - Refus explicite (non, pas intéressé, etc.)
    - Plaintes ou critiques
-   - Demande de désinscription
    - Messages hostiles ou agressifs
 
-3. NEUTRE/AMBIGU (intervention manuelle) :
+3. STOP (plus aucun message) :
+   - Demande de désinscription ou de ne plus être contacté
+
+4. NEUTRE/AMBIGU (intervention manuelle) :
    - Messages trop courts ou vagues
    - Réponses non claires
    - Messages qui ne semblent pas liés au projet
@@ -1263,50 +1277,37 @@ CRITÈRES D'ANALYSE :
 INSTRUCTIONS :
 - Analyse le ton, l'intention et le contenu du message
 - Détermine si le prospect montre de l'intérêt ou non
-- Réponds UNIQUEMENT par "POSITIF", "NÉGATIF" ou "NEUTRE"
+- Réponds UNIQUEMENT par "POSITIF", "NÉGATIF", "STOP" ou "NEUTRE"
 
 ANALYSE :"""
 
-            # Appeler question.py pour l'analyse
-            question_script = self.shared_state['config']['question_script']
-            command = ['python3', question_script, analysis_prompt]
-            
-            self.logger.debug(f"🔍 Analyse IA de la réponse : {message[:50]}...")
-            result = subprocess.run(command, capture_output=True, text=True, check=True)
-            analysis_result = result.stdout.strip()
-            
-            self.logger.debug(f"🔍 Résultat de l'analyse IA : {analysis_result}")
-            
-            # Parser la réponse
-            if "POSITIF" in analysis_result.upper():
-                self.logger.info(f"✅ Analyse IA : Réponse positive détectée")
-                return True
-            elif "NÉGATIF" in analysis_result.upper():
-                self.logger.info(f"❌ Analyse IA : Réponse négative détectée")
-                return False
-            else:
-                self.logger.info(f"⚠️ Analyse IA : Réponse neutre/ambiguë détectée")
+        self.logger.debug(f"🔍 Analyse IA de la réponse : {message[:50]}...")
+        analysis_result = self._llm_client().generate(analysis_prompt).strip().upper()
+        self.logger.debug(f"🔍 Résultat de l'analyse IA : {analysis_result}")
+        for label in (STOP, NEGATIVE, 'NEGATIF', POSITIVE):
+            if label in analysis_result:
+                return NEGATIVE if label == 'NEGATIF' else label
+        return NEUTRAL
+
+    def _add_to_blocklist(self, target_pubkey, target_uid, message):
+        """Ajoute un profil ayant demandé à ne plus être contacté à la blocklist (exclu des prochains ciblages)."""
+        blocklist_file = self.shared_state['config'].get('blocklist_file') or \
+            os.path.join(self.shared_state['config']['workspace'], 'blocklist.json')
+        blocklist = []
+        if os.path.exists(blocklist_file):
+            try:
+                with open(blocklist_file, 'r') as f:
+                    blocklist = json.load(f)
+            except (IOError, json.JSONDecodeError):
+                self.logger.warning(f"Impossible de lire la blocklist '{blocklist_file}'.")
                 return False
-                
-        except Exception as e:
-            self.logger.error(f"❌ Erreur lors de l'analyse IA : {e}")
-            # En cas d'erreur, utiliser une logique de fallback simple
-            message_lower = message.lower()
-            
-            # Mots-clés de fallback pour les cas d'urgence
-            positive_fallback = ['oui', 'yes', 'intéressé', 'intéressant', 'comment', 'où', 'quand', 'combien', '?']
-            negative_fallback = ['non', 'no', 'stop', 'arrêter', 'pas intéressé', 'not interested']
-            
-            for keyword in negative_fallback:
-                if keyword in message_lower:
-                    return False
-            
-            for keyword in positive_fallback:
-                if keyword in message_lower:
-                    return True
-            
-            # Par défaut, intervention manuelle si ambigu
+        if any(entry.get('pubkey') == target_pubkey for entry in blocklist):
             return False
+        blocklist.append({'pubkey': target_pubkey, 'uid': target_uid, 'reason': message[:200],
+                          'date': datetime.now().isoformat()})
+        atomic_write_json(blocklist_file, blocklist, indent=2)
+        self.logger.info(f"🚫 {target_uid} ajouté à la blocklist (demande de désinscription).")
+        return True
 
     def _send_auto_response(self, target_pubkey, response, slot=0):
         """Envoie une réponse automatique via le canal approprié"""
@@ -1354,7 +1355,7 @@ ANALYSE :"""
         print("=" * 60)
         
         # Charger les informations de campagne
-        campaigns_file = os.path.join(self.shared_state['config']['workspace'], 'campaigns.json')
+        campaigns_file = os.path.join(self.setup_memory_system(), 'campaigns.json')
         campaigns = {}
         if os.path.exists(campaigns_file):
             try:
@@ -1363,50 +1364,24 @@ ANALYSE :"""
             except Exception as e:
                 self.logger.error(f"Erreur lors du chargement des campagnes : {e}")
         
-        # Vérifier chaque slot
+        # Statistiques de chaque slot actif
+        store = self._interaction_store()
         active_slots = []
-        for slot in range(12):
-            slot_dir = os.path.join(self.setup_memory_system(), f'slot_{slot}')
+        for slot, stats in store.slot_stats().items():
+            if not stats['sent']:
+                continue
             campaign_info = campaigns.get(str(slot), {})
-            
-            if os.path.exists(slot_dir):
-                # Compter les interactions dans ce slot
-                files = [f for f in os.listdir(slot_dir) if f.endswith('.json')]
-                if files:
-                    # Calculer les statistiques
-                    total_interactions = 0
-                    total_responses = 0
-                    last_interaction = None
-                    
-                    for file in files:
-                        pubkey = file.replace('.json', '')
-                        history = self.get_interaction_history(pubkey, slot)
-                        if history:
-                            total_interactions += len(history)
-                            responses = sum(1 for h in history if h.get('response_received'))
-                            total_responses += responses
-                            
-                            if not last_interaction or history[-1]['timestamp'] > last_interaction:
-                                last_interaction = history[-1]['timestamp']
-                    
-                    # Calculer le taux de réponse
-                    response_rate = (total_responses / total_interactions * 100) if total_interactions > 0 else 0
-                    
-                    # Informations de campagne
-                    campaign_name = campaign_info.get('name', f'Campagne {slot}')
-                    campaign_date = campaign_info.get('date', 'Date inconnue')
-                    target_count = campaign_info.get('target_count', len(files))
-                    
-                    active_slots.append({
-                        'slot': slot,
-                        'name': campaign_name,
-                        'date': campaign_date,
-                        'targets': target_count,
-                        'interactions': total_interactions,
-                        'responses': total_responses,
-                        'response_rate': response_rate,
-                        'last_interaction': last_interaction
-                    })
+            active_slots.append({
+                'slot': slot,
+                'name': campaign_info.get('name', f'Campagne {slot}'),
+                'date': campaign_info.get('date', 'Date inconnue'),
+                'targets': campaign_info.get('targets', stats['profiles']),
+                'interactions': stats['sent'],
+                'responses': stats['responses'],
+                'response_rate': stats['response_rate'],
+                'last_interaction': stats['last_interaction'],
+                'channels': stats['channels']
+            })
         
         if not active_slots:
             print("❌ Aucune campagne active trouvée")
@@ -1419,6 +1394,7 @@ ANALYSE :"""
             print(f"   🎯 Cibles : {slot_info['targets']}")
             print(f"   💬 Interactions : {slot_info['interactions']}")
             print(f"   📨 Réponses : {slot_info['responses']} ({slot_info['response_rate']:.1f}%)")
+            print(f"   📡 Canaux : {self._format_channel_stats(slot_info['channels'])}")
             if slot_info['last_interaction']:
                 print(f"   ⏰ Dernière activité : {slot_info['last_interaction']}")
         
@@ -1447,9 +1423,6 @@ ANALYSE :"""
                 print("❌ Entrée invalide")
                 return
         
-        memory_dir = self.setup_memory_system()
-        slot_dir = os.path.join(memory_dir, f'slot_{slot}')
-        
         if target_pubkey:
             # Afficher l'historique d'une cible spécifique
             history = self.get_interaction_history(target_pubkey, slot)
@@ -1470,42 +1443,30 @@ ANALYSE :"""
             print(f"\n📚 Résumé des interactions (slot {slot})")
             print("=" * 60)
             
-            if os.path.exists(slot_dir):
-                files = [f for f in os.listdir(slot_dir) if f.endswith('.json')]
-                if files:
-                    for file in files:
-                        pubkey = file.replace('.json', '')
-                        history = self.get_interaction_history(pubkey, slot)
-                        if history:
-                            last_interaction = history[-1]
-                            print(f"\n{last_interaction['target_uid']} ({pubkey[:10]}...)")
-                            print(f"   Dernière interaction : {last_interaction['timestamp']}")
-                            print(f"   Total interactions : {len(history)}")
-                else:
-                    print("❌ Aucune interaction trouvée dans ce slot")
+            profiles = self._interaction_store().slot_summary(slot)['profiles']
+            if profiles:
+                for profile in profiles:
+                    print(f"\n{profile['uid']} ({profile['pubkey'][:10]}...)")
+                    print(f"   Dernière interaction : {profile['last_interaction']}")
+                    print(f"   Total interactions : {profile['interactions']}")
             else:
-                print("❌ Slot non trouvé")
+                print("❌ Aucune interaction trouvée dans ce slot")
 
     def _get_prospect_info(self, target_pubkey):
         """Récupère les informations du prospect depuis la base de connaissance"""
         try:
-            kb_file = self.shared_state['config']['enriched_prospects_file']
-            if os.path.exists(kb_file):
-                with open(kb_file, 'r') as f:
-                    knowledge_base = json.load(f)
+            profile_data = self._knowledge_cache().get(target_pubkey)
+            if profile_data:
+                metadata = profile_data.get('metadata', {})
+                profile = profile_data.get('profile', {})
                 
-                if target_pubkey in knowledge_base:
-                    profile_data = knowledge_base[target_pubkey]
-                    metadata = profile_data.get('metadata', {})
-                    profile = profile_data.get('profile', {})
-                    
-                    return {
-                        'language': metadata.get('language', 'fr'),
-                        'tags': metadata.get('tags', []),
-                        'description': profile.get('_source', {}).get('description', ''),
-                        'country': metadata.get('country', ''),
-                        'region': metadata.get('region', '')
-                    }
+                return {
+                    'language': metadata.get('language', 'fr'),
+                    'tags': metadata.get('tags', []),
+                    'description': profile.get('_source', {}).get('description', ''),
+                    'country': metadata.get('country', ''),
+                    'region': metadata.get('region', '')
+                }
         except Exception as e:
             self.logger.error(f"Erreur lors de la récupération des infos prospect : {e}")
         
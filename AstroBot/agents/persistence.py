@@ -0,0 +1,120 @@
+import json
+import os
+import tempfile
+import time
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Politique de synchronisation disque : None = jamais, 0 = à chaque écriture,
+# N > 0 = au plus une synchronisation toutes les N secondes (écritures groupées)
+_fsync_interval = 30
+_use_orjson = True
+_last_fsync = 0.0
+
+# Masque de création du processus, lu une fois (os.umask ne permet que de le lire en le remplaçant)
+_umask = os.umask(0)
+os.umask(_umask)
+
+
+def configure(fsync_interval=30, use_orjson=True):
+    """Règle la politique d'écriture des fichiers JSON du workspace."""
+    global _fsync_interval, _use_orjson
+    _fsync_interval = fsync_interval
+    _use_orjson = use_orjson
+
+
+def dumps_json(data, indent=None):
+    """
+    Encode 'data' en JSON (octets UTF-8). Compact par défaut ; orjson est
+    utilisé s'il est installé (indentation limitée à 2 espaces).
+    """
+    if orjson is not None and _use_orjson and indent in (None, 2):
+        option = orjson.OPT_INDENT_2 if indent else 0
+        try:
+            return orjson.dumps(data, option=option | orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            pass  # Types non gérés par orjson : repli sur le module json
+    separators = None if indent else (',', ':')
+    return json.dumps(data, indent=indent, ensure_ascii=False, separators=separators).encode('utf-8')
+
+
+def _should_fsync(fsync):
+    global _last_fsync
+    if fsync is not None:
+        return fsync
+    if _fsync_interval is None:
+        return False
+    now = time.time()
+    if now - _last_fsync >= _fsync_interval:
+        _last_fsync = now
+        return True
+    return False
+
+
+def _file_mode(path):
+    """Droits à donner au fichier écrit : ceux de la cible existante, sinon ceux d'un open() ordinaire."""
+    try:
+        return os.stat(path).st_mode & 0o7777
+    except FileNotFoundError:
+        return 0o666 & ~_umask
+
+
+def atomic_write_json(path, data, indent=None, fsync=None):
+    """
+    Écrit 'data' en JSON dans 'path' sans jamais laisser de fichier tronqué :
+    l'écriture se fait dans un fichier temporaire du même dossier, renommé
+    ensuite sur la cible (os.replace est atomique). Une interruption laisse
+    donc l'ancienne version intacte. Les droits de la cible sont conservés
+    (mkstemp crée le fichier temporaire en 0600).
+    fsync : True/False pour forcer, None pour suivre la politique de configure().
+    """
+    payload = dumps_json(data, indent)
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    sync = _should_fsync(fsync)
+
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(payload)
+            if sync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.chmod(tmp_path, _file_mode(path))
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    if sync and hasattr(os, 'O_DIRECTORY'):
+        # Rendre le renommage lui-même durable
+        dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+    return len(payload)
+
+
+def load_json(path, default=None, logger=None):
+    """
+    Charge un fichier JSON du workspace. Un fichier illisible n'est pas
+    écrasé silencieusement à la sauvegarde suivante : il est mis de côté
+    ('<fichier>.corrupt-<horodatage>') et la valeur par défaut est retournée.
+    """
+    if not os.path.exists(path):
+        return default
+    try:
+        with open(path, 'rb') as f:
+            content = f.read()
+        return orjson.loads(content) if orjson is not None and _use_orjson else json.loads(content)
+    except (ValueError, UnicodeDecodeError) as e:
+        backup = f"{path}.corrupt-{time.strftime('%Y%m%d-%H%M%S')}"
+        os.replace(path, backup)
+        if logger:
+            logger.error(f"❌ Fichier JSON corrompu '{path}' ({e}), mis de côté dans '{backup}'.")
+        return default
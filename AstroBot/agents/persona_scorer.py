@@ -0,0 +1,115 @@
+import math
+import re
+import unicodedata
+from collections import Counter
+
+# Mots outils ignorés (français, anglais, espagnol, allemand, italien)
+STOPWORDS = frozenset("""
+les des une est pour par sur dans avec qui que quoi aux ces ses son sont pas plus mais ont leur leurs nous vous
+elle ils elles tout tous toute toutes comme fait faire etre avoir cette cet entre sans sous chez tres aussi
+the and for with that this from are was were you your our their have has not but all can will into about
+los las del con por para una que como sus mas
+der die das und mit fur von den dem ein eine ist sich auf
+gli della delle con per sono una che
+""".split())
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text):
+    """Mots normalisés (minuscules, sans accents) d'un texte, hors mots outils et mots courts."""
+    text = unicodedata.normalize('NFKD', str(text or '').lower())
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    return [token for token in _TOKEN_RE.findall(text) if len(token) > 2 and token not in STOPWORDS]
+
+
+class PersonaScorer:
+    """
+    Sélection locale et déterministe du persona d'une cible, sans appel à l'IA.
+    Chaque persona est représenté par un vecteur TF-IDF construit une seule
+    fois à partir de ses thèmes, de son vocabulaire et de ses arguments (dans
+    toutes ses langues). Le profil d'une cible (tags et description) est
+    projeté sur ce vocabulaire et comparé à tous les personas en une passe sur
+    l'index inversé (similarité cosinus). Un résultat est jugé ambigu si le
+    meilleur score est trop faible ou trop proche du second : seuls ces cas
+    sont à confier à l'IA.
+    """
+
+    # Poids des différents champs dans le vecteur d'un persona
+    FIELD_WEIGHTS = {'themes': 3, 'vocabulary': 2, 'name': 1, 'archetype': 1, 'arguments': 1}
+    TAG_WEIGHT = 3
+
+    def __init__(self, banks_config, min_score=0.1, min_margin=0.2):
+        self.min_score = min_score
+        self.min_margin = min_margin
+        self.slots = []
+        documents = []
+        for slot, bank in sorted((banks_config or {}).get('banks', {}).items(), key=lambda item: int(item[0])):
+            if bank.get('name') and bank.get('corpus'):
+                self.slots.append(str(slot))
+                documents.append(self._bank_terms(bank))
+
+        document_frequency = Counter(term for terms in documents for term in terms)
+        count = len(documents)
+        self.idf = {term: math.log((1 + count) / (1 + df)) + 1 for term, df in document_frequency.items()}
+
+        # Index inversé terme -> [(position du persona, poids normalisé)]
+        self.postings = {}
+        for position, terms in enumerate(documents):
+            weights = {term: tf * self.idf[term] for term, tf in terms.items()}
+            norm = math.sqrt(sum(weight * weight for weight in weights.values())) or 1.0
+            for term, weight in weights.items():
+                self.postings.setdefault(term, []).append((position, weight / norm))
+
+    def _bank_terms(self, bank):
+        contents = [bank] + list(bank.get('multilingual', {}).values())
+        terms = Counter()
+        for content in contents:
+            corpus = content.get('corpus', content)
+            fields = {
+                'themes': bank.get('themes', []) if content is bank else [],
+                'vocabulary': corpus.get('vocabulary', []),
+                'name': [content.get('name', '')],
+                'archetype': [content.get('archetype', '')],
+                'arguments': corpus.get('arguments', []),
+            }
+            for field, values in fields.items():
+                for value in values:
+                    for token in tokenize(value):
+                        terms[token] += self.FIELD_WEIGHTS[field]
+        return terms
+
+    def score(self, tags=None, description=''):
+        """Retourne les couples (slot, score cosinus) triés par score décroissant."""
+        terms = Counter()
+        for tag in tags or []:
+            for token in tokenize(tag):
+                terms[token] += self.TAG_WEIGHT
+        for token in tokenize(description):
+            terms[token] += 1
+
+        weights = {term: tf * self.idf[term] for term, tf in terms.items() if term in self.idf}
+        norm = math.sqrt(sum(weight * weight for weight in weights.values()))
+        scores = [0.0] * len(self.slots)
+        if norm:
+            for term, weight in weights.items():
+                for position, bank_weight in self.postings[term]:
+                    scores[position] += weight / norm * bank_weight
+        return sorted(zip(self.slots, scores), key=lambda item: item[1], reverse=True)
+
+    def select(self, tags=None, description=''):
+        """
+        Retourne (slot, score, ambigu, classement) pour le profil d'une cible.
+        'slot' vaut None si aucun persona n'a de terme en commun avec le profil.
+        """
+        ranking = self.score(tags, description)
+        if not ranking or ranking[0][1] <= 0:
+            return None, 0.0, True, ranking
+        best_slot, best = ranking[0]
+        second = ranking[1][1] if len(ranking) > 1 else 0.0
+        ambiguous = best < self.min_score or (best - second) < self.min_margin * best
+        return best_slot, best, ambiguous, ranking
+
+    def select_many(self, profiles):
+        """Sélection pour une liste de profils (tags, description) ; retourne une liste de select()."""
+        return [self.select(tags, description) for tags, description in profiles]
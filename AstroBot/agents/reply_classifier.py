@@ -0,0 +1,175 @@
+import math
+import re
+import unicodedata
+from collections import Counter
+
+POSITIVE = 'POSITIF'
+NEGATIVE = 'NÉGATIF'
+STOP = 'STOP'
+NEUTRAL = 'NEUTRE'
+LABELS = (POSITIVE, NEGATIVE, STOP, NEUTRAL)
+
+# Tags de recherche explicites : toujours une réponse automatique
+SEARCH_TAGS = ('#search', '#recherche', '#info', '#help', '#aide', '#documentation', '#doc', '#tutorial')
+
+# Règles appliquées au texte normalisé (minuscules, sans accents) : français, anglais, espagnol, allemand, italien
+# STOP mène à la blocklist (irréversible) : seules des formules explicites de désinscription sont retenues,
+# pas un « stop » ou un « arrêtez » isolé dans une phrase (« Stop au gaspillage, je veux participer »)
+STOP_PATTERNS = (
+    r"^\W*stop\W*((merci|svp|stp|please|thanks?)\W*)?$",
+    r"\bstop\W+(les |vos |ces |aux )?(messages?|mails?|e-mails?|envois?|relances?|spam|sending|messaging|contacting|emails?)",
+    r"\bunsubscribe\b", r"\bdesinscri", r"\bdesabonn",
+    r"\bne (plus|pas) (me |m')?(contacter|ecrire|envoyer|recevoir|relancer)",
+    r"\b(retirez|supprimez|enlevez)[- ]moi\b", r"\bme retirer de (vos|votre|la|cette) (liste|fichier|base)",
+    r"\barretez (de |d')(m'|me |nous )?(ecrire|envoyer|contacter|relancer|spammer|harceler)",
+    r"\bremove me\b", r"\b(do not|don't|dont) (contact|message|write|email)",
+    r"\bdar(me)? de baja\b", r"\bno me (escribas|escriba|contactes|contacte|envies)",
+    r"\babmelden\b", r"\bkeine (nachrichten|mails?|werbung)\b",
+    r"\bcancellami\b", r"\bnon (scrivermi|contattarmi)\b",
+)
+NEGATIVE_PATTERNS = (
+    r"\bpas (du tout )?interess\w*", r"\bnon merci\b", r"\bpas pour moi\b", r"\bpas le temps\b", r"\bjamais\b",
+    r"\barnaque\b", r"\bescroquerie\b", r"\bspam\b",
+    r"\bnot (really )?interested\b", r"\bno thanks?\b", r"\bnot for me\b", r"\bscam\b",
+    r"\bno (me )?interesa\b", r"\bno gracias\b",
+    r"\b(kein|nicht) interess\w*", r"\bnein danke\b",
+    r"\bnon (mi )?interessa\w*", r"\bnon sono interessat\w*", r"\bno grazie\b",
+    # En dernier : un « non » initial ne doit pas masquer une formule plus longue (« non mi interessa »)
+    r"^\W*(non|no|nein|nope)\b",
+)
+# Un POSITIF déclenche une réponse automatique : pas de point d'interrogation seul (« Qui vous a donné mon
+# adresse ? ») ni de « si » initial (« Si vous m'écrivez encore... ») ; une simple question reste à l'IA
+POSITIVE_PATTERNS = (
+    r"\binteress\w*", r"^\W*(oui|yes|ja|ok|okay|d'accord|carrement|volontiers)\b", r"\bavec plaisir\b",
+    r"\bje (veux|voudrais|souhaite|souhaiterais) (bien )?(rejoindre|participer|m'inscrire|en savoir|essayer)",
+    r"\bcomment (faire|rejoindre|participer|s'inscrire|ca marche|ca fonctionne|fonctionne)",
+    r"\ben savoir plus\b", r"\bplus d'info", r"\bgenial\b", r"\bsuper\b", r"\bbravo\b", r"\bpartant\w*",
+    r"\b(i'm|i am) in\b", r"\bsounds (good|great|interesting)\b", r"\bhow (do|can) i\b", r"\btell me more\b",
+    r"\bcount me in\b", r"\bme interesa\b", r"\bcomo (me uno|participo|funciona)", r"\bwie kann ich\b",
+    r"\bgerne\b", r"\bmi interessa\b", r"\bcome (posso|funziona)",
+)
+
+_APOSTROPHES = str.maketrans({'’': "'", '‘': "'", '`': "'"})
+_TOKEN_RE = re.compile(r"[a-z0-9']+")
+
+
+def normalize(text):
+    """Texte en minuscules, sans accents ni apostrophes typographiques."""
+    text = unicodedata.normalize('NFKD', str(text or '').lower().translate(_APOSTROPHES))
+    return ''.join(c for c in text if not unicodedata.combining(c)).strip()
+
+
+def _compile(patterns):
+    return re.compile('|'.join(f"(?:{pattern})" for pattern in patterns))
+
+
+class NaiveBayesModel:
+    """
+    Classifieur bayésien naïf multinomial (lissage de Laplace) sur les mots
+    des réponses, entraîné sur les réponses déjà classées et mis à jour au
+    fil de l'eau par learn().
+    """
+
+    def __init__(self, samples=()):
+        self.label_counts = Counter()
+        self.word_counts = {}
+        self.word_totals = Counter()
+        self.vocabulary = set()
+        for text, label in samples:
+            self.learn(text, label)
+
+    @staticmethod
+    def features(text):
+        return _TOKEN_RE.findall(normalize(text))
+
+    def learn(self, text, label):
+        words = self.features(text)
+        self.label_counts[label] += 1
+        counts = self.word_counts.setdefault(label, Counter())
+        counts.update(words)
+        self.word_totals[label] += len(words)
+        self.vocabulary.update(words)
+
+    @property
+    def samples(self):
+        return sum(self.label_counts.values())
+
+    def predict(self, text):
+        """Retourne (label, probabilité) du label le plus probable, ou (None, 0.0) sans entraînement."""
+        if not self.label_counts:
+            return None, 0.0
+        words = self.features(text)
+        total = self.samples
+        vocabulary_size = len(self.vocabulary) + 1
+        scores = {}
+        for label, count in self.label_counts.items():
+            counts, denominator = self.word_counts[label], self.word_totals[label] + vocabulary_size
+            scores[label] = math.log(count / total) + sum(math.log((counts[word] + 1) / denominator) for word in words)
+        best = max(scores, key=scores.get)
+        # Probabilité a posteriori normalisée (log-sum-exp)
+        normalizer = sum(math.exp(score - scores[best]) for score in scores.values())
+        return best, 1.0 / normalizer
+
+
+class ReplyClassifier:
+    """
+    Classement local d'une réponse reçue en POSITIF, NÉGATIF, STOP ou NEUTRE,
+    sans appel à l'IA. Première étape : des règles multilingues compilées une
+    seule fois (demande de désinscription, refus, intérêt ou question), les
+    refus étant retirés du texte avant de chercher un signe d'intérêt (« pas
+    intéressé » n'est pas un intérêt). Une désinscription accompagnée d'un
+    signe d'intérêt est ambiguë. Seconde étape, pour les réponses sans
+    règle décisive : un modèle bayésien naïf entraîné sur les réponses déjà
+    classées, s'il en a vu assez et s'il est assez sûr de lui. Les réponses
+    restées ambiguës sont à confier à l'IA.
+    """
+
+    def __init__(self, samples=(), min_samples=20, min_confidence=0.8):
+        self.stop_re = _compile(STOP_PATTERNS)
+        self.negative_re = _compile(NEGATIVE_PATTERNS)
+        self.positive_re = _compile(POSITIVE_PATTERNS)
+        self.model = NaiveBayesModel(samples)
+        self.min_samples = min_samples
+        self.min_confidence = min_confidence
+
+    def learn(self, message, label):
+        """Ajoute une réponse classée (ex: par l'IA) à l'entraînement du modèle."""
+        self.model.learn(message, label)
+
+    def classify(self, message):
+        """
+        Retourne {'label', 'path', 'confidence', 'ambiguous', 'hint'} : 'path'
+        indique l'étape qui a décidé ('règles' ou 'modèle') ; une réponse
+        ambiguë est NEUTRE, 'hint' donnant alors l'indice des règles
+        (utile en repli si l'IA est injoignable).
+        """
+        text = normalize(message)
+        if not text:
+            return self._decision(NEUTRAL, 'règles', 1.0)
+        if self.stop_re.search(text):
+            # Désinscription accompagnée d'un signe d'intérêt : l'IA arbitre, jamais de STOP par défaut
+            if self.positive_re.search(self.stop_re.sub(' ', text)):
+                return self._decision(NEUTRAL, None, 0.0, ambiguous=True, hint=NEUTRAL)
+            return self._decision(STOP, 'règles', 1.0)
+        if any(tag in text for tag in SEARCH_TAGS):
+            return self._decision(POSITIVE, 'règles', 1.0)
+
+        negatives = len(self.negative_re.findall(text))
+        positives = len(self.positive_re.findall(self.negative_re.sub(' ', text)))
+        if negatives and not positives:
+            return self._decision(NEGATIVE, 'règles', 1.0)
+        if positives and not negatives:
+            return self._decision(POSITIVE, 'règles', 1.0)
+
+        hint = NEGATIVE if negatives >= positives and negatives else NEUTRAL
+        if self.model.samples >= self.min_samples and len(self.model.label_counts) > 1:
+            label, confidence = self.model.predict(message)
+            # Le modèle ne décide pas seul d'un STOP (blocklist) : ce cas reste à l'IA
+            if confidence >= self.min_confidence and label != STOP:
+                return self._decision(label, 'modèle', confidence)
+        return self._decision(NEUTRAL, None, 0.0, ambiguous=True, hint=hint)
+
+    @staticmethod
+    def _decision(label, path, confidence, ambiguous=False, hint=None):
+        return {'label': label, 'path': path, 'confidence': round(confidence, 3),
+                'ambiguous': ambiguous, 'hint': hint or label}
@@ -1,11 +1,13 @@
 from .base_agent import Agent
+from .persistence import atomic_write_json, load_json
+from .analysis_job import AnalysisJob
+from .persona_scorer import PersonaScorer
+from .web_cache import WebContentCache
+from .link_renderer import LinkRenderer, LINK_PLACEHOLDERS
 import json
 import os
 import subprocess
 import re
-import requests
-from bs4 import BeautifulSoup
-import html2text
 
 class StrategistAgent(Agent):
     """
@@ -72,10 +74,11 @@ class StrategistAgent(Agent):
         print("1. Mode Auto : Analyse automatique du profil et sélection de persona")
         print("2. Mode Persona : Sélection automatique basée sur les thèmes")
         print("3. Mode Classique : Choix manuel du persona")
+        print("4. Mode Modèle : Un message par groupe de cibles (persona, langue, thèmes), personnalisé localement")
         print()
         
         try:
-            choice = input("Choisissez le mode (1-3) : ").strip()
+            choice = input("Choisissez le mode (1-4) : ").strip()
             
             if choice == "1":
                 print("✅ Mode Auto sélectionné")
@@ -86,6 +89,9 @@ class StrategistAgent(Agent):
             elif choice == "3":
                 print("✅ Mode Classique sélectionné")
                 return "classic"
+            elif choice == "4":
+                print("✅ Mode Modèle sélectionné")
+                return "template"
             else:
                 print("❌ Choix invalide, utilisation du mode Auto")
                 return "auto"
@@ -94,8 +100,17 @@ class StrategistAgent(Agent):
             print("❌ Choix invalide, utilisation du mode Auto")
             return "auto"
 
-    def run(self):
-        """Lance la phase de rédaction du message de campagne"""
+    STRATEGY_MODES = ('auto', 'persona', 'classic', 'template')
+
+    def run(self, mode=None, bank_slot=None, resume=True):
+        """
+        Lance la phase de rédaction du message de campagne.
+        Sans 'mode', le mode de rédaction est demandé à l'utilisateur ; en mode
+        classique, 'bank_slot' désigne le persona à utiliser (sinon il est demandé,
+        et -1 signifie aucun persona). Les cibles sont rédigées en parallèle
+        ('ia_max_workers') et une rédaction interrompue reprend là où elle
+        s'était arrêtée, sauf si 'resume' est faux. Retourne la liste des messages générés.
+        """
         self.logger.info("🤖 Agent Stratège : Démarrage de la rédaction du message...")
         self.shared_state['status']['StrategistAgent'] = "Rédaction en cours..."
 
@@ -122,77 +137,321 @@ class StrategistAgent(Agent):
         banks_config = self._load_banks_config(banks_config_file)
 
         # Choisir le mode de rédaction
-        mode = self._choose_strategy_mode()
+        if mode is None:
+            mode = self._choose_strategy_mode()
+        elif mode not in self.STRATEGY_MODES:
+            self.logger.error(f"Mode de rédaction inconnu : '{mode}'.")
+            self.shared_state['status']['StrategistAgent'] = "Échec : Mode de rédaction inconnu."
+            return
         
         # Sélectionner le persona une seule fois pour toutes les cibles (sauf mode persona)
         selected_bank = None
         if mode == "classic":
             # Mode Classique : Choix manuel du persona une seule fois
             self.logger.info("📝 Mode Classique : Choix manuel du persona (une seule fois pour toutes les cibles)")
-            selected_bank = self._choose_bank_for_classic_method(banks_config)
+            if bank_slot is None:
+                selected_bank = self._choose_bank_for_classic_method(banks_config)
+            elif int(bank_slot) >= 0:
+                selected_bank = banks_config['banks'].get(str(bank_slot)) or None
             if selected_bank:
                 self.logger.info(f"🎭 Persona sélectionné pour toutes les cibles : {selected_bank['name']}")
         
-        # Générer les messages personnalisés pour chaque cible
+        # Liens relus une fois par campagne, puis injectés dans tous les messages
+        self._link_renderer_cache = None
+
+        targets = self.shared_state['targets']
+        messages_file = os.path.join(self.shared_state['config']['workspace'], "personalized_messages.json")
+        if mode == "template":
+            # Mode Modèle : un message de base par groupe, complété localement pour chaque cible
+            personalized_messages = self._generate_template_messages(targets, banks_config, treasury_pubkey)
+            if personalized_messages:
+                atomic_write_json(messages_file, personalized_messages, indent=2)
+            return self._report_generated_messages(personalized_messages)
+
+        # Générer les messages personnalisés (reprise possible après une interruption)
+        job = self._generation_job(mode)
+        job.start(resume=resume)
+        phase = job.phases[0]
+        target_keys = [self._target_key(target) for target in targets]
+        pending_targets = job.begin_phase(phase, target_keys)
+        done_count = len(targets) - len(pending_targets)
+
         personalized_messages = []
-        
-        for i, target in enumerate(self.shared_state['targets']):
-            self.logger.info(f"🎯 Génération du message personnalisé pour la cible {i+1}/{len(self.shared_state['targets'])} : {target.get('uid', 'Unknown')}")
-            
-            if mode == "auto":
-                # Mode Auto : Analyse automatique du profil et sélection de persona
-                target_selected_bank = self._analyze_profile_and_select_bank([target], banks_config)
-                if target_selected_bank:
-                    self.logger.info(f"🎭 Mode Auto : Banque sélectionnée automatiquement : {target_selected_bank['name']}")
-                    message_content = self._generate_personalized_message_with_persona_mode(target_selected_bank, treasury_pubkey, target)
-                else:
-                    self.logger.warning("⚠️ Mode Auto : Aucun persona adaptée trouvée, passage en mode classique")
-                    message_content = self._generate_personalized_message_with_classic_mode(banks_config, treasury_pubkey, target, selected_bank)
-            elif mode == "persona":
-                # Mode Persona : Utilisation de la logique existante (sélection basée sur les thèmes)
-                target_selected_bank = self._select_bank_for_targets([target], banks_config)
-                if target_selected_bank:
-                    self.logger.info(f"🎭 Mode Persona : Banque sélectionnée : {target_selected_bank['name']}")
-                    message_content = self._generate_personalized_message_with_bank_mode(target_selected_bank, target)
+        retry_keys = set()
+        if done_count:
+            done_keys = set(target_keys[:done_count])
+            personalized_messages = [item for item in load_json(messages_file, [], self.logger)
+                                     if self._target_key(item.get('target', {})) in done_keys]
+            # Cibles en échec lors du lancement précédent : retentées avant les cibles restantes
+            retry_keys = job.failed_items(phase) & done_keys
+            self.logger.info(f"♻️ Reprise de la rédaction : {len(personalized_messages)} messages déjà générés, "
+                             f"{len(retry_keys)} échec(s) à retenter, {len(pending_targets)} cible(s) restante(s).")
+        pending_targets = [target for target in targets[:done_count] if self._target_key(target) in retry_keys] \
+            + targets[done_count:]
+
+        def generate(target):
+            self.logger.info(f"🎯 Génération du message personnalisé pour la cible : {target.get('uid', 'Unknown')}")
+            return self._generate_message_for_target(target, mode, banks_config, treasury_pubkey, selected_bank)
+
+        # Les sites web sont récupérés en parallèle des appels à l'IA, par un pool distinct
+        self._prefetch_websites(pending_targets)
+        try:
+            for target, message_content, error in self._ia_pool("Rédaction des messages").imap(generate, pending_targets):
+                key = self._target_key(target)
+                failed = None
+                if message_content and 'title' in message_content and 'text' in message_content:
+                    personalized_messages.append({
+                        'target': target,
+                        'title': message_content['title'],
+                        'message': message_content['text'],
+                        'mode': mode
+                    })
+                    # Écriture au fil de l'eau : un arrêt ne perd aucun message déjà rédigé
+                    atomic_write_json(messages_file, personalized_messages, indent=2)
+                    self.logger.info(f"✅ Message personnalisé généré pour {target.get('uid', 'Unknown')}")
+                    job.resolve(phase, key)
                 else:
-                    self.logger.info("📝 Mode Persona : Aucun persona adaptée, passage en mode classique")
-                    message_content = self._generate_personalized_message_with_classic_mode(banks_config, treasury_pubkey, target, selected_bank)
-            else:
-                # Mode Classique : Utiliser le persona déjà sélectionné
-                self.logger.info("📝 Mode Classique : Utilisation du persona sélectionné")
-                message_content = self._generate_personalized_message_with_classic_mode(banks_config, treasury_pubkey, target, selected_bank)
-
-            if message_content and 'title' in message_content and 'text' in message_content:
-                personalized_messages.append({
-                    'target': target,
-                    'title': message_content['title'],
-                    'message': message_content['text'],
-                    'mode': mode
-                })
-                self.logger.info(f"✅ Message personnalisé généré pour {target.get('uid', 'Unknown')}")
-            else:
-                self.logger.warning(f"⚠️ Échec de génération du message pour {target.get('uid', 'Unknown')}")
+                    self.logger.warning(f"⚠️ Échec de génération du message pour {target.get('uid', 'Unknown')}")
+                    failed = {key: error or "message vide"}
+                # Une cible retentée est déjà passée par le curseur
+                job.advance(phase, 0 if key in retry_keys else 1, failed)
+                job.save()
+        except KeyboardInterrupt:
+            job.finish('interrupted')
+            self.logger.warning(f"⏸️ Rédaction interrompue ({len(personalized_messages)} messages sauvegardés) : elle reprendra au prochain lancement.")
+            self.shared_state['status']['StrategistAgent'] = "Interrompu : reprise possible."
+            self.shared_state['personalized_messages'] = personalized_messages
+            return personalized_messages
+        finally:
+            # Sites préchargés pas encore récupérés (arrêt, échec) : la sortie n'attend pas toute la file
+            self._web_cache().cancel_pending()
+
+        job.end_phase(phase, {'generated': len(personalized_messages)})
+        failures = len(job.failed_items(phase))
+        if not personalized_messages:
+            job.finish('failed', "Aucun message généré")
+        elif failures:
+            # Travail non terminé : le prochain lancement ne retentera que les cibles en échec
+            job.finish('failed', f"{failures} cible(s) en échec")
+            self.logger.warning(f"⚠️ {failures} cible(s) en échec : elles seront retentées au prochain lancement (--restart pour tout régénérer).")
+        else:
+            job.finish('completed')
+        return self._report_generated_messages(personalized_messages)
 
+    def _report_generated_messages(self, personalized_messages):
+        """Met à jour le statut de l'agent après la rédaction et retourne les messages (None si aucun)."""
         if not personalized_messages:
             self.logger.error("Aucun message n'a pu être généré.")
             self.shared_state['status']['StrategistAgent'] = "Échec : Aucun message généré."
             return
 
-        # Sauvegarder tous les messages personnalisés
-        messages_file = os.path.join(self.shared_state['config']['workspace'], "personalized_messages.json")
-        with open(messages_file, 'w', encoding='utf-8') as f:
-            json.dump(personalized_messages, f, indent=2, ensure_ascii=False)
-
         report = f"{len(personalized_messages)} messages personnalisés générés et sauvegardés dans personalized_messages.json. Prêt pour validation par l'Opérateur."
         self.logger.info(f"✅ {report}")
         self.shared_state['status']['StrategistAgent'] = report
         self.shared_state['personalized_messages'] = personalized_messages
+        return personalized_messages
+
+    def _generate_message_for_target(self, target, mode, banks_config, treasury_pubkey, selected_bank=None):
+        """Rédige le message d'une cible selon le mode choisi (appelé depuis les workers du pool IA)."""
+        if mode == "auto":
+            # Mode Auto : Analyse automatique du profil et sélection de persona
+            target_selected_bank = self._analyze_profile_and_select_bank([target], banks_config)
+            if target_selected_bank:
+                self.logger.info(f"🎭 Mode Auto : Banque sélectionnée automatiquement : {target_selected_bank['name']}")
+                return self._generate_personalized_message_with_persona_mode(target_selected_bank, treasury_pubkey, target)
+            self.logger.warning("⚠️ Mode Auto : Aucun persona adaptée trouvée, passage en mode classique")
+        elif mode == "persona":
+            # Mode Persona : Utilisation de la logique existante (sélection basée sur les thèmes)
+            target_selected_bank = self._select_bank_for_targets([target], banks_config)
+            if target_selected_bank:
+                self.logger.info(f"🎭 Mode Persona : Banque sélectionnée : {target_selected_bank['name']}")
+                return self._generate_personalized_message_with_bank_mode(target_selected_bank, target)
+            self.logger.info("📝 Mode Persona : Aucun persona adaptée, passage en mode classique")
+        else:
+            # Mode Classique : Utiliser le persona déjà sélectionné
+            self.logger.info("📝 Mode Classique : Utilisation du persona sélectionné")
+        # Pas de choix interactif du persona depuis les workers : le choix a été fait avant la boucle
+        return self._generate_personalized_message_with_classic_mode(banks_config, treasury_pubkey, target, selected_bank, ask_bank=False)
+
+    def _persona_scorer(self, banks_config):
+        """Moteur de sélection locale des personas, reconstruit seulement quand les banques changent."""
+        fingerprint = json.dumps(banks_config.get('banks', {}), sort_keys=True, ensure_ascii=False)
+        cached = getattr(self, '_persona_scorer_cache', None)
+        if cached is None or cached[0] != fingerprint:
+            config = self.shared_state['config']
+            scorer = PersonaScorer(banks_config, config.get('persona_min_score', 0.1), config.get('persona_min_margin', 0.2))
+            self._persona_scorer_cache = cached = (fingerprint, scorer)
+        return cached[1]
+
+    def _template_profile(self, target):
+        """Données de personnalisation d'une cible (base de connaissance, sinon métadonnées de la cible)."""
+        profile_info = self._knowledge_cache().get(target.get('pubkey')) or {}
+        metadata = profile_info.get('metadata') or target.get('metadata', {})
+        source = (profile_info.get('profile') or {}).get('_source', {})
+        tags = [tag for tag in metadata.get('tags', []) if tag and tag != 'error']
+        language = metadata.get('language')
+        return {
+            'tags': tags,
+            'language': language if language and language != 'xx' else 'fr',
+            'city': metadata.get('city', ''),
+            'description': source.get('description', ''),
+            'website': self._get_target_website(target),
+        }
+
+    def _template_groups(self, targets, banks_config):
+        """
+        Regroupe les cibles par (persona, langue, thèmes principaux, ville connue).
+        Le persona est choisi localement (PersonaScorer), sans appel à l'IA.
+        Retourne {clé: [(cible, profil), ...]} dans l'ordre des cibles.
+        """
+        scorer = self._persona_scorer(banks_config)
+        cluster_size = self.shared_state['config'].get('template_cluster_tags', 2)
+        groups = {}
+        for target in targets:
+            profile = self._template_profile(target)
+            slot = scorer.select(profile['tags'], profile['description'])[0]
+            themes = tuple(sorted(profile['tags'][:cluster_size]))
+            key = (slot, profile['language'], themes, bool(profile['city']))
+            groups.setdefault(key, []).append((target, profile))
+        return groups
+
+    def _generate_template_messages(self, targets, banks_config, treasury_pubkey):
+        """
+        Mode Modèle : un seul message de base est rédigé par l'IA pour chaque
+        groupe de cibles, avec des variables ({{uid}}, {{themes}}, {{city}})
+        complétées localement pour chaque cible. Les cibles les plus riches
+        (voir 'template_polish_min_value') peuvent être retouchées par l'IA.
+        """
+        groups = self._template_groups(targets, banks_config)
+        self.logger.info(f"🧩 Mode Modèle : {len(targets)} cibles réparties en {len(groups)} groupe(s).")
+
+        def generate(key):
+            return self._generate_template_base(key, groups[key], banks_config, treasury_pubkey)
+
+        personalized_messages = {}
+        to_polish = []
+        min_value = self.shared_state['config'].get('template_polish_min_value')
+        for key, base, error in self._ia_pool("Messages modèles").imap(generate, list(groups)):
+            slot, language, themes, has_city = key
+            if not base or not base.get('text'):
+                self.logger.warning(f"⚠️ Échec du message modèle du groupe {slot}/{language}/{'+'.join(themes)} : {error or 'message vide'}")
+                continue
+            for target, profile in groups[key]:
+                message = {
+                    'target': target,
+                    'title': self._fill_template_slots(base.get('title', ''), target, profile, themes),
+                    'message': self._fill_template_slots(base['text'], target, profile, themes),
+                    'mode': 'template',
+                    'group': f"{slot}/{language}/{'+'.join(themes)}"
+                }
+                personalized_messages[self._target_key(target)] = message
+                if min_value is not None and self._target_value(profile) >= min_value:
+                    to_polish.append((message, profile, language))
+
+        if to_polish:
+            self.logger.info(f"✨ Retouche par l'IA de {len(to_polish)} cible(s) à fort potentiel.")
+            for (message, profile, language), polished, error in self._ia_pool("Retouche des messages").imap(
+                    lambda item: self._polish_template_message(*item), to_polish):
+                if polished and polished.get('text'):
+                    message.update(title=polished.get('title') or message['title'], message=polished['text'], polished=True)
+
+        # Ordre des cibles d'origine
+        return [personalized_messages[key] for key in (self._target_key(target) for target in targets)
+                if key in personalized_messages]
+
+    def _generate_template_base(self, key, members, banks_config, treasury_pubkey):
+        """Rédige le message de base d'un groupe, avec ses variables de personnalisation."""
+        slot, language, themes, has_city = key
+        themes_text = ', '.join(themes) or 'UPlanet'
+        instructions = f"""MESSAGE MODÈLE : ce message sera envoyé à {len(members)} prospect(s) partageant les centres d'intérêt suivants : {themes_text}.
+Utilise EXACTEMENT ces variables, qui seront remplacées pour chaque prospect :
+- {{{{uid}}}} : le nom du prospect (pour t'adresser directement à lui)
+- {{{{themes}}}} : ses centres d'intérêt"""
+        if has_city:
+            instructions += "\n- {{city}} : sa ville"
+        instructions += "\nN'invente aucun autre nom de personne ni de lieu."
+
+        bank = banks_config.get('banks', {}).get(slot) if slot is not None else None
+        if bank:
+            return self._generate_message_with_bank(bank, instructions, language)
+
+        # Sans persona adapté : méthode classique sur une cible « modèle »
+        template_target = {'pubkey': members[0][0].get('pubkey'), 'uid': '{{uid}}', 'tags': list(themes),
+                           'description': instructions}
+        content = self._generate_personalized_message_with_classic_mode(banks_config, treasury_pubkey, template_target,
+                                                                        None, ask_bank=False)
+        return self._parse_ai_message_response(content) if isinstance(content, str) else content
+
+    # Variables des messages modèles ; l'IA écrit parfois {uid} au lieu de {{uid}}
+    TEMPLATE_SLOT_RE = re.compile(r'\{\{?\s*(uid|themes|city)\s*\}?\}')
+
+    @classmethod
+    def _fill_template_slots(cls, text, target, profile, group_themes):
+        """Remplace les variables du message modèle par les données de la cible."""
+        matched = [tag for tag in profile['tags'] if tag in group_themes] or list(group_themes) or profile['tags'][:2]
+        values = {'uid': target.get('uid', ''), 'themes': ', '.join(matched), 'city': profile.get('city', '')}
+        return cls.TEMPLATE_SLOT_RE.sub(lambda match: values[match.group(1)], text)
+
+    @staticmethod
+    def _target_value(profile):
+        """Richesse d'un profil (thèmes, description, site web), pour réserver la retouche IA aux meilleures cibles."""
+        return len(profile['tags']) + (1 if profile['description'] else 0) + (2 if profile['website'] else 0)
+
+    def _polish_template_message(self, message, profile, language):
+        """Retouche par l'IA d'un message modèle déjà complété, pour une cible à fort potentiel."""
+        prompt = f"""Tu es l'Agent Stratège d'UPlanet. Voici un message de campagne déjà rédigé pour {message['target'].get('uid', 'un prospect')}.
+Adapte-le légèrement à son profil, sans changer sa structure, son ton ni les liens.
+
+PROFIL : thèmes {', '.join(profile['tags']) or 'inconnus'} ; description : {profile['description'][:500] or 'aucune'}
+
+TITRE : {message['title']}
+MESSAGE :
+{message['message']}
+
+Ta réponse DOIT être un objet JSON valide avec deux clés : "title" et "text"."""
+        return self._parse_ai_message_response(
+            self._call_ia_for_writing(prompt, language)
+        )
+
+    def _generation_job(self, mode):
+        """Suivi reprenable de la rédaction (une phase par mode, point de reprise dans le workspace)."""
+        config = self.shared_state['config']
+        checkpoint_file = os.path.join(config['workspace'], 'generation_job_checkpoint.json')
+        return AnalysisJob(checkpoint_file, (f"generation_{mode}",), self.logger)
+
+    @staticmethod
+    def _target_key(target):
+        return target.get('pubkey') or target.get('uid', '')
+
+    def _prefetch_websites(self, targets):
+        """
+        Lance la récupération des sites web des cibles dans le pool du cache web
+        ('web_fetch_workers' requêtes simultanées) ; _fetch_website_content
+        attend ensuite le résultat déjà en cours au lieu de refaire la requête.
+        """
+        urls = [self._get_target_website(target) or target.get('website') for target in targets]
+        return self._web_cache().prefetch([url for url in urls if url])
+
+    def _web_cache(self):
+        """Cache persistant du contenu des sites web, partagé via l'état partagé."""
+        cache = self.shared_state.get('web_cache')
+        if cache is None:
+            config = self.shared_state['config']
+            db_file = config.get('web_cache_db') or os.path.join(config['workspace'], 'web_cache.db')
+            cache = WebContentCache(db_file, ttl=config.get('web_cache_ttl_hours', 168) * 3600,
+                                    max_workers=config.get('web_fetch_workers', 4), logger=self.logger)
+            self.shared_state['web_cache'] = cache
+        return cache
 
     def _check_ollama_once(self):
         """Vérifie une seule fois que l'API Ollama est disponible."""
         if not getattr(self, '_ollama_checked', False):
             ollama_script = self.shared_state['config']['ollama_script']
             self.logger.info("Vérification de l'API Ollama...")
+            if self._llm_client().is_available():
+                self.logger.info("✅ Ollama API vérifiée.")
+                setattr(self, '_ollama_checked', True)
+                return True
             self.logger.debug(f"Exécution du script Ollama : {' '.join(ollama_script)}")
             subprocess.run(ollama_script, check=True, capture_output=True)
             self.logger.info("✅ Ollama API vérifiée.")
@@ -221,8 +480,13 @@ class StrategistAgent(Agent):
             self.logger.debug(f"Erreurs Perplexica (stderr) : {result.stderr.strip()}")
         return result.stdout
 
-    def _call_ia_for_writing(self, final_prompt, target_language='fr'):
-        """Appelle l'IA pour la rédaction du message dans la langue spécifiée"""
+    def _call_ia_for_writing(self, final_prompt, target_language='fr', cache_namespace=None):
+        """
+        Appelle l'IA pour la rédaction du message dans la langue spécifiée.
+        La rédaction libre n'est pas mise en cache : relancer une campagne (ou
+        --restart) doit produire de nouveaux messages. Seuls les appels
+        déterministes (ex: choix du persona) indiquent un 'cache_namespace'.
+        """
         # Vérifier si le prompt contient déjà des instructions de langue
         language_indicators = {
             'en': ['english', 'in english', 'write in english', 'you are uplanet'],
@@ -259,17 +523,10 @@ class StrategistAgent(Agent):
         else:
             prompt_with_language = final_prompt
         
-        question_script = self.shared_state['config']['question_script']
-        command = ['python3', question_script, prompt_with_language]
         self.logger.info("Génération du message par l'IA...")
-        # self.logger.debug(f"Exécution de la commande de rédaction : {' '.join(command[:2])}...")
         # self.logger.debug(f"Prompt envoyé à l'IA (premiers 3500 caractères) : {prompt_with_language[:3500]}...")
         self.logger.debug(f"🌍 Langue cible : {target_language}")
-        result = subprocess.run(command, capture_output=True, text=True, check=True)
-        # self.logger.debug(f"Réponse brute de l'IA (rédaction) : {result.stdout.strip()}")
-        if result.stderr.strip():
-            self.logger.debug(f"Erreurs de l'IA (stderr) : {result.stderr.strip()}")
-        return result.stdout
+        return self._llm_client().generate(prompt_with_language, cache_namespace=cache_namespace)
 
     def manage_memory_banks(self):
         """Interface de gestion des mémoires persona thématiques"""
@@ -442,45 +699,40 @@ class StrategistAgent(Agent):
     def _get_available_themes(self):
         """Récupère la liste des thèmes disponibles depuis l'analyse"""
         try:
-            enriched_file = self.shared_state['config']['enriched_prospects_file']
-            if os.path.exists(enriched_file):
-                with open(enriched_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-
-                # Extraire tous les thèmes uniques
-                themes = set()
-                for pubkey, profile_data in data.items():
-                    metadata = profile_data.get('metadata', {})
-                    tags = metadata.get('tags', [])
-                    if isinstance(tags, list) and tags != ['error']:
-                        themes.update(tags)
-
-                return sorted(list(themes))
+            return list(self._knowledge_cache().derived('available_themes', self._build_available_themes))
         except Exception as e:
             self.logger.error(f"Erreur lors de la récupération des thèmes : {e}")
 
         return []
 
+    @staticmethod
+    def _build_available_themes(data):
+        """Extrait tous les thèmes uniques de la base de connaissance"""
+        themes = set()
+        for pubkey, profile_data in data.items():
+            metadata = profile_data.get('metadata', {})
+            tags = metadata.get('tags', [])
+            if isinstance(tags, list) and tags != ['error']:
+                themes.update(tags)
+        return sorted(list(themes))
+
+    @staticmethod
+    def _build_themes_by_frequency(data):
+        """Compte la fréquence de chaque thème, triée par fréquence décroissante"""
+        theme_counts = {}
+        for pubkey, profile_data in data.items():
+            metadata = profile_data.get('metadata', {})
+            tags = metadata.get('tags', [])
+            if isinstance(tags, list) and tags != ['error']:
+                for tag in tags:
+                    theme_counts[tag] = theme_counts.get(tag, 0) + 1
+        return sorted(theme_counts.items(), key=lambda x: x[1], reverse=True)
+
     def _get_top_themes_with_frequency(self, limit=50):
         """Récupère le top N des thèmes avec leur fréquence d'occurrence"""
         try:
-            enriched_file = self.shared_state['config']['enriched_prospects_file']
-            if os.path.exists(enriched_file):
-                with open(enriched_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-
-                # Compter la fréquence de chaque thème
-                theme_counts = {}
-                for pubkey, profile_data in data.items():
-                    metadata = profile_data.get('metadata', {})
-                    tags = metadata.get('tags', [])
-                    if isinstance(tags, list) and tags != ['error']:
-                        for tag in tags:
-                            theme_counts[tag] = theme_counts.get(tag, 0) + 1
-
-                # Trier par fréquence décroissante et prendre le top N
-                sorted_themes = sorted(theme_counts.items(), key=lambda x: x[1], reverse=True)
-                return sorted_themes[:limit]
+            sorted_themes = self._knowledge_cache().derived('themes_by_frequency', self._build_themes_by_frequency)
+            return sorted_themes[:limit]
         except Exception as e:
             self.logger.error(f"Erreur lors de la récupération des thèmes : {e}")
 
@@ -1008,58 +1260,27 @@ Exemple de format de sortie :
             
             return message_data
         except Exception as e:
+            # Pas de message d'erreur déguisé en message : il serait envoyé tel quel (et recopié dans tout un groupe en mode Modèle)
             self.logger.error(f"Erreur lors de la génération avec persona : {e}")
-            return {"title": "Erreur de génération", "text": f"Une erreur est survenue: {e}"}
+            return None
 
     def _save_banks_config(self, banks_config, config_file):
         """Sauvegarde la configuration des personas"""
         try:
-            os.makedirs(os.path.dirname(config_file), exist_ok=True)
-            with open(config_file, 'w', encoding='utf-8') as f:
-                json.dump(banks_config, f, indent=2, ensure_ascii=False)
+            atomic_write_json(config_file, banks_config, indent=2)
         except Exception as e:
             self.logger.error(f"Erreur lors de la sauvegarde : {e}")
 
     def _inject_links(self, message, config):
         """Injecte intelligemment les liens dans le message en remplaçant les placeholders"""
-        # Charger la configuration des liens depuis le fichier
-        links_config = self._load_links_config()
-
-        # Patterns de détection des placeholders avec gestion des caractères collés
-        # Le pattern capture le placeholder ET les caractères collés après le ]
-        link_patterns = {
-            r'\[Lien vers OpenCollective\]([^\w\s]*)': links_config.get('opencollective', ''),
-            r'\[Lien vers Documentation\]([^\w\s]*)': links_config.get('documentation', ''),
-            r'\[Lien vers GitHub\]([^\w\s]*)': links_config.get('github', ''),
-            r'\[Lien vers Discord\]([^\w\s]*)': links_config.get('discord', ''),
-            r'\[Lien vers Telegram\]([^\w\s]*)': links_config.get('telegram', ''),
-            r'\[Lien vers Site Web\]([^\w\s]*)': links_config.get('website', ''),
-            r'\[Lien vers Blog\]([^\w\s]*)': links_config.get('blog', ''),
-            r'\[Lien vers Forum\]([^\w\s]*)': links_config.get('forum', ''),
-            r'\[Lien vers Wiki\]([^\w\s]*)': links_config.get('wiki', ''),
-            r'\[Lien vers Mastodon\]([^\w\s]*)': links_config.get('mastodon', ''),
-            r'\[Lien vers Nostr\]([^\w\s]*)': links_config.get('nostr', ''),
-            r'\[Lien vers IPFS\]([^\w\s]*)': links_config.get('ipfs', ''),
-            r'\[Lien vers G1\]([^\w\s]*)': links_config.get('g1', ''),
-            r'\[Lien vers UPlanet\]([^\w\s]*)': links_config.get('uplanet', ''),
-            r'\[Lien vers Astroport\]([^\w\s]*)': links_config.get('astroport', ''),
-            r'\[Lien vers Zen\]([^\w\s]*)': links_config.get('zen', ''),
-            r'\[Lien vers Multipass\]([^\w\s]*)': links_config.get('multipass', ''),
-        }
-
-        # Remplacer les placeholders par les vrais liens
-        for pattern, link in link_patterns.items():
-            if link:
-                message = re.sub(pattern, link, message, flags=re.IGNORECASE)
-            else:
-                # Si le lien n'est pas configuré, supprimer le placeholder et les caractères collés
-                message = re.sub(pattern, '', message, flags=re.IGNORECASE)
-
-        # Nettoyer les espaces multiples créés par les suppressions
-        message = re.sub(r'\s+', ' ', message)
-        message = re.sub(r'\n\s*\n\s*\n', '\n\n', message)
+        return self._link_renderer().render(message)
 
-        return message.strip()
+    def _link_renderer(self):
+        """Moteur d'injection des liens, compilé une fois par campagne à partir de la configuration des liens."""
+        renderer = getattr(self, '_link_renderer_cache', None)
+        if renderer is None:
+            renderer = self._link_renderer_cache = LinkRenderer(self._load_links_config())
+        return renderer
 
     def _get_target_language(self, target):
         """
@@ -1067,20 +1288,11 @@ Exemple de format de sortie :
         Retourne 'fr' par défaut si pas d'information disponible.
         """
         try:
-            # Charger la base de connaissance
-            kb_file = self.shared_state['config']['enriched_prospects_file']
-            if not os.path.exists(kb_file):
+            # Chercher le profil par pubkey dans la base de connaissance
+            profile_data = self._knowledge_cache().get(target.get('pubkey'))
+            if not profile_data:
                 return 'fr'  # Défaut français
             
-            with open(kb_file, 'r') as f:
-                knowledge_base = json.load(f)
-            
-            # Chercher le profil par pubkey
-            pubkey = target.get('pubkey')
-            if not pubkey or pubkey not in knowledge_base:
-                return 'fr'  # Défaut français
-            
-            profile_data = knowledge_base[pubkey]
             metadata = profile_data.get('metadata', {})
             language = metadata.get('language')
             
@@ -1102,27 +1314,7 @@ Exemple de format de sortie :
         links_config = self._load_links_config()
         available_links = []
 
-        link_names = {
-            'opencollective': 'OpenCollective',
-            'documentation': 'Documentation',
-            'github': 'GitHub',
-            'discord': 'Discord',
-            'telegram': 'Telegram',
-            'website': 'Site Web',
-            'blog': 'Blog',
-            'forum': 'Forum',
-            'wiki': 'Wiki',
-            'mastodon': 'Mastodon',
-            'nostr': 'Nostr',
-            'ipfs': 'IPFS',
-            'g1': 'G1',
-            'uplanet': 'UPlanet',
-            'astroport': 'Astroport',
-            'zen': 'Zen',
-            'multipass': 'Multipass'
-        }
-
-        for key, name in link_names.items():
+        for key, name in LINK_PLACEHOLDERS:
             if links_config.get(key):
                 available_links.append(f"• {name}: {links_config[key]}")
 
@@ -1175,9 +1367,8 @@ Exemple de format de sortie :
         links_config_file = os.path.join(self.shared_state['config']['workspace'], 'links_config.json')
 
         try:
-            os.makedirs(os.path.dirname(links_config_file), exist_ok=True)
-            with open(links_config_file, 'w', encoding='utf-8') as f:
-                json.dump(links_config, f, indent=2, ensure_ascii=False)
+            atomic_write_json(links_config_file, links_config, indent=2)
+            self._link_renderer_cache = None
             self.logger.info(f"✅ Configuration des liens sauvegardée dans {links_config_file}")
         except Exception as e:
             self.logger.error(f"❌ Erreur lors de la sauvegarde de la configuration des liens : {e}")
@@ -1193,28 +1384,7 @@ Exemple de format de sortie :
         # Charger la configuration actuelle
         links_config = self._load_links_config()
 
-        # Liste des liens configurables avec leurs noms d'affichage
-        link_configs = [
-            ('opencollective', 'OpenCollective'),
-            ('documentation', 'Documentation'),
-            ('github', 'GitHub'),
-            ('discord', 'Discord'),
-            ('telegram', 'Telegram'),
-            ('website', 'Site Web'),
-            ('blog', 'Blog'),
-            ('forum', 'Forum'),
-            ('wiki', 'Wiki'),
-            ('mastodon', 'Mastodon'),
-            ('nostr', 'Nostr'),
-            ('ipfs', 'IPFS'),
-            ('g1', 'G1'),
-            ('uplanet', 'UPlanet'),
-            ('astroport', 'Astroport'),
-            ('zen', 'Zen'),
-            ('multipass', 'Multipass'),
-        ]
-
-        for key, name in link_configs:
+        for key, name in LINK_PLACEHOLDERS:
             current_url = links_config.get(key, '')
             print(f"\n🔗 {name}")
             print(f"   Placeholder : [Lien vers {name}]")
@@ -1333,61 +1503,35 @@ Exemple de format de sortie :
         
         # Enrichir avec les données de la base de connaissance
         try:
-            kb_file = self.shared_state['config']['enriched_prospects_file']
-            if os.path.exists(kb_file):
-                with open(kb_file, 'r') as f:
-                    knowledge_base = json.load(f)
+            # Chercher par pubkey d'abord, puis par uid
+            search_key, profile_info = self._knowledge_cache().find(target.get('pubkey'), target.get('uid'))
+            if profile_info:
+                self.logger.debug(f"🔍 Profil trouvé : {target.get('uid', '')} (pubkey: {search_key})")
+                # Extraire les tags depuis les métadonnées
+                metadata = profile_info.get('metadata', {})
+                profile_data['tags'] = metadata.get('tags', [])
                 
-                # Chercher par pubkey d'abord, puis par uid
-                profile_info = None
-                search_key = None
-                
-                # Essayer par pubkey
-                pubkey = target.get('pubkey')
-                if pubkey and pubkey in knowledge_base:
-                    profile_info = knowledge_base[pubkey]
-                    search_key = pubkey
-                    self.logger.debug(f"🔍 Profil trouvé par pubkey : {pubkey}")
-                
-                # Si pas trouvé par pubkey, essayer par uid
-                if not profile_info:
-                    uid = target.get('uid')
-                    if uid:
-                        for key, info in knowledge_base.items():
-                            if info.get('uid') == uid:
-                                profile_info = info
-                                search_key = key
-                                self.logger.debug(f"🔍 Profil trouvé par uid : {uid} (pubkey: {key})")
-                                break
-                
-                if profile_info:
-                    # Extraire les tags depuis les métadonnées
-                    metadata = profile_info.get('metadata', {})
-                    profile_data['tags'] = metadata.get('tags', [])
+                # Extraire la description depuis le profil
+                profile = profile_info.get('profile', {})
+                if profile and '_source' in profile:
+                    source = profile['_source']
+                    profile_data['description'] = source.get('description', '')
                     
-                    # Extraire la description depuis le profil
-                    profile = profile_info.get('profile', {})
-                    if profile and '_source' in profile:
-                        source = profile['_source']
-                        profile_data['description'] = source.get('description', '')
-                        
-                        # Extraire le site web depuis les réseaux sociaux
-                        socials = source.get('socials', [])
-                        for social in socials:
-                            if isinstance(social, dict) and social.get('type') == 'web':
-                                profile_data['website'] = social.get('url', '')
-                                break
-                            elif isinstance(social, str) and 'http' in social:
-                                profile_data['website'] = social
-                                break
-                    
-                    self.logger.debug(f"✅ Profil enrichi pour {profile_data['uid']} : {len(profile_data['tags'])} tags, description: {len(profile_data['description'])} chars")
-                    self.logger.debug(f"🔍 Tags extraits : {profile_data['tags']}")
-                    self.logger.debug(f"🔍 Description extraite : {profile_data['description'][:100]}...")
-                else:
-                    self.logger.warning(f"⚠️ Profil non trouvé dans la base de connaissance pour {target.get('uid', 'Unknown')} (pubkey: {pubkey})")
+                    # Extraire le site web depuis les réseaux sociaux
+                    socials = source.get('socials', [])
+                    for social in socials:
+                        if isinstance(social, dict) and social.get('type') == 'web':
+                            profile_data['website'] = social.get('url', '')
+                            break
+                        elif isinstance(social, str) and 'http' in social:
+                            profile_data['website'] = social
+                            break
+                
+                self.logger.debug(f"✅ Profil enrichi pour {profile_data['uid']} : {len(profile_data['tags'])} tags, description: {len(profile_data['description'])} chars")
+                self.logger.debug(f"🔍 Tags extraits : {profile_data['tags']}")
+                self.logger.debug(f"🔍 Description extraite : {profile_data['description'][:100]}...")
             else:
-                self.logger.warning("⚠️ Base de connaissance non trouvée")
+                self.logger.warning(f"⚠️ Profil non trouvé dans la base de connaissance pour {target.get('uid', 'Unknown')} (pubkey: {target.get('pubkey')})")
         except Exception as e:
             self.logger.error(f"❌ Erreur lors de l'enrichissement du profil : {e}")
         
@@ -1399,6 +1543,18 @@ Exemple de format de sortie :
             self.logger.debug(f"🔍 Pas de site web pour {profile_data['uid']}")
             profile_data['web_context'] = ""
         
+        # Sélection locale (TF-IDF) : l'IA n'est consultée que pour les cas ambigus
+        config = self.shared_state['config']
+        slot, score, ambiguous, ranking = self._persona_scorer(banks_config).select(profile_data['tags'], profile_data['description'])
+        if slot is not None and (not ambiguous or not config.get('persona_llm_escalation', True)):
+            selected_bank = banks_config['banks'][slot]
+            self.logger.info(f"✅ Banque sélectionnée localement : {selected_bank['name']} (slot {slot}, score {score:.2f})")
+            return selected_bank
+        if not config.get('persona_llm_escalation', True):
+            return None
+        candidates = {candidate for candidate, candidate_score in ranking[:3] if candidate_score > 0}
+        self.logger.info(f"🤔 Sélection locale ambiguë (score {score:.2f}), arbitrage par l'IA entre {len(candidates) or 'tous les'} persona(s).")
+
         # Construire le prompt d'analyse
         analysis_prompt = f"""Tu es un expert en analyse de profils pour UPlanet. Tu dois analyser le profil d'un prospect et déterminer quelle persona de mémoire (persona) est la plus adaptée pour lui adresser un message personnalisé.
 
@@ -1423,6 +1579,8 @@ BANQUES DE MÉMOIRE DISPONIBLES :"""
         available_banks = []
         for slot in range(12):
             bank = banks_config['banks'].get(str(slot), {})
+            if candidates and str(slot) not in candidates:
+                continue
             if bank.get('name') and bank.get('corpus'):
                 available_banks.append((slot, bank))
                 vocab = ', '.join(bank.get('corpus', {}).get('vocabulary', []))  # All vocabulary keywords
@@ -1443,7 +1601,7 @@ INSTRUCTIONS :
 1. Analyse le profil du prospect en détail
 2. Identifie ses centres d'intérêt, son domaine d'activité, ses valeurs
 3. Détermine quel archetype de persona correspond le mieux à son profil
-4. Réponds UNIQUEMENT avec le numéro du persona (0-{len(available_banks)}) qui correspond le mieux
+4. Réponds UNIQUEMENT avec le numéro de banque du persona ({', '.join(str(slot) for slot, bank in available_banks)}) qui correspond le mieux
 5. Si aucun persona ne correspond vraiment, réponds "AUCUNE"
 
 IMPORTANT : Assure-toi que ta réponse numérique correspond à ton raisonnement !
@@ -1453,7 +1611,7 @@ ANALYSE :"""
         # Appeler l'IA pour l'analyse
         try:
             self.logger.info("🧠 Analyse du profil par l'IA...")
-            analysis_result = self._call_ia_for_writing(analysis_prompt)
+            analysis_result = self._call_ia_for_writing(analysis_prompt, cache_namespace='persona_selection')
             
             # Debug : afficher la réponse complète
             # self.logger.debug(f"🔍 Réponse complète de l'IA : {analysis_result}")
@@ -1468,8 +1626,9 @@ ANALYSE :"""
                 bank_list = [f"{slot}:{bank['name']}" for slot, bank in available_banks]
                 self.logger.debug(f"🔍 Banques disponibles : {bank_list}")
                 
-                if 0 <= bank_index < len(available_banks):
-                    selected_slot, selected_bank = available_banks[bank_index]
+                banks_by_slot = dict(available_banks)
+                if bank_index in banks_by_slot:
+                    selected_slot, selected_bank = bank_index, banks_by_slot[bank_index]
                     self.logger.info(f"✅ Banque sélectionnée automatiquement : {selected_bank['name']} (slot {selected_slot})")
                     
                     # Afficher le raisonnement
@@ -1483,7 +1642,7 @@ ANALYSE :"""
                     
                     return selected_bank
                 else:
-                    self.logger.warning(f"⚠️ Index de persona invalide : {bank_index} (max: {len(available_banks)-1})")
+                    self.logger.warning(f"⚠️ Numéro de persona invalide : {bank_index} (attendu : {', '.join(str(slot) for slot, bank in available_banks)})")
                     bank_list = [f"{slot}:{bank['name']}" for slot, bank in available_banks]
                     self.logger.debug(f"🔍 Banques disponibles : {bank_list}")
             else:
@@ -1592,13 +1751,13 @@ INSTRUCTIONS DE PERSONNALISATION :
         """Génère un message en mode Auto avec le persona sélectionnée automatiquement (méthode legacy)"""
         return self._generate_personalized_message_with_bank_mode(selected_bank, self.shared_state['targets'][0])
 
-    def _generate_personalized_message_with_classic_mode(self, banks_config, treasury_pubkey, target, selected_bank=None):
+    def _generate_personalized_message_with_classic_mode(self, banks_config, treasury_pubkey, target, selected_bank=None, ask_bank=True):
         """Génère un message personnalisé en mode Classique pour une cible spécifique"""
         self.logger.info(f"📝 Mode Classique : Génération du message personnalisé pour {target.get('uid', 'Unknown')}")
         
         try:
             # Proposer le choix d'un persona de contexte seulement si pas déjà sélectionné
-            if selected_bank is None:
+            if selected_bank is None and ask_bank:
                 selected_bank = self._choose_bank_for_classic_method(banks_config)
             
             # Récupérer la langue du profil (doit être défini avant le bloc if)
@@ -1720,7 +1879,7 @@ INSTRUCTIONS DE PERSONNALISATION :
     def _parse_ai_message_response(self, raw_response: str) -> dict:
         """Parses the JSON response from the AI to extract title and text."""
         if not raw_response:
-            return {"title": "Invitation UPlanet", "text": "Aucun message n'a été généré."}
+            return None
 
         # The AI might wrap the JSON in markdown ```json ... ``` or just be noisy.
         # We look for the first '{' and the last '}' to extract the JSON object.
@@ -2663,105 +2822,22 @@ Réponds UNIQUEMENT avec le JSON valide, sans texte avant ou après."""
     def _get_target_website(self, target):
         """Récupère le site web d'une cible depuis les métadonnées enrichies"""
         try:
-            kb_file = self.shared_state['config']['enriched_prospects_file']
-            if os.path.exists(kb_file):
-                with open(kb_file, 'r') as f:
-                    knowledge_base = json.load(f)
-                
-                pubkey = target.get('pubkey')
-                if pubkey and pubkey in knowledge_base:
-                    profile_info = knowledge_base[pubkey]
-                    profile = profile_info.get('profile', {})
-                    if profile and '_source' in profile:
-                        source = profile['_source']
-                        socials = source.get('socials', [])
-                        for social in socials:
-                            if isinstance(social, dict) and social.get('type') == 'web':
-                                return social.get('url', '')
-                            elif isinstance(social, str) and 'http' in social:
-                                return social
+            profile_info = self._knowledge_cache().get(target.get('pubkey'))
+            if profile_info:
+                profile = profile_info.get('profile', {})
+                if profile and '_source' in profile:
+                    source = profile['_source']
+                    socials = source.get('socials', [])
+                    for social in socials:
+                        if isinstance(social, dict) and social.get('type') == 'web':
+                            return social.get('url', '')
+                        elif isinstance(social, str) and 'http' in social:
+                            return social
         except Exception as e:
             self.logger.debug(f"⚠️ Erreur lors de la récupération du site web : {e}")
         
         return ""
 
     def _fetch_website_content(self, url, max_length=2000):
-        """Récupère le contenu d'un site web et le convertit en markdown"""
-        try:
-            import requests
-            from bs4 import BeautifulSoup
-            import html2text
-            
-            self.logger.info(f"🌐 Récupération du contenu de : {url}")
-            
-            # Configuration des headers pour éviter d'être bloqué
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-                'Accept-Language': 'fr,fr-FR;q=0.8,en-US;q=0.5,en;q=0.3',
-                'Accept-Encoding': 'gzip, deflate',
-                'Connection': 'keep-alive',
-                'Upgrade-Insecure-Requests': '1',
-            }
-            
-            # Récupération du contenu avec timeout
-            response = requests.get(url, headers=headers, timeout=10)
-            response.raise_for_status()
-            
-            # Parsing HTML avec BeautifulSoup
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Suppression des éléments non désirés
-            for element in soup(['script', 'style', 'nav', 'footer', 'header', 'aside']):
-                element.decompose()
-            
-            # Extraction du contenu principal
-            content = ""
-            
-            # Essayer de trouver le contenu principal
-            main_selectors = ['main', 'article', '.content', '.main', '#content', '#main']
-            for selector in main_selectors:
-                main_content = soup.select_one(selector)
-                if main_content:
-                    content = main_content.get_text(separator=' ', strip=True)
-                    break
-            
-            # Si pas de contenu principal trouvé, prendre le body
-            if not content:
-                content = soup.get_text(separator=' ', strip=True)
-            
-            # Nettoyage du contenu
-            import re
-            # Supprimer les espaces multiples
-            content = re.sub(r'\s+', ' ', content)
-            # Supprimer les lignes vides
-            content = re.sub(r'\n\s*\n', '\n', content)
-            # Limiter la longueur
-            if len(content) > max_length:
-                content = content[:max_length] + "..."
-            
-            # Conversion en markdown basique
-            h = html2text.HTML2Text()
-            h.ignore_links = False
-            h.ignore_images = False
-            h.body_width = 0  # Pas de limite de largeur
-            
-            markdown_content = h.handle(str(soup))
-            
-            # Nettoyer le markdown
-            markdown_content = re.sub(r'\n\s*\n\s*\n', '\n\n', markdown_content)
-            if len(markdown_content) > max_length:
-                markdown_content = markdown_content[:max_length] + "..."
-            
-            self.logger.info(f"✅ Contenu récupéré : {len(markdown_content)} caractères")
-            return markdown_content
-            
-        except requests.exceptions.Timeout:
-            self.logger.warning(f"⚠️ Timeout lors de la récupération de {url}")
-            return f"Site web : {url} (timeout lors de la récupération)"
-        except requests.exceptions.RequestException as e:
-            self.logger.warning(f"⚠️ Erreur lors de la récupération de {url} : {e}")
-            return f"Site web : {url} (erreur de récupération)"
-        except Exception as e:
-            self.logger.warning(f"⚠️ Erreur lors du traitement de {url} : {e}")
-            return f"Site web : {url} (erreur de traitement)"
+        """Récupère le contenu d'un site web converti en markdown (via le cache web)"""
+        return self._web_cache().get(url, max_length)
@@ -0,0 +1,218 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class WebContentCache:
+    """
+    Cache persistant (SQLite) du contenu des sites web des cibles.
+    Chaque page est téléchargée via une session HTTP partagée (connexions
+    keep-alive), analysée une seule fois, et seul le texte extrait est conservé.
+    Une entrée est servie telle quelle pendant 'ttl' secondes ; au-delà elle
+    est revalidée par une requête conditionnelle (ETag / Last-Modified), et
+    resservie si le site est devenu injoignable. Les échecs sont mémorisés
+    'error_ttl' secondes pour ne pas retenter un site en panne à chaque cible.
+    prefetch() télécharge un lot d'URLs en parallèle ; get() attend alors la
+    requête déjà en cours au lieu d'en lancer une seconde. cancel_pending()
+    abandonne les téléchargements pas encore commencés (arrêt d'une campagne).
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS pages (
+            url TEXT PRIMARY KEY,
+            content TEXT NOT NULL,
+            etag TEXT,
+            last_modified TEXT,
+            fetched_at REAL NOT NULL,
+            error INTEGER NOT NULL DEFAULT 0
+        );
+    """
+    HEADERS = {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+        'Accept-Language': 'fr,fr-FR;q=0.8,en-US;q=0.5,en;q=0.3',
+        'Accept-Encoding': 'gzip, deflate',
+        'Upgrade-Insecure-Requests': '1',
+    }
+    # Texte conservé par page (les appelants en demandent en général 2000 caractères)
+    MAX_STORED_CHARS = 20000
+
+    def __init__(self, db_file, ttl=7 * 86400, error_ttl=3600, max_workers=4, timeout=10, logger=None):
+        self.db_file = db_file
+        self.ttl = ttl
+        self.error_ttl = error_ttl
+        self.max_workers = max(1, int(max_workers or 1))
+        self.timeout = timeout
+        self.logger = logger
+        self.session = requests.Session()
+        self.session.headers.update(self.HEADERS)
+        adapter = HTTPAdapter(pool_connections=self.max_workers, pool_maxsize=self.max_workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self._lock = threading.RLock()
+        self._in_flight = {}
+        self._executor = None
+        self.hits = 0
+        self.revalidated = 0
+        self.downloads = 0
+        os.makedirs(os.path.dirname(os.path.abspath(db_file)), exist_ok=True)
+        self._conn = sqlite3.connect(db_file, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.executescript(self.SCHEMA)
+
+    def get(self, url, max_length=2000):
+        """Retourne le texte extrait de la page (tronqué à 'max_length' caractères)."""
+        with self._lock:
+            future = self._in_flight.get(url)
+        content = future.result() if future is not None else self._fetch(url)
+        if len(content) > max_length:
+            content = content[:max_length] + "..."
+        return content
+
+    def prefetch(self, urls):
+        """Lance le téléchargement en arrière-plan des URLs absentes ou périmées du cache."""
+        started = 0
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="astrobot-web")
+            for url in dict.fromkeys(urls):
+                if not url or url in self._in_flight or self._fresh_row(url):
+                    continue
+                self._in_flight[url] = self._executor.submit(self._fetch, url)
+                started += 1
+        if started:
+            self._log('info', f"🌐 {started} site(s) web en cours de récupération en arrière-plan.")
+        return started
+
+    def cancel_pending(self):
+        """
+        Annule les téléchargements préchargés pas encore commencés (ex: après
+        un Ctrl-C), pour que la sortie n'attende pas toute la file. Ceux en
+        cours se terminent en arrière-plan. Retourne le nombre d'annulations.
+        """
+        with self._lock:
+            cancelled = sum(1 for future in self._in_flight.values() if future.cancel())
+            self._in_flight = {}
+        if cancelled:
+            self._log('info', f"⏹️ {cancelled} récupération(s) de site web annulée(s).")
+        return cancelled
+
+    def _fresh_row(self, url):
+        row = self._row(url)
+        if row is None:
+            return None
+        content, etag, last_modified, fetched_at, error = row
+        age = time.time() - fetched_at
+        return row if age < (self.error_ttl if error else self.ttl) else None
+
+    def _row(self, url):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT content, etag, last_modified, fetched_at, error FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+
+    def _fetch(self, url):
+        try:
+            row = self._row(url)
+            if row is not None:
+                content, etag, last_modified, fetched_at, error = row
+                if time.time() - fetched_at < (self.error_ttl if error else self.ttl):
+                    self.hits += 1
+                    return content
+            return self._download(url, None if row is None or row[4] else row)
+        finally:
+            with self._lock:
+                self._in_flight.pop(url, None)
+
+    def _download(self, url, stale_row=None):
+        headers = {}
+        if stale_row is not None:
+            if stale_row[1]:
+                headers['If-None-Match'] = stale_row[1]
+            if stale_row[2]:
+                headers['If-Modified-Since'] = stale_row[2]
+        try:
+            self._log('info', f"🌐 Récupération du contenu de : {url}")
+            response = self.session.get(url, headers=headers, timeout=self.timeout)
+            if response.status_code == 304 and stale_row is not None:
+                self.revalidated += 1
+                with self._lock, self._conn:
+                    self._conn.execute("UPDATE pages SET fetched_at = ? WHERE url = ?", (time.time(), url))
+                return stale_row[0]
+            response.raise_for_status()
+            content = self.extract_content(response.content)[:self.MAX_STORED_CHARS]
+            self.downloads += 1
+            self._store(url, content, response.headers.get('ETag'), response.headers.get('Last-Modified'))
+            self._log('info', f"✅ Contenu récupéré : {len(content)} caractères")
+            return content
+        except requests.exceptions.RequestException as e:
+            if stale_row is not None:
+                self._log('warning', f"⚠️ {url} injoignable ({e}), contenu en cache réutilisé.")
+                return stale_row[0]
+            if isinstance(e, requests.exceptions.Timeout):
+                self._log('warning', f"⚠️ Timeout lors de la récupération de {url}")
+                message = f"Site web : {url} (timeout lors de la récupération)"
+            else:
+                self._log('warning', f"⚠️ Erreur lors de la récupération de {url} : {e}")
+                message = f"Site web : {url} (erreur de récupération)"
+        except Exception as e:
+            self._log('warning', f"⚠️ Erreur lors du traitement de {url} : {e}")
+            message = f"Site web : {url} (erreur de traitement)"
+        self._store(url, message, None, None, error=True)
+        return message
+
+    def _store(self, url, content, etag, last_modified, error=False):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages (url, content, etag, last_modified, fetched_at, error) "
+                "VALUES (?, ?, ?, ?, ?, ?)", (url, content, etag, last_modified, time.time(), int(error))
+            )
+
+    @staticmethod
+    def extract_content(html):
+        """
+        Convertit une page HTML en markdown en une seule analyse : le document
+        est lu une fois par BeautifulSoup, débarrassé des éléments de navigation,
+        et seul son contenu principal est converti par html2text.
+        """
+        from bs4 import BeautifulSoup
+        import html2text
+
+        soup = BeautifulSoup(html, 'html.parser')
+        for element in soup(['script', 'style', 'nav', 'footer', 'header', 'aside']):
+            element.decompose()
+
+        main_content = None
+        for selector in ('main', 'article', '.content', '.main', '#content', '#main'):
+            main_content = soup.select_one(selector)
+            if main_content:
+                break
+
+        converter = html2text.HTML2Text()
+        converter.ignore_links = False
+        converter.ignore_images = False
+        converter.body_width = 0  # Pas de limite de largeur
+        markdown_content = converter.handle(str(main_content or soup))
+        return re.sub(r'\n\s*\n\s*\n', '\n\n', markdown_content).strip()
+
+    def stats(self):
+        return {'hits': self.hits, 'revalidated': self.revalidated, 'downloads': self.downloads}
+
+    def close(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+            self._in_flight = {}
+            self._conn.close()
+        self.session.close()
+
+    def _log(self, level, message):
+        if self.logger:
+            getattr(self.logger, level)(message)
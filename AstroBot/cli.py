@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Interface en ligne de commande d'AstroBot (sans menus interactifs).
+
+Chaque sous-commande exécute une étape de la chaîne de campagne et affiche
+son résultat en JSON sur la sortie standard ; les journaux et l'affichage
+des agents sont renvoyés sur la sortie d'erreur. Code de sortie : 0 en cas
+de succès, 1 en cas d'échec, 2 pour une commande invalide.
+
+Exemples :
+    python3 main.py sync
+    python3 main.py analyze suite
+    python3 main.py target --where "tag=permaculture|jardinage" --where language=fr --limit 200
+    python3 main.py generate --mode auto
+    python3 main.py send --channel jaklis --yes
+    python3 main.py send --channel jaklis --channel nostr --dry-run
+    python3 main.py receive --auto
+    python3 main.py sync-inbox --loop --interval 300
+
+Exemples cron :
+    */30 * * * * cd /chemin/vers/AstroBot && python3 main.py analyze suite
+    */5 * * * * cd /chemin/vers/AstroBot && python3 main.py sync-inbox
+"""
+import argparse
+import contextlib
+import json
+import sys
+import time
+
+
+def parse_filter(expression):
+    """
+    Analyse une expression de ciblage 'index=valeur1|valeur2' (au moins une
+    des valeurs) ou 'index!=valeur' (aucune des valeurs).
+    Retourne le triplet (index, valeurs, exclure) attendu par AnalystAgent.select_targets.
+    """
+    exclude = '!=' in expression
+    name, sep, values = expression.partition('!=' if exclude else '=')
+    values = [value.strip() for value in values.split('|') if value.strip()]
+    if not sep or not name.strip() or not values:
+        raise argparse.ArgumentTypeError(f"expression de ciblage invalide : '{expression}' (attendu : index=valeur1|valeur2)")
+    return name.strip().lower(), values, exclude
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='astrobot', description="AstroBot en mode non interactif (sortie JSON).")
+    parser.add_argument('--workspace', help="Répertoire de travail (par défaut : AstroBot/workspace)")
+    parser.add_argument('--prospect-file', help="Fichier g1prospect.json source")
+    subparsers = parser.add_subparsers(dest='command', metavar='commande')
+    subparsers.required = True
+
+    subparsers.add_parser('sync', help="Synchronise la base de connaissance avec le fichier de prospects")
+
+    analyze = subparsers.add_parser('analyze', help="Analyse la base de connaissance")
+    analyze.add_argument('kind', nargs='?', default='suite', choices=('suite', 'geo', 'thematic'),
+                         help="suite optimisée reprenable (défaut), géo-linguistique ou thématique")
+    analyze.add_argument('--restart', action='store_true', help="Ignore le point de reprise de la suite")
+
+    target = subparsers.add_parser('target', help="Sélectionne les cibles de la campagne")
+    target.add_argument('--where', dest='filters', action='append', type=parse_filter, default=[],
+                        metavar='INDEX=VALEURS',
+                        help="Filtre (répétable, combinés par ET) : tag, web2, language, country, region, source ; "
+                             "une région s'écrit « Région, Pays » (ex: \"region=Occitanie, France\")")
+    target.add_argument('--limit', type=int, help="Nombre maximal de cibles (les premières par ordre de pubkey)")
+    target.add_argument('--dry-run', action='store_true', help="N'écrit pas todays_targets.json")
+
+    generate = subparsers.add_parser('generate', help="Rédige les messages personnalisés des cibles")
+    generate.add_argument('--mode', default='auto', choices=('auto', 'persona', 'classic', 'template'))
+    generate.add_argument('--bank', type=int, default=-1,
+                          help="Persona (slot 0-11) du mode classique, -1 pour aucun")
+    generate.add_argument('--restart', action='store_true', help="Ignore les messages d'une rédaction interrompue")
+
+    send = subparsers.add_parser('send', help="Envoie la campagne préparée")
+    send.add_argument('--channel', required=True, action='append', choices=('jaklis', 'mailjet', 'nostr'),
+                      help="Canal d'envoi (répétable : les canaux sont envoyés en parallèle)")
+    send.add_argument('--yes', action='store_true', help="Confirme l'envoi (sinon seul un aperçu est produit)")
+    send.add_argument('--dry-run', action='store_true', help="Simule l'envoi sans exécuter les commandes")
+
+    receive = subparsers.add_parser('receive', help="Récupère les réponses reçues")
+    receive.add_argument('--auto', action='store_true',
+                         help="Traite automatiquement chaque réponse (et la retire de la file d'attente)")
+    receive.add_argument('--no-sync', action='store_true', help="Ne relève pas les messageries, lit seulement la file")
+
+    sync_inbox = subparsers.add_parser('sync-inbox', help="Relève les messageries et met en file les nouveaux messages")
+    sync_inbox.add_argument('--channel', action='append', choices=('jaklis', 'nostr'),
+                            help="Messagerie à relever (répétable, défaut : toutes celles configurées)")
+    sync_inbox.add_argument('--loop', action='store_true', help="Relève en boucle (mode démon, Ctrl-C pour arrêter)")
+    sync_inbox.add_argument('--interval', type=int, help="Secondes entre deux relèves en boucle")
+    sync_inbox.add_argument('--iterations', type=int, help="Nombre de relèves en boucle (défaut : illimité)")
+    return parser
+
+
+def _knowledge_stats(analyst):
+    return analyst._knowledge_store().progress_stats()
+
+
+def cmd_sync(orchestrator, args):
+    analyst = orchestrator.agents['analyste']
+    knowledge_base = analyst._load_and_sync_knowledge_base()
+    return {'ok': bool(knowledge_base), 'profiles': len(knowledge_base)}
+
+
+def cmd_analyze(orchestrator, args):
+    analyst = orchestrator.agents['analyste']
+    if args.kind == 'suite':
+        summary = analyst.run_optimized_analysis_suite(resume=not args.restart)
+        return {'ok': bool(summary) and summary['status'] == 'completed', 'job': summary}
+    if args.kind == 'geo':
+        analyst.run_geo_linguistic_analysis()
+    else:
+        analyst.run_thematic_analysis()
+    return {'ok': True, 'knowledge_base': _knowledge_stats(analyst)}
+
+
+def cmd_target(orchestrator, args):
+    analyst = orchestrator.agents['analyste']
+    targets = analyst.select_targets(args.filters, limit=args.limit, save=not args.dry_run)
+    languages = {}
+    for target in targets:
+        language = target.get('metadata', {}).get('language', 'unknown')
+        languages[language] = languages.get(language, 0) + 1
+    return {
+        'ok': bool(targets),
+        'count': len(targets),
+        'saved': bool(targets) and not args.dry_run,
+        'languages': languages,
+        'targets': [{'pubkey': target['pubkey'], 'uid': target['uid']} for target in targets]
+    }
+
+
+def cmd_generate(orchestrator, args):
+    strategist = orchestrator.agents['stratège']
+    messages = strategist.run(mode=args.mode, bank_slot=args.bank, resume=not args.restart) or []
+    return {
+        'ok': bool(messages),
+        'count': len(messages),
+        'targets': len(orchestrator.shared_state.get('targets') or []),
+        'status': orchestrator.shared_state['status'].get('StrategistAgent')
+    }
+
+
+def cmd_send(orchestrator, args):
+    operator = orchestrator.agents['opérateur']
+    if not args.yes and not args.dry_run:
+        # Sans confirmation explicite, on s'arrête à l'aperçu de validation
+        return {'ok': False, 'sent': False, 'error': "Envoi non confirmé : ajouter --yes pour lancer la campagne."}
+    slot = operator._run_send_campaign(channel=','.join(args.channel), assume_yes=True, dry_run=args.dry_run)
+    return {
+        'ok': slot is not None,
+        'sent': slot is not None and not args.dry_run,
+        'dry_run': args.dry_run,
+        'channels': args.channel,
+        'slot': slot,
+        'status': orchestrator.shared_state['status'].get('OperatorAgent')
+    }
+
+
+def cmd_receive(orchestrator, args):
+    operator = orchestrator.agents['opérateur']
+    responses = operator.fetch_new_responses(sync=not args.no_sync)
+    results = []
+    for response in responses:
+        entry = {key: response.get(key) for key in ('sender_pubkey', 'sender_uid', 'title', 'content', 'timestamp',
+                                                   'slot', 'campaign')}
+        if args.auto:
+            auto_response = operator._process_response_automatically(response)
+            entry['auto_response'] = auto_response
+            operator.acknowledge_responses([response])
+        results.append(entry)
+    return {'ok': True, 'count': len(results), 'responses': results}
+
+
+def cmd_sync_inbox(orchestrator, args):
+    inbox = orchestrator.agents['opérateur']._inbox_sync()
+    channels = args.channel or list(inbox.sources)
+    if not args.loop:
+        counts = inbox.sync(channels)
+        return {'ok': all(count is not None for count in counts.values()), 'new_messages': counts,
+                'pending': len(inbox.pending())}
+
+    interval = args.interval or orchestrator.shared_state['config'].get('inbox_sync_interval_seconds', 300)
+    inbox.sources = {channel: inbox.sources[channel] for channel in channels if channel in inbox.sources}
+    totals = inbox.run_forever(interval, args.iterations)
+    return {'ok': True, 'new_messages': totals, 'pending': len(inbox.pending())}
+
+
+COMMANDS = {
+    'sync': cmd_sync,
+    'analyze': cmd_analyze,
+    'target': cmd_target,
+    'generate': cmd_generate,
+    'send': cmd_send,
+    'receive': cmd_receive,
+    'sync-inbox': cmd_sync_inbox,
+}
+
+
+def run_command(orchestrator, args):
+    """
+    Exécute une sous-commande et retourne son résultat (dictionnaire
+    sérialisable en JSON, avec 'command', 'ok' et 'elapsed_seconds').
+    """
+    start_time = time.time()
+    try:
+        result = COMMANDS[args.command](orchestrator, args)
+    except Exception as e:
+        orchestrator.logger.error(f"❌ Commande '{args.command}' en échec : {e}")
+        result = {'ok': False, 'error': str(e)}
+    return dict({'command': args.command}, **result, elapsed_seconds=round(time.time() - start_time, 2))
+
+
+def main(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+    args = build_parser().parse_args(argv)
+
+    # L'affichage des agents (print) ne doit pas se mêler à la sortie JSON
+    with contextlib.redirect_stdout(sys.stderr):
+        from main import AstroBotOrchestrator
+        orchestrator = AstroBotOrchestrator(interactive=False, workspace=args.workspace,
+                                            prospect_file=args.prospect_file)
+        result = run_command(orchestrator, args)
+
+    print(json.dumps(result, indent=2, ensure_ascii=False, default=str))
+    return 0 if result['ok'] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 import os
+import sys
 import json
 import time
 import subprocess
@@ -7,25 +8,30 @@ import logging
 from agents.analyst_agent import AnalystAgent
 from agents.strategist_agent import StrategistAgent
 from agents.operator_agent import OperatorAgent
+from agents import persistence
 
 class AstroBotOrchestrator:
-    def __init__(self):
+    def __init__(self, interactive=True, workspace=None, prospect_file=None):
+        # En mode non interactif (ligne de commande, cron), rien n'est demandé à l'utilisateur
+        self.interactive = interactive
         self.setup_logging()
         
         # Base directory for robust path construction using home directory
         base_path = os.path.expanduser("~/.zen")
         astroport_one_path = os.path.join(base_path, "Astroport.ONE")
         script_dir = os.path.dirname(os.path.abspath(__file__))
+        workspace_dir = os.path.abspath(os.path.expanduser(workspace)) if workspace else os.path.join(script_dir, "workspace")
 
         self.shared_state = {
             "config": {
                 # --- Fichiers de données ---
-                "prospect_file": os.path.join(base_path, "game/g1prospect.json"),
-                "enriched_prospects_file": os.path.join(script_dir, "workspace", "enriched_prospects.json"),
+                "prospect_file": prospect_file or os.path.join(base_path, "game/g1prospect.json"),
+                "enriched_prospects_file": os.path.join(workspace_dir, "enriched_prospects.json"),
+                "knowledge_base_db": os.path.join(workspace_dir, "enriched_prospects.db"),
 
                 # --- Workspace et Prompts (locaux à l'agent) ---
-                "workspace": os.path.join(script_dir, "workspace"),
-                "blocklist_file": os.path.join(script_dir, "workspace", "blocklist.json"),
+                "workspace": workspace_dir,
+                "blocklist_file": os.path.join(workspace_dir, "blocklist.json"),
                 "strategist_prompt_file": os.path.join(script_dir, "prompts", "strategist_prompt.txt"),
                 "analyst_prompt_file": os.path.join(script_dir, "prompts", "analyst_prompt.txt"),
                 "analyst_deep_dive_prompt_file": os.path.join(script_dir, "prompts", "analyst_deep_dive_prompt.txt"),
@@ -37,7 +43,7 @@ class AstroBotOrchestrator:
                 "cesium_node": "https://g1.data.e-is.pro",   # Nœud Cesium+ à utiliser
 
                 # --- Scripts Externes (dans ~/.zen/Astroport.ONE) ---
-                "question_script": os.path.join(astroport_one_path, "IA", "question.py"),
+                "question_script": os.path.join(astroport_one_path, "IA", "question.py"),  # Repli si l'API Ollama est injoignable
                 "jaklis_script": os.path.join(astroport_one_path, "tools", "jaklis", "jaklis.py"),
                 "mailjet_script": os.path.join(astroport_one_path, "tools", "mailjet.sh"),
                 "nostr_dm_script": os.path.join(astroport_one_path, "tools", "nostr_send_dm.py"),
@@ -46,7 +52,70 @@ class AstroBotOrchestrator:
                 "perplexica_script_connector": os.path.join(astroport_one_path, "IA", "perplexica.me.sh"),
                 "perplexica_script_search": os.path.join(astroport_one_path, "IA", "perplexica_search.sh"),
                 
-                "send_delay_seconds": 5,
+                "send_delay_seconds": 5,  # rythme par défaut d'un canal sans réglage propre
+                # --- Envoi multicanal : débit (seau à jetons), envois simultanés et nouvelles tentatives par canal ---
+                "send_channels": {
+                    "jaklis": {"rate_per_minute": 12, "burst": 1, "max_concurrency": 2, "max_retries": 2},
+                    "mailjet": {"rate_per_minute": 60, "burst": 5, "max_concurrency": 4, "max_retries": 3},
+                    "nostr": {"rate_per_minute": 30, "burst": 3, "max_concurrency": 4, "max_retries": 2},
+                },
+                # Nouvelles tentatives sur erreur au lancement ; sur délai dépassé ou code de retour non nul
+                # seulement si le canal le permet ("retry_on_exit_code": True), les envois n'étant pas idempotents
+                "send_retry_backoff_seconds": 2,  # doublé à chaque nouvelle tentative
+                "send_dry_run": False,  # simulation : aucune commande d'envoi exécutée
+                # --- Mémoire des interactions de l'Opérateur (remplace operator_memory/slot_N/*.json) ---
+                "interaction_store_db": os.path.join(workspace_dir, "operator_memory", "interactions.db"),
+                "interaction_history_size": 50,  # interactions conservées par profil et par slot
+                # --- Relève incrémentale des messageries (marque haute par canal, file JSONL à classer) ---
+                "inbox_channels": ["jaklis", "nostr"],  # nostr : relai strfry local
+                "inbox_state_file": os.path.join(workspace_dir, "operator_memory", "inbox_state.json"),
+                "inbox_queue_file": os.path.join(workspace_dir, "operator_memory", "inbox_queue.jsonl"),
+                "inbox_fetch_limit": 100,  # derniers messages relevés par Jaklis à chaque passage
+                "inbox_initial_lookback_days": 30,  # première relève : messages des N derniers jours
+                "inbox_sync_interval_seconds": 300,  # mode démon (sync-inbox --loop)
+                "strfry_dir": os.path.expanduser("~/.zen/strfry"),
+                # --- Classement des réponses : règles locales + modèle bayésien, l'IA n'arbitre que les cas ambigus ---
+                "reply_llm_escalation": True,
+                "reply_model_min_samples": 20,      # réponses classées par l'IA avant d'utiliser le modèle
+                "reply_model_min_confidence": 0.8,  # probabilité minimale pour que le modèle décide seul
+                "reply_model_max_samples": 5000,
+                "ollama_url": "http://localhost:11434",
+                "ollama_model": "gemma3:latest",
+                "ia_timeout_seconds": 300,
+                "ia_max_workers": 2,  # Requêtes IA simultanées (aligner sur OLLAMA_NUM_PARALLEL)
+                "thematic_batch_size": 8,  # Descriptions par prompt d'analyse thématique (1 = une par prompt)
+                "thematic_batch_max_chars": 6000,
+                "web_fetch_workers": 4,  # Sites web des cibles récupérés simultanément pendant la rédaction
+                "web_cache_db": os.path.join(workspace_dir, "web_cache.db"),
+                "web_cache_ttl_hours": 168,  # au-delà, la page est revalidée (ETag / Last-Modified)
+                # --- Sélection locale du persona (TF-IDF), l'IA n'arbitre que les cas ambigus ---
+                "persona_min_score": 0.1,    # score cosinus minimal du meilleur persona
+                "persona_min_margin": 0.2,   # écart relatif minimal avec le second
+                "persona_llm_escalation": True,
+                # --- Mode Modèle : un message par groupe (persona, langue, thèmes) ---
+                "template_cluster_tags": 2,           # thèmes principaux définissant un groupe
+                "template_polish_min_value": None,    # richesse de profil à partir de laquelle l'IA retouche le message (None = jamais)
+
+                # --- Géocodage inverse hors ligne (GeoNames), Nominatim en repli ---
+                "geonames_dir": os.path.join(workspace_dir, "geonames"),
+                "geonames_dataset": "cities1000",
+                "geonames_auto_download": True,
+                "geo_boundaries_file": None,  # GeoJSON de frontières (ex: Natural Earth admin-1), optionnel
+                "geo_max_distance_km": 50,
+                "geo_cache_radius_km": 2.0,
+                "geo_nominatim_refine": False,
+                # --- Écriture des fichiers JSON du workspace (temporaire + renommage atomique) ---
+                "json_fsync_interval": 30,  # secondes entre deux fsync (0 = à chaque écriture, None = jamais)
+                "json_use_orjson": True,    # utilisé seulement s'il est installé
+                # --- Caches geo/thématique à écriture différée (journal JSONL) ---
+                "cache_flush_interval": 30,  # secondes entre deux vidages du journal
+                "cache_flush_size": 200,     # ou dès que ce nombre d'entrées est en attente
+                # --- Cache des réponses de l'IA (SQLite, éviction LRU) ---
+                "llm_cache_enabled": True,
+                "llm_cache_db": os.path.join(workspace_dir, "llm_cache.db"),
+                "llm_cache_max_entries": 50000,
+                # --- Suite d'analyse reprenable ---
+                "analysis_checkpoint_interval": 30,  # secondes entre deux points de reprise
                 "uplanet_treasury_g1pub": None,
                 "URL_OPEN_COLLECTIVE": "https://opencollective.com/monnaie-libre"
             },
@@ -56,6 +125,8 @@ class AstroBotOrchestrator:
             "message_to_send": None,
             "logger": self.logger
         }
+        config = self.shared_state['config']
+        persistence.configure(config['json_fsync_interval'], config['json_use_orjson'])
         self.agents = {
             "analyste": AnalystAgent(self.shared_state),
             "stratège": StrategistAgent(self.shared_state),
@@ -175,6 +246,8 @@ class AstroBotOrchestrator:
             return
 
         self.logger.warning(f"Fichier de prospects non trouvé à l'emplacement par défaut : {prospect_file}")
+        if not self.interactive:
+            return
         
         while True:
             try:
@@ -530,5 +603,9 @@ class AstroBotOrchestrator:
 
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        # Mode non interactif : voir 'python3 main.py --help'
+        from cli import main as cli_main
+        sys.exit(cli_main(sys.argv[1:]))
     orchestrator = AstroBotOrchestrator()
-    orchestrator.main_menu() 
\ No newline at end of file
+    orchestrator.main_menu()
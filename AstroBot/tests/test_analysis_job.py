@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Script de test pour les travaux d'analyse reprenables
+Vérifie qu'une analyse interrompue reprend au dernier point de reprise,
+sans réinterroger l'IA pour les profils déjà traités
+"""
+
+import sys
+import os
+import logging
+import tempfile
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from agents.analyst_agent import AnalystAgent
+from agents.analysis_job import AnalysisJob
+from agents.knowledge_store import KnowledgeStore
+
+class InterruptedAnalyst(AnalystAgent):
+    """Analyste dont l'IA répond sans réseau et qui peut être « interrompu » (Ctrl-C simulé)"""
+    def __init__(self, shared_state, interrupt_at=None):
+        super().__init__(shared_state)
+        self.interrupt_at = interrupt_at
+        self.queried = []
+        self.saves = 0
+
+    def _query_geo_data(self, description, prompt_template):
+        if description == self.interrupt_at:
+            raise KeyboardInterrupt()
+        if "illisible" in description:
+            raise ValueError("réponse JSON invalide")
+        self.queried.append(description)
+        return {'language': 'fr', 'country': 'France'}
+
+    def _save_knowledge_base(self, knowledge_base):
+        self.saves += 1
+
+def make_knowledge_base():
+    knowledge_base = {}
+    for i in range(30):
+        description = f"profil {i}" if i != 7 else "profil illisible"
+        knowledge_base[f"pk{i:02d}"] = {'uid': f"membre{i}", 'profile': {'_source': {'description': description}}}
+    knowledge_base["pk03"]['metadata'] = {'language': 'en'}  # déjà analysé
+    return knowledge_base
+
+def test_resume_after_interruption():
+    with tempfile.TemporaryDirectory() as workspace:
+        shared_state = {
+            'config': {'workspace': workspace, 'analysis_checkpoint_interval': 0, 'ia_max_workers': 1},
+            'status': {}, 'logger': logging.getLogger('test_analysis_job')
+        }
+        knowledge_base = make_knowledge_base()
+        all_prospects = sorted(knowledge_base)
+
+        # Premier lancement : interruption sur le profil 20
+        analyst = InterruptedAnalyst(shared_state, interrupt_at="profil 20")
+        job = analyst._analysis_job()
+        assert job.start() is False
+        try:
+            analyst._run_optimized_ia_analysis(knowledge_base, all_prospects, "PROMPT", job)
+            assert False, "l'interruption aurait dû être propagée"
+        except KeyboardInterrupt:
+            job.finish('interrupted')
+        assert job.state['phases']['ia']['cursor'] == 20
+        assert "pk07" in job.state['phases']['ia']['failed']
+        assert analyst.saves >= 18  # base enregistrée à chaque point de reprise
+        print(f"✅ Interruption : point de reprise à {job.progress_line('ia')}")
+
+        # Second lancement : reprise au curseur, seuls les profils restants sont analysés
+        analyst = InterruptedAnalyst(shared_state)
+        job = analyst._analysis_job()
+        assert job.start() is True
+        stats = analyst._run_optimized_ia_analysis(knowledge_base, all_prospects, "PROMPT", job)
+        job.end_phase('ia', stats)
+        assert analyst.queried == [f"profil {i}" for i in range(20, 30)]
+        assert stats == {'ia_analyzed': 10}
+        assert job.state['phases']['ia']['cursor'] == 30
+        job.finish()
+        assert job.summary()['status'] == 'completed'
+
+        # Un travail terminé n'est pas repris
+        assert analyst._analysis_job().start() is False
+        print("✅ Reprise : seuls les 10 profils restants sont réanalysés")
+
+def test_eta_from_throughput():
+    with tempfile.TemporaryDirectory() as workspace:
+        job = AnalysisJob(os.path.join(workspace, "job.json"), ('gps',))
+        job.start()
+        job.begin_phase('gps', [f"pk{i}" for i in range(100)])
+        job.state['phases']['gps']['cursor'] = 40
+        job.state['phases']['gps']['rate'] = 4.0
+        assert job.eta_seconds('gps') == 15
+        assert "40/100" in job.progress_line('gps')
+        print(f"✅ Estimation du temps restant : {job.progress_line('gps')}")
+
+def test_resume_with_stable_order():
+    """Les profils réécrits pendant une phase ne changent pas l'ordre ; un ordre différent fait repartir du début"""
+    with tempfile.TemporaryDirectory() as workspace:
+        store = KnowledgeStore(os.path.join(workspace, "kb.db"))
+        store.save({f"pk{i}": {'uid': f"membre{i}"} for i in range(6)})
+        store.save({"pk1": {'uid': "membre1", 'metadata': {'language': 'fr'}}, "pk2": {'uid': "membre2"}})
+        store.save({"pk1": {'uid': "membre1", 'metadata': {'language': 'en'}}})
+        assert list(store.load_all()) == [f"pk{i}" for i in range(6)]
+
+        checkpoint = os.path.join(workspace, "job.json")
+        job = AnalysisJob(checkpoint, ('ia',))
+        job.start()
+        job.begin_phase('ia', ["pk0", "pk1", "pk2", "pk3"])
+        job.advance('ia', 2)
+        job.finish('interrupted')
+
+        job = AnalysisJob(checkpoint, ('ia',))
+        assert job.start() is True
+        # Même longueur, même premier élément mais ordre différent : rien n'est sauté
+        assert job.begin_phase('ia', ["pk0", "pk3", "pk1", "pk2"]) == ["pk0", "pk3", "pk1", "pk2"]
+        job.advance('ia', 2)
+        job.finish('interrupted')
+        job = AnalysisJob(checkpoint, ('ia',))
+        job.start()
+        assert job.begin_phase('ia', ["pk0", "pk3", "pk1", "pk2"]) == ["pk1", "pk2"]
+        print("✅ Reprise sûre : ordre stable de la base, liste modifiée = phase reprise du début")
+
+def main():
+    """Test des travaux d'analyse reprenables"""
+    print("🧪 Test de l'AnalysisJob")
+    print("=" * 50)
+    test_resume_after_interruption()
+    test_eta_from_throughput()
+    test_resume_with_stable_order()
+    print("\n🎉 Tous les tests de l'AnalysisJob sont passés")
+
+if __name__ == "__main__":
+    main()
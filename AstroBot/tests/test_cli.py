@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Script de test pour l'interface en ligne de commande
+Vérifie l'analyse des expressions de ciblage et un ciblage non interactif
+complet sur une petite base de connaissance, avec sortie JSON
+"""
+
+import sys
+import os
+import json
+import logging
+import tempfile
+from types import SimpleNamespace
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from cli import build_parser, parse_filter, run_command
+from agents.analyst_agent import AnalystAgent
+
+def check_parse_filter():
+    """Les expressions 'index=a|b' et 'index!=a' sont reconnues"""
+    assert parse_filter("tag=permaculture|jardinage") == ("tag", ["permaculture", "jardinage"], False)
+    assert parse_filter("region=Occitanie, France") == ("region", ["Occitanie, France"], False)
+    assert parse_filter("Language!=en") == ("language", ["en"], True)
+    for invalid in ("tag", "=fr", "language="):
+        try:
+            parse_filter(invalid)
+            assert False, f"'{invalid}' aurait dû être refusée"
+        except Exception:
+            pass
+
+    args = build_parser().parse_args(["target", "--where", "language=fr", "--limit", "2"])
+    assert args.command == "target" and args.filters == [("language", ["fr"], False)] and args.limit == 2
+    print("✅ Expressions de ciblage analysées")
+
+def make_orchestrator(workspace):
+    """Orchestrateur minimal : un analyste sur une base de connaissance de démonstration"""
+    shared_state = {
+        'config': {
+            'workspace': workspace,
+            'prospect_file': os.path.join(workspace, 'absent.json'),
+            'enriched_prospects_file': os.path.join(workspace, 'enriched_prospects.json'),
+            'knowledge_base_db': os.path.join(workspace, 'enriched_prospects.db'),
+        },
+        'status': {}, 'targets': [], 'logger': logging.getLogger('test_cli')
+    }
+    analyst = AnalystAgent(shared_state)
+    analyst._knowledge_store().save({
+        "pk_alice": {"uid": "alice", "metadata": {"language": "fr", "country": "France", "region": "Occitanie",
+                                                  "tags": ["permaculture"]}},
+        "pk_bob": {"uid": "bob", "metadata": {"language": "en", "country": "Canada", "tags": ["permaculture", "musique"]}},
+        "pk_carla": {"uid": "carla", "metadata": {"language": "fr", "country": "Belgique", "tags": ["jardinage"]}},
+        "pk_dan": {"uid": "dan", "metadata": {"language": "fr", "country": "France", "tags": ["musique"]}},
+    })
+    return SimpleNamespace(agents={'analyste': analyst}, shared_state=shared_state, logger=shared_state['logger'])
+
+def check_headless_targeting(workspace):
+    """Ciblage non interactif : filtres combinés, sauvegarde et résultat JSON"""
+    orchestrator = make_orchestrator(workspace)
+    parser = build_parser()
+
+    args = parser.parse_args(["target", "--where", "tag=permaculture|jardinage", "--where", "language!=en"])
+    result = run_command(orchestrator, args)
+    json.dumps(result)
+    assert result['ok'] and result['count'] == 2
+    assert [target['uid'] for target in result['targets']] == ["alice", "carla"]
+    with open(os.path.join(workspace, 'todays_targets.json')) as f:
+        assert [target['pubkey'] for target in json.load(f)] == ["pk_alice", "pk_carla"]
+    assert len(orchestrator.shared_state['targets']) == 2
+
+    # Région : clé « Région, Pays » ; limite appliquée après tri par pubkey, quel que soit l'ordre d'ajout
+    result = run_command(orchestrator, parser.parse_args(["target", "--where", "region=Occitanie, France", "--dry-run"]))
+    assert [target['uid'] for target in result['targets']] == ["alice"]
+    orchestrator.agents['analyste']._knowledge_store().save({"pk_aaron": {"uid": "aaron", "metadata": {"language": "fr"}}})
+    result = run_command(orchestrator, parser.parse_args(["target", "--where", "language=fr", "--limit", "2", "--dry-run"]))
+    assert [target['pubkey'] for target in result['targets']] == ["pk_aaron", "pk_alice"]
+
+    result = run_command(orchestrator, parser.parse_args(["target", "--where", "country=Japon"]))
+    assert not result['ok'] and result['count'] == 0
+
+    result = run_command(orchestrator, parser.parse_args(["target", "--where", "couleur=bleu"]))
+    assert not result['ok'] and "Filtre inconnu" in result['error']
+    print(f"✅ Ciblage non interactif ({result['elapsed_seconds']}s)")
+
+def test_cli():
+    check_parse_filter()
+    with tempfile.TemporaryDirectory() as workspace:
+        check_headless_targeting(workspace)
+
+def main():
+    """Test de l'interface en ligne de commande"""
+    print("🧪 Test de la ligne de commande AstroBot")
+    print("=" * 50)
+    test_cli()
+    print("\n🎉 Tous les tests de la ligne de commande sont passés")
+
+if __name__ == "__main__":
+    main()
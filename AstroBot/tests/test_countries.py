@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Script de test pour la table des pays et des langues
+Vérifie la résolution pays -> langue (codes ISO, noms localisés, régions
+des pays multilingues) et l'application groupée des résultats de géolocalisation
+"""
+
+import sys
+import os
+import logging
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from agents.countries import country_code, country_languages, country_name, primary_language
+from agents.analyst_agent import AnalystAgent
+
+def test_country_resolution():
+    # Codes ISO, noms anglais, français et locaux, sans tenir compte de la casse ni des accents
+    for value in ("CH", "che", "Switzerland", "Suisse", "Schweiz", "SVIZZERA"):
+        assert country_code(value) == "CH"
+    assert country_code("Etats-Unis") == country_code("États-Unis") == "US"
+    assert country_code("Atlantide") is None
+
+    assert primary_language("France") == "fr"
+    assert primary_language("Deutschland") == "de"
+    assert primary_language("Atlantide") == "xx"
+    assert primary_language(None) == "xx"
+
+    # Pays multilingues : la région départage
+    assert primary_language("Suisse") == "de"
+    assert primary_language("Suisse", "Genève") == "fr"
+    assert primary_language("CH", "Ticino") == "it"
+    assert primary_language("Canada", "Québec") == "fr"
+    assert primary_language("Belgique", "Wallonie") == "fr"
+    assert primary_language("Catalonia") == "ca"
+
+    assert country_languages("Belgique")[0] == ("nl", 0.59)
+    assert country_name("DEU") == "Allemagne"
+    assert country_name("DE", lang="en") == "Germany"
+    print("✅ Résolution pays -> langue : codes, noms localisés et régions")
+
+def test_apply_geo_results():
+    shared_state = {'config': {}, 'status': {}, 'logger': logging.getLogger('test_countries')}
+    analyst = AnalystAgent(shared_state)
+    toulouse = {'country': 'France', 'region': 'Occitanie', 'city': 'Toulouse', 'language': 'fr'}
+    inconnu = {'country': 'Atlantide', 'language': 'xx'}
+    knowledge_base = {f"pk{i}": {'uid': f"membre{i}"} for i in range(5)}
+    knowledge_base["pk4"]['metadata'] = {'tags': ['permaculture']}
+
+    results = [(f"pk{i}", toulouse) for i in range(4)] + [("pk4", inconnu)]
+    assert analyst._apply_geo_results(knowledge_base, results, 'gps_service') == 5
+
+    assert knowledge_base["pk0"]['metadata'] == {
+        'country': 'France', 'region': 'Occitanie', 'city': 'Toulouse',
+        'language': 'fr', 'geolocation_source': 'gps_service'
+    }
+    # Langue inconnue : non écrite, métadonnées existantes conservées
+    assert knowledge_base["pk4"]['metadata'] == {
+        'tags': ['permaculture'], 'country': 'Atlantide', 'geolocation_source': 'gps_service'
+    }
+    print("✅ Application groupée des résultats de géolocalisation")
+
+def main():
+    """Test de la table des pays et des langues"""
+    print("🧪 Test de la table des pays")
+    print("=" * 50)
+    test_country_resolution()
+    test_apply_geo_results()
+    print("\n🎉 Tous les tests de la table des pays sont passés")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Script de test pour l'envoi multicanal de l'Opérateur
+Vérifie le débit par canal (seau à jetons), les envois simultanés, les
+nouvelles tentatives sur échec transitoire, l'envoi de plusieurs canaux en
+parallèle et le mode simulation, à l'aide de scripts d'envoi factices
+"""
+
+import sys
+import os
+import json
+import time
+import logging
+import tempfile
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from agents.dispatcher import ChannelDispatcher, TokenBucket
+from agents.operator_agent import OperatorAgent
+
+# Script d'envoi factice : journalise ses arguments, échoue une fois (par script) pour la cible « pk_instable »
+STUB_SCRIPT = """import sys, os, time
+log_file, args = os.environ['STUB_SEND_LOG'], sys.argv[1:]
+if 'pk_instable' in args:
+    marker = log_file + '.' + os.path.basename(sys.argv[0]) + '.instable'
+    if not os.path.exists(marker):
+        open(marker, 'w').close()
+        sys.exit('erreur réseau simulée')
+time.sleep(0.2)
+with open(log_file, 'a') as f:
+    f.write(os.path.basename(sys.argv[0]) + ' ' + ' '.join(args[-3:]).replace(chr(10), ' ') + chr(10))
+"""
+
+class StubOperator(OperatorAgent):
+    """Opérateur dont les clés du capitaine et les MULTIPASS sont factices"""
+    def _captain_secret_file(self, filename):
+        return self.shared_state['config']['stub_secret_file']
+
+    def _has_multipass(self, email):
+        return email.startswith("multipass")
+
+def make_workspace(workspace):
+    for name in ("jaklis.py", "nostr_send_dm.py"):
+        with open(os.path.join(workspace, name), 'w') as f:
+            f.write(STUB_SCRIPT)
+    secret_file = os.path.join(workspace, ".secret")
+    with open(secret_file, 'w') as f:
+        f.write("NSEC=nsec1factice;NPUB=npub1factice")
+    campaign = [{'target': {'uid': f"membre{i}", 'pubkey': pubkey, 'email': f"{'multipass' if i < 3 else 'mail'}{i}@exemple.org"},
+                 'title': "Invitation", 'message': f"Bonjour {{{{uid}}}}, message {i}"}
+                for i, pubkey in enumerate(["pk_a", "pk_b", "pk_instable", "pk_d", "pk_e", "pk_f"])]
+    campaign.append({'target': {'uid': "sans_cle"}, 'title': "Invitation", 'message': "Bonjour"})
+    with open(os.path.join(workspace, "personalized_messages.json"), 'w') as f:
+        json.dump(campaign, f)
+    return {
+        'config': {'workspace': workspace, 'URL_OPEN_COLLECTIVE': "", 'cesium_node': "https://g1.example",
+                   'jaklis_script': os.path.join(workspace, "jaklis.py"),
+                   'nostr_dm_script': os.path.join(workspace, "nostr_send_dm.py"),
+                   'mailjet_script': os.path.join(workspace, "absent.sh"),
+                   'stub_secret_file': secret_file, 'send_delay_seconds': 5, 'send_retry_backoff_seconds': 0.05,
+                   'send_channels': {'jaklis': {'rate_per_minute': 600, 'burst': 6, 'max_concurrency': 3, 'max_retries': 2},
+                                     'nostr': {'rate_per_minute': 600, 'burst': 3, 'max_concurrency': 3,
+                                               'retry_on_exit_code': True}}},
+        'status': {}, 'logger': logging.getLogger('test_dispatcher')
+    }
+
+def check_token_bucket():
+    """Le seau à jetons laisse passer une rafale puis impose le débit"""
+    bucket = TokenBucket(rate=20, burst=2)
+    start = time.monotonic()
+    for _ in range(6):
+        bucket.acquire()
+    elapsed = time.monotonic() - start
+    assert 0.18 < elapsed < 0.5
+    assert TokenBucket(rate=None).acquire() == 0.0
+    print(f"✅ Débit limité : 6 jetons (rafale de 2, 20/s) en {elapsed:.2f}s")
+
+def check_rate_and_failures():
+    """Débit respecté malgré les envois simultanés, pas de nouvelle tentative sur une erreur définitive"""
+    dispatcher = ChannelDispatcher({'test': {'rate_per_minute': 600, 'burst': 1, 'max_concurrency': 5}})
+    reports = dispatcher.dispatch({'test': [{'command': ['true'], 'label': str(i)} for i in range(5)],
+                                   'absent': [{'command': ['commande-inexistante-astrobot'], 'label': "x"}]})
+    assert reports['test']['success'] == 5 and reports['test']['elapsed_seconds'] >= 0.35
+    assert reports['absent'] == {**reports['absent'], 'success': 0, 'failure': 1, 'retries': 0}
+
+    # Code de retour non nul : retenté seulement si le canal le permet (envois non idempotents)
+    dispatcher = ChannelDispatcher({'jaklis': {}, 'idempotent': {'retry_on_exit_code': True}},
+                                   defaults={'rate_per_minute': None, 'backoff_seconds': 0.01})
+    reports = dispatcher.dispatch({'jaklis': [{'command': ['false'], 'label': "a"}],
+                                   'idempotent': [{'command': ['false'], 'label': "b"}]})
+    assert (reports['jaklis']['failure'], reports['jaklis']['retries']) == (1, 0)
+    assert (reports['idempotent']['failure'], reports['idempotent']['retries']) == (1, 2)
+
+    # Délai dépassé : le message a pu partir, même règle que pour un code de retour non nul
+    slow = [sys.executable, '-c', 'import time; time.sleep(5)']
+    dispatcher = ChannelDispatcher({'jaklis': {}, 'idempotent': {'retry_on_exit_code': True}},
+                                   defaults={'rate_per_minute': None, 'backoff_seconds': 0.01,
+                                             'timeout_seconds': 0.3, 'max_retries': 1})
+    reports = dispatcher.dispatch({'jaklis': [{'command': slow, 'label': "a"}],
+                                   'idempotent': [{'command': slow, 'label': "b"}]})
+    assert (reports['jaklis']['failure'], reports['jaklis']['retries']) == (1, 0)
+    assert (reports['idempotent']['failure'], reports['idempotent']['retries']) == (1, 1)
+    print("✅ Débit par canal respecté, erreurs définitives, codes de retour et délais dépassés non retentés par défaut")
+
+def check_multichannel_campaign(workspace):
+    """Jaklis et Nostr sont envoyés en parallèle, avec nouvelle tentative sur échec si le canal le permet"""
+    shared_state = make_workspace(workspace)
+    log_file = os.path.join(workspace, "sent.log")
+    os.environ['STUB_SEND_LOG'] = log_file
+    operator = StubOperator(shared_state)
+
+    start = time.time()
+    slot = operator._run_send_campaign(channel="1,nostr", assume_yes=True)
+    elapsed = time.time() - start
+
+    with open(log_file) as f:
+        sent = f.read().splitlines()
+    jaklis = [line for line in sent if line.startswith("jaklis.py")]
+    nostr = [line for line in sent if line.startswith("nostr_send_dm.py")]
+    # pk_instable : échec Jaklis non retenté (doublon possible), échec Nostr retenté
+    assert len(jaklis) == 5 and len(nostr) == 3
+    assert any("Bonjour membre2, message 2" in line for line in nostr)
+    # 9 envois de 0,2s (plus une nouvelle tentative) : bien plus rapide qu'un envoi à la fois
+    assert elapsed < 9 * 0.2
+    status = shared_state['status']['OperatorAgent']
+    assert "Jaklis terminée. Succès : 5, Échecs : 2" in status and "Nostr terminée. Succès : 3, Échecs : 4" in status
+
+    assert {item['channel'] for item in operator.get_interaction_history("pk_a", slot)} == {'jaklis', 'nostr'}
+    assert len(operator._interaction_store().pubkeys(slot)) == 6
+    assert operator.get_interaction_history("pk_instable", slot)[0]['channel'] == 'nostr'
+    print(f"✅ Campagne Jaklis + Nostr : {len(sent)} envois en {elapsed:.2f}s (slot {slot})")
+
+def check_dry_run(workspace):
+    """En simulation, aucune commande n'est exécutée et rien n'est enregistré"""
+    shared_state = make_workspace(workspace)
+    os.environ['STUB_SEND_LOG'] = os.path.join(workspace, "dry_run.log")
+    operator = StubOperator(shared_state)
+    slot = operator._run_send_campaign(channel="jaklis", assume_yes=True, dry_run=True)
+    assert slot is not None and not os.path.exists(os.environ['STUB_SEND_LOG'])
+    assert not operator._interaction_store().pubkeys()
+    assert "Succès : 6, Échecs : 1" in shared_state['status']['OperatorAgent']
+    assert operator._run_send_campaign(channel="pigeon", assume_yes=True) is None
+    print("✅ Mode simulation : aucun envoi réel")
+
+def test_dispatcher():
+    check_token_bucket()
+    check_rate_and_failures()
+    with tempfile.TemporaryDirectory() as workspace:
+        check_multichannel_campaign(workspace)
+    with tempfile.TemporaryDirectory() as workspace:
+        check_dry_run(workspace)
+
+def main():
+    """Test de l'envoi multicanal"""
+    print("🧪 Test du ChannelDispatcher")
+    print("=" * 50)
+    test_dispatcher()
+    print("\n🎉 Tous les tests d'envoi multicanal sont passés")
+
+if __name__ == "__main__":
+    main()
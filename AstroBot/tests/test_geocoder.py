@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Script de test pour le géocodage inverse hors ligne
+Construit un mini jeu de données au format GeoNames et vérifie la recherche
+du plus proche voisin, l'inclusion dans les polygones et les performances
+"""
+
+import sys
+import os
+import json
+import time
+import random
+import tempfile
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from agents.geocoder import OfflineGeocoder, SpatialGeoCache, haversine_km
+
+CITIES = [
+    # nom, lat, lon, pays, admin1
+    ("Toulouse", 43.6047, 1.4442, "FR", "76"),
+    ("Montauban", 44.0176, 1.3550, "FR", "76"),
+    ("Bruxelles", 50.8503, 4.3517, "BE", "BRU"),
+    ("Taveuni", -16.8500, 179.9500, "FJ", "03"),
+]
+
+def write_dataset(data_dir, extra_cities=()):
+    """Écrit cities1000.txt, admin1CodesASCII.txt et countryInfo.txt"""
+    with open(os.path.join(data_dir, "cities1000.txt"), 'w') as f:
+        for i, (name, lat, lon, country, admin1) in enumerate(list(CITIES) + list(extra_cities)):
+            fields = [str(i), name, name, "", str(lat), str(lon), "P", "PPL", country, "", admin1, "", "", "", "1000", "", "", "", ""]
+            f.write("\t".join(fields) + "\n")
+    with open(os.path.join(data_dir, "admin1CodesASCII.txt"), 'w') as f:
+        f.write("FR.76\tOccitanie\tOccitanie\t11071623\n")
+        f.write("BE.BRU\tBrussels Capital\tBrussels Capital\t2800866\n")
+    with open(os.path.join(data_dir, "countryInfo.txt"), 'w') as f:
+        f.write("#ISO\tISO3\tISO-Numeric\tfips\tCountry\n")
+        for code, name, langs in [("FR", "France", "fr-FR"), ("BE", "Belgium", "nl-BE,fr-BE,de-BE"), ("FJ", "Fiji", "en-FJ,fj")]:
+            fields = [code, "", "", "", name, "", "", "", "", "", "", "", "", "", "", langs, "", "", ""]
+            f.write("\t".join(fields) + "\n")
+
+def test_reverse_geocoding():
+    with tempfile.TemporaryDirectory() as data_dir:
+        write_dataset(data_dir)
+        geocoder = OfflineGeocoder(data_dir)
+        assert geocoder.load()
+
+        result = geocoder.reverse(43.62, 1.43)
+        assert result['city'] == "Toulouse" and result['country'] == "France" and result['region'] == "Occitanie"
+        assert result['distance_km'] < 3
+        # Nom du pays en français (GeoNames donne « Belgium ») ; les pays inconnus gardent le nom GeoNames
+        belgium = geocoder.reverse(50.84, 4.36)
+        assert (belgium['country_code'], belgium['country']) == ("BE", "Belgique")
+        # De l'autre côté de l'antiméridien
+        taveuni = geocoder.reverse(-16.85, -179.95)
+        assert (taveuni['city'], taveuni['country']) == ("Taveuni", "Fiji")
+        # Trop loin de toute localité connue
+        assert geocoder.reverse(0.0, -30.0) is None
+        print("✅ Géocodage inverse : plus proche localité, région et pays")
+
+def test_boundaries_override():
+    with tempfile.TemporaryDirectory() as data_dir:
+        write_dataset(data_dir)
+        boundaries_file = os.path.join(data_dir, "admin1.geojson")
+        square = [[1.0, 43.0], [2.0, 43.0], [2.0, 44.5], [1.0, 44.5], [1.0, 43.0]]
+        with open(boundaries_file, 'w') as f:
+            json.dump({"type": "FeatureCollection", "features": [{
+                "type": "Feature",
+                "properties": {"name": "Tarn-et-Garonne (test)", "admin": "France", "iso_a2": "FR", "adm1_code": "FRA-TEST"},
+                "geometry": {"type": "Polygon", "coordinates": [square]}
+            }]}, f)
+        geocoder = OfflineGeocoder(data_dir, boundaries_file=boundaries_file)
+        assert geocoder.load()
+        assert geocoder.reverse(44.0, 1.36)['region'] == "Tarn-et-Garonne (test)"
+        print("✅ Frontières administratives par inclusion dans un polygone")
+
+def test_performance():
+    rng = random.Random(42)
+    extra = [(f"Village {i}", rng.uniform(42.0, 51.0), rng.uniform(-4.5, 8.0), "FR", "76") for i in range(30000)]
+    with tempfile.TemporaryDirectory() as data_dir:
+        write_dataset(data_dir, extra)
+        geocoder = OfflineGeocoder(data_dir)
+        assert geocoder.load()
+        points = [(rng.uniform(42.5, 50.5), rng.uniform(-4.0, 7.5)) for _ in range(5000)]
+        start = time.time()
+        results = [geocoder.reverse(lat, lon) for lat, lon in points]
+        elapsed = time.time() - start
+        assert all(results)
+        # Vérification par force brute sur un échantillon
+        for (lat, lon), result in list(zip(points, results))[:20]:
+            brute = min(haversine_km(lat, lon, c[0], c[1]) for c in geocoder.cities)
+            assert abs(result['distance_km'] - brute) < 0.01
+        assert elapsed < 10
+        print(f"✅ 5000 points géocodés hors ligne en {elapsed:.2f}s")
+
+def test_spatial_cache():
+    """Les points voisins d'un point déjà résolu sont servis par le cache"""
+    entries = {"43.6047,1.4442": {"country": "France", "city": "Toulouse"}}
+    cache = SpatialGeoCache(entries, radius_km=2.0)
+    assert cache.get(43.6047, 1.4442)["city"] == "Toulouse"      # même point
+    assert cache.get(43.6100, 1.4500)["city"] == "Toulouse"      # ~800 m
+    assert cache.get(43.7000, 1.4442) is None                     # ~10 km
+    cache.put(43.7000, 1.4442, {"country": "France", "city": "Saint-Jory"})
+    assert cache.get(43.6950, 1.4442)["city"] == "Saint-Jory"
+    assert "43.7000,1.4442" in entries
+    assert (cache.exact_hits, cache.near_hits, cache.misses) == (1, 2, 1)
+    assert cache.hit_rate() == 0.75
+    # Hautes latitudes : les cellules sont plus étroites en longitude
+    cache.put(69.6500, 18.9500, {"city": "Tromsø"})
+    assert cache.get(69.6500, 18.9900)["city"] == "Tromsø"       # ~1,5 km
+    print(f"✅ Cache GPS spatial : {cache.summary()}")
+
+def main():
+    """Test du géocodeur hors ligne"""
+    print("🧪 Test de l'OfflineGeocoder")
+    print("=" * 50)
+    test_reverse_geocoding()
+    test_boundaries_override()
+    test_performance()
+    test_spatial_cache()
+    print("\n🎉 Tous les tests du géocodeur sont passés")
+
+if __name__ == "__main__":
+    main()
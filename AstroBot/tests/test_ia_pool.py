@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Script de test pour le pool de workers IA
+Vérifie que les requêtes sont parallélisées, bornées, et que les résultats
+sont restitués dans l'ordre de soumission
+"""
+
+import sys
+import os
+import time
+import threading
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from agents.ia_pool import IAWorkerPool
+
+def test_ordered_results_and_bounded_concurrency():
+    """Les résultats sortent dans l'ordre et jamais plus de max_workers requêtes en vol"""
+    in_flight = 0
+    max_seen = 0
+    lock = threading.Lock()
+
+    def fake_ia(item):
+        nonlocal in_flight, max_seen
+        with lock:
+            in_flight += 1
+            max_seen = max(max_seen, in_flight)
+        # Les premiers éléments sont les plus lents : l'ordre doit malgré tout être conservé
+        time.sleep(0.05 if item < 3 else 0.01)
+        with lock:
+            in_flight -= 1
+        if item == 5:
+            raise ValueError("réponse IA invalide")
+        return item * 10
+
+    pool = IAWorkerPool(max_workers=3)
+    start = time.time()
+    results = list(pool.imap(fake_ia, list(range(12))))
+    elapsed = time.time() - start
+
+    assert [item for item, _, _ in results] == list(range(12))
+    assert results[4][1] == 40
+    assert results[5][1] is None and isinstance(results[5][2], ValueError)
+    assert max_seen == 3
+    assert pool.completed == 12 and pool.failed == 1
+    # Séquentiellement : 3 x 0.05 + 9 x 0.01 = 0.24s
+    assert elapsed < 0.2
+    print(f"✅ 12 requêtes en {elapsed:.2f}s avec 3 workers ({pool.throughput():.1f}/s), ordre conservé")
+
+def main():
+    """Test du pool de workers IA"""
+    print("🧪 Test de l'IAWorkerPool")
+    print("=" * 50)
+    test_ordered_results_and_bounded_concurrency()
+    print("\n🎉 Tous les tests du pool IA sont passés")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Script de test pour la relève incrémentale des messageries
+Vérifie la marque haute par canal (seuls les messages plus récents sont
+retenus, sans doublon), la file d'attente JSONL, la boucle de relève et la
+réception des réponses par l'Opérateur et la ligne de commande, y compris
+celles de plus de 24h
+"""
+
+import sys
+import os
+import time
+import logging
+import tempfile
+import threading
+from types import SimpleNamespace
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from agents.inbox_sync import InboxSync, parse_jaklis_messages, parse_nostr_events
+from agents.operator_agent import OperatorAgent
+from cli import build_parser, run_command
+
+class FakeMailbox:
+    """Messagerie factice : renvoie toujours ses 'limit' derniers messages, comme 'jaklis read -n'"""
+    def __init__(self, limit=3):
+        self.messages = []
+        self.limit = limit
+        self.calls = []
+        self.fail = False
+
+    def add(self, identifier, pubkey, date, content):
+        self.messages.append({'id': identifier, 'pubkey': pubkey, 'date': date, 'title': "", 'content': content})
+
+    def __call__(self, since):
+        self.calls.append(since)
+        if self.fail:
+            raise RuntimeError("nœud Cesium+ injoignable")
+        return sorted(self.messages, key=lambda message: message['date'])[-self.limit:]
+
+def check_high_water_mark(workspace):
+    """Seuls les nouveaux messages sont mis en file, même à date égale, et la marque survit au redémarrage"""
+    now = time.time()
+    mailbox = FakeMailbox()
+    state_file, queue_file = os.path.join(workspace, "state.json"), os.path.join(workspace, "queue.jsonl")
+    inbox = InboxSync(state_file, queue_file, {'jaklis': mailbox}, initial_lookback_days=30)
+
+    mailbox.add("m0", "pk_ancien", now - 40 * 86400, "Trop ancien")
+    mailbox.add("m1", "pk_alice", now - 3 * 86400, "Merci, avec plaisir !")
+    mailbox.add("m2", "pk_bob", now - 3600, "STOP")
+    assert inbox.sync() == {'jaklis': 2}
+    assert mailbox.calls[0] < now - 29 * 86400
+    assert inbox.sync() == {'jaklis': 0} and mailbox.calls[1] == now - 3600
+
+    # Nouveau message à la même seconde que la marque haute : retenu une seule fois
+    mailbox.add("m3", "pk_carol", now - 3600, "Bonjour")
+    inbox = InboxSync(state_file, queue_file, {'jaklis': mailbox})
+    assert inbox.sync() == {'jaklis': 1} and inbox.sync() == {'jaklis': 0}
+    assert [entry['message_id'] for entry in inbox.pending()] == ["m1", "m2", "m3"]
+    assert inbox.pending()[0]['channel'] == 'jaklis'
+
+    # Échec de la relève : signalé, marque haute inchangée
+    mailbox.fail = True
+    mark = inbox.high_water_mark('jaklis')
+    assert inbox.sync() == {'jaklis': None} and inbox.high_water_mark('jaklis') == mark
+    mailbox.fail = False
+
+    # Messages traités retirés de la file, sans être relevés à nouveau
+    assert inbox.acknowledge(["m1", "m2"]) == 1
+    assert inbox.sync() == {'jaklis': 0} and [entry['message_id'] for entry in inbox.pending()] == ["m3"]
+    print("✅ Marque haute par canal : aucun message perdu ni traité deux fois")
+
+def check_shared_files(workspace):
+    """Deux relèves (ex: démon et 'receive') partagent la marque haute et la file sans doublon ni perte"""
+    mailbox = FakeMailbox(limit=10)
+    state_file, queue_file = os.path.join(workspace, "shared_state.json"), os.path.join(workspace, "shared_queue.jsonl")
+    daemon = InboxSync(state_file, queue_file, {'jaklis': mailbox})
+    receive = InboxSync(state_file, queue_file, {'jaklis': mailbox})
+    assert daemon.sync() == {'jaklis': 0}
+
+    # 'receive' relève m1 et le traite : le démon ne doit pas le remettre en file
+    mailbox.add("m1", "pk_alice", time.time(), "Oui !")
+    assert receive.sync() == {'jaklis': 1} and receive.acknowledge(["m1"]) == 0
+    assert daemon.sync() == {'jaklis': 0} and daemon.pending() == []
+    assert daemon.high_water_mark('jaklis') == receive.high_water_mark('jaklis')
+
+    # Ajouts et retraits simultanés depuis deux objets (descripteurs de verrou distincts) : rien n'est perdu
+    def append_many():
+        for i in range(200):
+            daemon._append([{'message_id': f"a{i}"}])
+    writer = threading.Thread(target=append_many)
+    writer.start()
+    for i in range(50):
+        receive._append([{'message_id': f"b{i}"}])
+        receive.acknowledge([f"b{i}"])
+    writer.join()
+    assert sorted(entry['message_id'] for entry in receive.pending()) == sorted(f"a{i}" for i in range(200))
+    print("✅ Marque haute et file partagées entre processus (verrou de fichier)")
+
+def check_parsers():
+    """Sorties de Jaklis (JSON) et du relai Nostr (un événement par ligne)"""
+    jaklis = parse_jaklis_messages('[{"id": "a1", "pubkey": "pk", "date": 12, "title": "t", "content": "c"}, "bruit"]')
+    assert jaklis == [{'id': "a1", 'pubkey': "pk", 'date': 12, 'title': "t", 'content': "c"}]
+    nostr = parse_nostr_events('{"id": "e1", "pubkey": "hex", "created_at": 15, "kind": 4, "content": "xx?iv=yy"}\n'
+                               'ligne illisible\n'
+                               '{"id": "e2", "pubkey": "hex", "created_at": 16, "kind": 1, "content": "Bravo"}\n')
+    assert [(message['id'], message['date'], message['encrypted']) for message in nostr] == [("e1", 15, True), ("e2", 16, False)]
+    print("✅ Messages Jaklis et événements Nostr normalisés")
+
+def check_daemon_loop(workspace):
+    """La boucle de relève s'arrête après le nombre de passages demandé"""
+    mailbox = FakeMailbox(limit=10)
+    inbox = InboxSync(os.path.join(workspace, "loop_state.json"), os.path.join(workspace, "loop_queue.jsonl"),
+                      {'jaklis': mailbox, 'nostr': lambda since: []})
+    mailbox.add("x1", "pk_alice", time.time(), "Bonjour")
+    assert inbox.run_forever(interval=0.01, iterations=3) == {'jaklis': 1, 'nostr': 0}
+    assert len(mailbox.calls) == 3
+    print("✅ Relève en boucle (mode démon)")
+
+class StubOperator(OperatorAgent):
+    """Opérateur dont la messagerie Cesium+ est factice"""
+    mailbox = None
+
+    def _fetch_jaklis_inbox(self, since):
+        return self.mailbox(since)
+
+def check_operator_receive(workspace):
+    """Les réponses des profils contactés sont reçues, même après 24h, puis retirées de la file"""
+    shared_state = {'config': {'workspace': workspace, 'inbox_channels': ['jaklis']}, 'status': {},
+                    'logger': logging.getLogger('test_inbox_sync')}
+    StubOperator.mailbox = mailbox = FakeMailbox(limit=10)
+    operator = StubOperator(shared_state)
+    operator.record_interaction("pk_alice", "alice", "Bonjour", slot=2, channel='jaklis')
+    operator.record_interaction("pk_bob", "bob", "Bonjour", slot=2, channel='jaklis')
+    mailbox.add("r1", "pk_alice", time.time() - 3 * 86400, "Merci, je suis intéressée")
+    mailbox.add("r2", "pk_inconnu", time.time() - 60, "Publicité")
+    mailbox.add("r3", "pk_bob", time.time() - 60, "Plus tard peut-être")
+
+    responses = operator.fetch_new_responses()
+    assert [(response['sender_uid'], response['slot'], response['message_id']) for response in responses] == \
+        [("bob", 2, "r3"), ("alice", 2, "r1")]
+    # Le message sans rapport avec une campagne est retiré, les réponses restent en attente de traitement
+    assert [entry['message_id'] for entry in operator._inbox_sync().pending()] == ["r1", "r3"]
+    operator.acknowledge_responses(responses[:1])
+    assert [response['message_id'] for response in operator.fetch_new_responses()] == ["r1"]
+
+    # Ligne de commande : relève seule, puis lecture de la file sans nouvelle relève
+    orchestrator = SimpleNamespace(agents={'opérateur': operator}, shared_state=shared_state, logger=shared_state['logger'])
+    mailbox.add("r4", "pk_bob", time.time(), "Finalement oui !")
+    result = run_command(orchestrator, build_parser().parse_args(["sync-inbox"]))
+    assert result['ok'] and result['new_messages'] == {'jaklis': 1} and result['pending'] == 2
+    calls = len(mailbox.calls)
+    result = run_command(orchestrator, build_parser().parse_args(["receive", "--no-sync"]))
+    assert result['count'] == 2 and result['responses'][0]['content'] == "Finalement oui !"
+    assert len(mailbox.calls) == calls
+    print("✅ Réponses reçues par l'Opérateur et la ligne de commande, sans filtre des 24h")
+
+def test_inbox_sync():
+    check_parsers()
+    with tempfile.TemporaryDirectory() as workspace:
+        check_high_water_mark(workspace)
+        check_daemon_loop(workspace)
+        check_shared_files(workspace)
+    with tempfile.TemporaryDirectory() as workspace:
+        check_operator_receive(workspace)
+
+def main():
+    """Test de la relève incrémentale des messageries"""
+    print("🧪 Test de l'InboxSync")
+    print("=" * 50)
+    test_inbox_sync()
+    print("\n🎉 Tous les tests de relève des messageries sont passés")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Script de test pour la mémoire des interactions de l'Opérateur (SQLite)
+Vérifie l'import des anciens répertoires operator_memory/slot_N, la limite
+de 50 interactions par profil, les statistiques par slot tenues à jour à
+l'écriture, l'index des destinataires utilisé pour reconnaître les réponses
+et la rapidité des envois enregistrés
+"""
+
+import sys
+import os
+import json
+import time
+import logging
+import tempfile
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from agents.interaction_store import InteractionStore
+from agents.operator_agent import OperatorAgent
+
+def make_legacy_memory(workspace):
+    """Anciennes mémoires : un fichier JSON par profil et par slot, et des slots vides"""
+    memory_dir = os.path.join(workspace, "operator_memory")
+    for slot in range(12):
+        os.makedirs(os.path.join(memory_dir, f"slot_{slot}"), exist_ok=True)
+    legacy = {
+        (0, "pk_alice"): [{'target_pubkey': "pk_alice", 'target_uid': "alice", 'message_sent': "Bonjour",
+                           'response_received': None, 'timestamp': "2025-01-01T10:00:00Z", 'slot': 0},
+                          {'target_pubkey': "pk_alice", 'target_uid': "alice", 'message_sent': "Bonjour",
+                           'response_received': "Merci !", 'timestamp': "2025-01-02T10:00:00Z", 'slot': 0}],
+        (0, "pk_bob"): [{'target_pubkey': "pk_bob", 'target_uid': "bob", 'message_sent': "Salut",
+                         'response_received': None, 'timestamp': "2025-01-01T11:00:00Z", 'slot': 0}],
+        (3, "pk_alice"): [{'target_pubkey': "pk_alice", 'target_uid': "alice", 'message_sent': "Relance",
+                           'response_received': None, 'timestamp': "2025-02-01T10:00:00Z", 'slot': 3}],
+    }
+    for (slot, pubkey), history in legacy.items():
+        with open(os.path.join(memory_dir, f"slot_{slot}", f"{pubkey}.json"), 'w') as f:
+            json.dump(history, f)
+    return memory_dir
+
+def check_migration(workspace):
+    """Les anciens fichiers sont importés une fois, puis mis de côté"""
+    memory_dir = make_legacy_memory(workspace)
+    shared_state = {'config': {'workspace': workspace}, 'status': {}, 'logger': logging.getLogger('test_interaction_store')}
+    operator = OperatorAgent(shared_state)
+
+    assert [item['response_received'] for item in operator.get_interaction_history("pk_alice", 0)] == [None, "Merci !"]
+    # Le slot d'un profil est celui du dernier message qui lui a été envoyé
+    assert operator._find_slot_for_pubkey("pk_alice") == 3 and operator._find_slot_for_pubkey("pk_inconnu") is None
+    assert operator._find_available_slot() == 1
+    assert sorted(os.listdir(os.path.join(memory_dir, "legacy_slots"))) == ["slot_0", "slot_3"]
+    assert not [name for name in os.listdir(memory_dir) if name.startswith("slot_")]
+
+    # Une nouvelle ouverture ne réimporte rien
+    assert InteractionStore(os.path.join(memory_dir, "interactions.db")).migrate_slot_directories(memory_dir) == 0
+
+    # Réponse reçue : associée à la dernière interaction, et le profil est reconnu dans la messagerie
+    operator.record_interaction("pk_bob", "bob", "Relance", slot=0, channel='jaklis')
+    operator._should_auto_respond = lambda message: False
+    operator.process_incoming_response("pk_bob", "bob", "STOP", 0)
+    assert operator.get_interaction_history("pk_bob", 0)[-1]['response_received'] == "STOP"
+    inbox = json.dumps([{'pubkey': "pk_bob", 'content': "STOP", 'title': "", 'date': time.time()},
+                        {'pubkey': "pk_inconnu", 'content': "Bonjour", 'title': "", 'date': time.time()}])
+    responses = operator._parse_messages_for_responses(inbox)
+    assert [(response['sender_pubkey'], response['sender_uid'], response['slot']) for response in responses] == [("pk_bob", "bob", 0)]
+
+    # Réponse traitée automatiquement : rattachée à l'envoi Jaklis, sans être comptée comme un envoi
+    operator.record_interaction("pk_erin", "erin", "Bonjour", slot=6, channel='jaklis')
+    operator._process_response_automatically({'sender_pubkey': "pk_erin", 'sender_uid': "erin",
+                                              'content': "Non merci", 'slot': 6})
+    stats = operator._interaction_store().slot_stats(6)
+    assert (stats['sent'], stats['responses'], stats['response_rate']) == (1, 1, 100.0)
+    assert stats['channels'] == {'jaklis': {'sent': 1, 'responses': 1}}
+    assert len(operator.get_interaction_history("pk_erin", 6)) == 1
+    print("✅ Anciennes mémoires importées, historique et réponses retrouvés")
+
+def check_summary(workspace):
+    """Les statistiques d'un slot sont calculées sans relire d'historique"""
+    store = InteractionStore(os.path.join(workspace, "stats.db"), max_history=50)
+    for i in range(60):
+        store.record("pk_alice", "alice", f"message {i}", slot=2, timestamp=f"2025-03-01T10:{i:02d}:00Z")
+    store.record("pk_bob", "bob", "message", slot=2, timestamp="2025-03-02T10:00:00Z")
+    store.set_last_response("pk_bob", 2, "Avec plaisir")
+
+    history = store.history("pk_alice", 2)
+    assert len(history) == 50 and history[0]['message_sent'] == "message 10"
+    summary = store.slot_summary(2)
+    assert (summary['interactions'], summary['responses']) == (51, 1)
+    assert summary['last_interaction'] == "2025-03-02T10:00:00Z"
+    assert [profile['pubkey'] for profile in summary['profiles'] if profile['responses']] == ["pk_bob"]
+    assert store.active_slots() == [2] and store.slots_for_pubkey("pk_bob") == [2]
+    print("✅ Statistiques par slot et historique limité à 50 interactions")
+
+def check_slot_stats(workspace):
+    """Les agrégats par slot sont tenus à jour à l'écriture et identiques à un recalcul complet"""
+    db_file = os.path.join(workspace, "slot_stats.db")
+    store = InteractionStore(db_file, max_history=5)
+    for i in range(8):
+        store.record("pk_alice", "alice", f"message {i}", slot=1, channel='jaklis', timestamp=f"2025-04-01T10:0{i}:00Z")
+    store.record("pk_bob", "bob", "message", slot=1, channel='nostr', timestamp="2025-04-02T10:00:00Z")
+    store.record("pk_carol", "carol", "message", slot=1, channel='nostr', timestamp="2025-04-03T10:00:00Z")
+    store.set_last_response("pk_bob", 1, "Oui")
+    store.set_last_response("pk_bob", 1, "Oui, vraiment")  # remplace la réponse : pas de double compte
+    store.set_last_response("pk_carol", 1, "STOP")
+
+    stats = store.slot_stats(1)
+    # Les envois restent comptés même si l'historique d'alice est tronqué à 5 interactions
+    assert (stats['sent'], stats['responses'], stats['profiles'], stats['conversations']) == (10, 2, 3, 2)
+    assert stats['response_rate'] == 20.0 and stats['last_interaction'] > "2025-04-03"
+    assert stats['channels'] == {'jaklis': {'sent': 8, 'responses': 0}, 'nostr': {'sent': 2, 'responses': 2}}
+    assert [profile['pubkey'] for profile in store.responders(1, limit=1)] == ["pk_bob"]
+    assert store.slot_stats(7) is None and list(store.slot_stats()) == [1]
+
+    # Une base créée sans statistiques les recalcule à l'ouverture
+    store._conn.execute("DELETE FROM meta")
+    store._conn.commit()
+    store.close()
+    rebuilt = InteractionStore(db_file, max_history=5).slot_stats(1)
+    assert (rebuilt['sent'], rebuilt['responses'], rebuilt['conversations']) == (7, 2, 2)
+    print("✅ Statistiques par slot et par canal tenues à jour à l'écriture")
+
+def check_status_views(workspace):
+    """Les vues de statistiques restent instantanées quelle que soit la taille de la campagne"""
+    shared_state = {'config': {'workspace': os.path.join(workspace, "vues")}, 'status': {},
+                    'logger': logging.getLogger('test_interaction_store')}
+    operator = OperatorAgent(shared_state)
+    store = operator._interaction_store()
+    rows = [(f"pk{i:05d}", f"membre{i}", "Bonjour", None, "2025-05-01T10:00:00Z", 4, 'jaklis') for i in range(20000)]
+    store._conn.executemany(f"INSERT INTO interactions ({store.COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+    store._conn.commit()
+    store.rebuild_stats()
+    operator.record_interaction("pk00001", "membre1", "Relance", slot=4, channel='nostr')
+
+    start = time.time()
+    active_slots = operator.list_campaign_slots()
+    elapsed = time.time() - start
+    assert active_slots[0]['interactions'] == 20001 and active_slots[0]['targets'] == 20000
+    assert elapsed < 0.1
+    print(f"✅ Vue des campagnes (20 000 interactions) affichée en {elapsed * 1000:.1f} ms")
+
+def check_recipient_index(workspace):
+    """Un lot de messages reçus est associé aux envois par simple recherche dans l'index"""
+    db_file = os.path.join(workspace, "recipients.db")
+    store = InteractionStore(db_file)
+    store.record("pk_alice", "alice", "Bonjour", slot=1, channel='jaklis', timestamp="2025-06-01T10:00:00Z")
+    store.record("pk_alice", "alice", "Relance", slot=5, channel='nostr', timestamp="2025-06-03T10:00:00Z")
+    store.record("pk_alice", "alice", "Rappel", slot=2, channel='jaklis', timestamp="2025-06-02T10:00:00Z")
+    recipient = store.recipient_index()["pk_alice"]
+    assert (recipient['uid'], recipient['last_slot'], recipient['last_sent']) == ("alice", 5, "2025-06-03T10:00:00Z")
+    assert sorted(recipient['slots']) == [1, 2, 5] and sorted(recipient['channels']) == ['jaklis', 'nostr']
+
+    # Une écriture depuis une autre connexion (ex: tâche cron) recharge l'index
+    other = InteractionStore(db_file)
+    other.record("pk_bob", "bob", "Bonjour", slot=2, timestamp="2025-06-04T10:00:00Z")
+    other.close()
+    assert store.recipient_index()["pk_bob"]['last_slot'] == 2
+
+    # Une base sans index des destinataires (version précédente) le reconstruit à l'ouverture
+    store._conn.execute("DELETE FROM recipients")
+    store._conn.execute("UPDATE meta SET value = '1' WHERE key = 'stats_version'")
+    store._conn.commit()
+    store.close()
+    assert set(InteractionStore(db_file).recipient_index()) == {"pk_alice", "pk_bob"}
+
+    # 5000 messages reçus, dont 1 sur 5 provient d'un profil contacté
+    shared_state = {'config': {'workspace': os.path.join(workspace, "reception")}, 'status': {},
+                    'logger': logging.getLogger('test_interaction_store')}
+    operator = OperatorAgent(shared_state)
+    store = operator._interaction_store()
+    rows = [(f"pk{i:05d}", f"membre{i}", "Bonjour", None, "2025-06-01T10:00:00Z", i // 4 % 3, 'jaklis')
+            for i in range(0, 20000, 4)]
+    store._conn.executemany(f"INSERT INTO interactions ({store.COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+    store._conn.commit()
+    store.rebuild_stats()
+    inbox = json.dumps([{'pubkey': f"pk{i:05d}", 'content': "Merci", 'title': "", 'date': time.time()} for i in range(5000)])
+    start = time.time()
+    responses = operator._parse_messages_for_responses(inbox)
+    elapsed = time.time() - start
+    matched = {response['sender_pubkey']: response for response in responses}
+    assert len(responses) == 1250 and (matched["pk00008"]['sender_uid'], matched["pk00008"]['slot']) == ("membre8", 2)
+    assert elapsed < 1
+    print(f"✅ 5000 messages reçus associés aux envois en {elapsed * 1000:.1f} ms")
+
+def check_throughput(workspace):
+    """Des milliers d'envois enregistrés rapidement"""
+    store = InteractionStore(os.path.join(workspace, "bulk.db"))
+    start = time.time()
+    for i in range(3000):
+        store.record(f"pk{i % 1000:04d}", f"membre{i}", "Bonjour", slot=i % 3, channel='jaklis')
+    elapsed = time.time() - start
+    assert len(store.pubkeys()) == 1000 and elapsed < 10
+    print(f"✅ 3000 interactions enregistrées en {elapsed:.2f}s")
+
+def test_interaction_store():
+    with tempfile.TemporaryDirectory() as workspace:
+        check_migration(workspace)
+        check_summary(workspace)
+        check_slot_stats(workspace)
+        check_status_views(workspace)
+        check_recipient_index(workspace)
+        check_throughput(workspace)
+
+def main():
+    """Test de la mémoire des interactions"""
+    print("🧪 Test de l'InteractionStore")
+    print("=" * 50)
+    test_interaction_store()
+    print("\n🎉 Tous les tests de la mémoire des interactions sont passés")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Script de test pour les caches à écriture différée (geo_cache, thematic_cache)
+Vérifie que les nouvelles entrées sont ajoutées au journal sans réécrire
+l'instantané, et que le journal est rejoué puis compacté au chargement
+"""
+
+import sys
+import os
+import json
+import time
+import tempfile
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from agents.journal_cache import JournalCache
+
+def check_write_behind(tmp_dir):
+    """Les entrées sont vidées par seuil de taille, sans réécrire l'instantané"""
+    path = os.path.join(tmp_dir, "thematic_cache.json")
+    with open(path, 'w') as f:
+        json.dump({"thematic_ancien": ["jardinage"]}, f)
+    snapshot_mtime = os.path.getmtime(path)
+
+    cache = JournalCache(path, flush_interval=3600, flush_size=10)
+    assert cache["thematic_ancien"] == ["jardinage"]
+    for i in range(25):
+        cache[f"thematic_{i}"] = ["permaculture"]
+    assert cache.flushes == 2 and cache.journal_entries == 20
+    cache.flush_if_due()  # délai non écoulé : rien n'est écrit
+    assert cache.journal_entries == 20
+    cache.flush()
+    assert cache.journal_entries == 25
+    assert os.path.getmtime(path) == snapshot_mtime
+    with open(cache.journal_path) as f:
+        assert len(f.readlines()) == 25
+    print("✅ Écriture différée : 25 entrées ajoutées au journal, instantané intact")
+    return path
+
+def check_replay_and_compaction(path):
+    """Un nouveau chargement rejoue le journal (même tronqué) puis le compacte"""
+    with open(f"{path}.journal", 'a') as f:
+        f.write('["thematic_tronque", ["perma')
+    cache = JournalCache(path, flush_size=10)
+    assert len(cache) == 26
+    assert cache["thematic_24"] == ["permaculture"]
+    assert not os.path.exists(cache.journal_path)
+    with open(path) as f:
+        assert len(json.load(f)) == 26
+    print("✅ Journal rejoué et compacté au chargement")
+
+def check_speed(tmp_dir):
+    """Le coût d'un vidage ne dépend pas de la taille du cache"""
+    path = os.path.join(tmp_dir, "geo_cache.json")
+    cache = JournalCache(path, flush_interval=0, flush_size=10000)
+    for i in range(20000):
+        dict.__setitem__(cache, f"{i},0", {"country": "France"})
+    start = time.time()
+    for i in range(300):
+        cache[f"new{i},0"] = {"country": "France"}
+        cache.flush_if_due()
+    elapsed = time.time() - start
+    assert cache.flushes == 300
+    assert elapsed < 2
+    cache.close()
+    print(f"✅ 300 vidages sur un cache de 20000 entrées en {elapsed:.3f}s")
+
+def test_journal_cache():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = check_write_behind(tmp_dir)
+        check_replay_and_compaction(path)
+        check_speed(tmp_dir)
+
+def main():
+    """Test des caches à écriture différée"""
+    print("🧪 Test du JournalCache")
+    print("=" * 50)
+    test_journal_cache()
+    print("\n🎉 Tous les tests du JournalCache sont passés")
+
+if __name__ == "__main__":
+    main()
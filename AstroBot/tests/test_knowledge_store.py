@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Script de test pour le stockage SQLite de la base de connaissance
+Vérifie que seules les fiches modifiées sont réécrites et que les statistiques
+d'avancement sont calculées sans recharger toute la base
+"""
+
+import sys
+import os
+import json
+import tempfile
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from agents.knowledge_store import KnowledgeStore
+from agents.knowledge_cache import KnowledgeBaseCache
+
+def sample_knowledge_base():
+    """Petite base de connaissance de démonstration"""
+    return {
+        "pubkey_alice": {
+            "uid": "alice",
+            "source": "g1_wot",
+            "metadata": {"language": "fr", "country": "France", "tags": ["permaculture"]},
+            "import_metadata": {"source_script": "g1_prospects", "discovery_method": "wot"}
+        },
+        "pubkey_bob": {
+            "uid": "bob",
+            "source": "g1_wot",
+            "profile": {"_source": {"geoPoint": {"lat": 43.6, "lon": 1.44}}},
+            "linked_accounts": ["nostr:npub_bob"]
+        }
+    }
+
+def check_incremental_save(store):
+    """Une sauvegarde sans modification ne doit rien réécrire"""
+    knowledge_base = sample_knowledge_base()
+    assert store.save(knowledge_base) == 2
+    assert store.save(knowledge_base) == 0
+
+    knowledge_base["pubkey_bob"]["metadata"] = {"language": "en"}
+    assert store.save(knowledge_base) == 1
+    assert store.get("pubkey_bob")["metadata"]["language"] == "en"
+    assert store.load_all() == knowledge_base
+    print("✅ Sauvegarde incrémentale : seules les fiches modifiées sont écrites")
+
+def check_progress_stats(store):
+    """Les statistiques SQL correspondent au contenu de la base"""
+    stats = store.progress_stats()
+    assert stats["total"] == 2
+    assert stats["language"] == 2
+    assert stats["tags"] == 1
+    assert stats["gps_prospects"] == 1
+    assert stats["linked_accounts"] == 1
+    assert stats["import_sources"] == {"g1_prospects": 1}
+    assert stats["discovery_methods"] == {"wot": 1}
+    print(f"✅ Statistiques d'avancement : {stats}")
+
+def check_import_json(tmp_dir):
+    """Import de l'ancien fichier enriched_prospects.json"""
+    json_file = os.path.join(tmp_dir, "enriched_prospects.json")
+    with open(json_file, 'w') as f:
+        json.dump(sample_knowledge_base(), f)
+
+    store = KnowledgeStore(os.path.join(tmp_dir, "import.db"))
+    assert store.import_json(json_file) == 2
+    assert store.count() == 2
+    store.close()
+    print("✅ Import de la base JSON historique")
+
+def check_knowledge_cache(store):
+    """Le cache ne relit la base que lorsqu'elle a été modifiée"""
+    cache = KnowledgeBaseCache(store)
+    assert cache.get("pubkey_alice")["uid"] == "alice"
+    assert cache.find(uid="bob")[0] == "pubkey_bob"
+    assert cache.find(pubkey="inconnue", uid="alice")[0] == "pubkey_alice"
+    assert cache.find(uid="inconnu") == (None, None)
+    assert cache.reloads == 1
+
+    knowledge_base = store.load_all()
+    knowledge_base["pubkey_carol"] = {"uid": "carol"}
+    store.save(knowledge_base)
+    assert cache.find(uid="carol")[0] == "pubkey_carol"
+    assert cache.reloads == 2
+    print("✅ Cache partagé : recherches par pubkey/uid et rechargement après écriture")
+
+def check_secondary_indexes(store):
+    """Les index inversés suivent les modifications des métadonnées"""
+    cache = KnowledgeBaseCache(store)
+    knowledge_base = store.load_all()
+    knowledge_base["pubkey_bob"]["metadata"] = {
+        "language": "fr", "country": "France", "region": "Occitanie",
+        "tags": ["permaculture", "logiciel libre"], "web2": ["website"]
+    }
+    store.save(knowledge_base)
+
+    assert cache.lookup('tag', ['permaculture']) == {"pubkey_alice", "pubkey_bob"}
+    assert cache.lookup('web2', ['website']) == {"pubkey_bob"}
+    assert cache.counts('tag')[0] == ("permaculture", 2)
+    assert cache.lookup('region', ['Occitanie, France']) == {"pubkey_bob"}
+
+    # Intersection de filtres : thème ET pays ET région
+    selection = cache.lookup('tag', ['permaculture']) & cache.lookup('country', ['France']) & cache.lookup('region', ['Occitanie, France'])
+    assert [pubkey for pubkey, _ in cache.records(selection)] == ["pubkey_bob"]
+
+    # Les anciennes entrées d'index sont retirées lors de la réécriture du profil
+    knowledge_base["pubkey_bob"]["metadata"]["tags"] = ["error"]
+    store.save(knowledge_base)
+    assert cache.lookup('tag', ['permaculture', 'logiciel libre']) == {"pubkey_alice"}
+    print("✅ Index inversés : thèmes, réseaux, langue, pays et région")
+
+def test_knowledge_store():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = KnowledgeStore(os.path.join(tmp_dir, "enriched_prospects.db"))
+        check_incremental_save(store)
+        check_progress_stats(store)
+        check_knowledge_cache(store)
+        check_secondary_indexes(store)
+        store.close()
+        check_import_json(tmp_dir)
+
+def main():
+    """Test du stockage SQLite de la base de connaissance"""
+    print("🧪 Test du KnowledgeStore")
+    print("=" * 50)
+
+    test_knowledge_store()
+
+    print("\n🎉 Tous les tests du KnowledgeStore sont passés")
+
+if __name__ == "__main__":
+    main()
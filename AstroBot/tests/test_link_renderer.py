@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Script de test pour le moteur d'injection des liens
+Vérifie que le LinkRenderer produit exactement le même texte que l'ancienne
+injection (une substitution par lien) et mesure le gain sur quelques
+milliers de messages
+"""
+
+import sys
+import os
+import re
+import time
+import logging
+import tempfile
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from agents.link_renderer import LinkRenderer, LINK_PLACEHOLDERS
+from agents.strategist_agent import StrategistAgent
+
+LINKS_CONFIG = {key: f"https://{key}.example/" for key, _ in LINK_PLACEHOLDERS}
+LINKS_CONFIG.update({'blog': '', 'wiki': ''})
+
+MESSAGES = [
+    "Bonjour {uid},\n\nLe code est sur [Lien vers GitHub].\nSoutenez-nous : [Lien vers OpenCollective] !",
+    "Lisez notre [Lien vers Blog] et notre [Lien vers wiki]... puis le [lien vers SITE WEB]).",
+    "Rien à remplacer ici,   seulement   des espaces.\n\n\n",
+    "[Lien vers G1], [Lien vers Zen] et [Lien vers Inconnu] et [Lien vers Multipass]?!",
+    "Documentation : [Lien vers Documentation]\tCommunauté : [Lien vers Discord], [Lien vers Telegram].",
+]
+
+def legacy_inject_links(message, links_config):
+    """Ancienne injection : une substitution insensible à la casse par lien"""
+    for key, name in LINK_PLACEHOLDERS:
+        message = re.sub(r'\[Lien vers ' + name + r'\]([^\w\s]*)', links_config.get(key, ''), message, flags=re.IGNORECASE)
+    message = re.sub(r'\s+', ' ', message)
+    message = re.sub(r'\n\s*\n\s*\n', '\n\n', message)
+    return message.strip()
+
+def check_same_output():
+    """Le rendu est identique à l'ancienne injection"""
+    renderer = LinkRenderer(LINKS_CONFIG)
+    for message in MESSAGES:
+        assert renderer.render(message) == legacy_inject_links(message, LINKS_CONFIG), message
+    assert renderer.render(MESSAGES[1]) == "Lisez notre et notre puis le https://website.example/"
+    # Deux placeholders accolés sont tous deux remplacés (l'ancienne injection avalait le second '[')
+    assert renderer.render("[Lien vers G1][Lien vers Zen]") == "https://g1.example/https://zen.example/"
+    print("✅ Rendu identique à l'ancienne injection")
+
+def check_benchmark(compare_timings=False):
+    """
+    Quelques milliers de messages sont rendus comme avec l'ancienne injection.
+    La comparaison des durées, sensible à la charge de la machine, n'est faite
+    que par le benchmark lancé directement (main), pas sous pytest.
+    """
+    messages = [" ".join([MESSAGES[i % len(MESSAGES)].replace("{uid}", f"membre{i}")] * 3) for i in range(5000)]
+    renderer = LinkRenderer(LINKS_CONFIG)
+
+    start = time.perf_counter()
+    rendered = [renderer.render(message) for message in messages]
+    elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    expected = [legacy_inject_links(message, LINKS_CONFIG) for message in messages]
+    legacy_elapsed = time.perf_counter() - start
+
+    assert rendered == expected
+    if compare_timings:
+        assert elapsed < legacy_elapsed
+    print(f"✅ {len(messages)} messages rendus en {elapsed:.3f}s (ancienne injection : {legacy_elapsed:.3f}s)")
+
+def check_strategist_reuse():
+    """Le Stratège ne relit la configuration des liens qu'une fois par campagne"""
+    with tempfile.TemporaryDirectory() as workspace:
+        shared_state = {'config': {'workspace': workspace}, 'status': {},
+                        'logger': logging.getLogger('test_link_renderer')}
+        strategist = StrategistAgent(shared_state)
+        loads = []
+        load_links_config = strategist._load_links_config
+        strategist._load_links_config = lambda: loads.append(1) or load_links_config()
+
+        for _ in range(100):
+            text = strategist._inject_links("Voir [Lien vers GitHub].", shared_state['config'])
+        assert text == "Voir https://github.com/papiche/Astroport.ONE" and len(loads) == 1
+
+        # Une nouvelle configuration des liens est prise en compte immédiatement
+        strategist._save_links_config({**load_links_config(), 'github': "https://git.example"})
+        assert strategist._inject_links("[Lien vers GitHub]", shared_state['config']) == "https://git.example"
+    print("✅ Configuration des liens chargée une fois par campagne")
+
+def test_link_renderer():
+    check_same_output()
+    check_benchmark()
+    check_strategist_reuse()
+
+def main():
+    """Test du moteur d'injection des liens"""
+    print("🧪 Test du LinkRenderer")
+    print("=" * 50)
+    check_same_output()
+    check_benchmark(compare_timings=True)
+    check_strategist_reuse()
+    print("\n🎉 Tous les tests d'injection des liens sont passés")
+
+if __name__ == "__main__":
+    main()
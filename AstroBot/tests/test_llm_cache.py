@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Script de test pour le cache des réponses de l'IA
+Vérifie la réutilisation des réponses, l'invalidation lors d'un changement
+de template et l'éviction des réponses les moins récemment utilisées
+"""
+
+import sys
+import os
+import logging
+import tempfile
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from agents.llm_cache import LLMResponseCache, prompt_version
+from agents.llm_client import OllamaClient
+from agents.strategist_agent import StrategistAgent
+
+def check_cached_generation(tmp_dir):
+    """Un prompt déjà posé n'est pas renvoyé à l'IA"""
+    question_script = os.path.join(tmp_dir, "question.py")
+    with open(question_script, 'w') as f:
+        f.write("import sys\nprint('réponse : ' + sys.argv[1])\n")
+
+    cache = LLMResponseCache(os.path.join(tmp_dir, "llm_cache.db"))
+    client = OllamaClient(None, "gemma3:latest", question_script=question_script, cache=cache)
+    namespace = f"thematic:{prompt_version('Extrais les thèmes')}"
+
+    first = client.generate("Extrais les thèmes\n\nTexte fourni: jardin", cache_namespace=namespace)
+    # Espacement différent, même prompt normalisé
+    again = client.generate("Extrais les thèmes  \nTexte fourni:   jardin", cache_namespace=namespace)
+    assert first == again and client.fallback_calls == 1
+
+    client.generate("Extrais les thèmes\n\nTexte fourni: jardin", cache_namespace=namespace, refresh=True)
+    client.generate("Sans cache")
+    client.generate("Sans cache")
+    assert client.fallback_calls == 4
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 1
+    print(f"✅ Réponses réutilisées : {cache.summary()}")
+    cache.close()
+
+def check_version_invalidation(tmp_dir):
+    """Un nouveau template invalide les réponses de l'ancienne version, et seulement celles-là"""
+    db_file = os.path.join(tmp_dir, "versions.db")
+    cache = LLMResponseCache(db_file)
+    old_ns = f"thematic:{prompt_version('ancien prompt')}"
+    geo_ns = f"geo:{prompt_version('prompt geo')}"
+    cache.put(cache.make_key("m", old_ns, "p1"), old_ns, "m", '["jardin"]')
+    cache.put(cache.make_key("m", geo_ns, "p1"), geo_ns, "m", '{"language": "fr"}')
+    cache.close()
+
+    cache = LLMResponseCache(db_file)
+    new_ns = f"thematic:{prompt_version('nouveau prompt')}"
+    assert cache.get(cache.make_key("m", new_ns, "p1"), new_ns) is None
+    assert cache.stats()['entries'] == 1
+    assert cache.get(cache.make_key("m", geo_ns, "p1"), geo_ns) == '{"language": "fr"}'
+    assert cache.invalidate("geo") == 1
+    print("✅ Invalidation sélective par version de prompt")
+    cache.close()
+
+def check_lru_eviction(tmp_dir):
+    """Au-delà de max_entries, les réponses les moins récemment utilisées sont évincées"""
+    cache = LLMResponseCache(os.path.join(tmp_dir, "lru.db"), max_entries=10)
+    keys = [cache.make_key("m", "writing", f"prompt {i}") for i in range(10)]
+    for i, key in enumerate(keys):
+        cache.put(key, "writing", "m", f"message {i}")
+    assert cache.get(keys[0], "writing") == "message 0"  # rafraîchit la première entrée
+    cache.put(cache.make_key("m", "writing", "prompt 10"), "writing", "m", "message 10")
+
+    assert cache.stats()['entries'] == 9 and cache.evictions == 2
+    assert cache.get(keys[0], "writing") == "message 0"
+    assert cache.get(keys[1], "writing") is None
+    print(f"✅ Éviction LRU : {cache.stats()}")
+    cache.close()
+
+def check_writing_not_cached(tmp_dir):
+    """La rédaction libre est régénérée à chaque appel, le choix du persona reste en cache"""
+    question_script = os.path.join(tmp_dir, "question_writing.py")
+    with open(question_script, 'w') as f:
+        f.write("import sys\nprint('message')\n")
+    cache = LLMResponseCache(os.path.join(tmp_dir, "writing.db"))
+    client = OllamaClient(None, "gemma3:latest", question_script=question_script, cache=cache)
+    strategist = StrategistAgent({'config': {'workspace': tmp_dir}, 'status': {}, 'llm_client': client,
+                                  'logger': logging.getLogger('test_llm_cache')})
+    for _ in range(2):
+        strategist._call_ia_for_writing("Rédige un message pour Alice", 'fr')
+    assert client.fallback_calls == 2 and cache.stats()['entries'] == 0
+    for _ in range(2):
+        strategist._call_ia_for_writing("Quel persona pour Alice ?", cache_namespace='persona_selection')
+    assert client.fallback_calls == 3 and cache.stats()['entries'] == 1
+    print("✅ Messages régénérés à chaque rédaction, choix du persona servi par le cache")
+    cache.close()
+
+def test_llm_cache():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        check_cached_generation(tmp_dir)
+        check_writing_not_cached(tmp_dir)
+        check_version_invalidation(tmp_dir)
+        check_lru_eviction(tmp_dir)
+
+def main():
+    """Test du cache des réponses de l'IA"""
+    print("🧪 Test du LLMResponseCache")
+    print("=" * 50)
+    test_llm_cache()
+    print("\n🎉 Tous les tests du cache IA sont passés")
+
+if __name__ == "__main__":
+    main()
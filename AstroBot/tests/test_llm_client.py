@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Script de test pour le client IA Ollama
+Lance un faux serveur Ollama local (http.server) et vérifie le streaming,
+le mode JSON, les nouvelles tentatives et le repli sur question.py
+"""
+
+import sys
+import os
+import json
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from agents.llm_client import OllamaClient
+
+class FakeOllamaHandler(BaseHTTPRequestHandler):
+    """Imite /api/tags et /api/generate (réponse en streaming NDJSON)"""
+    requests_received = []
+    fail_next = 0
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.end_headers()
+        self.wfile.write(b'{"models": []}')
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        FakeOllamaHandler.requests_received.append(payload)
+        if FakeOllamaHandler.fail_next:
+            FakeOllamaHandler.fail_next -= 1
+            self.send_response(503)
+            self.end_headers()
+            return
+        answer = '{"language": "fr"}' if payload.get('format') == 'json' else f"Bonjour {payload['prompt']} !"
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson')
+        self.end_headers()
+        # Découper la réponse en fragments comme le fait Ollama
+        for i in range(0, len(answer), 4):
+            self.wfile.write((json.dumps({"response": answer[i:i + 4], "done": False}) + "\n").encode())
+        self.wfile.write(b'{"response": "", "done": true}\n')
+
+def start_fake_ollama():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FakeOllamaHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def test_streaming_json_and_retries():
+    server = start_fake_ollama()
+    try:
+        client = OllamaClient(f"http://127.0.0.1:{server.server_port}", "gemma3:latest")
+        assert client.is_available()
+
+        fragments = []
+        assert client.generate("UPlanet", on_token=fragments.append) == "Bonjour UPlanet !"
+        assert len(fragments) > 1
+        assert FakeOllamaHandler.requests_received[-1]['model'] == "gemma3:latest"
+        assert FakeOllamaHandler.requests_received[-1]['stream'] is True
+
+        assert json.loads(client.generate("Texte", json_format=True)) == {"language": "fr"}
+        assert FakeOllamaHandler.requests_received[-1]['format'] == "json"
+
+        # Une erreur serveur transitoire est retentée sur la même session
+        FakeOllamaHandler.fail_next = 1
+        assert client.generate("retry") == "Bonjour retry !"
+        assert client.http_calls == 3 and client.fallback_calls == 0
+        print("✅ Streaming, mode JSON et nouvelles tentatives via l'API HTTP")
+    finally:
+        server.shutdown()
+
+def test_fallback_to_question_script():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        question_script = os.path.join(tmp_dir, "question.py")
+        with open(question_script, 'w') as f:
+            f.write("import sys, json\n"
+                    "answer = 'repli : ' + sys.argv[1]\n"
+                    "print(json.dumps({'answer': answer}) if '--json' in sys.argv else answer)\n")
+
+        # Port fermé : l'API est injoignable, question.py prend le relais
+        client = OllamaClient("http://127.0.0.1:9", "gemma3:latest", question_script=question_script, max_retries=0)
+        assert client.generate("test").strip() == "repli : test"
+        assert client.generate("test", json_format=True) == "repli : test"
+        assert client.fallback_calls == 2
+        print("✅ Repli sur question.py quand l'API Ollama est injoignable")
+
+def main():
+    """Test du client IA Ollama"""
+    print("🧪 Test de l'OllamaClient")
+    print("=" * 50)
+    test_streaming_json_and_retries()
+    test_fallback_to_question_script()
+    print("\n🎉 Tous les tests du client IA sont passés")
+
+if __name__ == "__main__":
+    main()
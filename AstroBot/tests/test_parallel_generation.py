@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Script de test pour la rédaction parallèle des messages personnalisés
+Vérifie que les cibles sont rédigées simultanément, que les messages sont
+écrits au fil de l'eau et qu'une rédaction interrompue reprend sans
+régénérer les cibles déjà traitées
+"""
+
+import sys
+import os
+import json
+import time
+import logging
+import tempfile
+import threading
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from agents.strategist_agent import StrategistAgent
+from agents.web_cache import WebContentCache
+
+class OfflineWebCache(WebContentCache):
+    """Cache web dont les pages sont « téléchargées » sans réseau"""
+    downloaded = None
+
+    def _download(self, url, stale_row=None):
+        self.downloaded.append(url)
+        self._store(url, f"contenu de {url}", None, None)
+        return f"contenu de {url}"
+
+class OfflineStrategist(StrategistAgent):
+    """Stratège dont l'IA et le web répondent sans réseau, et qui peut être « interrompu »"""
+    def __init__(self, shared_state, interrupt_at=None, delay=0.05):
+        super().__init__(shared_state)
+        self.interrupt_at = interrupt_at
+        self.delay = delay
+        self.failing = {"membre07"}
+        self.generated = []
+        self.downloads = []
+        self.active = 0
+        self.max_active = 0
+        self._counter_lock = threading.Lock()
+
+    def _check_ollama_once(self):
+        return True
+
+    def _check_perplexica_once(self):
+        return True
+
+    def _load_banks_config(self, config_file):
+        return {'banks': {}}
+
+    def _get_target_website(self, target):
+        return f"https://{target['uid']}.example" if target['uid'].endswith('0') else ""
+
+    def _web_cache(self):
+        if 'web_cache' not in self.shared_state:
+            self.shared_state['web_cache'] = OfflineWebCache(
+                os.path.join(self.shared_state['config']['workspace'], "web_cache.db"), max_workers=2)
+        self.shared_state['web_cache'].downloaded = self.downloads
+        return self.shared_state['web_cache']
+
+    def _generate_message_for_target(self, target, mode, banks_config, treasury_pubkey, selected_bank=None):
+        if target['uid'] == self.interrupt_at:
+            raise KeyboardInterrupt()
+        with self._counter_lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        website = self._get_target_website(target)
+        web_context = self._fetch_website_content(website) if website else ""
+        time.sleep(self.delay)
+        with self._counter_lock:
+            self.active -= 1
+            self.generated.append(target['uid'])
+        if target['uid'] in self.failing:
+            return None  # échec de rédaction
+        return {'title': f"Bonjour {target['uid']}", 'text': f"Message pour {target['uid']} {web_context}"}
+
+def make_shared_state(workspace):
+    return {
+        'config': {'workspace': workspace, 'ia_max_workers': 4,
+                   'uplanet_treasury_g1pub': "TRESOR"},
+        'status': {}, 'logger': logging.getLogger('test_parallel_generation'),
+        'targets': [{'pubkey': f"pk{i:02d}", 'uid': f"membre{i:02d}", 'metadata': {}} for i in range(24)]
+    }
+
+def check_parallel_generation(workspace):
+    """Plusieurs cibles sont rédigées en même temps et les sites web sont préchargés"""
+    strategist = OfflineStrategist(make_shared_state(workspace))
+    start = time.time()
+    messages = strategist.run(mode="auto", resume=False)
+    elapsed = time.time() - start
+
+    assert len(messages) == 23 and strategist.max_active > 1
+    assert [item['target']['uid'] for item in messages] == [f"membre{i:02d}" for i in range(24) if i != 7]
+    assert sorted(strategist.downloads) == ["https://membre00.example", "https://membre10.example", "https://membre20.example"]
+    assert "contenu de https://membre10.example" in messages[9]['message']
+    print(f"✅ Rédaction parallèle : {len(messages)} messages en {elapsed:.2f}s (jusqu'à {strategist.max_active} simultanés)")
+
+def check_resume(workspace):
+    """Une rédaction interrompue reprend à la première cible non traitée, en retentant les cibles en échec"""
+    messages_file = os.path.join(workspace, "personalized_messages.json")
+    strategist = OfflineStrategist(make_shared_state(workspace), interrupt_at="membre15")
+    partial = strategist.run(mode="persona")
+    assert strategist.shared_state['status']['StrategistAgent'].startswith("Interrompu")
+    # Préchargements restants annulés : la sortie n'attend pas la file des sites web
+    assert strategist.shared_state['web_cache']._in_flight == {}
+    with open(messages_file) as f:
+        saved = json.load(f)
+    assert len(saved) == len(partial) > 0
+
+    assert "membre07" not in {item['target']['uid'] for item in partial}
+
+    # Reprise : membre07 (en échec avant l'arrêt) est retenté, les autres cibles traitées ne le sont pas
+    strategist = OfflineStrategist(make_shared_state(workspace))
+    strategist.failing = {"membre07", "membre20"}
+    messages = strategist.run(mode="persona")
+    assert "membre00" not in strategist.generated and "membre23" in strategist.generated
+    assert strategist.generated.count("membre07") == 1
+    assert len(messages) == 22
+    assert len({item['target']['pubkey'] for item in messages}) == 22
+    print(f"✅ Reprise : {len(partial)} messages conservés, {len(strategist.generated)} cibles rédigées à la reprise")
+
+    # Rédaction terminée avec des échecs : le lancement suivant ne retente que ces cibles
+    strategist = OfflineStrategist(make_shared_state(workspace))
+    strategist.failing = set()
+    messages = strategist.run(mode="persona")
+    assert sorted(strategist.generated) == ["membre07", "membre20"]
+    assert sorted(item['target']['uid'] for item in messages) == [f"membre{i:02d}" for i in range(24)]
+
+    # Une rédaction terminée n'est pas reprise : on recommence
+    strategist = OfflineStrategist(make_shared_state(workspace))
+    strategist.run(mode="persona")
+    assert len(strategist.generated) == 24
+
+def test_parallel_generation():
+    with tempfile.TemporaryDirectory() as workspace:
+        check_parallel_generation(workspace)
+        check_resume(workspace)
+
+def main():
+    """Test de la rédaction parallèle"""
+    print("🧪 Test de la rédaction parallèle des messages")
+    print("=" * 50)
+    test_parallel_generation()
+    print("\n🎉 Tous les tests de la rédaction parallèle sont passés")
+
+if __name__ == "__main__":
+    main()
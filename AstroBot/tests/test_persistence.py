@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Script de test pour l'écriture atomique des fichiers JSON du workspace
+Vérifie qu'une sauvegarde interrompue laisse l'ancienne version intacte et
+qu'un fichier corrompu est mis de côté au lieu d'être écrasé
+"""
+
+import sys
+import os
+import json
+import tempfile
+from unittest import mock
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from agents import persistence
+from agents.persistence import atomic_write_json, load_json
+
+CACHE = {f"43.{i:04d},1.4442": {"country": "France", "city": "Toulouse", "language": "fr"} for i in range(200)}
+
+def check_compact_write(tmp_dir):
+    """L'écriture compacte est plus petite que l'ancien format indenté"""
+    path = os.path.join(tmp_dir, "geo_cache.json")
+    size = atomic_write_json(path, CACHE, fsync=True)
+    assert load_json(path) == CACHE
+    assert size < len(json.dumps(CACHE, indent=2))
+    assert os.listdir(tmp_dir) == ["geo_cache.json"]
+    print(f"✅ Écriture compacte : {size} octets au lieu de {len(json.dumps(CACHE, indent=2))}")
+
+def check_interrupted_write(tmp_dir):
+    """Une écriture interrompue ne détruit pas la version précédente"""
+    path = os.path.join(tmp_dir, "geo_cache.json")
+    with mock.patch.object(persistence.os, 'replace', side_effect=KeyboardInterrupt):
+        try:
+            atomic_write_json(path, {"partiel": True})
+            assert False, "l'interruption aurait dû être propagée"
+        except KeyboardInterrupt:
+            pass
+    assert load_json(path) == CACHE
+    assert os.listdir(tmp_dir) == ["geo_cache.json"]  # pas de fichier temporaire orphelin
+    print("✅ Écriture interrompue : ancienne version intacte")
+
+def check_corrupt_file(tmp_dir):
+    """Un fichier tronqué est mis de côté et la valeur par défaut est retournée"""
+    path = os.path.join(tmp_dir, "thematic_cache.json")
+    with open(path, 'w') as f:
+        f.write('{"thematic_abc": ["permac')
+    assert load_json(path, {}) == {}
+    assert not os.path.exists(path)
+    assert any(name.startswith("thematic_cache.json.corrupt-") for name in os.listdir(tmp_dir))
+    assert load_json(path, []) == []
+    print("✅ Fichier corrompu mis de côté au lieu d'être écrasé")
+
+def check_file_mode(tmp_dir):
+    """Les droits d'un fichier existant sont conservés, un nouveau fichier suit le umask"""
+    path = os.path.join(tmp_dir, "links_config.json")
+    with open(path, 'w') as f:
+        f.write('{}')
+    os.chmod(path, 0o644)
+    atomic_write_json(path, {"github": "https://git.example"})
+    assert os.stat(path).st_mode & 0o777 == 0o644
+    os.chmod(path, 0o640)
+    atomic_write_json(path, {})
+    assert os.stat(path).st_mode & 0o777 == 0o640
+
+    new_path = os.path.join(tmp_dir, "todays_targets.json")
+    umask = os.umask(0o022)
+    try:
+        persistence._umask = 0o022
+        atomic_write_json(new_path, [])
+    finally:
+        os.umask(umask)
+        persistence._umask = umask
+    assert os.stat(new_path).st_mode & 0o777 == 0o644
+    print("✅ Droits des fichiers conservés (pas de 0600 imposé par le fichier temporaire)")
+
+def test_persistence():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        check_compact_write(tmp_dir)
+        check_interrupted_write(tmp_dir)
+        check_corrupt_file(tmp_dir)
+        check_file_mode(tmp_dir)
+
+def main():
+    """Test de l'écriture atomique des fichiers JSON"""
+    print("🧪 Test de la persistance JSON")
+    print("=" * 50)
+    test_persistence()
+    print("\n🎉 Tous les tests de persistance sont passés")
+
+if __name__ == "__main__":
+    main()
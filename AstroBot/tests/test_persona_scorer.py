@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Script de test pour la sélection locale des personas (TF-IDF)
+Vérifie le choix du persona sans IA, la détection des cas ambigus et
+la rapidité du traitement de milliers de profils
+"""
+
+import sys
+import os
+import time
+import logging
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from agents.persona_scorer import PersonaScorer, tokenize
+from agents.strategist_agent import StrategistAgent
+
+BANKS_CONFIG = {
+    'banks': {
+        '0': {'name': "Ingénieur Réseau", 'archetype': "Le Technicien",
+              'themes': ["technologie", "informatique", "logiciel-libre"],
+              'corpus': {'vocabulary': ["serveur", "réseau", "linux", "décentralisé", "ipfs"],
+                         'arguments': ["L'auto-hébergement rend la souveraineté numérique"]}},
+        '1': {'name': "Jardinier Permaculteur", 'archetype': "Le Cultivateur",
+              'themes': ["permaculture", "jardinage", "écologie"],
+              'corpus': {'vocabulary': ["potager", "semences", "compost", "sol vivant"],
+                         'arguments': ["Nourrir la terre qui nous nourrit"]},
+              'multilingual': {'es': {'name': "Jardinero", 'vocabulary': ["huerto", "semillas"]}}},
+        '2': {'name': "Militant Monnaie Libre", 'archetype': "Le Philosophe",
+              'themes': ["monnaie-libre", "économie", "g1"],
+              'corpus': {'vocabulary': ["dividende universel", "june", "toile de confiance"],
+                         'arguments': ["Une monnaie co-créée par chacun"]}},
+        '3': {'name': "Persona sans corpus", 'themes': ["musique"]},
+    }
+}
+
+def check_tokenize():
+    assert tokenize("Écologie & Sol-Vivant, de la TERRE") == ["ecologie", "sol", "vivant", "terre"]
+    print("✅ Normalisation des mots (accents, casse, mots outils)")
+
+def check_selection():
+    """Les profils nets sont attribués localement, les autres signalés ambigus"""
+    scorer = PersonaScorer(BANKS_CONFIG)
+    assert scorer.slots == ['0', '1', '2']
+
+    slot, score, ambiguous, ranking = scorer.select(["permaculture", "jardinage"], "Je cultive mon potager en sol vivant")
+    assert slot == '1' and not ambiguous and score > 0.3
+
+    slot, score, ambiguous, _ = scorer.select([], "Mon huerto et mes semillas")
+    assert slot == '1'
+
+    slot, score, ambiguous, ranking = scorer.select(["linux", "potager"], "Bonjour à tous")
+    assert ambiguous and {ranking[0][0], ranking[1][0]} == {'0', '1'}
+
+    slot, score, ambiguous, ranking = scorer.select(["cuisine"], "J'aime les voyages")
+    assert slot is None and ambiguous and score == 0.0
+    print("✅ Sélection locale et détection des cas ambigus")
+
+def check_throughput():
+    """Des milliers de profils sont attribués en quelques secondes au plus"""
+    scorer = PersonaScorer(BANKS_CONFIG)
+    profiles = [(["permaculture", "g1"] if i % 2 else ["informatique"], f"profil {i} : serveur linux et compost")
+                for i in range(5000)]
+    start = time.time()
+    results = scorer.select_many(profiles)
+    elapsed = time.time() - start
+    assert len(results) == 5000 and elapsed < 5
+    print(f"✅ {len(results)} profils attribués en {elapsed:.2f}s")
+
+class CountingStrategist(StrategistAgent):
+    """Stratège qui compte les appels à l'IA au lieu de l'interroger"""
+    def __init__(self, shared_state):
+        super().__init__(shared_state)
+        self.ia_calls = []
+
+    def _knowledge_cache(self):
+        raise RuntimeError("pas de base de connaissance")
+
+    def _call_ia_for_writing(self, final_prompt, target_language='fr', cache_namespace=None):
+        self.ia_calls.append(final_prompt)
+        return "Banque 2"
+
+def check_llm_escalation():
+    """Seuls les profils ambigus sont soumis à l'IA, avec les seuls personas candidats"""
+    shared_state = {'config': {}, 'status': {}, 'logger': logging.getLogger('test_persona_scorer')}
+    strategist = CountingStrategist(shared_state)
+    strategist._persona_scorer(BANKS_CONFIG).select = lambda tags, description: ('1', 0.8, False, [('1', 0.8)])
+    bank = strategist._analyze_profile_and_select_bank([{'uid': "alice"}], BANKS_CONFIG)
+    assert bank['name'] == "Jardinier Permaculteur" and not strategist.ia_calls
+
+    strategist = CountingStrategist(shared_state)
+    strategist._persona_scorer(BANKS_CONFIG).select = lambda tags, description: ('0', 0.3, True, [('0', 0.3), ('2', 0.28), ('1', 0.0)])
+    bank = strategist._analyze_profile_and_select_bank([{'uid': "bob"}], BANKS_CONFIG)
+    assert bank['name'] == "Militant Monnaie Libre" and len(strategist.ia_calls) == 1
+    assert "Jardinier" not in strategist.ia_calls[0] and "Banque 0" in strategist.ia_calls[0]
+    print("✅ Escalade vers l'IA limitée aux cas ambigus")
+
+def test_persona_scorer():
+    check_tokenize()
+    check_selection()
+    check_throughput()
+    check_llm_escalation()
+
+def main():
+    """Test de la sélection locale des personas"""
+    print("🧪 Test du PersonaScorer")
+    print("=" * 50)
+    test_persona_scorer()
+    print("\n🎉 Tous les tests de sélection des personas sont passés")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Script de test pour le classement des réponses reçues
+Vérifie les règles multilingues (POSITIF, NÉGATIF, STOP), le modèle bayésien
+entraîné sur les réponses déjà classées, le recours à l'IA pour les seules
+réponses ambiguës et l'ajout des demandes de désinscription à la blocklist
+"""
+
+import sys
+import os
+import json
+import time
+import logging
+import tempfile
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from agents.reply_classifier import ReplyClassifier, NaiveBayesModel, POSITIVE, NEGATIVE, STOP, NEUTRAL
+from agents.operator_agent import OperatorAgent
+from agents.analyst_agent import AnalystAgent
+
+RULE_CASES = [
+    ("Oui, ça m'intéresse !", POSITIVE),
+    ("Comment faire pour rejoindre UPlanet ?", POSITIVE),
+    ("Tell me more, how can I join?", POSITIVE),
+    ("Me interesa, ¿cómo participo?", POSITIVE),
+    ("#recherche ipfs", POSITIVE),
+    ("Non merci", NEGATIVE),
+    ("Je ne suis pas intéressé, mais merci", NEGATIVE),
+    ("Not interested, thanks", NEGATIVE),
+    ("Kein Interesse", NEGATIVE),
+    ("Non mi interessa", NEGATIVE),
+    ("STOP", STOP),
+    ("Merci de me retirer de vos listes, désabonnez-moi", STOP),
+    ("Arrêtez de m'écrire", STOP),
+    ("Please remove me", STOP),
+    ("Darme de baja por favor", STOP),
+    ("Stop merci", STOP),
+    ("Super projet ! Stop au gaspillage, je veux participer", POSITIVE),
+    ("Arrêtez de vous excuser, c'est génial, comment je rejoins ?", POSITIVE),
+    ("C'est du spam", NEGATIVE),
+]
+AMBIGUOUS = ["Bonjour, je reviens vers vous", "Hmm", "Non, mais comment ça marche ?",
+             "Est-ce du spam ? Comment ça marche ?", "Désabonnez-moi, mais bravo pour le projet",
+             # Réponses hostiles : ni un « si » initial ni une question seule ne valent un intérêt
+             "Si vous m'écrivez encore je porte plainte", "Qui vous a donné mon adresse ?"]
+
+def check_rules():
+    """Les cas nets sont tranchés par les règles, les autres sont signalés ambigus"""
+    classifier = ReplyClassifier()
+    for message, expected in RULE_CASES:
+        decision = classifier.classify(message)
+        assert (decision['label'], decision['path']) == (expected, 'règles'), (message, decision)
+    for message in AMBIGUOUS:
+        decision = classifier.classify(message)
+        assert decision['ambiguous'] and decision['label'] == NEUTRAL and decision['path'] is None, (message, decision)
+        assert decision['hint'] != STOP  # sans l'IA, pas de blocklist sur une réponse ambiguë
+
+    messages = [message for message, _ in RULE_CASES] * 700
+    start = time.perf_counter()
+    for message in messages:
+        classifier.classify(message)
+    per_message = (time.perf_counter() - start) / len(messages) * 1e6
+    assert per_message < 200
+    print(f"✅ Règles multilingues : {per_message:.0f} µs par réponse")
+
+def check_model():
+    """Le modèle bayésien tranche les réponses ambiguës qui ressemblent aux réponses déjà classées"""
+    samples = [("je reviens vers vous bientôt pour en discuter", POSITIVE),
+               ("je reviens vers vous après en avoir parlé à mon association", POSITIVE),
+               ("je reviens vers vous la semaine prochaine", POSITIVE),
+               ("ce genre de projet me fatigue", NEGATIVE),
+               ("encore un projet crypto, ça me fatigue", NEGATIVE),
+               ("ça me fatigue tout ça", NEGATIVE)] * 4
+    model = NaiveBayesModel(samples)
+    assert model.predict("je reviens vers vous")[0] == POSITIVE and NaiveBayesModel().predict("x") == (None, 0.0)
+
+    classifier = ReplyClassifier(samples, min_samples=20, min_confidence=0.8)
+    decision = classifier.classify("Bonjour, je reviens vers vous")
+    assert (decision['label'], decision['path']) == (POSITIVE, 'modèle') and decision['confidence'] >= 0.8
+    assert classifier.classify("Ça me fatigue")['label'] == NEGATIVE
+    # Le modèle ne décide jamais seul d'un STOP
+    stop_samples = [("laissez moi tranquille", STOP)] * 10 + [("je reviens vers vous", POSITIVE)] * 10
+    assert ReplyClassifier(stop_samples, min_samples=20).classify("laissez moi tranquille")['ambiguous']
+    # Trop peu d'exemples : le modèle ne décide pas seul
+    assert ReplyClassifier(samples[:6], min_samples=20).classify("je reviens vers vous")['ambiguous']
+    print("✅ Modèle bayésien entraîné sur les réponses classées")
+
+class OfflineOperator(OperatorAgent):
+    """Opérateur dont l'IA répond sans réseau en comptant les appels"""
+    def __init__(self, shared_state):
+        super().__init__(shared_state)
+        self.llm_calls = []
+
+    def _classify_reply_with_llm(self, message):
+        self.llm_calls.append(message)
+        if self.shared_state.get('llm_down'):
+            raise ConnectionError("Ollama injoignable")
+        return POSITIVE if "reviens" in message else NEUTRAL
+
+def check_escalation(workspace):
+    """Seules les réponses ambiguës sont confiées à l'IA ; l'étape qui a décidé est enregistrée"""
+    shared_state = {'config': {'workspace': workspace, 'blocklist_file': os.path.join(workspace, "blocklist.json"),
+                               'reply_model_min_samples': 3},
+                    'status': {}, 'logger': logging.getLogger('test_reply_classifier')}
+    operator = OfflineOperator(shared_state)
+    for message, expected in RULE_CASES:
+        assert operator.classify_reply(message)['label'] == expected
+    assert operator.llm_calls == []
+
+    assert operator.classify_reply("Bonjour, je reviens vers vous")['path'] == 'ia'
+    assert operator.classify_reply("Hmm")['label'] == NEUTRAL and len(operator.llm_calls) == 2
+    shared_state['llm_down'] = True
+    assert operator.classify_reply("Non, mais comment ça marche ?")['path'] == 'repli'
+    assert operator._should_auto_respond("Oui, avec plaisir !") and not operator._should_auto_respond("Non merci")
+
+    # Classement enregistré avec son étape ; les réponses de l'IA entraînent le modèle des sessions suivantes
+    sources = [source for _, _, source in operator._interaction_store().labeled_replies()]
+    assert sources.count('règles') == len(RULE_CASES) + 2 and sources.count('ia') == 2 and sources.count('repli') == 1
+    assert [label for _, label, _ in operator._interaction_store().labeled_replies(('ia',))] == [POSITIVE, NEUTRAL]
+    assert OfflineOperator(shared_state)._reply_classifier().model.samples == 2
+
+    # Réponse hostile en forme de question : confiée à l'IA, pas de relance automatique
+    shared_state['llm_down'] = False
+    assert operator.classify_reply("Qui vous a donné mon adresse ?")['path'] == 'ia'
+    assert not operator._should_auto_respond("Si vous m'écrivez encore je porte plainte")
+    print("✅ IA consultée pour les seules réponses ambiguës (2 sur "
+          f"{len(RULE_CASES) + 3}), étape de décision enregistrée")
+
+def check_blocklist(workspace):
+    """Une demande de désinscription ajoute l'expéditeur à la blocklist, une seule fois, et l'exclut des campagnes suivantes"""
+    shared_state = {'config': {'workspace': workspace, 'blocklist_file': os.path.join(workspace, "blocklist.json"),
+                               'prospect_file': os.path.join(workspace, "absent.json"),
+                               'enriched_prospects_file': os.path.join(workspace, "enriched_prospects.json"),
+                               'knowledge_base_db': os.path.join(workspace, "enriched_prospects.db")},
+                    'status': {}, 'targets': [], 'logger': logging.getLogger('test_reply_classifier')}
+    analyst = AnalystAgent(shared_state)
+    analyst._knowledge_store().save({"pk_alice": {"uid": "alice", "metadata": {"language": "fr"}},
+                                     "pk_dan": {"uid": "dan", "metadata": {"language": "fr"}}})
+    assert [target['uid'] for target in analyst.select_targets([("language", ["fr"], False)], save=False)] == ["alice", "dan"]
+    operator = OfflineOperator(shared_state)
+    operator.record_interaction("pk_dan", "dan", "Bonjour", slot=1, channel='jaklis')
+    assert operator.process_incoming_response("pk_dan", "dan", "STOP, ne plus me contacter", 1) is None
+    assert operator.process_incoming_response("pk_dan", "dan", "stop", 1) is None
+    assert operator.process_incoming_response("pk_dan", "dan", "Non merci", 1) is None
+    with open(shared_state['config']['blocklist_file']) as f:
+        blocklist = json.load(f)
+    assert [(entry['pubkey'], entry['uid']) for entry in blocklist] == [("pk_dan", "dan")]
+    assert operator.llm_calls == []
+
+    # Ciblage suivant : l'expéditeur du STOP n'est plus retenu
+    targets = analyst.select_targets([("language", ["fr"], False)])
+    assert [target['uid'] for target in targets] == ["alice"]
+    # Envoi d'une campagne préparée avant le STOP : l'expéditeur est retiré avant tout envoi
+    prepared = []
+    operator._jaklis_deliveries = lambda campaign_data: prepared.extend(campaign_data)
+    operator.send_campaign([{'target': {'pubkey': "pk_alice", 'uid': "alice"}, 'message': "Bonjour"},
+                            {'target': {'pubkey': "pk_dan", 'uid': "dan"}, 'message': "Bonjour"}], ['jaklis'], dry_run=True)
+    assert [item['target']['uid'] for item in prepared] == ["alice"]
+    print("✅ Demande de désinscription ajoutée à la blocklist et exclue des campagnes suivantes")
+
+def test_reply_classifier():
+    check_rules()
+    check_model()
+    with tempfile.TemporaryDirectory() as workspace:
+        check_escalation(workspace)
+    with tempfile.TemporaryDirectory() as workspace:
+        check_blocklist(workspace)
+
+def main():
+    """Test du classement des réponses"""
+    print("🧪 Test du ReplyClassifier")
+    print("=" * 50)
+    test_reply_classifier()
+    print("\n🎉 Tous les tests de classement des réponses sont passés")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Script de test pour le mode Modèle du Stratège
+Vérifie qu'un seul message est rédigé par groupe de cibles (persona, langue,
+thèmes), que les variables sont complétées pour chaque cible et que la
+retouche par l'IA est réservée aux profils les plus riches
+"""
+
+import sys
+import os
+import json
+import logging
+import tempfile
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from agents.strategist_agent import StrategistAgent
+
+BANKS_CONFIG = {
+    'banks': {
+        '1': {'name': "Jardinier Permaculteur", 'archetype': "Le Cultivateur",
+              'themes': ["permaculture", "jardinage"],
+              'corpus': {'vocabulary': ["potager", "compost"], 'tone': "chaleureux"}},
+        '2': {'name': "Militant Monnaie Libre", 'archetype': "Le Philosophe",
+              'themes': ["monnaie-libre", "g1"],
+              'corpus': {'vocabulary': ["june", "dividende"], 'tone': "convaincu"}},
+    }
+}
+
+PROFILES = {
+    "pk_alice": {'metadata': {'language': 'fr', 'city': "Toulouse", 'tags': ["permaculture", "jardinage"]}},
+    "pk_bruno": {'metadata': {'language': 'fr', 'city': "Albi", 'tags': ["jardinage", "permaculture"]}},
+    "pk_chloe": {'metadata': {'language': 'fr', 'city': "Nantes", 'tags': ["permaculture", "jardinage", "compost"]},
+                 'profile': {'_source': {'description': "Ferme pédagogique en permaculture"}}},
+    "pk_diego": {'metadata': {'language': 'es', 'city': "Sevilla", 'tags': ["permaculture", "jardinage"]}},
+    "pk_emma": {'metadata': {'language': 'fr', 'tags': ["g1", "monnaie-libre"]}},
+    "pk_farid": {'metadata': {'language': 'fr', 'tags': ["monnaie-libre", "g1"]}},
+}
+
+class FakeKnowledgeCache:
+    def get(self, pubkey):
+        return PROFILES.get(pubkey)
+
+class OfflineStrategist(StrategistAgent):
+    """Stratège dont l'IA répond sans réseau en comptant les appels"""
+    def __init__(self, shared_state):
+        super().__init__(shared_state)
+        self.prompts = []
+        self.failing_language = None
+
+    def _check_ollama_once(self):
+        return True
+
+    def _check_perplexica_once(self):
+        return True
+
+    def _load_banks_config(self, config_file):
+        return BANKS_CONFIG
+
+    def _knowledge_cache(self):
+        return FakeKnowledgeCache()
+
+    def _get_target_website(self, target):
+        return ""
+
+    def _load_links_config(self):
+        return {}
+
+    def _call_ia_for_writing(self, final_prompt, target_language='fr', cache_namespace=None):
+        self.prompts.append(final_prompt)
+        if target_language == self.failing_language:
+            raise ConnectionError("Ollama injoignable")
+        if "Adapte-le légèrement" in final_prompt:  # retouche d'un message déjà complété
+            return json.dumps({'title': "Titre retouché", 'text': "Message retouché"})
+        greeting = "Hola" if target_language == 'es' else "Bonjour"
+        city = " de {{city}}" if "{{city}} : sa ville" in final_prompt else ""
+        return json.dumps({'title': "Pour {uid}",
+                           'text': f"{greeting} {{uid}}{city}, vos passions ({{{{themes}}}}) nous parlent."})
+
+def make_shared_state(workspace, polish_min_value=None):
+    return {
+        'config': {'workspace': workspace, 'ia_max_workers': 2, 'uplanet_treasury_g1pub': "TRESOR",
+                   'template_polish_min_value': polish_min_value},
+        'status': {}, 'logger': logging.getLogger('test_template_mode'),
+        'targets': [{'pubkey': pubkey, 'uid': pubkey[3:].capitalize(), 'metadata': {}} for pubkey in PROFILES]
+    }
+
+def check_one_call_per_group(workspace):
+    """Une seule rédaction IA par groupe, variables complétées pour chaque cible"""
+    strategist = OfflineStrategist(make_shared_state(workspace))
+    messages = strategist.run(mode="template")
+
+    # Groupes : jardiniers fr (alice, bruno, chloe), jardinier es (diego), monnaie libre fr sans ville (emma, farid)
+    assert len(messages) == 6 and len(strategist.prompts) == 3
+    by_uid = {item['target']['uid']: item for item in messages}
+    assert by_uid["Alice"]['message'] == "Bonjour Alice de Toulouse, vos passions (permaculture, jardinage) nous parlent."
+    assert by_uid["Bruno"]['title'] == "Pour Bruno"
+    assert by_uid["Diego"]['message'].startswith("Hola Diego de Sevilla")
+    assert by_uid["Emma"]['message'] == "Bonjour Emma, vos passions (g1, monnaie-libre) nous parlent."
+    assert by_uid["Alice"]['group'] == by_uid["Bruno"]['group'] != by_uid["Diego"]['group']
+    assert "{" not in "".join(item['message'] + item['title'] for item in messages)
+
+    with open(os.path.join(workspace, "personalized_messages.json")) as f:
+        assert len(json.load(f)) == 6
+    print(f"✅ {len(messages)} messages pour {len(strategist.prompts)} appels à l'IA")
+
+def check_polish(workspace):
+    """Seules les cibles au profil riche sont retouchées par l'IA"""
+    strategist = OfflineStrategist(make_shared_state(workspace, polish_min_value=4))
+    messages = strategist.run(mode="template")
+    polished = [item['target']['uid'] for item in messages if item.get('polished')]
+    assert polished == ["Chloe"] and len(strategist.prompts) == 4
+    print("✅ Retouche IA réservée aux profils les plus riches")
+
+def check_failed_group(workspace):
+    """Un groupe dont le message modèle a échoué n'est pas rempli avec le message d'erreur"""
+    strategist = OfflineStrategist(make_shared_state(workspace))
+    strategist.failing_language = 'es'
+    messages = strategist.run(mode="template")
+    assert len(messages) == 5 and "Diego" not in [item['target']['uid'] for item in messages]
+    assert strategist._parse_ai_message_response("") is None
+    print("✅ Échec d'un message modèle : aucune cible du groupe ne reçoit de message d'erreur")
+
+def test_template_mode():
+    with tempfile.TemporaryDirectory() as workspace:
+        check_one_call_per_group(workspace)
+        check_polish(workspace)
+        check_failed_group(workspace)
+
+def main():
+    """Test du mode Modèle"""
+    print("🧪 Test du mode Modèle du Stratège")
+    print("=" * 50)
+    test_template_mode()
+    print("\n🎉 Tous les tests du mode Modèle sont passés")
+
+if __name__ == "__main__":
+    main()
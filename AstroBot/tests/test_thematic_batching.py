@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Script de test pour l'analyse thématique par lots
+Vérifie le regroupement des descriptions, la lecture de la réponse JSON
+indexée par identifiant et le repli en analyse individuelle
+"""
+
+import sys
+import os
+import json
+import logging
+import hashlib
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from agents.analyst_agent import AnalystAgent
+
+class ScriptedAnalyst(AnalystAgent):
+    """Analyste dont l'IA répond de façon scriptée (pas d'appel réseau)"""
+    def __init__(self, shared_state):
+        super().__init__(shared_state)
+        self.prompts = []
+
+    def _query_ia(self, prompt, expect_json=False, json_format=False, cache_namespace=None, refresh=False):
+        self.prompts.append(prompt)
+        if "MODE LOT" in prompt:
+            # L'IA « oublie » la description du boulanger dans sa réponse groupée
+            answers = {}
+            for line in prompt.splitlines():
+                if line.startswith('[') and 'boulanger' not in line:
+                    answers[line[1:9]] = ["permaculture"]
+            return {'answer': json.dumps(answers)}
+        return {'answer': '["artisan", "boulanger"]'}
+
+def make_item(description):
+    cache_key = f"thematic_{hashlib.md5(description.encode()).hexdigest()}"
+    return {'pubkey': cache_key, 'uid': description[:10], 'description': description, 'cache_key': cache_key}
+
+def test_batched_thematic_analysis():
+    shared_state = {
+        'config': {'thematic_batch_size': 4, 'thematic_batch_max_chars': 6000, 'ia_max_workers': 2},
+        'status': {},
+        'logger': logging.getLogger('test_thematic_batching')
+    }
+    analyst = ScriptedAnalyst(shared_state)
+    items = [make_item(f"Jardinier numéro {i}, je cultive en permaculture.") for i in range(7)]
+    items.append(make_item("Artisan boulanger, je fais mon pain au levain."))
+
+    packs = analyst._pack_descriptions(items, 4, 6000)
+    assert [len(pack) for pack in packs] == [4, 4]
+    assert [len(pack) for pack in analyst._pack_descriptions(items, 4, 100)] == [2, 2, 2, 2]
+
+    ia_cache = {}
+    processed = analyst._process_ia_batch(items, ia_cache, "PROMPT THÉMATIQUE", ["permaculture"])
+
+    assert len(processed) == 8
+    assert all(ia_cache[item['cache_key']] == ["permaculture"] for item in items[:7])
+    assert ia_cache[items[7]['cache_key']] == ["artisan", "boulanger"]
+    # 2 prompts groupés + 1 reprise individuelle au lieu de 8 prompts
+    assert len(analyst.prompts) == 3
+    assert sum(prompt.count("PROMPT THÉMATIQUE") for prompt in analyst.prompts) == 3
+    print(f"✅ 8 descriptions analysées en {len(analyst.prompts)} requêtes IA (dont 1 reprise individuelle)")
+
+def main():
+    """Test de l'analyse thématique par lots"""
+    print("🧪 Test de l'analyse thématique par lots")
+    print("=" * 50)
+    test_batched_thematic_analysis()
+    print("\n🎉 Tous les tests de l'analyse par lots sont passés")
+
+if __name__ == "__main__":
+    main()
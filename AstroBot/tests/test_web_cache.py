@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Script de test pour le cache du contenu des sites web
+Vérifie l'extraction du contenu principal, la réutilisation des pages en
+cache, la revalidation conditionnelle (ETag) et le préchargement parallèle,
+à l'aide d'un petit serveur HTTP local
+"""
+
+import sys
+import os
+import time
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from agents.web_cache import WebContentCache
+
+PAGE = b"""<html><head><script>var x = 1;</script></head><body>
+<nav>Accueil | Contact</nav>
+<main><h1>Ferme du Soleil</h1><p>Nous cultivons des <a href="/legumes">legumes</a> en permaculture.</p></main>
+<footer>Mentions legales</footer></body></html>"""
+
+class SiteHandler(BaseHTTPRequestHandler):
+    requests_seen = []
+
+    def do_GET(self):
+        SiteHandler.requests_seen.append((self.path, self.headers.get('If-None-Match')))
+        if self.path.startswith('/lent'):
+            time.sleep(0.2)
+        if self.path == '/absent':
+            self.send_response(404)
+            self.end_headers()
+            return
+        if self.headers.get('If-None-Match') == '"v1"':
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('ETag', '"v1"')
+        self.end_headers()
+        self.wfile.write(PAGE)
+
+    def log_message(self, *args):
+        pass
+
+def check_cache(base_url, tmp_dir):
+    """Une page n'est téléchargée et analysée qu'une fois, puis revalidée par ETag"""
+    db_file = os.path.join(tmp_dir, "web_cache.db")
+    cache = WebContentCache(db_file)
+    content = cache.get(f"{base_url}/ferme")
+    assert "Ferme du Soleil" in content and "permaculture" in content and "legumes" in content
+    assert "Accueil" not in content and "Mentions" not in content and "var x" not in content
+    assert cache.get(f"{base_url}/ferme", max_length=10) == content[:10] + "..."
+    assert cache.stats() == {'hits': 1, 'revalidated': 0, 'downloads': 1}
+    cache.close()
+
+    # Cache périmé : requête conditionnelle, la page (inchangée) n'est pas retéléchargée
+    cache = WebContentCache(db_file, ttl=0)
+    assert cache.get(f"{base_url}/ferme") == content
+    assert SiteHandler.requests_seen[-1] == ('/ferme', '"v1"') and cache.revalidated == 1
+
+    # Les erreurs sont mémorisées pour ne pas retenter le site à chaque cible
+    assert "erreur de récupération" in cache.get(f"{base_url}/absent")
+    seen = len(SiteHandler.requests_seen)
+    assert "erreur de récupération" in cache.get(f"{base_url}/absent")
+    assert len(SiteHandler.requests_seen) == seen
+    cache.close()
+    print("✅ Pages réutilisées depuis le cache et revalidées par ETag")
+
+def check_stale_when_offline(tmp_dir):
+    """Un site devenu injoignable est servi depuis le cache, même périmé"""
+    cache = WebContentCache(os.path.join(tmp_dir, "web_cache.db"), ttl=0, timeout=1)
+    cache._store("http://127.0.0.1:9/ferme", "contenu conservé", '"v1"', None)
+    assert cache.get("http://127.0.0.1:9/ferme") == "contenu conservé"
+    cache.close()
+    print("✅ Contenu en cache réutilisé quand le site est injoignable")
+
+def check_prefetch(base_url, tmp_dir):
+    """Le préchargement télécharge les sites en parallèle, une seule fois chacun"""
+    cache = WebContentCache(os.path.join(tmp_dir, "prefetch.db"), max_workers=4)
+    urls = [f"{base_url}/lent/{i}" for i in range(8)]
+    start = time.time()
+    assert cache.prefetch(urls + urls[:3]) == 8
+    contents = [cache.get(url) for url in urls]
+    elapsed = time.time() - start
+    assert all("Ferme du Soleil" in content for content in contents)
+    assert cache.downloads == 8 and elapsed < 8 * 0.2
+    assert cache.prefetch(urls) == 0  # déjà en cache
+    cache.close()
+    print(f"✅ {len(urls)} sites préchargés en {elapsed:.2f}s")
+
+def check_cancel_pending(base_url, tmp_dir):
+    """Les téléchargements préchargés pas encore commencés sont annulés sans être attendus"""
+    cache = WebContentCache(os.path.join(tmp_dir, "cancel.db"), max_workers=2)
+    urls = [f"{base_url}/lent/annule/{i}" for i in range(10)]
+    assert cache.prefetch(urls) == 10
+    start = time.time()
+    assert cache.cancel_pending() >= 7
+    assert cache._in_flight == {}
+    cache.close()
+    elapsed = time.time() - start
+    # Une URL annulée est téléchargée normalement à la demande
+    cache = WebContentCache(os.path.join(tmp_dir, "cancel.db"))
+    assert "Ferme du Soleil" in cache.get(urls[-1])
+    cache.close()
+    print(f"✅ Préchargement annulé en {elapsed:.2f}s")
+
+def test_web_cache():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), SiteHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            check_cache(base_url, tmp_dir)
+            check_stale_when_offline(tmp_dir)
+            check_prefetch(base_url, tmp_dir)
+            check_cancel_pending(base_url, tmp_dir)
+    finally:
+        server.shutdown()
+
+def main():
+    """Test du cache des sites web"""
+    print("🧪 Test du WebContentCache")
+    print("=" * 50)
+    test_web_cache()
+    print("\n🎉 Tous les tests du cache web sont passés")
+
+if __name__ == "__main__":
+    main()